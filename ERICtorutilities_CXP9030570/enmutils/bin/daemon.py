@@ -20,25 +20,35 @@ daemon - Tool that runs code as a background daemon
 
 Usage:
   daemon IDENTIFIER [LOG_IDENTIFIER]
+  daemon --zygote
+  daemon --stats [DAEMONS...]
 
 Arguments:
    IDENTIFIER        Is the identifier
    LOG_IDENTIFIER    Is the log identifier to use for log folder name
+   DAEMONS           Are the identifiers of the daemons to display start stats for, defaults to all
 
 Examples:
     ./daemon pm_06
         Will run anything associated with pm_06 identifier which is stored in redis
+    ./daemon --zygote
+        Will preload the common modules and fork a daemon for each start request received on the zygote socket
+    ./daemon --stats
+        Will display the start latency and PSS memory usage of the daemons, and their averages per launcher
 
 Options:
   -h        Print this help text
+  --zygote  Run the zygote server, which forks daemons on request
+  --stats   Display the start latency and PSS memory usage of the daemons started by the zygote and by popen
 """
 
+import functools
 import os
 import sys
 
 from docopt import docopt
 
-from enmutils.lib import (init, exception, config, persistence, log)
+from enmutils.lib import (init, exception, config, persistence, log, zygote)
 
 
 def cli():
@@ -55,19 +65,77 @@ def cli():
         else:
             raise
 
-    identifier = arguments['IDENTIFIER']
-    log_identifier = arguments['LOG_IDENTIFIER']
-
-    # Initialize logging and load our configuration properties
-    init.global_init("tool", "prod", log_identifier or identifier, sys.argv,
-                     simplified_logging=True, execution_timeout=-1)
-
-    # Attempt to load internal props in case our target is in enmutils_int
+    if arguments['--zygote']:
+        init.global_init("tool", "prod", zygote.ZYGOTE_IDENTIFIER, sys.argv[:2], simplified_logging=True,
+                         execution_timeout=-1)
+        _load_int_config()
+        zygote.serve(functools.partial(run, launcher="zygote"))
+    elif arguments['--stats']:
+        init.global_init("tool", "prod", "daemon", sys.argv)
+        display_start_stats(arguments['DAEMONS'] or None)
+        init.exit(0)
+    else:
+        init.exit(run(arguments['IDENTIFIER'], arguments['LOG_IDENTIFIER']))
+
+
+def _load_int_config():
+    """
+    Attempt to load internal props in case our target is in enmutils_int
+    """
     try:
         config.load_config("int", True)
     except:
         pass
 
+
+def display_start_stats(identifiers=None):
+    """
+    Log the start latency and PSS memory usage of the daemons, followed by their averages per launcher
+
+    :param identifiers: Identifiers of the daemons, defaults to all daemons with start stats recorded
+    :type identifiers: list
+
+    :return: Dictionary of launcher to tuple of number of daemons, average latency (s) and average pss (kB)
+    :rtype: dict
+    """
+    stats = zygote.get_start_stats(identifiers)
+    if not stats:
+        log.logger.info("No daemon start stats recorded")
+        return {}
+    launchers = {}
+    for identifier, start_stats in sorted(stats.items()):
+        log.logger.info("{0}: launcher {1}, start latency {2}s, PSS {3}kB".format(
+            identifier, start_stats["launcher"], start_stats["latency"], start_stats["pss"]))
+        launchers.setdefault(start_stats["launcher"], []).append(start_stats)
+    averages = {}
+    for launcher, launcher_stats in sorted(launchers.items()):
+        count = len(launcher_stats)
+        averages[launcher] = (count, round(sum(item["latency"] for item in launcher_stats) / count, 3),
+                              sum(item["pss"] for item in launcher_stats) / count)
+        log.logger.info("{0}: {1} daemon(s), average start latency {2}s, average PSS {3}kB".format(
+            launcher, *averages[launcher]))
+    return averages
+
+
+def run(identifier, log_identifier, launcher="popen"):
+    """
+    Run the function reference and arguments persisted for the identifier
+
+    :param identifier: Identifier of the daemon
+    :type identifier: str
+    :param log_identifier: Log identifier to use for log file name
+    :type log_identifier: str
+    :param launcher: Name of the launcher which started the daemon, i.e. popen or zygote
+    :type launcher: str
+
+    :return: Return code of the daemon
+    :rtype: int
+    """
+    # Initialize logging and load our configuration properties
+    init.global_init("tool", "prod", log_identifier or identifier, sys.argv,
+                     simplified_logging=True, execution_timeout=-1)
+    _load_int_config()
+
     # Attempt to load the function reference and arguments from persisted target
     pickled_identifier = identifier + '_pickled'
     target = persistence.get(pickled_identifier)
@@ -86,6 +154,7 @@ def cli():
     args = target[1] or []
     rc = 0
     result = None
+    zygote.record_start_latency(identifier, launcher)
 
     # Execute the function
     try:
@@ -106,7 +175,7 @@ def cli():
     if result is not None and not result:
         rc = 1
 
-    init.exit(rc)
+    return rc
 
 
 if __name__ == "__main__":
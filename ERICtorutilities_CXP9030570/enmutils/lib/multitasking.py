@@ -23,6 +23,7 @@ import exception
 import cache
 import timestamp
 import exceptions
+import zygote
 
 
 # List of all UtilitiesThread instances we initialize over the course of the run
@@ -111,7 +112,8 @@ class AbstractUtilitiesDaemon(object):
         """
         Writes the PID file for this daemon process
         """
-        self.pid = self.proc.pid
+        if self.proc:
+            self.pid = self.proc.pid
         with open(self.pidfile, 'w+') as f:
             f.write("{0}\n".format(self.pid))
         log.logger.debug("Process ID {0} written to file: {1}".format(self.pid, self.pidfile))
@@ -207,6 +209,8 @@ class AbstractUtilitiesDaemon(object):
 
 class UtilitiesDaemon(AbstractUtilitiesDaemon):
     counter = 1
+    # Daemons of subclasses enabling the zygote are forked by the zygote server, if the zygote property is enabled
+    use_zygote = False
 
     def __init__(self, identifier, target, args=None, log_identifier=None,
                  scheduler=False):
@@ -250,12 +254,33 @@ class UtilitiesDaemon(AbstractUtilitiesDaemon):
         if not os.path.exists(profile_symlink):
             os.symlink(daemon_path, profile_symlink)
 
+        self.daemon_path = daemon_path
+        self.log_identifier = log_identifier.lower() if log_identifier else None
         self.cmd = [profile_symlink, identifier]
         if log_identifier:
             self.cmd.append(log_identifier.lower())
         if scheduler:
             self.cmd.append('--scheduler')
 
+    def start(self):
+        """
+        Starts this daemon process, forked by the zygote server if enabled, falling back to executing the daemon command
+        """
+        if self.use_zygote and zygote.is_enabled():
+            self._raise_if_running()
+            pid = zygote.spawn(self.id, self.log_identifier, self.cmd, self.base_dir) if zygote.start(
+                self.daemon_path) else None
+            if pid:
+                self.proc, self.pid = None, pid
+                self.write_pid_file()
+                return
+            log.logger.debug("Zygote unavailable, executing daemon command {0}".format(str(self.cmd)))
+        os.environ[zygote.REQUEST_TIME_ENV] = str(time.time())
+        try:
+            super(UtilitiesDaemon, self).start()
+        finally:
+            os.environ.pop(zygote.REQUEST_TIME_ENV, None)
+
 
 class UtilitiesExternalDaemon(AbstractUtilitiesDaemon):
     counter = 1
@@ -13,8 +13,15 @@ import pkgutil
 import time
 import string
 import random
+import threading
+from collections import OrderedDict
+from itertools import islice
+from contextlib import contextmanager
+from functools import wraps
+from timeit import default_timer as timer
+
 import redis
-from redis.exceptions import ConnectionError, TimeoutError
+from redis.exceptions import ConnectionError, ResponseError, TimeoutError
 
 import multitasking
 import config
@@ -32,8 +39,73 @@ MUTEX_DB_INDEX = 32
 INDEX_MGR_DB_INDEX = 33
 NODE_POOL_DB_INDEX = 34
 ENMUTILS_DB_PORT = 6379
+UNIX_SOCKET_PROPERTY = "persistence_unix_socket"
+SIZE_COMMANDS = {"string": "strlen", "hash": "hlen", "list": "llen", "set": "scard", "zset": "zcard"}
+SNAPSHOT_TIMEOUT_SECS = 30 * 60
+SCAN_COUNT = 1000
+TRANSACTION_ATTEMPTS = 10
 
 pid = None
+LATENCY_STATS = {}
+LATENCY_STATS_LOCK = threading.Lock()
+
+
+def _add_latency(command, secs):
+    """
+    Adds the duration of a command to the latency counters of this process
+
+    :param command: Name of the command
+    :type command: str
+    :param secs: Duration of the command in seconds
+    :type secs: float
+    """
+    with LATENCY_STATS_LOCK:
+        stats = LATENCY_STATS.setdefault(command, {"count": 0, "total_secs": 0.0, "max_secs": 0.0})
+        stats["count"] += 1
+        stats["total_secs"] += secs
+        stats["max_secs"] = max(stats["max_secs"], secs)
+
+
+def _record_latency(command):
+    """
+    Decorator which records the duration of each call of the decorated method in the latency counters
+
+    :param command: Name of the command the counters are recorded under
+    :type command: str
+
+    :return: Decorator
+    :rtype: function
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = timer()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _add_latency(command, timer() - start)
+        return wrapper
+    return decorator
+
+
+def get_latency_stats():
+    """
+    Returns the latency counters of the persistence commands issued by this process
+
+    :return: Dictionary of command name to the count, total, average and maximum duration (seconds) of the command
+    :rtype: dict
+    """
+    with LATENCY_STATS_LOCK:
+        return {command: dict(stats, avg_secs=stats["total_secs"] / stats["count"])
+                for command, stats in LATENCY_STATS.iteritems()}
+
+
+def reset_latency_stats():
+    """
+    Resets the latency counters of the persistence commands issued by this process
+    """
+    with LATENCY_STATS_LOCK:
+        LATENCY_STATS.clear()
 
 
 class Persistence(object):
@@ -69,15 +141,33 @@ class Persistence(object):
         if self.connection:
             return
         if self.production:
-            if self.logging_enabled:
-                log.logger.debug("Initializing client Redis connection to DB index {0} running on local port {1}"
-                                 .format(self.index, self.port))
             self._start_redis_daemon()
-            self.connection = redis.StrictRedis(port=self.port, db=self.index)
+            unix_socket_path = self._get_unix_socket_path()
+            if self.logging_enabled:
+                log.logger.debug("Initializing client Redis connection to DB index {0} running on {1}".format(
+                    self.index, "unix socket {0}".format(unix_socket_path) if unix_socket_path else
+                    "local port {0}".format(self.port)))
+            if unix_socket_path:
+                self.connection = redis.StrictRedis(unix_socket_path=unix_socket_path, db=self.index)
+            else:
+                self.connection = redis.StrictRedis(port=self.port, db=self.index)
         else:
             import fakeredis
             self.connection = fakeredis.FakeStrictRedis()
 
+    @staticmethod
+    def _get_unix_socket_path():
+        """
+        Returns the path of the unix socket of the local enmutils-db, if enabled and the socket exists and is accessible
+        to the current user
+
+        :return: Path of the unix socket, or None if the TCP port is to be used
+        :rtype: str or None
+        """
+        unix_socket_path = config.get_prop(UNIX_SOCKET_PROPERTY) if config.has_prop(UNIX_SOCKET_PROPERTY) else None
+        return (unix_socket_path if unix_socket_path and os.path.exists(unix_socket_path) and
+                os.access(unix_socket_path, os.R_OK | os.W_OK) else None)
+
     def _start_redis_daemon(self):
         """
         Starts redis daemon if not running on the deployment
@@ -107,6 +197,7 @@ class Persistence(object):
 
             self.daemon_started = True
 
+    @_record_latency("set")
     def set(self, key, value, expiry, log_values=True):
         """
         Values are persisted with a specified expiry time (in seconds), where a negative value denotes no expiry
@@ -119,6 +210,29 @@ class Persistence(object):
         :type expiry: int
         :param log_values: Security option to disable writing sensitive values to logs (optional)
         :type log_values: bool (optional)
+        """
+        value = self._prepare_value(key, value, expiry, log_values)
+
+        if expiry >= 0:
+            self.connection.setex(key, expiry, value)
+        else:
+            self.connection.set(key, value)
+
+    def _prepare_value(self, key, value, expiry, log_values):
+        """
+        Validates and logs the value to be persisted, and returns the pickled value
+
+        :param key: key identifier for the value
+        :type key: str
+        :param value: object to store
+        :type value: object
+        :param expiry: Duration of time until the key becomes invalid (seconds). A negative value indicates no expiry
+        :type expiry: int
+        :param log_values: Security option to disable writing sensitive values to logs
+        :type log_values: bool
+
+        :return: pickled value
+        :rtype: str
         :raises ValueError: raises if key is not instance or value is none ot expiry is none
         """
         # Make sure we have sane inputs
@@ -141,13 +255,39 @@ class Persistence(object):
             log.logger.debug("%s%s" % (message[:1000], end_message) if len(message) >= 1000 else message)
 
         # pickle the value before persisting
-        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
 
-        if expiry >= 0:
-            self.connection.setex(key, expiry, value)
-        else:
-            self.connection.set(key, value)
+    @_record_latency("set_keys")
+    def set_keys(self, key_values, expiry):
+        """
+        Persists multiple values in a single transaction, either all of the values are persisted or none of them
 
+        :param key_values: Dictionary of key identifiers and the objects to store
+        :type key_values: dict
+        :param expiry: Duration of time until the keys become invalid (seconds). A negative value indicates no expiry
+        :type expiry: int
+        :raises ValueError: raised if any key is not a string or any value is None or expiry is None
+        """
+        if any(not isinstance(key, str) for key in key_values):
+            raise ValueError("Could not persist data; specified key is not of type string")
+        elif any(value is None for value in key_values.itervalues()):
+            raise ValueError("Could not persist data; specified value is NoneType")
+        elif expiry is None:
+            raise ValueError("Could not persist data; specified expiry is NoneType")
+
+        if self.logging_enabled:
+            log.logger.debug("  Persisting {0} keys in a single transaction".format(len(key_values)))
+
+        pipeline = self.connection.pipeline(transaction=True)
+        for key, value in key_values.iteritems():
+            value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            if expiry >= 0:
+                pipeline.setex(key, expiry, value)
+            else:
+                pipeline.set(key, value)
+        pipeline.execute()
+
+    @_record_latency("get")
     def get(self, key):
         """
         Retrieves a value from persistence using the key as it's identifier
@@ -172,6 +312,7 @@ class Persistence(object):
                         log.logger.debug('Removing key {0}, error was: {1}'.format(key, str(e)))
                     self.remove(key)
 
+    @_record_latency("get_keys")
     def get_keys(self, keys):
         """
         Retrieves all values from persistence using the keys as identifiers
@@ -204,6 +345,87 @@ class Persistence(object):
                     log.logger.debug("Failed to load object correctly, error encountered: {0}".format(str(e)))
         return loaded_objects
 
+    @_record_latency("get_hash")
+    def get_hash(self, key):
+        """
+        Retrieves all of the fields and values of the hash stored at the key
+
+        :param key: key of the hash
+        :type key: str
+
+        :returns: Dictionary of the fields and values of the hash, empty if the key does not exist
+        :rtype: dict
+        """
+        return self.connection.hgetall(key)
+
+    @_record_latency("get_hash_values")
+    def get_hash_values(self, key, fields):
+        """
+        Retrieves the values of the fields of the hash stored at the key, in a single command
+
+        :param key: key of the hash
+        :type key: str
+        :param fields: fields of the hash to retrieve
+        :type fields: list
+
+        :returns: List of the values of the fields, None for each field which does not exist
+        :rtype: list
+        """
+        return self.connection.hmget(key, fields) if fields else []
+
+    @_record_latency("update_hashes")
+    def update_hashes(self, increments=None, values=None):
+        """
+        Increments the counters and sets the values of fields of hashes in a single transaction, either all of the
+        fields are updated or none of them
+
+        :param increments: Dictionary of the keys of the hashes to the dictionary of the fields to increment and the
+                            amount to increment them by
+        :type increments: dict
+        :param values: Dictionary of the keys of the hashes to the dictionary of the fields to set and their values, a
+                        value of None removes the field
+        :type values: dict
+        """
+        pipeline = self.connection.pipeline(transaction=True)
+        for command, args in _get_hash_commands(increments, values):
+            getattr(pipeline, command)(*args)
+        pipeline.execute()
+
+    @_record_latency("update_hashes_from_values")
+    def update_hashes_from_values(self, key, fields, get_updates, attempts=TRANSACTION_ATTEMPTS):
+        """
+        Reads the values of fields of the hash and updates the hashes based on them in a single transaction, retried
+        if the hash is changed by another client between the read and the update
+
+        :param key: key of the hash, watched for changes
+        :type key: str
+        :param fields: fields of the hash to read
+        :type fields: list
+        :param get_updates: Function taking the list of the values of the fields, None for each field which does not
+                            exist, and returning the increments and values to update the hashes with, as taken by
+                            update_hashes
+        :type get_updates: function
+        :param attempts: Number of times the transaction is attempted
+        :type attempts: int
+
+        :returns: True if the hashes were updated, False if the hash kept changing during every attempt
+        :rtype: bool
+        """
+        with self.connection.pipeline(transaction=True) as pipeline:
+            for _ in xrange(attempts):
+                try:
+                    pipeline.watch(key)
+                    increments, values = get_updates(pipeline.hmget(key, fields) if fields else [])
+                    pipeline.multi()
+                    for command, args in _get_hash_commands(increments, values):
+                        getattr(pipeline, command)(*args)
+                    pipeline.execute()
+                    return True
+                except redis.WatchError:
+                    continue
+        return False
+
+    @_record_latency("has_key")
     def has_key(self, key):
         """
         Checks if key exists in storage
@@ -244,6 +466,7 @@ class Persistence(object):
         log.logger.debug("Redis DB running (i.e. pong response detected from ping): {0}".format(db_running))
         return db_running
 
+    @_record_latency("remove")
     def remove(self, key):
         """
         Removes key and value from persistence
@@ -263,6 +486,7 @@ class Persistence(object):
                 log.logger.debug('Error removing the key %s' % key)
         return result
 
+    @_record_latency("get_ttl")
     def get_ttl(self, key):
         """
         Determines the ttl (time to live), the amount of time before the key expires
@@ -284,6 +508,7 @@ class Persistence(object):
 
         return ttl
 
+    @_record_latency("update_ttl")
     def update_ttl(self, key, expiry):
         """
         Updates the ttl (time to live), the amount of time before the key expires
@@ -301,6 +526,49 @@ class Persistence(object):
             if self.logging_enabled:
                 log.logger.debug('Error updating ttl for key %s' % key)
 
+    def scan_keys(self, match="*", count=SCAN_COUNT):
+        """
+        Incrementally iterates over the keys in storage, using SCAN rather than KEYS so the DB is not blocked
+
+        :param match: Glob-style pattern the keys are matched against by the DB
+        :type match: str
+        :param count: Number of keys the DB examines per SCAN call
+        :type count: int
+
+        :yields: Name of each of the keys, once
+        :ytype: str
+        """
+        seen = {}  # SCAN may return a key more than once while the DB is rehashing
+        for key in self.connection.scan_iter(match=match, count=count):
+            if key not in seen:
+                seen[key] = True
+                yield key
+
+    @_record_latency("get_key_details")
+    def get_key_details(self, keys):
+        """
+        Get the ttl, type and size of each of the keys, i.e. the length of string values and the number of elements
+        of the other types, in one pipeline getting the ttl and type of the keys and one getting their size
+
+        :param keys: Names of the keys
+        :type keys: list
+
+        :returns: List of tuples of the key, ttl, type and size of the value of each of the keys
+        :rtype: list
+        """
+        pipeline = self.connection.pipeline(transaction=False)
+        for key in keys:
+            pipeline.ttl(key)
+            pipeline.type(key)
+        responses = pipeline.execute()
+        ttls, key_types = responses[::2], responses[1::2]
+        pipeline = self.connection.pipeline(transaction=False)
+        sized_keys = [(key, key_type) for key, key_type in zip(keys, key_types) if key_type in SIZE_COMMANDS]
+        for key, key_type in sized_keys:
+            getattr(pipeline, SIZE_COMMANDS[key_type])(key)
+        sizes = dict(zip([key for key, _ in sized_keys], pipeline.execute() if sized_keys else []))
+        return [(key, ttl, key_type, sizes.get(key, 0)) for key, ttl, key_type in zip(keys, ttls, key_types)]
+
     def get_all_keys(self):
         """
         Returns a list of all keys in storage
@@ -313,7 +581,7 @@ class Persistence(object):
         key_list = None
 
         try:
-            key_list = self.connection.keys("*")
+            key_list = [key for key in self.scan_keys()]
         except:
             if self.logging_enabled:
                 log.logger.debug('Error getting all keys')
@@ -322,16 +590,22 @@ class Persistence(object):
 
     def clear(self):
         """
-        Removes all keys from storage that do not have an infinite expiration
+        Removes all keys from storage that do not have an infinite expiration, checking and removing the keys in
+        pipelined chunks
 
         NOTE: Keys that have no expiration or begin with 'permanent-' will not be cleared
         """
 
         try:
-            keys = self.get_all_keys()
-            for key in keys:
-                if self.connection.ttl(key) > -1 and not key.startswith("permanent-"):
-                    self.remove(key)
+            keys = iter(self.get_all_keys())
+            for chunk in iter(lambda: [key for key in islice(keys, SCAN_COUNT)], []):
+                pipeline = self.connection.pipeline(transaction=False)
+                for key in chunk:
+                    pipeline.ttl(key)
+                expiring_keys = [key for key, ttl in zip(chunk, pipeline.execute())
+                                 if ttl > -1 and not key.startswith("permanent-")]
+                if expiring_keys:
+                    self.connection.delete(*expiring_keys)
         except:
             exception.process_exception("Exception raised while clearing persistence DB")
             raise
@@ -479,13 +753,34 @@ class Persistence(object):
 
         return self.connection.get(key) is None
 
-    def save(self):
+    def save(self, timeout=SNAPSHOT_TIMEOUT_SECS):
         """
-        Saves a snapshot of the Redis Db at the moment it is issued
+        Saves a snapshot of the Redis Db at the moment it is issued, in the background (BGSAVE) so that the other
+        clients are not blocked while the snapshot is written, and waits for the snapshot to complete
         Snapshot stored in location specified under 'dir' in the enmutils-db.conf file
 
+        :param timeout: Number of seconds to wait for the snapshot to complete
+        :type timeout: int
+
+        :returns: True if the snapshot completed successfully within the timeout
+        :rtype: bool
+        :raises ResponseError: if the background save could not be started
         """
-        self.connection.save()
+        last_save = self.connection.lastsave()
+        try:
+            self.connection.bgsave()
+        except ResponseError as e:
+            # A background save already in progress completes the snapshot
+            if "in progress" not in str(e):
+                raise
+            log.logger.debug("Waiting for the snapshot in progress to complete: {0}".format(str(e)))
+        expiry = time.time() + timeout
+        while self.connection.lastsave() == last_save:
+            if time.time() > expiry:
+                log.logger.debug("Snapshot not completed within {0}s".format(timeout))
+                return False
+            time.sleep(1)
+        return self.connection.info("persistence").get("rdb_last_bgsave_status", "ok") == "ok"
 
     def shutdown(self):
         """
@@ -515,6 +810,256 @@ class Persistence(object):
         return getattr(cls, index_str)
 
 
+class BatchResult(object):
+
+    def __init__(self, loader=None):
+        """
+        Constructor for the result of a command queued in a batch, the value is set when the batch is flushed
+
+        :param loader: Function applied to the response of the command to obtain the value
+        :type loader: function
+        """
+        self.loader = loader
+        self.value = None
+        self.flushed = False
+
+    def set_response(self, response):
+        """
+        Sets the value of the result from the response of the command
+
+        :param response: Response of the command
+        :type response: object
+        """
+        self.value = self.loader(response) if self.loader else response
+        self.flushed = True
+
+
+class Batch(object):
+
+    def __init__(self):
+        """
+        Constructor for a Batch object, which queues commands across DB indexes until flushed
+        """
+        self.commands = []
+
+    def __len__(self):
+        return len(self.commands)
+
+    def _queue(self, db, command, args, loader=None):
+        """
+        Queues the command against the persistence object
+
+        :param db: Persistence object the command is issued against, None for the default persistence object
+        :type db: Persistence
+        :param command: Name of the Redis command
+        :type command: str
+        :param args: Arguments of the Redis command
+        :type args: tuple
+        :param loader: Function applied to the response of the command to obtain the value of the result
+        :type loader: function
+
+        :return: Result of the command, set when the batch is flushed
+        :rtype: BatchResult
+        """
+        result = BatchResult(loader)
+        self.commands.append((db or default_db(), command, args, result))
+        return result
+
+    def set(self, key, value, expiry, log_values=True, db=None):
+        """
+        Queues the value to be persisted with a specified expiry time (in seconds), where a negative value denotes no
+        expiry
+
+        :param key: key identifier for the value
+        :type key: str
+        :param value: object to store
+        :type value: object
+        :param expiry: Duration of time until the key becomes invalid (seconds). A negative value indicates no expiry
+        :type expiry: int
+        :param log_values: Security option to disable writing sensitive values to logs (optional)
+        :type log_values: bool
+        :param db: Persistence object to persist the value in, None for the mutex persistence object if the key exists
+                    there when the batch is flushed, as for persistence.set, otherwise the default persistence object
+        :type db: Persistence
+
+        :return: Result of the command, set when the batch is flushed
+        :rtype: BatchResult
+        """
+        value = (db or default_db())._prepare_value(key, value, expiry, log_values)
+        command, args = ("setex", (key, expiry, value)) if expiry >= 0 else ("set", (key, value))
+        if db:
+            return self._queue(db, command, args)
+        result = BatchResult()
+        self.commands.append((None, command, args, result))
+        return result
+
+    @staticmethod
+    def _route_commands(commands):
+        """
+        Resolves the persistence object of the queued sets without one, to the mutex persistence object if the key
+        exists there, otherwise the default persistence object, checking all of the keys in a single pipeline
+
+        :param commands: Queued commands, updated with the persistence object of each set
+        :type commands: list
+        """
+        indexes = [index for index, (db, _, _, _) in enumerate(commands) if db is None]
+        if not indexes:
+            return
+        pipeline = mutex_db().connection.pipeline(transaction=False)
+        for index in indexes:
+            pipeline.exists(commands[index][2][0])
+        for index, exists in zip(indexes, pipeline.execute()):
+            commands[index] = (mutex_db() if exists else default_db(),) + commands[index][1:]
+
+    def get(self, key, db=None):
+        """
+        Queues the retrieval of the value of the key
+
+        :param key: cache key
+        :type key: str
+        :param db: Persistence object to retrieve the value from, None for the default persistence object
+        :type db: Persistence
+
+        :return: Result of the command, whose value is the object retrieved or None, set when the batch is flushed
+        :rtype: BatchResult
+        """
+        return self._queue(db, "get", (key,), loader=_loads)
+
+    def has_key(self, key, db=None):
+        """
+        Queues the check if the key exists
+
+        :param key: key to search for
+        :type key: str
+        :param db: Persistence object to search, None for the default persistence object
+        :type db: Persistence
+
+        :return: Result of the command, set when the batch is flushed
+        :rtype: BatchResult
+        """
+        return self._queue(db, "exists", (key,), loader=bool)
+
+    def remove(self, key, db=None):
+        """
+        Queues the removal of the key
+
+        :param key: key to remove
+        :type key: str
+        :param db: Persistence object to remove the key from, None for the default persistence object
+        :type db: Persistence
+
+        :return: Result of the command, 1 if the key was removed, set when the batch is flushed
+        :rtype: BatchResult
+        """
+        return self._queue(db, "delete", (key,))
+
+    def expire(self, key, expiry, db=None):
+        """
+        Queues the update of the ttl (time to live) of the key
+
+        :param key: persisted item's identifier
+        :type key: str
+        :param expiry: Duration of time until the key becomes invalid (seconds). A negative value indicates no expiry
+        :type expiry: int
+        :param db: Persistence object holding the key, None for the default persistence object
+        :type db: Persistence
+
+        :return: Result of the command, set when the batch is flushed
+        :rtype: BatchResult
+        """
+        if expiry >= 0:
+            return self._queue(db, "expire", (key, expiry))
+        return self._queue(db, "persist", (key,))
+
+    def update_hashes(self, increments=None, values=None, db=None):
+        """
+        Queues the increments of the counters and the updates of the values of fields of hashes, each of which is
+        applied atomically
+
+        :param increments: Dictionary of the keys of the hashes to the dictionary of the fields to increment and the
+                            amount to increment them by
+        :type increments: dict
+        :param values: Dictionary of the keys of the hashes to the dictionary of the fields to set and their values, a
+                        value of None removes the field
+        :type values: dict
+        :param db: Persistence object holding the hashes, None for the default persistence object
+        :type db: Persistence
+
+        :return: Results of the commands, set when the batch is flushed
+        :rtype: list
+        """
+        return [self._queue(db, command, args) for command, args in _get_hash_commands(increments, values)]
+
+    @_record_latency("batch")
+    def flush(self):
+        """
+        Issues the queued commands, in a single pipeline per DB index, and sets the results of the commands
+
+        :return: Number of commands issued
+        :rtype: int
+        """
+        commands, self.commands = self.commands, []
+        self._route_commands(commands)
+        commands_by_index = OrderedDict()
+        for db, command, args, result in commands:
+            commands_by_index.setdefault(db.index, (db, []))[1].append((command, args, result))
+
+        for db, db_commands in commands_by_index.itervalues():
+            pipeline = db.connection.pipeline(transaction=False)
+            for command, args, _ in db_commands:
+                getattr(pipeline, command)(*args)
+            for (_, _, result), response in zip(db_commands, pipeline.execute()):
+                result.set_response(response)
+
+        if commands and log.logger is not None:
+            log.logger.debug("  Flushed batch of {0} commands in {1} pipeline(s)".format(
+                len(commands), len(commands_by_index)))
+        return len(commands)
+
+
+def _get_hash_commands(increments=None, values=None):
+    """
+    Get the Redis commands which apply the increments and values to the fields of the hashes
+
+    :param increments: Dictionary of the keys of the hashes to the dictionary of the fields to increment and the
+                        amount to increment them by
+    :type increments: dict
+    :param values: Dictionary of the keys of the hashes to the dictionary of the fields to set and their values, a
+                    value of None removes the field
+    :type values: dict
+
+    :return: List of tuples of the name and the arguments of each of the commands
+    :rtype: list
+    """
+    commands = []
+    for key, fields in (increments or {}).iteritems():
+        commands.extend(("hincrby", (key, field, amount)) for field, amount in fields.iteritems() if amount)
+    for key, fields in (values or {}).iteritems():
+        removed = [field for field, value in fields.iteritems() if value is None]
+        updated = dict((field, value) for field, value in fields.iteritems() if value is not None)
+        if removed:
+            commands.append(("hdel", (key,) + tuple(removed)))
+        if updated:
+            commands.append(("hmset", (key, updated)))
+    return commands
+
+
+def _loads(value):
+    """
+    Unpickles the value retrieved from persistence
+
+    :param value: pickled value
+    :type value: str
+
+    :return: unpickled object, or None if the value does not exist or cannot be unpickled
+    :rtype: object
+    """
+    try:
+        return pickle.loads(value) if value is not None else None
+    except Exception as e:
+        log.logger.debug("Failed to load object correctly, error encountered: {0}".format(str(e)))
+
+
 # Below are the helper functions to delegate the persistence operations on the persistence object
 # This is for backword compatibility across the api
 
@@ -711,6 +1256,23 @@ def has_key(key):
     return default_db().has_key(key) or mutex_db().has_key(key)
 
 
+@contextmanager
+def batch():
+    """
+    Context manager which queues the set, get, has_key, remove, expire and update_hashes commands issued on the yielded
+    batch, across DB indexes, and flushes them in a single pipeline per DB index on exit. As with commands issued one at a time, the
+    commands queued before an exception raised within the context are still issued.
+
+    :yields: Batch to queue the commands on
+    :ytype: Batch
+    """
+    commands = Batch()
+    try:
+        yield commands
+    finally:
+        commands.flush()
+
+
 def clear(*args, **kwargs):
     """
     Removes all keys from storage that do not have an infinite expiration.
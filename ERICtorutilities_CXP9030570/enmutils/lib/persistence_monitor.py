@@ -0,0 +1,438 @@
+# ********************************************************************
+# Name    : Persistence Monitor
+# Summary : Health monitoring of the local Redis DB (enmutils-db).
+#           Samples the memory usage, keyspace and slow log of the
+#           DB, attributes the memory used to the key namespaces,
+#           e.g. nodes, profiles, MOs and sessions, and keeps a
+#           rolling history of the samples in persistence, which is
+#           checked for memory, slow command and key growth warnings.
+# ********************************************************************
+
+import re
+import time
+from itertools import islice
+
+# These modules are imported relatively from current python package i.e. lib
+# and to avoid circular imports we cannot do from . import ...
+import config
+import log
+import mutexer
+import persistence
+# End circular imports
+
+HISTORY_KEY = "persistence-health-history"
+HISTORY_SIZE_PROPERTY = "persistence_health_history_size"
+MEMORY_WARNING_PROPERTY = "persistence_memory_warning_percent"
+KEY_GROWTH_WARNING_PROPERTY = "persistence_key_growth_warning_percent"
+SLOW_COMMAND_WARNING_PROPERTY = "persistence_slow_command_warning_ms"
+DEFAULT_HISTORY_SIZE = 96
+DEFAULT_MEMORY_WARNING_PERCENT = 80
+DEFAULT_KEY_GROWTH_WARNING_PERCENT = 50
+DEFAULT_SLOW_COMMAND_WARNING_MS = 100
+SCAN_COUNT = 1000
+HEADER_BYTES = 200
+SLOWLOG_LENGTH = 10
+NODE_CLASS_MODULES = ["enm_node\n", "load_node\n"]
+PROFILE_CLASS_MODULES = ["profile_flows.", "enmutils_int.lib.profile\n"]
+PROFILE_KEY_SUFFIXES = ("-status", "-diff", "-errors", "-warnings")
+NAMESPACES = ["nodes", "profiles", "mos", "sessions", "counters", "mutexes", "other"]
+MEMORY_USAGE_SUPPORTED = {}
+
+
+def _get_int_prop(key, default):
+    """
+    Get the value of the integer property, or the default if the property is not set
+
+    :param key: Name of the property
+    :type key: str
+    :param default: Value returned if the property is not set
+    :type default: int
+
+    :return: Value of the property
+    :rtype: int
+    """
+    return int(config.get_prop(key)) if config.has_prop(key) and config.get_prop(key) != "" else default
+
+
+def _call(db, command, *args):
+    """
+    Issues the command on the connection of the persistence object, as not all the commands are supported by all the
+    Redis versions
+
+    :param db: Persistence object
+    :type db: `persistence.Persistence`
+    :param command: Name of the method of the Redis client
+    :type command: str
+    :param args: Arguments of the command
+    :type args: list
+
+    :return: Response of the command, or None if the command failed
+    :rtype: object
+    """
+    try:
+        return getattr(db.connection, command)(*args)
+    except Exception as e:
+        log.logger.debug("Unable to get {0} of persistence DB index {1}: {2}".format(command, db.index, str(e)))
+
+
+def get_namespace(key, header="", index=None):
+    """
+    Get the namespace the key is attributed to, from the name of the key and the class of the persisted object
+
+    :param key: Name of the key
+    :type key: str
+    :param header: First bytes of the pickled value of the key, which hold the class of the persisted object
+    :type header: str
+    :param index: DB index of the key
+    :type index: int
+
+    :return: Name of the namespace
+    :rtype: str
+    """
+    namespace = "other"
+    if index == persistence.MUTEX_DB_INDEX or "mutex" in key:
+        namespace = "mutexes"
+    elif key.endswith("-mos"):
+        namespace = "mos"
+    elif "session" in key:
+        namespace = "sessions"
+    elif "count" in key:
+        namespace = "counters"
+    elif key.endswith(PROFILE_KEY_SUFFIXES) or any(module in header for module in PROFILE_CLASS_MODULES):
+        namespace = "profiles"
+    elif any(module in header for module in NODE_CLASS_MODULES):
+        namespace = "nodes"
+    return namespace
+
+
+def _supports_memory_usage(db):
+    """
+    Checks if the DB supports the MEMORY USAGE command, i.e. Redis 4.0 or later
+
+    :param db: Persistence object
+    :type db: `persistence.Persistence`
+
+    :return: True if the MEMORY USAGE command is supported
+    :rtype: bool
+    """
+    if db.index not in MEMORY_USAGE_SUPPORTED:
+        try:
+            db.connection.execute_command("MEMORY", "USAGE", HISTORY_KEY)
+            MEMORY_USAGE_SUPPORTED[db.index] = True
+        except Exception:
+            MEMORY_USAGE_SUPPORTED[db.index] = False
+    return MEMORY_USAGE_SUPPORTED[db.index]
+
+
+def _get_key_types(db, keys):
+    """
+    Get the type of each of the keys, in a single pipeline
+
+    :param db: Persistence object
+    :type db: `persistence.Persistence`
+    :param keys: Names of the keys
+    :type keys: list
+
+    :return: List of the type of each of the keys, "none" for keys which no longer exist
+    :rtype: list
+    """
+    pipeline = db.connection.pipeline(transaction=False)
+    for key in keys:
+        pipeline.type(key)
+    try:
+        return pipeline.execute()
+    except Exception as e:
+        log.logger.debug("Unable to get the type of {0} keys of persistence DB index {1}: {2}"
+                         .format(len(keys), db.index, str(e)))
+        return [None for _ in keys]
+
+
+def _queue_size_and_header_commands(pipeline, key, key_type, memory_usage_supported):
+    """
+    Queue the commands getting the size and the first bytes of the value of the key, for the type of the key
+
+    :param pipeline: Redis pipeline
+    :type pipeline: `redis.client.Pipeline`
+    :param key: Name of the key
+    :type key: str
+    :param key_type: Type of the key
+    :type key_type: str
+    :param memory_usage_supported: True if the MEMORY USAGE command is supported
+    :type memory_usage_supported: bool
+
+    :return: Function reading the size and header of the key from the responses to the queued commands, and the
+            number of commands queued
+    :rtype: tuple
+    """
+    if key_type == "none":
+        return lambda _: (0, ""), 0
+    if key_type in [None, "string"]:
+        if memory_usage_supported:
+            pipeline.execute_command("MEMORY", "USAGE", key)
+        else:
+            pipeline.strlen(key)
+        pipeline.getrange(key, 0, HEADER_BYTES)
+        return lambda responses: (responses[0] or 0, responses[1] or ""), 2
+    if memory_usage_supported:
+        pipeline.execute_command("MEMORY", "USAGE", key)
+        return lambda responses: (responses[0] or 0, ""), 1
+    if key_type == "hash":
+        pipeline.hgetall(key)
+        return lambda responses: (sum(len(field) + len(value) for field, value in
+                                      (responses[0] or {}).iteritems()), ""), 1
+    return lambda _: (0, ""), 0
+
+
+def _get_sizes_and_headers(db, keys, key_types, memory_usage_supported):
+    """
+    Get the size and header of each of the keys, in a single pipeline
+
+    :param db: Persistence object
+    :type db: `persistence.Persistence`
+    :param keys: Names of the keys
+    :type keys: list
+    :param key_types: Type of each of the keys
+    :type key_types: list
+    :param memory_usage_supported: True if the MEMORY USAGE command is supported
+    :type memory_usage_supported: bool
+
+    :raises Exception: if any of the commands fails
+
+    :return: List of tuples of the size and header of each of the keys
+    :rtype: list
+    """
+    pipeline = db.connection.pipeline(transaction=False)
+    readers = [_queue_size_and_header_commands(pipeline, key, key_type, memory_usage_supported)
+               for key, key_type in zip(keys, key_types)]
+    responses = pipeline.execute() if any(num_commands for _, num_commands in readers) else []
+    sizes_and_headers = []
+    for reader, num_commands in readers:
+        sizes_and_headers.append(reader(responses[:num_commands]))
+        responses = responses[num_commands:]
+    return sizes_and_headers
+
+
+def _get_key_sizes_and_headers(db, keys, key_types=None):
+    """
+    Get the memory used by each of the keys, or the length of the value where MEMORY USAGE is not supported, and the
+    first bytes of each string value, in a single pipeline. The commands are chosen by the type of each key, and if
+    the pipeline fails, e.g. as a key changed type since, the keys are sized one at a time, so that a single failing
+    key is the only one reported as empty.
+
+    :param db: Persistence object
+    :type db: `persistence.Persistence`
+    :param keys: Names of the keys
+    :type keys: list
+    :param key_types: Type of each of the keys, None to get the types
+    :type key_types: list
+
+    :return: List of tuples of the size and header of each of the keys
+    :rtype: list
+    """
+    memory_usage_supported = _supports_memory_usage(db)
+    key_types = key_types or _get_key_types(db, keys)
+    try:
+        return _get_sizes_and_headers(db, keys, key_types, memory_usage_supported)
+    except Exception as e:
+        log.logger.debug("Unable to get the size of {0} keys of persistence DB index {1} in a single pipeline, "
+                         "getting the size of each key: {2}".format(len(keys), db.index, str(e)))
+    sizes_and_headers = []
+    for key, key_type in zip(keys, key_types):
+        try:
+            sizes_and_headers.extend(_get_sizes_and_headers(db, [key], [key_type], memory_usage_supported))
+        except Exception as e:
+            log.logger.debug("Unable to get the size of key {0} of persistence DB index {1}: {2}"
+                             .format(key, db.index, str(e)))
+            sizes_and_headers.append((0, ""))
+    return sizes_and_headers
+
+
+def get_namespace_usage(dbs):
+    """
+    Get the number of keys and the memory used by each namespace, scanning all the keys of the persistence objects
+
+    :param dbs: Persistence objects to scan
+    :type dbs: list
+
+    :return: Tuple of dictionary of namespace to number of keys and bytes, and dictionary of DB index to number of keys
+    :rtype: tuple
+    """
+    usage = {namespace: {"keys": 0, "bytes": 0} for namespace in NAMESPACES}
+    keyspace = {}
+    for db in dbs:
+        keys = list(db.connection.scan_iter(count=SCAN_COUNT))
+        keyspace[db.index] = len(keys)
+        for start in xrange(0, len(keys), SCAN_COUNT):
+            chunk = keys[start:start + SCAN_COUNT]
+            for key, (size, header) in zip(chunk, _get_key_sizes_and_headers(db, chunk)):
+                namespace = get_namespace(key, header, db.index)
+                usage[namespace]["keys"] += 1
+                usage[namespace]["bytes"] += size
+    return usage, keyspace
+
+
+def get_prefix(key):
+    """
+    Get the prefix the key is grouped under, i.e. the key up to the first dash or digit, e.g. FM_ for FM_01-status
+
+    :param key: Name of the key
+    :type key: str
+
+    :return: Prefix of the key
+    :rtype: str
+    """
+    match = re.match(r"[^-0-9]+", key)
+    return match.group(0) if match else key
+
+
+def get_prefix_usage(db, match="*"):
+    """
+    Get the number of keys, the number of keys with an expiry and the memory used by each key prefix, scanning the
+    keys matching the pattern in pipelined chunks
+
+    :param db: Persistence object to scan
+    :type db: `persistence.Persistence`
+    :param match: Glob-style pattern the keys are matched against by the DB
+    :type match: str
+
+    :return: Dictionary of prefix to number of keys, number of expiring keys and bytes
+    :rtype: dict
+    """
+    usage = {}
+    keys = db.scan_keys(match=match, count=SCAN_COUNT)
+    for chunk in iter(lambda: list(islice(keys, SCAN_COUNT)), []):
+        key_details = db.get_key_details(chunk)
+        sizes = _get_key_sizes_and_headers(db, chunk, [key_type for _, _, key_type, _ in key_details])
+        for (key, ttl, _, _), (size, _) in zip(key_details, sizes):
+            prefix_usage = usage.setdefault(get_prefix(key), {"keys": 0, "expiring": 0, "bytes": 0})
+            prefix_usage["keys"] += 1
+            prefix_usage["expiring"] += 1 if ttl > -1 else 0
+            prefix_usage["bytes"] += size
+    return usage
+
+
+def take_sample():
+    """
+    Samples the memory usage, keyspace, slow log and memory used per namespace of the persistence DB
+
+    :return: Dictionary of the sampled values
+    :rtype: dict
+    """
+    default_db = persistence.default_db()
+    dbs = {db.index: db for db in [default_db, persistence.mutex_db()]}.values()
+    start_time = time.time()
+    namespaces, keyspace = get_namespace_usage(dbs)
+    info = _call(default_db, "info") or {}
+    slowlog = [{"id": entry["id"], "start_time": entry["start_time"], "duration_us": entry["duration"],
+                "command": str(entry["command"])[:100]}
+               for entry in _call(default_db, "slowlog_get", SLOWLOG_LENGTH) or []]
+    return {"time": start_time, "duration": time.time() - start_time,
+            "used_memory": info.get("used_memory", sum(usage["bytes"] for usage in namespaces.values())),
+            "used_memory_peak": info.get("used_memory_peak"), "maxmemory": info.get("maxmemory", 0),
+            "connected_clients": info.get("connected_clients"), "ops_per_sec": info.get("instantaneous_ops_per_sec"),
+            "keyspace": keyspace, "namespaces": namespaces, "slowlog": slowlog}
+
+
+def record_sample():
+    """
+    Takes a sample of the persistence DB and adds it to the rolling history of samples
+
+    :return: Dictionary of the sampled values
+    :rtype: dict
+    """
+    sample = take_sample()
+    history_size = _get_int_prop(HISTORY_SIZE_PROPERTY, DEFAULT_HISTORY_SIZE)
+    with mutexer.mutex(HISTORY_KEY, persisted=True):
+        history = (get_history() + [sample])[-history_size:]
+        persistence.default_db().set(HISTORY_KEY, history, -1, log_values=False)
+    log.logger.debug("Persistence health sample recorded in {0:.2f}s: {1} keys, {2} bytes used".format(
+        sample["duration"], sum(sample["keyspace"].values()), sample["used_memory"]))
+    for warning in check_health(sample, history[:-1]):
+        log.logger.debug("Persistence health warning: {0}".format(warning))
+    return sample
+
+
+def get_history():
+    """
+    Get the rolling history of samples of the persistence DB
+
+    :return: List of samples, oldest first
+    :rtype: list
+    """
+    return persistence.default_db().get(HISTORY_KEY) or []
+
+
+def check_health(sample, history=None):
+    """
+    Checks the sample for high memory usage, slow commands and key growth compared to the history of samples
+
+    :param sample: Sample of the persistence DB
+    :type sample: dict
+    :param history: Samples taken before the sample, oldest first
+    :type history: list
+
+    :return: List of warnings
+    :rtype: list
+    """
+    warnings = []
+    history = [previous for previous in history or [] if previous["time"] < sample["time"]]
+    memory_warning_percent = _get_int_prop(MEMORY_WARNING_PROPERTY, DEFAULT_MEMORY_WARNING_PERCENT)
+    if sample["maxmemory"] and sample["used_memory"] * 100.0 / sample["maxmemory"] >= memory_warning_percent:
+        warnings.append("Persistence DB is using {0:.1f}% of its maximum memory ({1:.1f}MB of {2:.1f}MB)".format(
+            sample["used_memory"] * 100.0 / sample["maxmemory"], sample["used_memory"] / 1024.0 ** 2,
+            sample["maxmemory"] / 1024.0 ** 2))
+
+    last_slowlog_id = max([entry["id"] for entry in history[-1]["slowlog"]] or [-1]) if history else -1
+    slow_command_warning_ms = _get_int_prop(SLOW_COMMAND_WARNING_PROPERTY, DEFAULT_SLOW_COMMAND_WARNING_MS)
+    slow_commands = [entry for entry in sample["slowlog"]
+                     if entry["id"] > last_slowlog_id and entry["duration_us"] >= slow_command_warning_ms * 1000]
+    if slow_commands:
+        slowest = max(slow_commands, key=lambda entry: entry["duration_us"])
+        warnings.append("{0} persistence command(s) took longer than {1}ms, slowest: {2} ({3:.1f}ms)".format(
+            len(slow_commands), slow_command_warning_ms, slowest["command"], slowest["duration_us"] / 1000.0))
+
+    key_growth_warning_percent = _get_int_prop(KEY_GROWTH_WARNING_PROPERTY, DEFAULT_KEY_GROWTH_WARNING_PERCENT)
+    num_keys = sum(sample["keyspace"].values())
+    previous_num_keys = sum(history[0]["keyspace"].values()) if history else 0
+    if previous_num_keys and (num_keys - previous_num_keys) * 100.0 / previous_num_keys >= key_growth_warning_percent:
+        warnings.append("Number of persistence keys has grown by {0:.0f}% ({1} to {2}) since {3}".format(
+            (num_keys - previous_num_keys) * 100.0 / previous_num_keys, previous_num_keys, num_keys,
+            time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(history[0]["time"]))))
+    return warnings
+
+
+def get_report(sample):
+    """
+    Get the lines of the report of the sample, with the memory used per namespace
+
+    :param sample: Sample of the persistence DB
+    :type sample: dict
+
+    :return: List of lines of the report
+    :rtype: list
+    """
+    def to_mb(num_bytes):
+        return "{0:.1f}MB".format(num_bytes / 1024.0 ** 2) if num_bytes else "n/a"
+
+    def or_na(value):
+        return value if value is not None else "n/a"
+
+    sample_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sample["time"]))
+    keyspace = ", ".join("{0}: {1}".format(index, num_keys) for index, num_keys in sorted(sample["keyspace"].items()))
+    lines = ["Sampled at: {0} in {1:.2f}s".format(sample_time, sample["duration"]),
+             "Used memory: {0} (peak: {1}, maximum: {2})".format(
+                 to_mb(sample["used_memory"]), to_mb(sample["used_memory_peak"]), to_mb(sample["maxmemory"])),
+             "Connected clients: {0}, operations per second: {1}".format(
+                 or_na(sample["connected_clients"]), or_na(sample["ops_per_sec"])),
+             "Keys per DB index: {0}".format(keyspace),
+             "{0:<10} {1:>10} {2:>14}".format("NAMESPACE", "KEYS", "BYTES")]
+    for namespace in NAMESPACES:
+        usage = sample["namespaces"][namespace]
+        if usage["keys"]:
+            lines.append("{0:<10} {1:>10} {2:>14}".format(namespace, usage["keys"], usage["bytes"]))
+    if sample["slowlog"]:
+        lines.append("Slow log:")
+    for entry in sample["slowlog"]:
+        lines.append("  {0} {1:.1f}ms {2}".format(time.strftime("%H:%M:%S", time.localtime(entry["start_time"])),
+                                                  entry["duration_us"] / 1000.0, entry["command"]))
+    return lines
@@ -0,0 +1,260 @@
+# ********************************************************************
+# Name    : Persistence Snapshot
+# Summary : Durability of the local Redis DB (enmutils-db). Applies
+#           the configured snapshot strategy, i.e. the Redis save
+#           points, or background snapshots (BGSAVE) scheduled
+#           outside the workload peak hours with a single save point
+#           kept as a backstop, and the optional append only file with
+#           its fsync policy. Records the duration and size of each
+#           snapshot, and streams backups of the keys to and from a
+#           file without stopping the DB.
+# ********************************************************************
+
+import cPickle as pickle
+import datetime
+import gzip
+import os
+import time
+
+# These modules are imported relatively from current python package i.e. lib
+# and to avoid circular imports we cannot do from . import ...
+import config
+import log
+import mutexer
+import persistence
+# End circular imports
+
+HISTORY_KEY = "persistence-snapshot-history"
+INTERVAL_PROPERTY = "persistence_snapshot_interval_mins"
+PEAK_HOURS_PROPERTY = "persistence_snapshot_peak_hours"
+AOF_PROPERTY = "persistence_aof_enabled"
+AOF_FSYNC_PROPERTY = "persistence_aof_fsync"
+AOF_FSYNC_POLICIES = ["always", "everysec", "no"]
+DEFAULT_INTERVAL_MINS = 0
+DEFAULT_AOF_FSYNC = "everysec"
+REDIS_SAVE_POINTS = "900 1 300 10 60 10000"
+SNAPSHOT_PATH = "/var/db/enmutils/enmutils.db"
+HISTORY_SIZE = 96
+MAX_DEFERRED_INTERVALS = 4
+BACKUP_CHUNK_SIZE = 1000
+
+
+def _get_prop(key, default):
+    """
+    Get the value of the property, or the default if the property is not set
+
+    :param key: Name of the property
+    :type key: str
+    :param default: Value returned if the property is not set
+    :type default: str
+
+    :return: Value of the property
+    :rtype: str
+    """
+    return str(config.get_prop(key)) if config.has_prop(key) and config.get_prop(key) != "" else default
+
+
+def get_interval_mins():
+    """
+    Get the number of minutes between the scheduled snapshots, 0 if the Redis save points are used instead
+
+    :return: Number of minutes between the scheduled snapshots
+    :rtype: int
+    """
+    return int(_get_prop(INTERVAL_PROPERTY, DEFAULT_INTERVAL_MINS))
+
+
+def get_peak_hours():
+    """
+    Get the workload peak hours, during which the scheduled snapshots are deferred, e.g. "07-09,17-19"
+
+    :return: List of tuples of the start and end hour of each peak period
+    :rtype: list
+    """
+    peak_hours = []
+    for period in _get_prop(PEAK_HOURS_PROPERTY, "").replace('"', '').split(","):
+        if "-" in period:
+            start, end = period.split("-")
+            peak_hours.append((int(start), int(end)))
+    return peak_hours
+
+
+def is_peak_time(now=None):
+    """
+    Checks if the time is within the workload peak hours
+
+    :param now: Time to check, None for the current time
+    :type now: `datetime.datetime`
+
+    :return: True if the time is within the peak hours
+    :rtype: bool
+    """
+    hour = (now or datetime.datetime.now()).hour
+    return any(start <= hour < end if start <= end else hour >= start or hour < end
+               for start, end in get_peak_hours())
+
+
+def get_save_points():
+    """
+    Get the Redis save points, i.e. the default save points if the scheduled snapshots are disabled, otherwise a
+    single save point taking a snapshot only if no scheduled snapshot was taken for longer than the scheduled
+    snapshots can be deferred, e.g. if the scheduled snapshots are no longer running
+
+    :return: Redis save points
+    :rtype: str
+    """
+    interval_mins = get_interval_mins()
+    if interval_mins <= 0:
+        return REDIS_SAVE_POINTS
+    return "{0} 1".format((MAX_DEFERRED_INTERVALS + 1) * interval_mins * 60)
+
+
+def configure():
+    """
+    Applies the snapshot strategy and the append only file settings to the persistence DB
+
+    :return: Dictionary of the Redis settings applied
+    :rtype: dict
+    """
+    aof_fsync = _get_prop(AOF_FSYNC_PROPERTY, DEFAULT_AOF_FSYNC)
+    if aof_fsync not in AOF_FSYNC_POLICIES:
+        log.logger.debug("Ignoring unsupported append only file fsync policy {0}, using {1}".format(
+            aof_fsync, DEFAULT_AOF_FSYNC))
+        aof_fsync = DEFAULT_AOF_FSYNC
+    settings = {"save": get_save_points(),
+                "appendonly": "yes" if _get_prop(AOF_PROPERTY, "false").lower() == "true" else "no",
+                "appendfsync": aof_fsync}
+    connection = persistence.default_db().connection
+    for name, value in sorted(settings.iteritems()):
+        connection.config_set(name, value)
+    log.logger.debug("Persistence DB snapshot settings applied: {0}".format(settings))
+    return settings
+
+
+def snapshot(timeout=persistence.SNAPSHOT_TIMEOUT_SECS):
+    """
+    Takes a background snapshot of the persistence DB, and records the duration and size of the snapshot
+
+    :param timeout: Number of seconds to wait for the snapshot to complete
+    :type timeout: int
+
+    :return: Dictionary of the time, duration, size and status of the snapshot
+    :rtype: dict
+    """
+    db = persistence.default_db()
+    start_time = time.time()
+    completed = db.save(timeout=timeout)
+    info = db.connection.info("persistence")
+    metrics = {"time": start_time, "duration": info.get("rdb_last_bgsave_time_sec", time.time() - start_time),
+               "size": os.path.getsize(SNAPSHOT_PATH) if os.path.exists(SNAPSHOT_PATH) else None,
+               "status": info.get("rdb_last_bgsave_status", "ok") if completed else "timeout",
+               "aof_enabled": bool(info.get("aof_enabled", 0))}
+    with mutexer.mutex(HISTORY_KEY, persisted=True):
+        history = (get_history() + [metrics])[-HISTORY_SIZE:]
+        db.set(HISTORY_KEY, history, -1, log_values=False)
+    log.logger.debug("Persistence DB snapshot {0} in {1}s, size {2} bytes".format(
+        metrics["status"], metrics["duration"], metrics["size"]))
+    return metrics
+
+
+def run_scheduled_snapshot():
+    """
+    Takes the scheduled snapshot of the persistence DB, unless within the workload peak hours and the last snapshot
+    was taken less than the maximum number of deferred intervals ago
+
+    :return: Dictionary of the metrics of the snapshot, or None if the snapshot was not taken
+    :rtype: dict
+    """
+    interval_mins = get_interval_mins()
+    if interval_mins <= 0:
+        return
+    last_save = persistence.default_db().connection.lastsave()
+    since_last_save = datetime.datetime.now() - last_save
+    if is_peak_time() and since_last_save < datetime.timedelta(minutes=interval_mins * MAX_DEFERRED_INTERVALS):
+        log.logger.debug("Deferring persistence DB snapshot during the workload peak hours, last snapshot taken at {0}"
+                         .format(last_save))
+        return
+    return snapshot()
+
+
+def get_history():
+    """
+    Get the rolling history of the snapshot metrics of the persistence DB
+
+    :return: List of snapshot metrics, oldest first
+    :rtype: list
+    """
+    return persistence.default_db().get(HISTORY_KEY) or []
+
+
+def backup(path, dbs=None):
+    """
+    Streams the keys of the persistence DB to the backup file, in chunks of pipelined DUMP commands, without stopping
+    or blocking the DB. The file starts with the DB indexes backed up, so that they can be emptied on restore.
+
+    :param path: Path of the backup file
+    :type path: str
+    :param dbs: Persistence objects to back up, None for the default and index manager persistence objects
+    :type dbs: list
+
+    :return: Number of keys backed up
+    :rtype: int
+    """
+    num_keys = 0
+    dbs = dbs or [persistence.default_db(), persistence.index_db()]
+    with gzip.open(path, "wb") as backup_file:
+        pickle.dump({"indexes": [db.index for db in dbs]}, backup_file, pickle.HIGHEST_PROTOCOL)
+        for db in dbs:
+            keys = list(db.connection.scan_iter(count=BACKUP_CHUNK_SIZE))
+            for start in xrange(0, len(keys), BACKUP_CHUNK_SIZE):
+                chunk = keys[start:start + BACKUP_CHUNK_SIZE]
+                pipeline = db.connection.pipeline(transaction=False)
+                for key in chunk:
+                    pipeline.pttl(key)
+                    pipeline.dump(key)
+                responses = pipeline.execute()
+                records = [(db.index, key, responses[index * 2], responses[index * 2 + 1])
+                           for index, key in enumerate(chunk) if responses[index * 2 + 1] is not None]
+                pickle.dump(records, backup_file, pickle.HIGHEST_PROTOCOL)
+                num_keys += len(records)
+    log.logger.debug("Backed up {0} keys to {1}".format(num_keys, path))
+    return num_keys
+
+
+def restore(path, flush=True):
+    """
+    Streams the keys from the backup file into the persistence DB, in chunks of pipelined RESTORE commands, replacing
+    the existing keys, without stopping the DB
+
+    NOTE: Unless flushed, keys of the DB missing from the backup are kept, i.e. the backup is merged into the DB
+
+    :param path: Path of the backup file
+    :type path: str
+    :param flush: Flag controlling whether the DB indexes backed up are emptied before the keys are restored
+    :type flush: bool
+
+    :return: Number of keys restored
+    :rtype: int
+    """
+    num_keys = 0
+    with gzip.open(path, "rb") as backup_file:
+        while True:
+            try:
+                records = pickle.load(backup_file)
+            except EOFError:
+                break
+            if isinstance(records, dict):
+                for index in records["indexes"] if flush else []:
+                    persistence.get_db(index).connection.flushdb()
+                    log.logger.debug("Flushed persistence DB index {0} before restoring from {1}".format(index, path))
+                continue
+            pipelines = {}
+            for index, key, ttl, value in records:
+                if index not in pipelines:
+                    pipelines[index] = persistence.get_db(index).connection.pipeline(transaction=False)
+                pipelines[index].execute_command("RESTORE", key, max(ttl, 0), value, "REPLACE")
+            for pipeline in pipelines.itervalues():
+                pipeline.execute()
+            num_keys += len(records)
+    log.logger.debug("Restored {0} keys from {1}".format(num_keys, path))
+    return num_keys
@@ -89,6 +89,26 @@ def get_current_rss_memory_for_current_process(pid=None):
     return 0
 
 
+def get_pss_memory_for_process(pid=None):
+    """
+    Get current PSS memory usage for Process, i.e. the memory of the process with shared pages divided between the
+    processes sharing them
+
+    :param pid: Process Id
+    :type pid: int
+
+    :return: Current PSS memory usage of the process (kB)
+    :rtype: int
+    """
+    pid = pid or os.getpid()
+    try:
+        with open("/proc/{0}/smaps".format(pid)) as smaps:
+            return sum(int(line.split()[1]) for line in smaps.read().splitlines() if line.startswith("Pss:"))
+    except (IOError, IndexError, ValueError) as e:
+        log.logger.debug("Cannot fetch current PSS memory usage for process {0}: {1}".format(pid, str(e)))
+        return 0
+
+
 def kill_process_id(pid, signal_id=signal.SIGTERM):
     """
     Kill specific process id with user-specified signal
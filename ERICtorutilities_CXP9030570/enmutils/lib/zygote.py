@@ -0,0 +1,436 @@
+# ********************************************************************
+# Name    : Zygote
+# Summary : Pre-forked launcher of daemon processes. The zygote server
+#           imports the common library surface once and then forks a
+#           child per daemon start request, received on a unix socket,
+#           so that the daemons share the imported modules copy on
+#           write instead of each starting a new interpreter. Forked
+#           daemons are given the same command line as a daemon
+#           started from the daemon script, to remain compatible with
+#           the pid file and pgrep based process lookups, which needs
+#           the setproctitle module. The zygote is restarted when the
+#           installed code changes.
+# ********************************************************************
+
+import importlib
+import json
+import os
+import pkgutil
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+# These modules are imported relatively from current python package i.e. lib
+# and to avoid circular imports we cannot do from . import ...
+import config
+import log
+import persistence
+import process
+# End circular imports
+
+ZYGOTE_IDENTIFIER = "zygote"
+ZYGOTE_DIR = "/var/tmp/enmutils/daemon"
+ZYGOTE_SOCKET = os.path.join(ZYGOTE_DIR, "zygote.sock")
+ZYGOTE_PID_FILE = os.path.join(ZYGOTE_DIR, "zygote.pid")
+ZYGOTE_VERSION_FILE = os.path.join(ZYGOTE_DIR, "zygote.version")
+ZYGOTE_PROPERTY = "use_daemon_zygote"
+PRELOAD_MODULES = ["enmutils_int.lib.profile", "enmutils_int.lib.enm_user", "enmutils_int.lib.load_node",
+                   "enmutils_int.lib.profile_flows.common_flows.common_flow"]
+PRELOAD_PACKAGES = ["enmutils_int.lib.workload"]
+REQUEST_TIMEOUT_SECS = 30
+# Requests are handled one at a time, so a client not sending its request is given up on quickly
+CONNECTION_TIMEOUT_SECS = 5
+REQUEST_FIELDS = ("identifier", "log_identifier", "cmd", "cwd", "request_time")
+STARTUP_TIMEOUT_SECS = 120
+LISTEN_BACKLOG = 64
+START_STATS_KEY = "daemon-start-stats-{0}"
+START_STATS_EXPIRY_SECS = 24 * 60 * 60
+REQUEST_TIME_ENV = "ENMUTILS_DAEMON_REQUEST_TIME"
+
+
+def is_enabled():
+    """
+    Check if daemons are to be started by the zygote
+
+    :return: True if the zygote property is enabled and the command line of the forked daemons can be set
+    :rtype: bool
+    """
+    if not (config.has_prop(ZYGOTE_PROPERTY) and str(config.get_prop(ZYGOTE_PROPERTY)).lower() == "true"):
+        return False
+    if not can_set_process_title():
+        log.logger.debug("The setproctitle module is not installed, daemons will not be started by the zygote")
+        return False
+    return True
+
+
+def can_set_process_title():
+    """
+    Check if the command line of the current process can be set, i.e. if the setproctitle module is installed
+
+    :return: True if the setproctitle module can be imported
+    :rtype: bool
+    """
+    try:
+        import setproctitle  # pylint: disable=import-error,unused-variable
+        return True
+    except ImportError:
+        return False
+
+
+def get_code_version(modules=None):
+    """
+    Get the version of the installed code preloaded by the zygote, i.e. the latest modification time of the source
+    files of the modules, which changes whenever a new version of the packages is installed
+
+    :param modules: Names of the modules, defaults to this module and the preloaded modules
+    :type modules: list
+
+    :return: Version of the installed code
+    :rtype: str
+    """
+    mtimes = []
+    for module_name in ["enmutils.lib.zygote"] + PRELOAD_MODULES if modules is None else modules:
+        try:
+            mtimes.append(os.path.getmtime(pkgutil.get_loader(module_name).filename))
+        except Exception as e:
+            log.logger.debug("Failed to get the modification time of module {0}: {1}".format(module_name, str(e)))
+    return str(int(max(mtimes))) if mtimes else ""
+
+
+def preload(modules=None, packages=None):
+    """
+    Import the modules, and all modules of the packages, so that they are shared with the forked daemons
+
+    :param modules: Names of the modules to import
+    :type modules: list
+    :param packages: Names of the packages of which all modules are imported
+    :type packages: list
+
+    :return: Number of modules imported successfully
+    :rtype: int
+    """
+    modules = list(PRELOAD_MODULES if modules is None else modules)
+    for package_name in PRELOAD_PACKAGES if packages is None else packages:
+        try:
+            package = importlib.import_module(package_name)
+        except Exception as e:
+            log.logger.debug("Failed to import package {0}: {1}".format(package_name, str(e)))
+            continue
+        modules.extend("{0}.{1}".format(package_name, name) for _, name, _ in pkgutil.iter_modules(package.__path__))
+    imported = 0
+    for module_name in modules:
+        try:
+            importlib.import_module(module_name)
+            imported += 1
+        except Exception as e:
+            log.logger.debug("Failed to preload module {0}: {1}".format(module_name, str(e)))
+    log.logger.debug("Preloaded {0}/{1} module(s)".format(imported, len(modules)))
+    return imported
+
+
+def set_process_title(args):
+    """
+    Overwrite the command line of the current process, as read from /proc/<pid>/cmdline by ps and pgrep
+
+    :param args: Command line arguments
+    :type args: list
+
+    :return: True if the command line was updated, False if the setproctitle module is not installed
+    :rtype: bool
+    """
+    try:
+        import setproctitle  # pylint: disable=import-error
+    except ImportError:
+        log.logger.debug("Failed to set the command line {0}, the setproctitle module is not installed".format(args))
+        return False
+    setproctitle.setproctitle(" ".join(args))
+    return True
+
+
+def record_start_latency(identifier, launcher, request_time=None):
+    """
+    Record the time taken to start the daemon, from the start request until the daemon target is about to run
+
+    :param identifier: Identifier of the daemon
+    :type identifier: str
+    :param launcher: Name of the launcher that started the daemon, i.e. zygote or popen
+    :type launcher: str
+    :param request_time: Time of the start request, read from the environment if not supplied
+    :type request_time: float
+
+    :return: Start latency in seconds, or None if the request time is unknown
+    :rtype: float or None
+    """
+    request_time = request_time or os.environ.pop(REQUEST_TIME_ENV, None)
+    if not request_time:
+        return
+    latency = round(time.time() - float(request_time), 3)
+    log.logger.debug("Daemon {0} started by {1} in {2}s".format(identifier, launcher, latency))
+    persistence.set(START_STATS_KEY.format(identifier), {"launcher": launcher, "latency": latency},
+                    START_STATS_EXPIRY_SECS, log_values=False)
+    return latency
+
+
+def get_start_stats(identifiers=None, piddir=ZYGOTE_DIR):
+    """
+    Get the start latency and current PSS memory usage of the daemons, to compare the zygote and popen launchers
+
+    :param identifiers: Identifiers of the daemons, defaults to all daemons with start stats recorded
+    :type identifiers: list
+    :param piddir: Directory of the daemon pid files
+    :type piddir: str
+
+    :return: Dictionary of identifier to dictionary of launcher, latency (s) and pss (kB), for the daemons found
+    :rtype: dict
+    """
+    if identifiers is None:
+        prefix = START_STATS_KEY.format("")
+        identifiers = sorted(key[len(prefix):] for key in persistence.default_db().scan_keys(prefix + "*"))
+    stats = {}
+    for identifier in identifiers:
+        start_stats = persistence.get(START_STATS_KEY.format(identifier))
+        if not start_stats:
+            continue
+        try:
+            with open(os.path.join(piddir, "{0}.pid".format(identifier))) as pid_file:
+                pid = int(pid_file.read().strip())
+        except (IOError, ValueError):
+            pid = None
+        start_stats["pss"] = process.get_pss_memory_for_process(pid) if pid else 0
+        stats[identifier] = start_stats
+    return stats
+
+
+def _handle_request(connection, listener, handler):
+    """
+    Read a start request from the connection and fork the daemon
+
+    :param connection: Client connection
+    :type connection: `socket.socket`
+    :param listener: Listening socket of the server, closed in the forked daemon
+    :type listener: `socket.socket`
+    :param handler: Function invoked in the forked daemon, with the identifier and log identifier, returning exit code
+    :type handler: function
+    """
+    connection.settimeout(CONNECTION_TIMEOUT_SECS)
+    try:
+        request = json.loads(connection.makefile().readline())
+    except (socket.error, ValueError) as e:
+        log.logger.debug("Failed to read start request: {0}".format(str(e) or e.__class__.__name__))
+        return
+    if not isinstance(request, dict) or any(field not in request for field in REQUEST_FIELDS):
+        log.logger.debug("Ignoring invalid start request: {0}".format(request))
+        return
+    pid = os.fork()
+    if pid:
+        connection.sendall(json.dumps({"pid": pid}) + "\n")
+        log.logger.debug("Forked daemon {0} [{1}]".format(request["identifier"], pid))
+        return
+    rc = 5
+    try:
+        listener.close()
+        connection.close()
+        os.setpgrp()
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        _detach_standard_streams()
+        _remove_log_handlers()
+        os.chdir(request["cwd"])
+        sys.argv = [str(arg) for arg in request["cmd"]]
+        set_process_title(sys.argv)
+        os.environ[REQUEST_TIME_ENV] = str(request["request_time"])
+        log_identifier = request["log_identifier"]
+        rc = handler(str(request["identifier"]), str(log_identifier) if log_identifier else None)
+    except SystemExit as e:
+        rc = e.code if isinstance(e.code, int) else 0
+    except BaseException:
+        rc = 5
+    finally:
+        os._exit(rc)  # pylint: disable=protected-access
+
+
+def _detach_standard_streams():
+    """
+    Redirect the standard streams of the forked daemon to /dev/null, as done for daemons started from the script
+    """
+    dev_null = os.open(os.devnull, os.O_RDWR)
+    for stream_fd in (0, 1, 2):
+        os.dup2(dev_null, stream_fd)
+    os.close(dev_null)
+
+
+def _remove_log_handlers():
+    """
+    Remove the log handlers inherited from the zygote, so that the forked daemon only logs to its own log file
+    """
+    if log.logger is not None:
+        for log_handler in list(log.logger.handlers):
+            log.logger.removeHandler(log_handler)
+            log_handler.close()
+
+
+def serve(handler, socket_path=ZYGOTE_SOCKET):
+    """
+    Preload the common modules then fork a daemon for each start request received on the unix socket
+
+    :param handler: Function invoked in the forked daemon, with the identifier and log identifier, returning exit code
+    :type handler: function
+    :param socket_path: Path of the unix socket
+    :type socket_path: str
+    """
+    preload()
+    # Forked daemons are reaped automatically, they are monitored through their pid files
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    # Only the user running the zygote, and so starting the daemons, may request daemons to be forked
+    os.chmod(socket_path, 0600)
+    listener.listen(LISTEN_BACKLOG)
+    log.logger.debug("Zygote [{0}] listening on {1}".format(os.getpid(), socket_path))
+    while True:
+        connection, _ = listener.accept()
+        try:
+            _handle_request(connection, listener, handler)
+        except Exception as e:
+            log.logger.debug("Failed to handle start request: {0}".format(str(e)))
+        finally:
+            connection.close()
+
+
+def is_running(pid_file=ZYGOTE_PID_FILE, socket_path=ZYGOTE_SOCKET):
+    """
+    Check if the zygote server is running
+
+    :param pid_file: Path of the zygote pid file
+    :type pid_file: str
+    :param socket_path: Path of the unix socket
+    :type socket_path: str
+
+    :return: True if the zygote process is running and its socket exists
+    :rtype: bool
+    """
+    try:
+        with open(pid_file) as f:
+            pid = int(f.read().strip())
+    except (IOError, ValueError):
+        return False
+    return os.path.exists(socket_path) and process.is_pid_running(pid)
+
+
+def _read_version(version_file):
+    """
+    Read the version of the code the running zygote was started with
+
+    :param version_file: Path of the zygote version file
+    :type version_file: str
+
+    :return: Version of the code, or None if not recorded
+    :rtype: str or None
+    """
+    try:
+        with open(version_file) as f:
+            return f.read().strip()
+    except IOError:
+        return None
+
+
+def stop(pid_file=ZYGOTE_PID_FILE, socket_path=ZYGOTE_SOCKET, version_file=ZYGOTE_VERSION_FILE):
+    """
+    Stop the zygote server, the daemons already forked by it continue to run
+
+    :param pid_file: Path of the zygote pid file
+    :type pid_file: str
+    :param socket_path: Path of the unix socket
+    :type socket_path: str
+    :param version_file: Path of the zygote version file
+    :type version_file: str
+    """
+    try:
+        with open(pid_file) as f:
+            pid = int(f.read().strip())
+    except (IOError, ValueError):
+        pid = None
+    if pid and process.is_pid_running(pid):
+        log.logger.debug("Stopping zygote [{0}]".format(pid))
+        process.kill_pid(pid, signal.SIGTERM)
+    for path in (socket_path, pid_file, version_file):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def start(daemon_path, pid_file=ZYGOTE_PID_FILE, socket_path=ZYGOTE_SOCKET, timeout=STARTUP_TIMEOUT_SECS,
+          version_file=ZYGOTE_VERSION_FILE):
+    """
+    Start the zygote server, unless already running the installed code, and wait until it accepts requests.
+    A zygote running code older than that installed is stopped and a new zygote started.
+
+    :param daemon_path: Path of the daemon script
+    :type daemon_path: str
+    :param pid_file: Path of the zygote pid file
+    :type pid_file: str
+    :param socket_path: Path of the unix socket
+    :type socket_path: str
+    :param timeout: Maximum time in seconds to wait for the zygote to accept requests
+    :type timeout: int
+    :param version_file: Path of the zygote version file
+    :type version_file: str
+
+    :return: True if the zygote is running
+    :rtype: bool
+    """
+    version = get_code_version()
+    if is_running(pid_file, socket_path):
+        if _read_version(version_file) == version:
+            return True
+        log.logger.debug("Installed code has changed since the zygote was started, restarting the zygote")
+        stop(pid_file, socket_path, version_file)
+    cmd = [daemon_path, "--zygote"]
+    proc = subprocess.Popen(cmd, stdout=open(os.devnull, "w"), stderr=subprocess.STDOUT, shell=False,
+                            close_fds=True, preexec_fn=os.setpgrp)
+    with open(pid_file, "w+") as f:
+        f.write("{0}\n".format(proc.pid))
+    with open(version_file, "w+") as f:
+        f.write("{0}\n".format(version))
+    log.logger.debug("Started zygote [{0}], waiting for it to accept requests".format(proc.pid))
+    expiry_time = time.time() + timeout
+    while time.time() < expiry_time and proc.poll() is None:
+        if os.path.exists(socket_path):
+            return True
+        time.sleep(0.5)
+    log.logger.debug("Zygote [{0}] failed to accept requests within {1}s".format(proc.pid, timeout))
+    return False
+
+
+def spawn(identifier, log_identifier, cmd, cwd, socket_path=ZYGOTE_SOCKET):
+    """
+    Request the zygote to fork the daemon
+
+    :param identifier: Identifier of the daemon, of which the target is pickled in persistence
+    :type identifier: str
+    :param log_identifier: Log identifier of the daemon
+    :type log_identifier: str
+    :param cmd: Command line given to the forked daemon, as used to start the daemon from the script
+    :type cmd: list
+    :param cwd: Working directory of the daemon
+    :type cwd: str
+    :param socket_path: Path of the unix socket
+    :type socket_path: str
+
+    :return: Pid of the forked daemon, or None if the zygote did not fork the daemon
+    :rtype: int or None
+    """
+    request = {"identifier": identifier, "log_identifier": log_identifier, "cmd": cmd, "cwd": cwd,
+               "request_time": time.time()}
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(REQUEST_TIMEOUT_SECS)
+    try:
+        client.connect(socket_path)
+        client.sendall(json.dumps(request) + "\n")
+        return json.loads(client.makefile().readline())["pid"]
+    except (socket.error, ValueError, KeyError) as e:
+        log.logger.debug("Zygote failed to fork daemon {0}: {1}".format(identifier, str(e)))
+    finally:
+        client.close()
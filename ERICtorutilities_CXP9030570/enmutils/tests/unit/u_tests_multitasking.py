@@ -542,6 +542,47 @@ class MultitaskingUnitTests(unittest2.TestCase):
         self.assertFalse(mock_os.mkdir.called)
         self.assertFalse(mock_os.symlink.called)
 
+    @patch('enmutils.lib.multitasking.UtilitiesDaemon.__init__', return_value=None)
+    @patch('enmutils.lib.multitasking.zygote.is_enabled', return_value=True)
+    @patch('enmutils.lib.multitasking.zygote.start', return_value=True)
+    @patch('enmutils.lib.multitasking.zygote.spawn', return_value=1234)
+    @patch('enmutils.lib.multitasking.subprocess.Popen')
+    @patch('enmutils.lib.multitasking.UtilitiesDaemon._raise_if_running')
+    @patch('__builtin__.open', new_callable=mock_open)
+    def test_start__for_utilitiesdaemon_writes_pid_of_daemon_forked_by_zygote(self, mock_file, _, mock_popen,
+                                                                              mock_spawn, *__):
+        daemon = multitasking.UtilitiesDaemon("TEST_PROFILE_01", good_func)
+        daemon.id, daemon.log_identifier, daemon.daemon_path = "TEST_PROFILE_01", "test_profile_01", "bin/daemon"
+        daemon.cmd, daemon.base_dir, daemon.pidfile = ["daemons/TEST_PROFILE_01", "TEST_PROFILE_01"], "dir", "pidfile"
+        daemon.proc = daemon.pid = None
+        daemon.use_zygote = True
+
+        daemon.start()
+
+        mock_spawn.assert_called_once_with("TEST_PROFILE_01", "test_profile_01", daemon.cmd, "dir")
+        mock_file.return_value.write.assert_called_with("1234\n")
+        self.assertEqual(1234, daemon.pid)
+        self.assertFalse(mock_popen.called)
+
+    @patch('enmutils.lib.multitasking.UtilitiesDaemon.__init__', return_value=None)
+    @patch('enmutils.lib.multitasking.zygote.is_enabled', return_value=True)
+    @patch('enmutils.lib.multitasking.zygote.start', return_value=False)
+    @patch('enmutils.lib.multitasking.zygote.spawn')
+    @patch('enmutils.lib.multitasking.AbstractUtilitiesDaemon.start')
+    @patch('enmutils.lib.multitasking.UtilitiesDaemon._raise_if_running')
+    def test_start__for_utilitiesdaemon_executes_daemon_command_if_zygote_unavailable(self, _, mock_start,
+                                                                                      mock_spawn, *__):
+        daemon = multitasking.UtilitiesDaemon("TEST_PROFILE_01", good_func)
+        daemon.id, daemon.log_identifier, daemon.daemon_path = "TEST_PROFILE_01", None, "bin/daemon"
+        daemon.cmd, daemon.base_dir, daemon.pid = ["daemons/TEST_PROFILE_01", "TEST_PROFILE_01"], "dir", None
+        daemon.use_zygote = True
+
+        daemon.start()
+
+        self.assertFalse(mock_spawn.called)
+        self.assertTrue(mock_start.called)
+        self.assertNotIn(multitasking.zygote.REQUEST_TIME_ENV, multitasking.os.environ)
+
     @patch('enmutils.lib.multitasking.AbstractUtilitiesDaemon.__init__', return_value=None)
     def test_creating_daemon_with_nonetype_func_reference_raises_value_error(self, *_):
         self.assertRaises(ValueError, multitasking.UtilitiesDaemon, "test-daemon", None)
@@ -152,6 +152,49 @@ class PersistenceLibUnitTests(unittest2.TestCase):
         mock_strictredis.assert_called_with(port=9999, db=111)
         self.assertEqual(mock_debug.call_count, 1)
 
+    @patch("enmutils.lib.persistence.Persistence.__init__", return_value=None)
+    @patch("enmutils.lib.persistence.Persistence._start_redis_daemon")
+    @patch("enmutils.lib.persistence.os.access", return_value=True)
+    @patch("enmutils.lib.persistence.os.path.exists", return_value=True)
+    @patch("enmutils.lib.persistence.config.has_prop", return_value=True)
+    @patch("enmutils.lib.persistence.config.get_prop", return_value="/var/db/enmutils/enmutils-db.sock")
+    @patch("enmutils.lib.persistence.redis.StrictRedis")
+    def test_establish_connection__uses_unix_socket_if_enabled_and_socket_exists(self, mock_strictredis, *_):
+        db = persistence.Persistence(999)
+        db.connection = None
+        db.production = True
+        db.logging_enabled = False
+        db.index = 111
+
+        db.establish_connection()
+
+        mock_strictredis.assert_called_with(unix_socket_path="/var/db/enmutils/enmutils-db.sock", db=111)
+
+    @patch("enmutils.lib.persistence.Persistence.__init__", return_value=None)
+    @patch("enmutils.lib.persistence.Persistence._start_redis_daemon")
+    @patch("enmutils.lib.persistence.os.path.exists", return_value=False)
+    @patch("enmutils.lib.persistence.config.has_prop", return_value=True)
+    @patch("enmutils.lib.persistence.config.get_prop", return_value="/var/db/enmutils/enmutils-db.sock")
+    @patch("enmutils.lib.persistence.redis.StrictRedis")
+    def test_establish_connection__uses_port_if_unix_socket_does_not_exist(self, mock_strictredis, *_):
+        db = persistence.Persistence(999)
+        db.connection = None
+        db.production = True
+        db.logging_enabled = False
+        db.port = 9999
+        db.index = 111
+
+        db.establish_connection()
+
+        mock_strictredis.assert_called_with(port=9999, db=111)
+
+    @patch("enmutils.lib.persistence.os.access", return_value=False)
+    @patch("enmutils.lib.persistence.os.path.exists", return_value=True)
+    @patch("enmutils.lib.persistence.config.has_prop", return_value=True)
+    @patch("enmutils.lib.persistence.config.get_prop", return_value="/var/db/enmutils/enmutils-db.sock")
+    def test_get_unix_socket_path__returns_none_if_socket_not_accessible_to_user(self, *_):
+        self.assertIsNone(persistence.Persistence._get_unix_socket_path())
+
     @patch("enmutils.lib.persistence.Persistence.__init__", return_value=None)
     @patch("fakeredis.FakeStrictRedis")
     def test_establish_connection__is_successful_in_test(self, mock_fakestrictredis, *_):
@@ -312,6 +355,207 @@ class PersistenceLibUnitTests(unittest2.TestCase):
         persistence.clear()
         self.assertTrue(len(persistence.get_all_keys()) == 0)
 
+    def test_scan_keys__yields_each_matching_key_once(self):
+        persist = persistence.default_db()
+        with patch.object(persist.connection, "scan_iter", return_value=iter(["FM_01", "FM_02", "FM_01"])) as mock_scan:
+            self.assertEqual(["FM_01", "FM_02"], [key for key in persist.scan_keys(match="FM_*")])
+        mock_scan.assert_called_once_with(match="FM_*", count=persistence.SCAN_COUNT)
+
+    def test_get_key_details__returns_ttl_type_and_size_of_each_key(self):
+        persist = persistence.default_db()
+        connection = persist.connection
+        persist.connection = Mock()
+        persist.connection.pipeline.return_value.execute.side_effect = [[-1, "string", 50, "hash", -2, "none"],
+                                                                        [10, 3]]
+        try:
+            self.assertEqual([("key1", -1, "string", 10), ("key2", 50, "hash", 3), ("key3", -2, "none", 0)],
+                             persist.get_key_details(["key1", "key2", "key3"]))
+            self.assertEqual(2, persist.connection.pipeline.call_count)
+            persist.connection.pipeline.return_value.strlen.assert_called_once_with("key1")
+            persist.connection.pipeline.return_value.hlen.assert_called_once_with("key2")
+        finally:
+            persist.connection = connection
+
+    @patch("enmutils.lib.persistence.SCAN_COUNT", 2)
+    @patch("enmutils.lib.persistence.Persistence.get_all_keys", return_value=["key1", "permanent-key2", "key3"])
+    def test_clear__removes_expiring_keys_in_pipelined_chunks(self, _):
+        persist = persistence.default_db()
+        connection = persist.connection
+        persist.connection = Mock()
+        persist.connection.pipeline.return_value.execute.side_effect = [[10, 10], [-1]]
+        try:
+            persist.clear()
+            self.assertEqual(2, persist.connection.pipeline.call_count)
+            persist.connection.delete.assert_called_once_with("key1")
+        finally:
+            persist.connection = connection
+
+    def test_set_keys__persists_all_values(self):
+        persistence.default_db().set_keys({"key1": "value1", "key2": "value2"}, -1)
+        self.assertEqual(["value1", "value2"], persistence.default_db().get_keys(["key1", "key2"]))
+
+    def test_set_keys__raises_value_error_if_any_value_is_none(self):
+        self.assertRaises(ValueError, persistence.default_db().set_keys, {"key1": "value1", "key2": None}, -1)
+        self.assertFalse(persistence.has_key("key1"))
+
+    def test_set_keys__uses_setex_in_transaction_if_expiry_set(self):
+        per = persistence.Persistence(0)
+        per.connection = Mock()
+        per.set_keys({"key1": "value1"}, 10)
+        per.connection.pipeline.assert_called_with(transaction=True)
+        self.assertTrue(per.connection.pipeline.return_value.setex.called)
+        self.assertTrue(per.connection.pipeline.return_value.execute.called)
+
+    def test_update_hashes__increments_counters_and_sets_and_removes_values(self):
+        db = persistence.default_db()
+        db.update_hashes(increments={"counters": {"total": 2, "allocated": 1}}, values={"states": {"node1": "a"}})
+        db.update_hashes(increments={"counters": {"total": -1, "allocated": 0}},
+                         values={"states": {"node1": None, "node2": "b"}})
+
+        self.assertEqual({"total": 1, "allocated": 1}, {field: int(value) for field, value in
+                                                        db.get_hash("counters").iteritems()})
+        self.assertEqual([None, "b"], db.get_hash_values("states", ["node1", "node2"]))
+        self.assertEqual([], db.get_hash_values("states", []))
+
+    def test_update_hashes__uses_single_transaction(self):
+        per = persistence.Persistence(0)
+        per.connection = Mock()
+        per.update_hashes(increments={"counters": {"total": 1}}, values={"states": {"node1": None}})
+        per.connection.pipeline.assert_called_once_with(transaction=True)
+        per.connection.pipeline.return_value.hincrby.assert_called_once_with("counters", "total", 1)
+        per.connection.pipeline.return_value.hdel.assert_called_once_with("states", "node1")
+        self.assertEqual(1, per.connection.pipeline.return_value.execute.call_count)
+
+    def test_update_hashes_from_values__retries_if_hash_changed_before_update(self):
+        db = persistence.default_db()
+        db.update_hashes(values={"states": {"node1": "a"}})
+        read_values = []
+
+        def get_updates(values):
+            read_values.append(values)
+            if len(read_values) == 1:
+                db.update_hashes(values={"states": {"node1": "b"}})
+            return {"counters": {values[0]: 1}}, {"states": {"node1": "c"}}
+
+        self.assertTrue(db.update_hashes_from_values("states", ["node1"], get_updates))
+        self.assertEqual([["a"], ["b"]], read_values)
+        self.assertEqual(1, int(db.get_hash("counters")["b"]))
+        self.assertEqual(["c"], db.get_hash_values("states", ["node1"]))
+
+    def test_update_hashes_from_values__returns_false_if_hash_keeps_changing(self):
+        db = persistence.default_db()
+
+        def get_updates(_):
+            db.update_hashes(increments={"states": {"changes": 1}})
+            return {}, {}
+
+        self.assertFalse(db.update_hashes_from_values("states", ["node1"], get_updates, attempts=2))
+        self.assertEqual(2, int(db.get_hash("states")["changes"]))
+
+    def test_batch__update_hashes_queues_one_command_per_update(self):
+        with persistence.batch() as batch:
+            results = batch.update_hashes(increments={"counters": {"total": 3}}, values={"states": {"node1": "a"}})
+            self.assertEqual(2, len(batch))
+
+        self.assertEqual(3, int(persistence.default_db().get_hash("counters")["total"]))
+        self.assertEqual(["a"], persistence.default_db().get_hash_values("states", ["node1"]))
+        self.assertTrue(all(result.flushed for result in results))
+
+    def test_batch__flushes_queued_commands_on_exit(self):
+        persistence.set("key1", "value1", -1)
+        persistence.set("key2", "value2", -1)
+        with persistence.batch() as batch:
+            set_result = batch.set("key3", {"a": 1}, 10)
+            get_result = batch.get("key1")
+            missing_result = batch.get("missing")
+            has_key_result = batch.has_key("key2")
+            batch.remove("key2")
+            batch.expire("key1", 100)
+            self.assertEqual(6, len(batch))
+            self.assertFalse(persistence.has_key("key3"))
+            self.assertFalse(get_result.flushed)
+
+        self.assertTrue(set_result.value)
+        self.assertEqual("value1", get_result.value)
+        self.assertIsNone(missing_result.value)
+        self.assertTrue(has_key_result.value)
+        self.assertEqual({"a": 1}, persistence.get("key3"))
+        self.assertFalse(persistence.has_key("key2"))
+        self.assertTrue(0 < persistence.get_ttl("key1") <= 100)
+
+    @patch("enmutils.lib.persistence.mutex_db")
+    def test_batch__set_persists_value_in_mutex_db_if_key_exists_there_when_flushed(self, mock_mutex_db):
+        mock_mutex_db.return_value.index = persistence.MUTEX_DB_INDEX
+        mock_pipeline = mock_mutex_db.return_value.connection.pipeline.return_value
+        mock_pipeline.execute.side_effect = [[True, False], [True]]
+        batch = persistence.Batch()
+        batch.set("key1", "value1", -1)
+        batch.set("key2", "value2", -1)
+        batch.set("key3", "value3", -1, db=persistence.default_db())
+        self.assertFalse(mock_mutex_db.return_value.has_key.called)
+
+        batch.flush()
+
+        self.assertEqual(["key1", "key2"], [exists_call[0][0] for exists_call in mock_pipeline.exists.call_args_list])
+        self.assertEqual(1, mock_pipeline.set.call_count)
+        self.assertEqual(("key1", "value1"), (mock_pipeline.set.call_args[0][0],
+                                              pickle.loads(mock_pipeline.set.call_args[0][1])))
+        self.assertEqual(["value2", "value3"], persistence.default_db().get_keys(["key2", "key3"]))
+
+    def test_batch__expire_with_negative_expiry_removes_ttl(self):
+        db = persistence.Persistence(0)
+        db.connection = Mock()
+        db.connection.pipeline.return_value.execute.return_value = [True]
+        with persistence.batch() as batch:
+            batch.expire("key1", -1, db=db)
+
+        db.connection.pipeline.return_value.persist.assert_called_once_with("key1")
+        self.assertFalse(db.connection.pipeline.return_value.expire.called)
+
+    def test_batch__flushes_commands_queued_before_exception(self):
+        with self.assertRaises(ValueError):
+            with persistence.batch() as batch:
+                batch.set("key1", "value1", -1)
+                batch.set("key2", None, -1)
+
+        self.assertEqual("value1", persistence.get("key1"))
+        self.assertFalse(persistence.has_key("key2"))
+
+    def test_batch_flush__uses_single_pipeline_per_db_index(self):
+        default_db, other_db = persistence.Persistence(0), persistence.Persistence(32)
+        default_db.connection, other_db.connection = Mock(), Mock()
+        default_db.connection.pipeline.return_value.execute.return_value = [True, None]
+        other_db.connection.pipeline.return_value.execute.return_value = [1]
+        batch = persistence.Batch()
+        batch.set("key1", "value1", -1, db=default_db)
+        batch.remove("key2", db=other_db)
+        batch.get("key3", db=default_db)
+
+        self.assertEqual(3, batch.flush())
+        default_db.connection.pipeline.assert_called_once_with(transaction=False)
+        other_db.connection.pipeline.assert_called_once_with(transaction=False)
+        self.assertEqual(1, default_db.connection.pipeline.return_value.execute.call_count)
+        self.assertTrue(default_db.connection.pipeline.return_value.get.called)
+        other_db.connection.pipeline.return_value.delete.assert_called_once_with("key2")
+        self.assertEqual(0, len(batch))
+
+    def test_latency_stats__are_recorded_per_command(self):
+        persistence.reset_latency_stats()
+        persistence.set("key1", "value1", -1)
+        persistence.default_db().get("key1")
+        persistence.default_db().get("key1")
+        with persistence.batch() as batch:
+            batch.get("key1")
+
+        stats = persistence.get_latency_stats()
+        self.assertEqual(1, stats["set"]["count"])
+        self.assertEqual(2, stats["get"]["count"])
+        self.assertEqual(1, stats["batch"]["count"])
+        self.assertTrue(stats["get"]["max_secs"] <= stats["get"]["total_secs"])
+        self.assertEqual(stats["get"]["total_secs"] / 2, stats["get"]["avg_secs"])
+        persistence.reset_latency_stats()
+        self.assertEqual({}, persistence.get_latency_stats())
+
     def test_setting_a_nonetype_value_raises_error(self):
         self.assertRaises(ValueError, persistence.set, self._test_key, None, 0)
 
@@ -535,11 +779,35 @@ class PersistenceLibUnitTests(unittest2.TestCase):
     def test_get_unique_id__is_successful(self, *_):
         self.assertEqual("pid12345_aaaaaaaaaaaaa", persistence.get_unique_id())
 
+    @patch("enmutils.lib.persistence.time.sleep")
+    @patch("enmutils.lib.persistence.Persistence.__init__", return_value=None)
+    def test_persistence_save__successful(self, *_):
+        persist = persistence.Persistence(2)
+        persist.connection = Mock()
+        persist.connection.lastsave.side_effect = [1, 1, 2]
+        persist.connection.info.return_value = {"rdb_last_bgsave_status": "ok"}
+        self.assertTrue(persist.save())
+        self.assertTrue(persist.connection.bgsave.called)
+        self.assertFalse(persist.connection.save.called)
+
+    @patch("enmutils.lib.persistence.time.sleep")
+    @patch("enmutils.lib.persistence.Persistence.__init__", return_value=None)
+    def test_persistence_save__waits_for_snapshot_in_progress(self, *_):
+        persist = persistence.Persistence(2)
+        persist.connection = Mock()
+        persist.connection.bgsave.side_effect = persistence.ResponseError("Background save already in progress")
+        persist.connection.lastsave.side_effect = [1, 2]
+        persist.connection.info.return_value = {"rdb_last_bgsave_status": "err"}
+        self.assertFalse(persist.save())
+
+    @patch("enmutils.lib.persistence.time.sleep")
+    @patch("enmutils.lib.persistence.time.time", side_effect=[0, 5, 11])
     @patch("enmutils.lib.persistence.Persistence.__init__", return_value=None)
-    def test_persistence_save__successful(self, _):
+    def test_persistence_save__returns_false_if_snapshot_not_completed_within_timeout(self, *_):
         persist = persistence.Persistence(2)
         persist.connection = Mock()
-        persist.save()
+        persist.connection.lastsave.return_value = 1
+        self.assertFalse(persist.save(timeout=10))
 
     @patch("enmutils.lib.persistence.Persistence.__init__", return_value=None)
     def test_persistence_shutdown__successful(self, _):
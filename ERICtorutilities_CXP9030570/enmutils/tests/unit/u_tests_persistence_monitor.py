@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+import time
+
+import unittest2
+from mock import patch, Mock
+
+from enmutils.lib import persistence, persistence_monitor
+from testslib import unit_test_utils
+
+
+def get_sample(sample_time, num_keys=10, used_memory=100, maxmemory=1000, slowlog=None):
+    return {"time": sample_time, "duration": 0.1, "used_memory": used_memory, "used_memory_peak": None,
+            "maxmemory": maxmemory, "connected_clients": None, "ops_per_sec": None, "keyspace": {0: num_keys},
+            "namespaces": {namespace: {"keys": 0, "bytes": 0} for namespace in persistence_monitor.NAMESPACES},
+            "slowlog": slowlog or []}
+
+
+class PersistenceMonitorUnitTests(unittest2.TestCase):
+
+    def setUp(self):
+        unit_test_utils.setup()
+        persistence_monitor.MEMORY_USAGE_SUPPORTED.clear()
+
+    def tearDown(self):
+        unit_test_utils.tear_down()
+        persistence_monitor.MEMORY_USAGE_SUPPORTED.clear()
+
+    def test_get_namespace__attributes_keys_by_name_and_class(self):
+        self.assertEqual("mutexes", persistence_monitor.get_namespace("workload_pool", index=32))
+        self.assertEqual("mos", persistence_monitor.get_namespace("FM_01-mos"))
+        self.assertEqual("sessions", persistence_monitor.get_namespace("workload_admin_session"))
+        self.assertEqual("counters", persistence_monitor.get_namespace("total-node-count"))
+        self.assertEqual("profiles", persistence_monitor.get_namespace("FM_01-status"))
+        self.assertEqual("profiles", persistence_monitor.get_namespace(
+            "FM_01", "\x80\x02cenmutils_int.lib.profile_flows.fm_flows.fm_01_flow\nFm01\n"))
+        self.assertEqual("nodes", persistence_monitor.get_namespace(
+            "LTE01ERBS00001", "\x80\x02cenmutils_int.lib.load_node\nERBSLoadNode\n"))
+        self.assertEqual("other", persistence_monitor.get_namespace("network-type", "\x80\x02U\x04five"))
+
+    @patch("enmutils.lib.persistence_monitor.persistence.mutex_db", side_effect=persistence.default_db)
+    def test_take_sample__attributes_memory_to_namespaces(self, _):
+        persistence.set("FM_01-mos", {"a": 1}, -1)
+        persistence.set("FM_01-status", "x" * 100, -1)
+        persistence.set("network-type", "five", -1)
+
+        sample = persistence_monitor.take_sample()
+
+        self.assertEqual(1, sample["namespaces"]["mos"]["keys"])
+        self.assertEqual(1, sample["namespaces"]["profiles"]["keys"])
+        self.assertLess(100, sample["namespaces"]["profiles"]["bytes"])
+        self.assertEqual(1, sample["namespaces"]["other"]["keys"])
+        self.assertEqual(sum(usage["bytes"] for usage in sample["namespaces"].values()), sample["used_memory"])
+        self.assertEqual([], sample["slowlog"])
+
+    def test_get_key_sizes_and_headers__uses_memory_usage_if_supported(self):
+        db = Mock(index=0)
+        db.connection.pipeline.return_value.execute.side_effect = [["string", "string", "hash"],
+                                                                   [120, "header", None, "", 300]]
+
+        self.assertEqual([(120, "header"), (0, ""), (300, "")],
+                         persistence_monitor._get_key_sizes_and_headers(db, ["key1", "key2", "key3"]))
+        db.connection.pipeline.return_value.execute_command.assert_called_with("MEMORY", "USAGE", "key3")
+        self.assertFalse(db.connection.pipeline.return_value.strlen.called)
+
+    def test_get_key_sizes_and_headers__sizes_hash_keys_by_their_fields(self):
+        persistence.default_db().connection.set("key1", "value1")
+        persistence.default_db().update_hashes(values={"key2": {"node1": "abc", "node2": "de"}})
+        persistence_monitor.MEMORY_USAGE_SUPPORTED[0] = False
+
+        self.assertEqual([(6, "value1"), (15, ""), (0, "")], persistence_monitor._get_key_sizes_and_headers(
+            persistence.default_db(), ["key1", "key2", "key3"], ["string", "hash", "none"]))
+
+    def test_get_key_sizes_and_headers__sizes_keys_one_at_a_time_if_pipeline_fails(self):
+        db = Mock(index=0)
+        db.connection.pipeline.return_value.execute.side_effect = [
+            Exception("WRONGTYPE Operation against a key holding the wrong kind of value"), [10, "header"],
+            Exception("WRONGTYPE Operation against a key holding the wrong kind of value")]
+        persistence_monitor.MEMORY_USAGE_SUPPORTED[0] = False
+
+        self.assertEqual([(10, "header"), (0, "")],
+                         persistence_monitor._get_key_sizes_and_headers(db, ["key1", "key2"], ["string", "string"]))
+
+    def test_get_prefix__groups_keys_up_to_first_dash_or_digit(self):
+        self.assertEqual("FM_", persistence_monitor.get_prefix("FM_01-status"))
+        self.assertEqual("LTE", persistence_monitor.get_prefix("LTE01ERBS00001"))
+        self.assertEqual("workload_admin_session", persistence_monitor.get_prefix("workload_admin_session"))
+        self.assertEqual("1", persistence_monitor.get_prefix("1"))
+
+    def test_get_prefix_usage__counts_keys_expiring_keys_and_bytes_by_prefix(self):
+        db = Mock(index=0)
+        db.scan_keys.return_value = iter(["FM_01-status", "FM_02-status", "LTE01ERBS00001"])
+        db.get_key_details.return_value = [("FM_01-status", 60, "string", 10), ("FM_02-status", -1, "string", 10),
+                                           ("LTE01ERBS00001", -1, "string", 50)]
+        db.connection.pipeline.return_value.execute.return_value = [10, "", 10, "", 50, ""]
+        persistence_monitor.MEMORY_USAGE_SUPPORTED[0] = False
+
+        self.assertEqual({"FM_": {"keys": 2, "expiring": 1, "bytes": 20}, "LTE": {"keys": 1, "expiring": 0, "bytes": 50}},
+                         persistence_monitor.get_prefix_usage(db, match="*"))
+
+    def test_record_sample__keeps_rolling_history(self):
+        def get_int_prop(key, default):
+            return 2 if key == persistence_monitor.HISTORY_SIZE_PROPERTY else default
+
+        with patch("enmutils.lib.persistence_monitor._get_int_prop", side_effect=get_int_prop):
+            for _ in xrange(3):
+                persistence_monitor.record_sample()
+
+        history = persistence_monitor.get_history()
+        self.assertEqual(2, len(history))
+        self.assertLess(history[0]["time"], history[1]["time"])
+
+    def test_check_health__returns_no_warnings_for_healthy_sample(self):
+        self.assertEqual([], persistence_monitor.check_health(get_sample(time.time()), [get_sample(1, num_keys=9)]))
+
+    def test_check_health__warns_of_memory_usage_slow_commands_and_key_growth(self):
+        slowlog = [{"id": 5, "start_time": 1, "duration_us": 500000, "command": "KEYS *"},
+                   {"id": 6, "start_time": 2, "duration_us": 200000, "command": "GET a"},
+                   {"id": 4, "start_time": 0, "duration_us": 900000, "command": "SAVE"}]
+        history = [get_sample(1, num_keys=10), get_sample(2, num_keys=12, slowlog=[slowlog[2]])]
+
+        warnings = persistence_monitor.check_health(
+            get_sample(3, num_keys=20, used_memory=900, slowlog=slowlog), history)
+
+        self.assertEqual(3, len(warnings))
+        self.assertIn("90.0% of its maximum memory", warnings[0])
+        self.assertIn("2 persistence command(s) took longer than 100ms, slowest: KEYS * (500.0ms)", warnings[1])
+        self.assertIn("grown by 100% (10 to 20)", warnings[2])
+
+    def test_get_report__lists_used_namespaces(self):
+        sample = get_sample(time.time(), slowlog=[{"id": 1, "start_time": 1, "duration_us": 1500, "command": "GET"}])
+        sample["namespaces"]["nodes"] = {"keys": 5, "bytes": 5000}
+
+        report = persistence_monitor.get_report(sample)
+
+        self.assertIn("{0:<10} {1:>10} {2:>14}".format("nodes", 5, 5000), report)
+        self.assertFalse(any(line.startswith("mos") for line in report))
+        self.assertIn("1.5ms GET", report[-1])
+
+
+if __name__ == "__main__":
+    unittest2.main(verbosity=2)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+import datetime
+import os
+import tempfile
+
+import unittest2
+from mock import patch, Mock
+
+from enmutils.lib import persistence, persistence_snapshot
+from testslib import unit_test_utils
+
+
+def get_prop(properties):
+    def _get_prop(key, default):
+        return properties.get(key, default)
+    return _get_prop
+
+
+class PersistenceSnapshotUnitTests(unittest2.TestCase):
+
+    def setUp(self):
+        unit_test_utils.setup()
+
+    def tearDown(self):
+        unit_test_utils.tear_down()
+
+    def test_is_peak_time__checks_peak_hours_including_periods_over_midnight(self):
+        properties = {persistence_snapshot.PEAK_HOURS_PROPERTY: '"07-09,22-02"'}
+        with patch("enmutils.lib.persistence_snapshot._get_prop", side_effect=get_prop(properties)):
+            self.assertEqual([(7, 9), (22, 2)], persistence_snapshot.get_peak_hours())
+            self.assertTrue(persistence_snapshot.is_peak_time(datetime.datetime(2024, 1, 1, 8)))
+            self.assertFalse(persistence_snapshot.is_peak_time(datetime.datetime(2024, 1, 1, 9)))
+            self.assertTrue(persistence_snapshot.is_peak_time(datetime.datetime(2024, 1, 1, 23)))
+            self.assertTrue(persistence_snapshot.is_peak_time(datetime.datetime(2024, 1, 1, 1)))
+            self.assertFalse(persistence_snapshot.is_peak_time(datetime.datetime(2024, 1, 1, 12)))
+
+    def test_is_peak_time__returns_false_if_no_peak_hours_set(self):
+        self.assertFalse(persistence_snapshot.is_peak_time())
+
+    @patch("enmutils.lib.persistence_snapshot.persistence.default_db")
+    def test_configure__keeps_backstop_save_point_and_ignores_unsupported_fsync_policy(self, mock_default_db):
+        properties = {persistence_snapshot.INTERVAL_PROPERTY: "60", persistence_snapshot.AOF_PROPERTY: "true",
+                      persistence_snapshot.AOF_FSYNC_PROPERTY: "often"}
+        with patch("enmutils.lib.persistence_snapshot._get_prop", side_effect=get_prop(properties)):
+            settings = persistence_snapshot.configure()
+
+        self.assertEqual({"save": "18000 1", "appendonly": "yes", "appendfsync": "everysec"}, settings)
+        self.assertEqual(3, mock_default_db.return_value.connection.config_set.call_count)
+        mock_default_db.return_value.connection.config_set.assert_any_call("save", "18000 1")
+
+    @patch("enmutils.lib.persistence_snapshot.persistence.default_db")
+    def test_configure__keeps_redis_save_points_if_scheduled_snapshots_disabled(self, _):
+        self.assertEqual(persistence_snapshot.REDIS_SAVE_POINTS, persistence_snapshot.configure()["save"])
+
+    @patch("enmutils.lib.persistence_snapshot.os.path.getsize", return_value=2048)
+    @patch("enmutils.lib.persistence_snapshot.os.path.exists", return_value=True)
+    @patch("enmutils.lib.persistence.Persistence.save", return_value=True)
+    def test_snapshot__records_duration_and_size_in_history(self, mock_save, *_):
+        info = {"rdb_last_bgsave_time_sec": 3, "rdb_last_bgsave_status": "ok", "aof_enabled": 0}
+        with patch.object(persistence.default_db().connection, "info", create=True, return_value=info):
+            metrics = persistence_snapshot.snapshot()
+
+        self.assertTrue(mock_save.called)
+        self.assertEqual((3, 2048, "ok", False),
+                         (metrics["duration"], metrics["size"], metrics["status"], metrics["aof_enabled"]))
+        self.assertEqual([metrics], persistence_snapshot.get_history())
+
+    @patch("enmutils.lib.persistence_snapshot.get_interval_mins", return_value=60)
+    @patch("enmutils.lib.persistence_snapshot.snapshot")
+    @patch("enmutils.lib.persistence_snapshot.is_peak_time", return_value=True)
+    @patch("enmutils.lib.persistence_snapshot.persistence.default_db")
+    def test_run_scheduled_snapshot__defers_snapshot_during_peak_hours(self, mock_default_db, _, mock_snapshot, *__):
+        mock_default_db.return_value.connection.lastsave.return_value = (datetime.datetime.now() -
+                                                                         datetime.timedelta(minutes=90))
+        self.assertIsNone(persistence_snapshot.run_scheduled_snapshot())
+        self.assertFalse(mock_snapshot.called)
+
+    @patch("enmutils.lib.persistence_snapshot.get_interval_mins", return_value=60)
+    @patch("enmutils.lib.persistence_snapshot.snapshot")
+    @patch("enmutils.lib.persistence_snapshot.is_peak_time", return_value=True)
+    @patch("enmutils.lib.persistence_snapshot.persistence.default_db")
+    def test_run_scheduled_snapshot__takes_snapshot_if_deferred_too_long(self, mock_default_db, _, mock_snapshot, *__):
+        mock_default_db.return_value.connection.lastsave.return_value = (datetime.datetime.now() -
+                                                                         datetime.timedelta(hours=5))
+        self.assertEqual(mock_snapshot.return_value, persistence_snapshot.run_scheduled_snapshot())
+
+    @patch("enmutils.lib.persistence_snapshot.persistence.get_db")
+    def test_backup_and_restore__stream_keys_in_chunks(self, mock_get_db):
+        db = Mock(index=0)
+        db.connection.scan_iter.return_value = iter(["key1", "key2", "key3"])
+        db.connection.pipeline.return_value.execute.side_effect = [[-1, "dump1", 500, "dump2"], [-2, None]]
+        path = tempfile.mktemp(suffix=".dump.gz")
+        try:
+            with patch("enmutils.lib.persistence_snapshot.BACKUP_CHUNK_SIZE", 2):
+                self.assertEqual(2, persistence_snapshot.backup(path, dbs=[db]))
+            self.assertEqual(2, persistence_snapshot.restore(path))
+            mock_get_db.return_value.connection.flushdb.assert_called_once_with()
+            mock_get_db.reset_mock()
+            self.assertEqual(2, persistence_snapshot.restore(path, flush=False))
+        finally:
+            os.remove(path)
+
+        mock_get_db.assert_called_with(0)
+        self.assertFalse(mock_get_db.return_value.connection.flushdb.called)
+        pipeline = mock_get_db.return_value.connection.pipeline.return_value
+        pipeline.execute_command.assert_any_call("RESTORE", "key1", 0, "dump1", "REPLACE")
+        pipeline.execute_command.assert_any_call("RESTORE", "key2", 500, "dump2", "REPLACE")
+        self.assertEqual(1, pipeline.execute.call_count)
+
+
+if __name__ == "__main__":
+    unittest2.main(verbosity=2)
@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 import unittest2
-from mock import patch, Mock
+from mock import patch, Mock, mock_open
 
 from enmutils.lib import process
 from testslib import unit_test_utils
@@ -82,6 +82,15 @@ class ProcessUnitTests(unittest2.TestCase):
         mock_run_local_cmd.return_value = Mock(stdout="VmRSS:	   Some message\n")
         self.assertEqual(0, process.get_current_rss_memory_for_current_process())
 
+    @patch('__builtin__.open', new_callable=mock_open, read_data="Rss:  100 kB\nPss:  40 kB\nPss:  2 kB\n")
+    def test_get_pss_memory_for_process__sums_pss_of_all_mappings(self, mock_file):
+        self.assertEqual(42, process.get_pss_memory_for_process(1234))
+        mock_file.assert_called_with("/proc/1234/smaps")
+
+    @patch('__builtin__.open', side_effect=IOError("No such file"))
+    def test_get_pss_memory_for_process__returns_zero_if_process_not_found(self, _):
+        self.assertEqual(0, process.get_pss_memory_for_process(1234))
+
     @patch('enmutils.lib.process.get_profile_daemon_pid', return_value=["1234", "1235", "1236"])
     @patch("enmutils.lib.process.kill_process_id")
     def test_kill_spawned_process__calls_kill_process_id(self, mock_kill, *_):
@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+import json
+import socket
+
+import unittest2
+from mock import Mock, patch, mock_open
+
+from enmutils.lib import zygote, persistence
+from testslib import unit_test_utils
+
+
+class ZygoteUnitTests(unittest2.TestCase):
+
+    def setUp(self):
+        unit_test_utils.setup()
+
+    def tearDown(self):
+        unit_test_utils.tear_down()
+
+    @patch('enmutils.lib.zygote.can_set_process_title', return_value=True)
+    @patch('enmutils.lib.zygote.config.has_prop', return_value=True)
+    @patch('enmutils.lib.zygote.config.get_prop', return_value="true")
+    def test_is_enabled__returns_true_if_property_enabled(self, *_):
+        self.assertTrue(zygote.is_enabled())
+
+    @patch('enmutils.lib.zygote.can_set_process_title', return_value=False)
+    @patch('enmutils.lib.zygote.config.has_prop', return_value=True)
+    @patch('enmutils.lib.zygote.config.get_prop', return_value="true")
+    def test_is_enabled__returns_false_if_setproctitle_not_installed(self, *_):
+        self.assertFalse(zygote.is_enabled())
+
+    @patch('enmutils.lib.zygote.config.has_prop', return_value=False)
+    def test_is_enabled__returns_false_if_property_not_set(self, _):
+        self.assertFalse(zygote.is_enabled())
+
+    @patch('enmutils.lib.zygote.pkgutil.iter_modules', return_value=[(None, "prof_01", False),
+                                                                     (None, "prof_02", False)])
+    @patch('enmutils.lib.zygote.importlib.import_module')
+    def test_preload__imports_modules_and_all_package_modules_ignoring_failures(self, mock_import, _):
+        mock_import.side_effect = [Mock(__path__=[]), Mock(), Mock(), ImportError("No module")]
+
+        self.assertEqual(2, zygote.preload(modules=["module"], packages=["package"]))
+        self.assertEqual(["package", "module", "package.prof_01", "package.prof_02"],
+                         [import_call[0][0] for import_call in mock_import.call_args_list])
+
+    @patch.dict('sys.modules', {'setproctitle': None})
+    def test_set_process_title__returns_false_if_setproctitle_not_installed(self):
+        self.assertFalse(zygote.can_set_process_title())
+        self.assertFalse(zygote.set_process_title(["daemon", "TEST_01"]))
+
+    def test_set_process_title__sets_command_line_using_setproctitle(self):
+        mock_setproctitle = Mock()
+        with patch.dict('sys.modules', {'setproctitle': mock_setproctitle}):
+            self.assertTrue(zygote.set_process_title(["daemon", "TEST_01"]))
+        mock_setproctitle.setproctitle.assert_called_once_with("daemon TEST_01")
+
+    @patch('enmutils.lib.zygote.os.path.getmtime', side_effect=[1000.5, OSError("No such file"), 2000.5])
+    @patch('enmutils.lib.zygote.pkgutil.get_loader')
+    def test_get_code_version__returns_latest_modification_time_of_modules(self, *_):
+        self.assertEqual("2000", zygote.get_code_version(["module_1", "module_2", "module_3"]))
+
+    @patch('enmutils.lib.zygote.time.time', return_value=1010.5)
+    def test_record_start_latency__persists_latency(self, _):
+        self.assertEqual(10.5, zygote.record_start_latency("TEST_01", "zygote", request_time=1000))
+        self.assertEqual({"launcher": "zygote", "latency": 10.5},
+                         persistence.get(zygote.START_STATS_KEY.format("TEST_01")))
+
+    @patch('enmutils.lib.zygote.os.environ', {})
+    def test_record_start_latency__does_nothing_if_request_time_unknown(self):
+        self.assertIsNone(zygote.record_start_latency("TEST_01", "popen"))
+        self.assertFalse(persistence.has_key(zygote.START_STATS_KEY.format("TEST_01")))
+
+    @patch('enmutils.lib.zygote.process.get_pss_memory_for_process', return_value=2048)
+    @patch('__builtin__.open', new_callable=mock_open, read_data="1234\n")
+    def test_get_start_stats__adds_pss_of_running_daemons(self, _, mock_get_pss):
+        persistence.set(zygote.START_STATS_KEY.format("TEST_01"), {"launcher": "zygote", "latency": 0.1}, 60)
+
+        self.assertEqual({"TEST_01": {"launcher": "zygote", "latency": 0.1, "pss": 2048}},
+                         zygote.get_start_stats(["TEST_01", "TEST_02"]))
+        mock_get_pss.assert_called_once_with(1234)
+
+    @patch('enmutils.lib.zygote.process.get_pss_memory_for_process', return_value=2048)
+    @patch('__builtin__.open', side_effect=IOError("No such file"))
+    def test_get_start_stats__returns_stats_of_all_daemons_if_no_identifiers(self, *_):
+        persistence.set(zygote.START_STATS_KEY.format("TEST_02"), {"launcher": "popen", "latency": 1.5}, 60)
+        persistence.set(zygote.START_STATS_KEY.format("TEST_01"), {"launcher": "zygote", "latency": 0.1}, 60)
+
+        self.assertEqual({"TEST_01": {"launcher": "zygote", "latency": 0.1, "pss": 0},
+                          "TEST_02": {"launcher": "popen", "latency": 1.5, "pss": 0}}, zygote.get_start_stats())
+
+    @patch('enmutils.lib.zygote.os.fork', return_value=1234)
+    def test_handle_request__replies_with_pid_of_forked_daemon(self, _):
+        connection = Mock()
+        connection.makefile.return_value.readline.return_value = json.dumps(
+            {"identifier": "TEST_01", "log_identifier": None, "cmd": [], "cwd": "/tmp", "request_time": 1000})
+
+        zygote._handle_request(connection, Mock(), Mock())
+
+        connection.settimeout.assert_called_once_with(zygote.CONNECTION_TIMEOUT_SECS)
+        connection.sendall.assert_called_once_with('{"pid": 1234}\n')
+
+    @patch('enmutils.lib.zygote.os.fork')
+    def test_handle_request__does_not_fork_if_request_times_out(self, mock_fork):
+        connection = Mock()
+        connection.makefile.return_value.readline.side_effect = socket.timeout("timed out")
+
+        zygote._handle_request(connection, Mock(), Mock())
+
+        self.assertFalse(mock_fork.called)
+        self.assertFalse(connection.sendall.called)
+
+    @patch('enmutils.lib.zygote.os.fork')
+    def test_handle_request__does_not_fork_if_request_invalid(self, mock_fork):
+        connection = Mock()
+        connection.makefile.return_value.readline.side_effect = ["not json", json.dumps({"identifier": "TEST_01"}),
+                                                                 json.dumps(["TEST_01"])]
+
+        for _ in xrange(3):
+            zygote._handle_request(connection, Mock(), Mock())
+
+        self.assertFalse(mock_fork.called)
+        self.assertFalse(connection.sendall.called)
+
+    @patch('enmutils.lib.zygote._handle_request')
+    @patch('enmutils.lib.zygote.signal.signal')
+    @patch('enmutils.lib.zygote.preload')
+    @patch('enmutils.lib.zygote.os.path.exists', return_value=False)
+    @patch('enmutils.lib.zygote.os.chmod')
+    @patch('enmutils.lib.zygote.socket.socket')
+    def test_serve__only_allows_owner_to_connect_and_closes_each_connection(self, mock_socket, mock_chmod, *_):
+        connection = Mock()
+        mock_socket.return_value.accept.side_effect = [(connection, None), SystemExit]
+
+        self.assertRaises(SystemExit, zygote.serve, Mock(), socket_path="/tmp/zygote.sock")
+
+        mock_chmod.assert_called_once_with("/tmp/zygote.sock", 0600)
+        self.assertTrue(connection.close.called)
+
+    @patch('enmutils.lib.zygote._detach_standard_streams')
+    @patch('enmutils.lib.zygote._remove_log_handlers')
+    @patch('enmutils.lib.zygote.set_process_title')
+    @patch('enmutils.lib.zygote.signal.signal')
+    @patch('enmutils.lib.zygote.os')
+    def test_handle_request__runs_handler_in_forked_daemon_and_exits_with_return_code(self, mock_os, *_):
+        mock_os.fork.return_value = 0
+        mock_os.environ = {}
+        request = {"identifier": "TEST_01", "log_identifier": "test_01", "cmd": ["daemons/TEST_01", "TEST_01"],
+                   "cwd": "/tmp", "request_time": 1000}
+        connection = Mock()
+        connection.makefile.return_value.readline.return_value = json.dumps(request)
+        listener, handler = Mock(), Mock(return_value=1)
+
+        with patch('enmutils.lib.zygote.sys') as mock_sys:
+            zygote._handle_request(connection, listener, handler)
+            self.assertEqual(["daemons/TEST_01", "TEST_01"], mock_sys.argv)
+
+        handler.assert_called_once_with("TEST_01", "test_01")
+        self.assertTrue(listener.close.called)
+        self.assertTrue(mock_os.setpgrp.called)
+        mock_os.chdir.assert_called_once_with("/tmp")
+        mock_os._exit.assert_called_once_with(1)
+
+    @patch('enmutils.lib.zygote._detach_standard_streams')
+    @patch('enmutils.lib.zygote._remove_log_handlers')
+    @patch('enmutils.lib.zygote.set_process_title')
+    @patch('enmutils.lib.zygote.signal.signal')
+    @patch('enmutils.lib.zygote.os')
+    def test_handle_request__exits_with_code_of_system_exit_raised_by_handler(self, mock_os, *_):
+        mock_os.fork.return_value = 0
+        mock_os.environ = {}
+        request = {"identifier": "TEST_01", "log_identifier": None, "cmd": ["daemons/TEST_01", "TEST_01"],
+                   "cwd": "/tmp", "request_time": 1000}
+        connection = Mock()
+        connection.makefile.return_value.readline.return_value = json.dumps(request)
+        handler = Mock(side_effect=SystemExit(3))
+
+        with patch('enmutils.lib.zygote.sys'):
+            zygote._handle_request(connection, Mock(), handler)
+
+        handler.assert_called_once_with("TEST_01", None)
+        mock_os._exit.assert_called_once_with(3)
+
+    @patch('enmutils.lib.zygote.stop')
+    @patch('enmutils.lib.zygote.subprocess.Popen')
+    @patch('enmutils.lib.zygote._read_version', return_value="1000")
+    @patch('enmutils.lib.zygote.get_code_version', return_value="1000")
+    @patch('enmutils.lib.zygote.is_running', return_value=True)
+    def test_start__does_not_start_zygote_if_already_running_installed_code(self, *mocks):
+        self.assertTrue(zygote.start("bin/daemon"))
+        self.assertFalse(mocks[3].called)
+        self.assertFalse(mocks[4].called)
+
+    @patch('enmutils.lib.zygote.time.sleep')
+    @patch('enmutils.lib.zygote.os.path.exists', return_value=True)
+    @patch('__builtin__.open', new_callable=mock_open)
+    @patch('enmutils.lib.zygote.stop')
+    @patch('enmutils.lib.zygote.subprocess.Popen')
+    @patch('enmutils.lib.zygote._read_version', return_value="1000")
+    @patch('enmutils.lib.zygote.get_code_version', return_value="2000")
+    @patch('enmutils.lib.zygote.is_running', return_value=True)
+    def test_start__restarts_zygote_if_installed_code_changed(self, _, __, ___, mock_popen, mock_stop, *____):
+        mock_popen.return_value = Mock(pid=1234, poll=Mock(return_value=None))
+
+        self.assertTrue(zygote.start("bin/daemon"))
+        mock_stop.assert_called_once_with(zygote.ZYGOTE_PID_FILE, zygote.ZYGOTE_SOCKET, zygote.ZYGOTE_VERSION_FILE)
+        self.assertTrue(mock_popen.called)
+
+    @patch('enmutils.lib.zygote.time.sleep')
+    @patch('enmutils.lib.zygote.os.path.exists', side_effect=[False, True])
+    @patch('__builtin__.open', new_callable=mock_open)
+    @patch('enmutils.lib.zygote.subprocess.Popen')
+    @patch('enmutils.lib.zygote.get_code_version', return_value="2000")
+    @patch('enmutils.lib.zygote.is_running', return_value=False)
+    def test_start__starts_zygote_and_waits_for_socket(self, _, __, mock_popen, mock_file, *___):
+        mock_popen.return_value = Mock(pid=1234, poll=Mock(return_value=None))
+
+        self.assertTrue(zygote.start("bin/daemon"))
+        self.assertEqual(["bin/daemon", "--zygote"], mock_popen.call_args[0][0])
+        self.assertEqual([(("1234\n",),), (("2000\n",),)], mock_file.return_value.write.call_args_list)
+
+    @patch('enmutils.lib.zygote.os.remove')
+    @patch('enmutils.lib.zygote.os.path.exists', side_effect=[True, True, False])
+    @patch('enmutils.lib.zygote.process.kill_pid')
+    @patch('enmutils.lib.zygote.process.is_pid_running', return_value=True)
+    @patch('__builtin__.open', new_callable=mock_open, read_data="1234\n")
+    def test_stop__kills_zygote_and_removes_its_files(self, _, __, mock_kill_pid, ___, mock_remove):
+        zygote.stop("zygote.pid", "zygote.sock", "zygote.version")
+        mock_kill_pid.assert_called_once_with(1234, zygote.signal.SIGTERM)
+        self.assertEqual([(("zygote.sock",),), (("zygote.pid",),)], mock_remove.call_args_list)
+
+    @patch('enmutils.lib.zygote.time.sleep')
+    @patch('enmutils.lib.zygote.os.path.exists', return_value=False)
+    @patch('__builtin__.open', new_callable=mock_open)
+    @patch('enmutils.lib.zygote.subprocess.Popen')
+    @patch('enmutils.lib.zygote.is_running', return_value=False)
+    def test_start__returns_false_if_zygote_exits_before_accepting_requests(self, _, mock_popen, *__):
+        mock_popen.return_value = Mock(pid=1234, poll=Mock(return_value=5))
+        self.assertFalse(zygote.start("bin/daemon"))
+
+    @patch('enmutils.lib.zygote.socket.socket')
+    def test_spawn__returns_pid_of_forked_daemon(self, mock_socket):
+        client = mock_socket.return_value
+        client.makefile.return_value.readline.return_value = '{"pid": 1234}\n'
+
+        self.assertEqual(1234, zygote.spawn("TEST_01", "test_01", ["daemons/TEST_01", "TEST_01"], "/tmp"))
+        request = json.loads(client.sendall.call_args[0][0])
+        self.assertEqual(["TEST_01", "test_01", "/tmp"],
+                         [request["identifier"], request["log_identifier"], request["cwd"]])
+        self.assertTrue(client.close.called)
+
+    @patch('enmutils.lib.zygote.socket.socket')
+    def test_spawn__returns_none_if_zygote_not_listening(self, mock_socket):
+        mock_socket.return_value.connect.side_effect = socket.error("Connection refused")
+        self.assertIsNone(zygote.spawn("TEST_01", "test_01", ["daemons/TEST_01", "TEST_01"], "/tmp"))
+
+
+if __name__ == "__main__":
+    unittest2.main(verbosity=2)
@@ -19,7 +19,8 @@
 workload - Tool that allows users to create load in ENM system
 Usage:
   workload start PROFILES [--conf <path>] [--category] [--network-check] [--ignore <profiles>] [--network-config <configuration>] [--schedule <path_to_schedule>]
-                          [--force] [--include <supported_types>] [ -r | --release-exclusive-nodes] [--no-exclusive] [--priority=<PRIORITY>] [--updated] [options]
+                          [--force] [--include <supported_types>] [ -r | --release-exclusive-nodes] [--no-exclusive] [--priority=<PRIORITY>] [--updated]
+                          [--plan-allocation] [--dry-run] [options]
   workload status [PROFILES] [--no-ansi] [--json] [[--errors | --verbose | --lastrun | --warnings] | (--verbose --error-type=<TYPES>) | (--errors --error-type=<TYPES>) | (--errors --warnings)]
                              [--network-check] [-t <total> | --total <total>] [-c | --category] [--priority=<PRIORITY>] [options]
   workload stop PROFILES [--category] [--ignore <profiles>] [--force-stop] [--initial-install-teardown] [--skip] [--schedule <path_to_schedule>]
@@ -82,6 +83,8 @@ Options:
   --validate                           Validate that nodes being added to the pool are synchronized
   -r, --release-exclusive-nodes        Restart the specified profiles, and release EXCLUSIVE profile nodes
   -x, --no-exclusive                   Start the profiles, without allocating nodes to be used by EXCLUSIVE profiles
+  --plan-allocation                    Allocate nodes to all of the profiles being started in a single pass, before the profiles are started
+  --dry-run                            Report the node allocation plan and its runtime, without allocating nodes or starting profiles
   --new-only                           Select the new profiles that have been installed eg new profiles in installed rpm 4.43.11, not in the previous rpm 4.43.10
   --version <rpm>                      Specify a specific rpm version to be used: 4.48.10, can be used with --new-only to amend the previous rpm from the default option
   --soak                               REL flag
@@ -98,6 +101,8 @@ Options:
 Examples:
   workload start all
     Starts all profiles according the schedule in enmutils_int/lib/schedules/full_schedule.py file
+  workload start all --dry-run
+    Reports the node allocation plan for all profiles, without allocating nodes or starting profiles
   workload restart all
     Restarts all active/running profiles according to the start schedule in enmutils_int/etc/full_schedule.py
   workload reset
@@ -134,8 +139,8 @@ import unipath
 
 from enmutils.lib.exceptions import SessionNotEstablishedException
 from enmutils.lib import (log, exception, init, config)
-from enmutils_int.lib import load_mgr, workload_ops, workload_ops_node_operations
-from enmutils_int.lib.services.profilemanager_helper_methods import get_all_profile_names, get_categories
+from enmutils_int.lib import profile_registry
+from enmutils_int.lib.profile_registry import get_all_profile_names, get_categories
 
 from docopt import docopt
 
@@ -162,8 +167,10 @@ def _validate_profiles(argument_dict):
         argument_dict['PROFILES'] = 'all'
 
     if argument_dict['--new-only']:
+        from enmutils_int.lib import load_mgr
         valid_profiles = load_mgr.get_new_profiles(argument_dict['--version'])
     elif argument_dict['start'] and argument_dict['--updated']:
+        from enmutils_int.lib import load_mgr
         valid_profiles = load_mgr.get_updated_profiles()
     elif argument_dict['PROFILES']:
         user_supplied = _remove_duplicates(argument_dict['PROFILES'].split(","))
@@ -372,6 +379,43 @@ def perform_cli_pre_checks(argument_dict):
     return ignored_profiles, operation_type
 
 
+def is_registry_operation(operation_type, argument_dict):
+    """
+    Check if the operation only reads profile information which is answered from the profile registry
+
+    :param operation_type: Type of workload operation.
+    :type operation_type: str
+    :param argument_dict: Command line argument dict.
+    :type argument_dict: dict
+
+    :return: True if the operation is answered from the profile registry
+    :rtype: bool
+    """
+    return (operation_type in ["category", "describe"] or
+            operation_type == "profiles" and not argument_dict['--exclusive'])
+
+
+def display_registry_operation(operation_type, profile_names):
+    """
+    Display the profiles, categories or profile descriptions from the profile registry, without importing the
+    workload operations or the profile modules
+
+    :param operation_type: Type of workload operation.
+    :type operation_type: str
+    :param profile_names: List of profile names to describe
+    :type profile_names: list
+    """
+    if operation_type == "profiles":
+        log.logger.info(log.cyan_text('Existing Profiles: {0}.'.format(log.green_text(
+            ', '.join([profile.upper() for profile in get_all_profile_names()])))))
+    elif operation_type == "category":
+        log.logger.info(log.green_text('Categories: {0}'.format(', '.join(get_categories()))))
+    else:
+        for profile_name in profile_names:
+            profile_registry.print_profile_description(profile_name)
+            profile_registry.print_basic_network_values(profile_name)
+
+
 def display_workload_operation_info_message(operation_type, argument_dict):
     """
     prints the workload operation info message, if operation_type is status and --json value is False.
@@ -385,6 +429,46 @@ def display_workload_operation_info_message(operation_type, argument_dict):
         log.logger.info("Workload operations can take some time. Please be patient...")
 
 
+def execute_workload_operation(operation_type, argument_dict, profile_names, ignored_profiles):
+    """
+    Execute the workload operation
+
+    :param operation_type: Type of workload operation.
+    :type operation_type: str
+    :param argument_dict: Command line argument dict.
+    :type argument_dict: dict
+    :param profile_names: List of validated profile names
+    :type profile_names: list
+    :param ignored_profiles: Profile names to be ignored
+    :type ignored_profiles: set
+
+    :return: True if the operation was successful
+    :rtype: bool
+    """
+    display_workload_operation_info_message(operation_type, argument_dict)
+    # Operation modules import most of enmutils_int.lib, only import them once the arguments are validated
+    if operation_type in ["add", "remove", "reset"]:
+        from enmutils_int.lib import workload_ops_node_operations
+        operation = workload_ops_node_operations.get_workload_operations(operation_type, argument_dict)
+    else:
+        from enmutils_int.lib import workload_ops
+        operation = workload_ops.get_workload_operations(
+            operation_type, argument_dict, profile_names=profile_names, ignored_profiles=ignored_profiles)
+    try:
+        operation.execute()
+    except SessionNotEstablishedException:
+        log.logger.error(
+            "Unable to get or create user administrator session. Retry commmand execution.\n"
+            "If problem continues please try logging in manually and verify ENM system is healthy.\n"
+            "If no fault in ENM raise support request.")
+        exception.process_exception()
+        return False
+    except Exception as e:
+        exception.process_exception(str(e), print_msg_to_console=True)
+        return False
+    return True
+
+
 def cli():
     """
     Parses the command line arguments passed to the workload.py tool
@@ -419,24 +503,10 @@ def cli():
         exception.process_exception(e.message, print_msg_to_console=True)
         result = False
     else:
-        display_workload_operation_info_message(operation_type, argument_dict)
-        if operation_type in ["add", "remove", "reset"]:
-            operation = workload_ops_node_operations.get_workload_operations(operation_type, argument_dict)
+        if is_registry_operation(operation_type, argument_dict):
+            display_registry_operation(operation_type, profile_names)
         else:
-            operation = workload_ops.get_workload_operations(
-                operation_type, argument_dict, profile_names=profile_names, ignored_profiles=ignored_profiles)
-        try:
-            operation.execute()
-        except SessionNotEstablishedException:
-            log.logger.error(
-                "Unable to get or create user administrator session. Retry commmand execution.\n"
-                "If problem continues please try logging in manually and verify ENM system is healthy.\n"
-                "If no fault in ENM raise support request.")
-            exception.process_exception()
-            result = False
-        except Exception as e:
-            exception.process_exception(str(e), print_msg_to_console=True)
-            result = False
+            result = execute_workload_operation(operation_type, argument_dict, profile_names, ignored_profiles)
 
     if not result:
         rc = 1
@@ -0,0 +1,337 @@
+# ********************************************************************
+# Name    : Allocation Planner
+# Summary : Plans the node allocation for all of the profiles being
+#           started in a single pass over the workload pool, balancing
+#           the selected nodes across the netsim hosts, and commits
+#           the resulting allocations to persistence in a single
+#           transaction. The plan can be reported without committing
+#           it (dry run).
+# ********************************************************************
+import copy
+import heapq
+import math
+import time
+from collections import OrderedDict, defaultdict
+
+from enmutils.lib import log, persistence, mutexer
+from enmutils_int.lib import node_pool_mgr, node_pool_stats
+
+PLANNED_ALLOCATIONS_KEY = "planned-node-allocations"
+PLANNED_ALLOCATIONS_EXPIRY = 24 * 60 * 60
+# Profiles whose node selection depends on ENM/netsim queries or bespoke logic remain allocated at profile start
+UNPLANNED_PROFILE_ATTRIBUTES = ["BATCH_MO_SIZE", "CELL_CARDINALITY", "CHECK_NODE_SYNC", "LTE_CELL_CHECK",
+                                "LARGE_BSC_ONLY", "SMALL_BSC_ONLY", "BSC_250_CELL", "ME_TYPE_NODES_PERCENTAGE",
+                                "MAX_NODES_TO_ALLOCATE"]
+UNPLANNED_PROFILES = ["HA_01", "SHM_27", "CMIMPORT_31", "CMIMPORT_32", "CMIMPORT_33"]
+
+
+class AllocationPlanner(object):
+
+    def __init__(self, profiles):
+        """
+        Plans the node allocation for a set of profiles in a single pass over the workload pool
+
+        :param profiles: List of profile objects to be started
+        :type profiles: list
+        """
+        self.profiles = OrderedDict((profile.NAME, profile) for profile in profiles)
+        self.allocations = OrderedDict()
+        self.shortfalls = {}
+        self.unplanned = []
+        self.nodes = {}
+        self.host_load = defaultdict(int)
+        self.plan_time = 0
+
+    @staticmethod
+    def can_be_planned(profile):
+        """
+        Check if the node allocation of the profile can be determined by the planner
+
+        :param profile: Profile object
+        :type profile: `enmutils_int.lib.profile.Profile`
+
+        :return: Boolean indicating if the allocation can be planned
+        :rtype: bool
+        """
+        if profile.EXCLUSIVE or profile.NAME in UNPLANNED_PROFILES:
+            return False
+        if any(hasattr(profile, attribute) for attribute in UNPLANNED_PROFILE_ATTRIBUTES):
+            return False
+        if getattr(profile, "SUPPORTED_NODE_TYPES", None) and getattr(profile, "TOTAL_NODES", 0):
+            return True
+        return bool(getattr(profile, "NUM_NODES", None))
+
+    def plan(self, nodes=None):
+        """
+        Determine the nodes to be allocated to each of the profiles
+
+        :param nodes: List of pool nodes to plan against, read from persistence if not supplied
+        :type nodes: list
+
+        :return: Dictionary of planned node ids per profile name
+        :rtype: dict
+        """
+        start_time = time.time()
+        if nodes is None:
+            nodes = node_pool_mgr.get_pool().wl_nodes
+        # Plan against copies so the planned profiles are visible to later profiles without altering the pool nodes
+        self.nodes = OrderedDict()
+        for node in sorted(nodes, key=lambda node: node.node_id):
+            node_copy = copy.copy(node)
+            node_copy.profiles = list(node.profiles)
+            self.nodes[node.node_id] = node_copy
+
+        nodes_by_type = defaultdict(list)
+        for node in self.nodes.itervalues():
+            nodes_by_type[node.primary_type].append(node)
+
+        profiles = [profile for profile in self.profiles.itervalues() if self.can_be_planned(profile)]
+        self.unplanned = [profile_name for profile_name, profile in self.profiles.iteritems()
+                          if profile not in profiles and self._requires_nodes(profile)]
+        # Profiles excluding nodes used by other profiles are planned last, once those allocations are known
+        for profile in sorted(profiles, key=lambda profile: bool(getattr(profile, "EXCLUDE_NODES_FROM", None))):
+            self._plan_profile(profile, nodes_by_type)
+
+        self.plan_time = time.time() - start_time
+        return self.allocations
+
+    @staticmethod
+    def _requires_nodes(profile):
+        """
+        Check if the profile has node related attributes
+
+        :param profile: Profile object
+        :type profile: `enmutils_int.lib.profile.Profile`
+
+        :return: Boolean indicating if the profile requires nodes
+        :rtype: bool
+        """
+        return hasattr(profile, "NUM_NODES") or hasattr(profile, "SUPPORTED_NODE_TYPES")
+
+    def _plan_profile(self, profile, nodes_by_type):
+        """
+        Select the nodes for the profile, recording any node type shortfall.
+        The nodes of a profile with a shortfall are not reserved, so they remain available to the later profiles.
+
+        :param profile: Profile object
+        :type profile: `enmutils_int.lib.profile.Profile`
+        :param nodes_by_type: Dictionary of pool nodes per primary type
+        :type nodes_by_type: dict
+        """
+        candidates = OrderedDict()
+        node_types = (profile.SUPPORTED_NODE_TYPES if getattr(profile, "SUPPORTED_NODE_TYPES", None) and
+                      getattr(profile, "TOTAL_NODES", 0) else profile.NUM_NODES.keys())
+        for node_type in node_types:
+            candidates[node_type] = self._get_candidates(profile, node_type, nodes_by_type)
+
+        requirements = self.get_requirements(profile, {node_type: len(nodes) for node_type, nodes in
+                                                       candidates.iteritems()})
+        selected, shortfall = [], {}
+        for node_type, required in requirements.iteritems():
+            selected_ids = set(node.node_id for node in selected)
+            nodes = [node for node in candidates[node_type] if node.node_id not in selected_ids]
+            allocated = [node for node in nodes if profile.NAME in node.profiles][:required]
+            unallocated = [node for node in nodes if profile.NAME not in node.profiles]
+            nodes = allocated + self._select_across_hosts(profile, unallocated, required - len(allocated))
+            if len(nodes) < required:
+                shortfall[node_type] = required - len(nodes)
+            selected.extend(nodes)
+
+        new_nodes = [node for node in selected if profile.NAME not in node.profiles]
+        if shortfall:
+            log.logger.debug("Not enough nodes available for {0}, shortfall: {1}".format(profile.NAME, shortfall))
+            self.shortfalls[profile.NAME] = shortfall
+            for node in new_nodes:
+                self.host_load[node.netsim] -= 1
+        else:
+            for node in new_nodes:
+                node.profiles.append(profile.NAME)
+        self.allocations[profile.NAME] = [node.node_id for node in selected]
+
+    def _get_candidates(self, profile, node_type, nodes_by_type):
+        """
+        Get the pool nodes of the given type which the profile may be allocated to
+
+        :param profile: Profile object
+        :type profile: `enmutils_int.lib.profile.Profile`
+        :param node_type: NE type required
+        :type node_type: str
+        :param nodes_by_type: Dictionary of pool nodes per primary type
+        :type nodes_by_type: dict
+
+        :return: List of candidate nodes
+        :rtype: list
+        """
+        nodes = nodes_by_type.get(node_type, []) + nodes_by_type.get(node_pool_mgr.UPDATED_NODES.get(node_type), [])
+        node_filter = getattr(profile, "NODE_FILTER", {}).get(node_type)
+        nodes_filter = node_pool_mgr.NodesFilter(profile, nodes, node_type)
+        candidates = []
+        for node in nodes:
+            if node_filter and not nodes_filter._filter_node_by_attr_per_each_node(node, node_filter):  # pylint: disable=protected-access
+                continue
+            if getattr(profile, "NO_UPGIND", False) and "UPGIND" in node.simulation:
+                continue
+            if node.is_available_for(profile):
+                candidates.append(node)
+        return candidates
+
+    @staticmethod
+    def get_requirements(profile, available_per_type):
+        """
+        Determine the number of nodes of each type required by the profile
+
+        :param profile: Profile object
+        :type profile: `enmutils_int.lib.profile.Profile`
+        :param available_per_type: Number of candidate nodes per NE type
+        :type available_per_type: dict
+
+        :return: Dictionary of required node count per NE type
+        :rtype: dict
+        """
+        requirements = OrderedDict()
+        total_nodes = getattr(profile, "TOTAL_NODES", 0)
+        if getattr(profile, "SUPPORTED_NODE_TYPES", None) and total_nodes:
+            total_available = sum(available_per_type.values())
+            # Share the total between the types in proportion to availability, rounding up and then removing any
+            # extra nodes from the largest share, as per the existing allocation by NE type
+            for node_type, available in sorted(available_per_type.items(), key=lambda item: item[1], reverse=True):
+                requirements[node_type] = (int(math.ceil(total_nodes * available / float(total_available)))
+                                           if total_available else 0)
+            extra_nodes = sum(requirements.values()) - total_nodes
+            if requirements and extra_nodes > 0:
+                requirements[requirements.keys()[0]] -= extra_nodes
+            return requirements
+
+        fixed = sum(count for count in profile.NUM_NODES.values() if count != -1)
+        for node_type, count in sorted(profile.NUM_NODES.items(), key=lambda item: item[1], reverse=True):
+            if count == -1:
+                count = (max(total_nodes - fixed, 0) if total_nodes else available_per_type.get(node_type, 0))
+                fixed += count
+            requirements[node_type] = count
+        return requirements
+
+    def _select_across_hosts(self, profile, nodes, required):
+        """
+        Select the required number of nodes, spreading them across the least loaded netsim hosts
+
+        :param profile: Profile object
+        :type profile: `enmutils_int.lib.profile.Profile`
+        :param nodes: List of candidate nodes
+        :type nodes: list
+        :param required: Number of nodes required
+        :type required: int
+
+        :return: List of selected nodes
+        :rtype: list
+        """
+        if required <= 0:
+            return []
+        host_dict = node_pool_mgr.group_nodes_per_netsim_host(nodes)
+        nodes_per_host = getattr(profile, "NODES_PER_HOST", None)
+        heap = []
+        for host, host_nodes in host_dict.iteritems():
+            # Least used nodes first, so that load is spread across the nodes of each host too
+            host_nodes.sort(key=lambda node: (len(node.profiles), node.node_id), reverse=True)
+            heapq.heappush(heap, (0, self.host_load[host], host))
+        selected = []
+        while heap and len(selected) < required:
+            used_by_profile, _, host = heapq.heappop(heap)
+            selected.append(host_dict[host].pop())
+            self.host_load[host] += 1
+            if host_dict[host] and (not nodes_per_host or used_by_profile + 1 < nodes_per_host):
+                heapq.heappush(heap, (used_by_profile + 1, self.host_load[host], host))
+        return selected
+
+    def commit(self, record=True):
+        """
+        Allocate the planned nodes to the profiles in a single transaction.
+
+        Profiles with a shortfall are not committed, their nodes are allocated at profile start as usual.
+
+        :param record: Record the planned allocations, so that the profiles skip their own allocation at start
+        :type record: bool
+
+        :return: Number of nodes updated
+        :rtype: int
+        """
+        start_time = time.time()
+        allocations = {profile_name: node_ids for profile_name, node_ids in self.allocations.iteritems()
+                       if node_ids and profile_name not in self.shortfalls}
+        if not allocations:
+            log.logger.debug("No planned allocations to commit")
+            return 0
+        with node_pool_mgr.mutex():
+            db = persistence.default_db()
+            nodes = {node.node_id: node for node in
+                     db.get_keys(list(set(node_id for node_ids in allocations.values() for node_id in node_ids)))}
+            updated_nodes = {}
+            for profile_name, node_ids in allocations.iteritems():
+                for node_id in node_ids:
+                    node = nodes.get(node_id)
+                    if node and profile_name not in node.profiles:
+                        node.profiles.append(profile_name)
+                        node._is_exclusive = False  # pylint: disable=protected-access
+                        updated_nodes[node_id] = node
+            node_pool_stats.record_nodes(updated_nodes.values())
+            db.set_keys(updated_nodes, -1)
+            node_pool_mgr.update_cached_list_of_nodes(updated_nodes)
+            if record:
+                record_planned_allocations({profile_name: len(node_ids) for profile_name, node_ids in
+                                            allocations.iteritems()})
+        log.logger.debug("Committed planned allocations for {0} profile(s) to {1} node(s) in {2:.2f}s"
+                         .format(len(allocations), len(updated_nodes), time.time() - start_time))
+        return len(updated_nodes)
+
+    def log_plan(self):
+        """
+        Log a summary of the plan
+        """
+        log.logger.info("Node allocation plan for {0} profile(s) calculated in {1:.2f}s"
+                        .format(len(self.allocations), self.plan_time))
+        for profile_name, node_ids in self.allocations.iteritems():
+            node_types = defaultdict(int)
+            hosts = set()
+            for node_id in node_ids:
+                node_types[self.nodes[node_id].primary_type] += 1
+                hosts.add(self.nodes[node_id].netsim)
+            log.logger.info("  {0}: {1} node(s) {2} across {3} netsim host(s)"
+                            .format(profile_name, len(node_ids), dict(node_types), len(hosts)))
+            if profile_name in self.shortfalls:
+                log.logger.info(log.yellow_text("  {0}: not enough nodes available, short by {1}. Nodes will be "
+                                                "allocated at profile start.".format(profile_name,
+                                                                                     self.shortfalls[profile_name])))
+        if self.unplanned:
+            log.logger.info("Nodes allocated at profile start for: [{0}]".format(", ".join(sorted(self.unplanned))))
+
+
+def record_planned_allocations(planned_allocations):
+    """
+    Persist the number of nodes allocated to each profile by the planner
+
+    :param planned_allocations: Dictionary of node count per profile name
+    :type planned_allocations: dict
+    """
+    with mutexer.mutex(PLANNED_ALLOCATIONS_KEY, persisted=True):
+        current_allocations = persistence.get(PLANNED_ALLOCATIONS_KEY) or {}
+        current_allocations.update(planned_allocations)
+        persistence.set(PLANNED_ALLOCATIONS_KEY, current_allocations, PLANNED_ALLOCATIONS_EXPIRY)
+
+
+def pop_planned_allocation(profile_name):
+    """
+    Remove and return the number of nodes allocated to the profile by the planner
+
+    :param profile_name: Name of the profile
+    :type profile_name: str
+
+    :return: Number of nodes allocated to the profile by the planner, 0 if not planned
+    :rtype: int
+    """
+    if not persistence.has_key(PLANNED_ALLOCATIONS_KEY):
+        return 0
+    with mutexer.mutex(PLANNED_ALLOCATIONS_KEY, persisted=True):
+        current_allocations = persistence.get(PLANNED_ALLOCATIONS_KEY) or {}
+        planned = current_allocations.pop(profile_name, 0)
+        if planned:
+            persistence.set(PLANNED_ALLOCATIONS_KEY, current_allocations, PLANNED_ALLOCATIONS_EXPIRY)
+    return planned
@@ -22,10 +22,10 @@ from enmutils.lib.exceptions import EnvironError, ScriptEngineResponseValidation
 from enmutils.lib.headers import JSON_SECURITY_REQUEST
 from enmutils_int.lib.cmcli import get_cell_attributes
 from enmutils_int.lib.enm_user import get_workload_admin_user
+from enmutils_int.lib import mo_topology_index
 from enmutils_int.lib.load_node import filter_nodes_having_poid_set
 from enmutils_int.lib.node_pool_mgr import remove_gerancell_in_range
 
-GET_LIST_OF_CELL_FDNs_ON_NODE = "cmedit get {node_name} {mo_type}"
 BASE_URL = 'configuration-tasks/v1/tasks'
 CELL_URL = 'cell-management-internal/v1/tasks'
 NETWORK_PO_IDS_URL = '/persistentObject/network/-1?relativeDepth=0:-2&childDepth=1'
@@ -149,14 +149,7 @@ def get_all_fdn_list_of_cells_on_node(user, node_name, mo_type):
     :rtype: list
     """
 
-    response = user.enm_execute(GET_LIST_OF_CELL_FDNs_ON_NODE.format(node_name=node_name, mo_type=mo_type))
-    output = response.get_output()
-
-    cell_fdn_list = []
-    for cell_fdn in [item for item in output if "FDN".lower() in item.lower()]:
-        cell_fdn_list.append(cell_fdn.split(":")[1].strip())
-
-    return cell_fdn_list
+    return mo_topology_index.get_mo_fdns(user, [node_name], mo_type).get(node_name, [])
 
 
 def configure_new_attribute_values(attribute_data, current_attribute_values, set_new_attributes_to_zero=False):
@@ -282,6 +275,8 @@ def populate_node_cell_data(user, required_number_of_cells_per_node, mo_type, li
     """
 
     list_of_attributes = [attribute_data_info[0] for attribute_data_info in mo_attribute_data[mo_type]]
+    # Index the cells of all of the nodes in bulk, before the cells are fetched node by node
+    mo_topology_index.get_mo_fdns(user, [node.node_id for node in list_of_nodes], mo_type)
 
     node_cell_data = {}
 
@@ -986,18 +981,7 @@ def get_list_of_existing_cells_on_node(user, node_name, cell_mo_type):
 
     log.logger.debug('Getting list of existing cells on node')
 
-    list_of_cells = []
-    cmedit_get_cells_command = 'cmedit get {0} {1}'.format(node_name, cell_mo_type)
-    response = user.enm_execute(cmedit_get_cells_command)
-
-    output = response.get_output()
-    match_pattern = '(^FDN\\s+:\\s+)(.*)'
-    for line in output:
-        if re.search(match_pattern, line):
-            fdn = line.split()[-1]
-            list_of_cells.append(fdn)
-
-    return list_of_cells
+    return mo_topology_index.get_mo_fdns(user, [node_name], cell_mo_type).get(node_name, [])
 
 
 def determine_existing_cells_on_list_of_nodes(user, source_cell_type, nodes):
@@ -1014,13 +998,10 @@ def determine_existing_cells_on_list_of_nodes(user, source_cell_type, nodes):
     :rtype: dict
     """
 
-    existing_cells = {}
-
-    for selected_node_info in nodes:
-        node_name = selected_node_info.node_id
-        existing_cells[node_name] = get_list_of_existing_cells_on_node(user, node_name, source_cell_type)
+    node_names = [selected_node_info.node_id for selected_node_info in nodes]
+    existing_cells = mo_topology_index.get_mo_fdns(user, node_names, source_cell_type)
 
-    return existing_cells
+    return {node_name: existing_cells.get(node_name, []) for node_name in node_names}
 
 
 def view_cell_relations(user_node_data, relations, random_sleep_range=0):
@@ -1097,9 +1078,11 @@ def verify_nodes_on_enm_and_return_mo_cell_fdn_dict(user, nodes, mo_types):
 
     nodes_verified_on_enm = filter_nodes_having_poid_set(nodes)
     if nodes_verified_on_enm:
-        for node in nodes_verified_on_enm:
-            for mo_type in mo_types:
-                node_fdns[mo_type] += get_all_fdn_list_of_cells_on_node(user, node.node_id, mo_type)
+        node_names = [node.node_id for node in nodes_verified_on_enm]
+        for mo_type in mo_types:
+            cell_fdns = mo_topology_index.get_mo_fdns(user, node_names, mo_type)
+            for node_name in node_names:
+                node_fdns[mo_type] += cell_fdns.get(node_name, [])
 
     return node_fdns
 
@@ -1153,6 +1136,7 @@ def execute_cmedit_command_to_create_new_cell(user, cmedit_command, node_name, c
         raise ScriptEngineResponseValidationError('Could not create cell on node {0}.'.format(node_name),
                                                   response.get_output())
 
+    mo_topology_index.invalidate_fdns([cell_fdn])
     log.logger.debug('Cell created: {0}'.format(cell_fdn))
     log.logger.debug('Partial output to identify instances updated: {0}'.format(output[-24:]))
 
@@ -1257,6 +1241,7 @@ def execute_cmedit_command_to_delete_cells(user, cell_fdn):
         raise EnvironError(e, 'Could not delete cell on ENM')
 
     output = response.get_output()
+    mo_topology_index.invalidate_fdns([cell_fdn])
 
     log.logger.debug('Cell deleted successfully: {0}'.format(cell_fdn))
     log.logger.debug('Partial output to identify instances updated: {0}'.format(
@@ -1441,6 +1426,7 @@ def delete_cell_via_rest(user, target_fdn, force=True):
 
     response = user.post(BASE_URL, data=json.dumps(json_data), headers=JSON_SECURITY_REQUEST)
     raise_for_status(response, message_prefix="POST response returned is NOK: ")
+    mo_topology_index.invalidate_fdns([target_fdn])
     if response.json() and response.json().get("requestResult") in ["ERROR", "Error"]:
         log.logger.debug("Cell failed to delete cell correctly.\nRequest made: \t[{0}]\nResponse: \t[{1}]"
                          .format(json.dumps(json_data), response.json()))
@@ -1620,6 +1606,7 @@ def create_cell_via_rest(user, profile, target_fdns, cell_type, lte_cell_type, n
         except HTTPError as e:
             profile.add_error_as_exception(e)
             failed_cells[fdn] = e.message
+    mo_topology_index.invalidate_fdns(created_cells)
     log.logger.debug("Created {0}/{1} cell(s) of type '{cell_type}'.".format(len(created_cells),
                                                                              len(target_fdns), cell_type=cell_type))
 
@@ -11,6 +11,7 @@ import re
 from enmutils.lib import log, persistence
 from enmutils.lib.exceptions import ScriptEngineResponseValidationError, DependencyException
 from enmutils_int.lib import load_node, node_pool_mgr
+from enmutils_int.lib.script_engine_output import split_tabular_rows
 
 MSCM_MCD_RATE = 0.04
 MSCMCE_MCD_RATE = 0.5
@@ -280,7 +281,8 @@ class CmSyncMoInfo(object):
         if filtered_response and self.RADIO_NODE not in filtered_response[0]:
             raise DependencyException(host='cmserv', command=self.RADIO_NODE_CMD,
                                       error='Change in format of command output: {0}'.format(filtered_response[0]))
-        nodes_on_enm = {_.split('\t')[0].encode('utf-8'): _.split('\t')[-1].encode('utf-8') for _ in filtered_response}
+        nodes_on_enm = {values[0].encode('utf-8'): values[-1].encode('utf-8')
+                        for values in split_tabular_rows(filtered_response)}
         with node_pool_mgr.mutex():
             pool = node_pool_mgr.get_pool()
             for node in pool.node_dict.get(self.RADIO_NODE).values():
@@ -17,6 +17,7 @@ from enmutils.lib.cache import (get_emp, get_enm_cloud_native_namespace,
                                 is_emp, is_enm_on_cloud_native)
 from enmutils.lib.enm_user_2 import get_admin_user
 from enmutils.lib.exceptions import EnmApplicationError, EnvironError
+from enmutils_int.lib.script_engine_output import split_tabular_rows
 from enmutils_int.lib.services import deployment_info_helper_methods
 
 LITP_HOST_CMD = ("/usr/bin/python /usr/bin/litp show -p /deployments/enm/clusters/{cluster}_cluster/services/"
@@ -630,8 +631,7 @@ def get_mo_attributes_from_enm(enm_user, mo_type, mo_attributes, scope="*"):
         raise EnmApplicationError("Error occurred while getting NE {mo_type} status from ENM - {output}"
                                   .format(mo_type=mo_type, output=enm_output))
     mo_attribute_values_per_fdn = {}
-    for line in enm_output[2:-2]:
-        mo_attributes_values = line.split("\t")
+    for mo_attributes_values in split_tabular_rows(enm_output[2:-2]):
         mo_attribute_values_per_fdn[mo_attributes_values[0]] = dict(zip(mo_attributes.split(','),
                                                                         mo_attributes_values[2:]))
 
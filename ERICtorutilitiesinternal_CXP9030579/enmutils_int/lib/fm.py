@@ -4,7 +4,9 @@
 # Summary : Module for interacting with FM application, services in ENM.
 #           Allows the user to query FM application in ENM, manage user
 #           workspaces, manage alarm routes, generate, and search for
-#           alarms in ENM.
+#           alarms in ENM. Alarm supervision, sync and acknowledgement
+#           node actions are sent in batches, with bounded concurrency
+#           across the supplied users, retrying only the failed items.
 # ********************************************************************
 
 
@@ -20,6 +22,8 @@ from enmutils.lib import log
 from enmutils.lib.enm_user_2 import raise_for_status
 from enmutils.lib.exceptions import ScriptEngineResponseValidationError, EnvironError
 from enmutils.lib.script_engine_2 import Request
+from enmutils.lib.thread_queue import ThreadQueue
+from enmutils_int.lib.common_utils import chunks
 
 HEADERS = {'Content-Type': 'application/json; charset=utf-8'}
 OPEN, HISTORICAL = range(2)
@@ -97,6 +101,15 @@ NODE_SCOPE_PAYLOAD = {"id": None,
                                '"totalCount":%s,'
                                '"isShown":true}'}
 ALARM_TEXT_ROUTING_URL = "alarmcontroldisplayservice/alarmMonitoring/alarmtextrouting/"
+NODE_ACTIONS_URL = "/alarmcontroldisplayservice/alarmMonitoring/alarmoperations/nodeactions"
+NODE_ACTION_BATCH_SIZE = 250
+ALARM_ACK_BATCH_SIZE = 500
+NODE_ACTION_MAX_WORKERS = 4
+NODE_ACTION_RETRIES = 0
+NODE_ACTION_RETRY_INTERVAL_SECS = 10
+ALARM_ACK_RETRIES = 1
+ALARM_ACK_RETRY_INTERVAL_SECS = 120
+NODE_ACTION_TIMEOUT_SECS = 10 * 60
 
 
 def alarm_overview_home(user):
@@ -110,60 +123,193 @@ def alarm_overview_home(user):
     raise_for_status(response, message_prefix="Failed to get alarm monitor home: ")
 
 
-def enable_alarm_supervision(user, nodes):
+def _execute_node_action_batch(batch, user_data, item_key, separator, message_prefix):
+    """
+    Executes the node action on a single batch of items
+
+    :param batch: Tuple of the user who will execute the action and the list of items, i.e. node ids or alarm ids
+    :type batch: tuple
+    :param user_data: Node action payload, excluding the items
+    :type user_data: dict
+    :param item_key: Payload key of the items
+    :type item_key: str
+    :param separator: String used to join the items in the payload
+    :type separator: str
+    :param message_prefix: Message to prefix the error with if the action fails
+    :type message_prefix: str
+
+    :return: Dictionary of item to the exception encountered, for the items on which the action failed
+    :rtype: dict
+    """
+    user, items = batch
+    payload = dict(user_data, **{item_key: separator.join(items)})
+    try:
+        response = user.post(NODE_ACTIONS_URL, data=json.dumps(payload), headers=HEADERS)
+        raise_for_status(response, message_prefix=message_prefix)
+    except Exception as e:
+        log.logger.debug("Node action {0} failed on batch of {1} item(s): {2}"
+                         .format(user_data["action"], len(items), str(e)))
+        return {item: e for item in items}
+    return {}
+
+
+def _execute_node_action_batches(batches, user_data, item_key, separator, message_prefix, max_workers):
+    """
+    Executes the node action on each batch of items, with bounded concurrency
+
+    :param batches: List of tuples of user and list of items
+    :type batches: list
+    :param user_data: Node action payload, excluding the items
+    :type user_data: dict
+    :param item_key: Payload key of the items
+    :type item_key: str
+    :param separator: String used to join the items in the payload
+    :type separator: str
+    :param message_prefix: Message to prefix the error with if the action fails
+    :type message_prefix: str
+    :param max_workers: Maximum number of batches executed concurrently
+    :type max_workers: int
+
+    :return: Dictionary of item to the exception encountered, for the items on which the action failed
+    :rtype: dict
+    """
+    args = [user_data, item_key, separator, message_prefix]
+    if len(batches) == 1:
+        return _execute_node_action_batch(batches[0], *args)
+    tq = ThreadQueue(batches, num_workers=min(max_workers, len(batches)), func_ref=_execute_node_action_batch,
+                     args=args, task_join_timeout=NODE_ACTION_TIMEOUT_SECS, task_wait_timeout=NODE_ACTION_TIMEOUT_SECS)
+    tq.execute()
+    failures = {}
+    for work_entry in tq.work_entries:
+        if work_entry.exception_raised or not work_entry.finished:
+            failures.update({item: work_entry.exception or EnvironError("Batch did not complete")
+                             for item in work_entry.arg_list[0][1]})
+        else:
+            failures.update(work_entry.result or {})
+    return failures
+
+
+def execute_node_action_in_batches(users, items, user_data, message_prefix, item_key="nodes", separator=";",
+                                   batch_size=NODE_ACTION_BATCH_SIZE, max_workers=NODE_ACTION_MAX_WORKERS,
+                                   retries=NODE_ACTION_RETRIES, retry_interval=NODE_ACTION_RETRY_INTERVAL_SECS):
+    """
+    Executes the node action on the items, split into batches which are shared between the users and executed
+    concurrently. If retries are requested, only the items of the batches which failed are retried.
+
+    :param users: User, or list of users, who will execute the node action
+    :type users: `enm_user_2.User` or list
+    :param items: List of items, i.e. node ids or alarm ids
+    :type items: list
+    :param user_data: Node action payload, excluding the items
+    :type user_data: dict
+    :param message_prefix: Message to prefix the error with if the action fails
+    :type message_prefix: str
+    :param item_key: Payload key of the items
+    :type item_key: str
+    :param separator: String used to join the items in the payload
+    :type separator: str
+    :param batch_size: Maximum number of items per request
+    :type batch_size: int
+    :param max_workers: Maximum number of batches executed concurrently
+    :type max_workers: int
+    :param retries: Number of times the failed items are retried, 0 to return the failures of the first attempt
+    :type retries: int
+    :param retry_interval: Time in seconds to wait before retrying the failed items
+    :type retry_interval: int
+
+    :return: Dictionary of item to the exception encountered, for the items on which the action failed
+    :rtype: dict
+    """
+    users = users if isinstance(users, list) else [users]
+    failures = {}
+    pending = list(items)
+    for attempt in xrange(retries + 1):
+        if attempt:
+            log.logger.debug("Retrying node action {0} on {1} failed item(s) in {2} seconds"
+                             .format(user_data["action"], len(pending), retry_interval))
+            time.sleep(retry_interval)
+        batches = [(users[index % len(users)], batch) for index, batch in enumerate(chunks(pending, batch_size))]
+        failures = _execute_node_action_batches(batches, user_data, item_key, separator, message_prefix,
+                                                max_workers) if batches else {}
+        pending = [item for item in pending if item in failures]
+        if not pending:
+            break
+    log.logger.debug("Node action {0} succeeded on {1}/{2} item(s)"
+                     .format(user_data["action"], len(items) - len(failures), len(items)))
+    return failures
+
+
+def raise_for_failed_items(failures, action):
+    """
+    Raises the error encountered if the node action failed on any items
+
+    :param failures: Dictionary of item to the exception encountered
+    :type failures: dict
+    :param action: Description of the node action
+    :type action: str
+
+    :raises HTTPError: if the node action failed on any items, or the other error encountered
+    """
+    if failures:
+        log.logger.debug("Failed to {0} on {1} item(s): {2}"
+                         .format(action, len(failures), ", ".join(sorted(failures)[:10])))
+        raise failures.values()[0]
+
+
+def enable_alarm_supervision(user, nodes, batch_size=NODE_ACTION_BATCH_SIZE):
     """
     Enables the alarm supervision in ENM for the given nodes
-    :param user: ENM user instance
-    :type user: enmutils.lib.enm_user_2.User
+    :param user: ENM user instance, or list of user instances between which the batches of nodes are shared
+    :type user: enmutils.lib.enm_user_2.User or list
     :param nodes: list of enmutils.lib.enm_node.Node instances to be used with this request
     :type nodes: list
+    :param batch_size: Maximum number of nodes per request
+    :type batch_size: int
     """
-    url = "/alarmcontroldisplayservice/alarmMonitoring/alarmoperations/nodeactions"
-
     user_data = {
         "action": "supervision",
-        "nodes": ';'.join([node.node_id for node in nodes]),
         "operatorName": "administrator",
         "value": "ON"
     }
-    response = user.post(url, data=json.dumps(user_data), headers=HEADERS)
-    raise_for_status(response, message_prefix="Failed to enable alarm supervision: ")
+    failures = execute_node_action_in_batches(user, [node.node_id for node in nodes], user_data,
+                                              "Failed to enable alarm supervision: ", batch_size=batch_size)
+    raise_for_failed_items(failures, "enable alarm supervision")
 
 
-def initiate_alarm_sync(user, nodes):
+def initiate_alarm_sync(user, nodes, batch_size=NODE_ACTION_BATCH_SIZE):
     """
-    Initiates the alarm sync for the given nodesraise_for_status(response, message_prefix="Failed to enable alarm supervision: ")
-    :param user: ENM user instance
-    :type user: enmutils.lib.enm_user_2.User
+    Initiates the alarm sync for the given nodes
+    :param user: ENM user instance, or list of user instances between which the batches of nodes are shared
+    :type user: enmutils.lib.enm_user_2.User or list
     :param nodes: list of enmutils.lib.enm_node.Node instances to be used with this request
     :type nodes: list
+    :param batch_size: Maximum number of nodes per request
+    :type batch_size: int
     """
-    url = "/alarmcontroldisplayservice/alarmMonitoring/alarmoperations/nodeactions"
-
     user_data = {
         "action": "sync",
-        "nodes": ';'.join([node.node_id for node in nodes]),
         "operatorName": "administrator",
         "value": True
     }
-    response = user.post(url, data=json.dumps(user_data), headers=HEADERS)
-    raise_for_status(response, message_prefix="Failed to initiate alarm sync: ")
+    failures = execute_node_action_in_batches(user, [node.node_id for node in nodes], user_data,
+                                              "Failed to initiate alarm sync: ", batch_size=batch_size)
+    raise_for_failed_items(failures, "initiate alarm sync")
 
 
-@retry(retry_on_exception=lambda e: isinstance(e, (HTTPError, ConnectionError)), wait_fixed=120000,
-       stop_max_attempt_number=2)
-def acknowledge_alarms(user, nodes, num_alarms=10):
+def acknowledge_alarms(user, nodes, num_alarms=10, batch_size=ALARM_ACK_BATCH_SIZE):
     """
     Acknowledges the alarms in ENM for the given nodes
-    :param user: ENM user instance
-    :type user: enmutils.lib.enm_user_2.User
+    :param user: ENM user instance, or list of user instances between which the batches of alarms are shared
+    :type user: enmutils.lib.enm_user_2.User or list
     :param nodes: list of enmutils.lib.enm_node.Node instances to be used with this request
     :type nodes: list
     :param num_alarms: Number of alarms to be acknowledged
     :type num_alarms: int
+    :param batch_size: Maximum number of alarms per request
+    :type batch_size: int
     """
     alarms_json = {}
-    alarms = _fetch_alarms(user, nodes)
+    alarms = _fetch_alarms(user[0] if isinstance(user, list) else user, nodes)
     try:
         alarms_json = alarms.json()[1]
     except IndexError:
@@ -173,16 +319,15 @@ def acknowledge_alarms(user, nodes, num_alarms=10):
         return
     alarms_poids = [str(alarm) for alarm in alarms_json['eventPoIds'][:num_alarms] if alarms_json]
     log.logger.info("Number of alarm PoIds fetched : {0}".format(len(alarms_poids)))
-    url = "/alarmcontroldisplayservice/alarmMonitoring/alarmoperations/nodeactions"
     user_data = {
         "action": "ACK",
-        "alarmIdList": ",".join(alarms_poids),
         "operatorName": "administrator",
         "value": "true"
     }
-    response = user.post(url, data=json.dumps(user_data), headers=HEADERS)
-    log.logger.debug("Response status code : {0} and response text : {1}".format(response.status_code, response.text))
-    raise_for_status(response, message_prefix="Failed to acknowledge alarms: ")
+    failures = execute_node_action_in_batches(user, alarms_poids, user_data, "Failed to acknowledge alarms: ",
+                                              item_key="alarmIdList", separator=",", batch_size=batch_size,
+                                              retries=ALARM_ACK_RETRIES, retry_interval=ALARM_ACK_RETRY_INTERVAL_SECS)
+    raise_for_failed_items(failures, "acknowledge alarms")
 
 
 def network_explorer_search_for_nodes(user):
@@ -216,6 +361,8 @@ def alarm_overview(user, sleep=60, heart_beat_refresh_time=10):
         time.sleep(heart_beat_refresh_time)
 
 
+@retry(retry_on_exception=lambda e: isinstance(e, (HTTPError, ConnectionError)),
+       wait_fixed=ALARM_ACK_RETRY_INTERVAL_SECS * 1000, stop_max_attempt_number=ALARM_ACK_RETRIES + 1)
 def _fetch_alarms(user, nodes):
     """
     Returns 1000 alarm records on the given nodes
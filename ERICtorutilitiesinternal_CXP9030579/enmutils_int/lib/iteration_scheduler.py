@@ -0,0 +1,129 @@
+# ********************************************************************
+# Name    : Iteration Scheduler
+# Summary : Shared calendar of the next iteration of the periodic
+#           profiles. Profiles reserve their next iteration time in
+#           the calendar before sleeping, and profiles due in the
+#           same second as other profiles, e.g. started by the same
+#           workload start, are staggered by a bounded offset so that
+#           they do not all hit ENM at once. Profiles with jitter
+#           disabled do not reserve their iterations. The calendar of
+#           upcoming iterations is exposed by the profilemanager
+#           service.
+# ********************************************************************
+
+import json
+import time
+
+from enmutils.lib import config, log, mutexer, persistence
+
+CALENDAR_KEY = "profile-iteration-calendar-entries"
+CALENDAR_MUTEX = "profile-iteration-calendar"
+STAGGER_PROPERTY = "profile_iteration_stagger_secs"
+MAX_JITTER_PROPERTY = "profile_iteration_max_jitter_secs"
+DEFAULT_STAGGER_SECS = 2
+DEFAULT_MAX_JITTER_SECS = 30
+RETENTION_SECS = 60 * 60
+
+
+def _get_int_prop(key, default):
+    """
+    Get the value of the integer property, or the default if the property is not set
+
+    :param key: Name of the property
+    :type key: str
+    :param default: Value returned if the property is not set
+    :type default: int
+
+    :return: Value of the property
+    :rtype: int
+    """
+    return int(config.get_prop(key)) if config.has_prop(key) and config.get_prop(key) != "" else default
+
+
+def _get_calendar_entries():
+    """
+    Read the reserved iterations of all the profiles from the calendar
+
+    :return: Dictionary of profile name to the planned and wake times of its next iteration
+    :rtype: dict
+    """
+    return {name: json.loads(entry) for name, entry in persistence.default_db().get_hash(CALENDAR_KEY).iteritems()}
+
+
+def get_offset(planned_time, calendar, stagger_secs, max_jitter_secs):
+    """
+    Get the offset to apply to an iteration planned at the given time, i.e. the first multiple of the stagger, within
+    the maximum jitter, not already taken by another profile due in the same second
+
+    :param planned_time: Time, in seconds since the epoch, the iteration is planned for
+    :type planned_time: float
+    :param calendar: Dictionary of profile name to the planned and wake times of its next iteration
+    :type calendar: dict
+    :param stagger_secs: Number of seconds between profiles due in the same second
+    :type stagger_secs: int
+    :param max_jitter_secs: Maximum number of seconds an iteration is delayed
+    :type max_jitter_secs: int
+
+    :return: Number of seconds the iteration is to be delayed
+    :rtype: int
+    """
+    if stagger_secs <= 0 or max_jitter_secs <= 0:
+        return 0
+    taken = [int(round(entry["wake"] - entry["planned"])) for entry in calendar.values()
+             if int(entry["planned"]) == int(planned_time)]
+    offsets = range(0, max_jitter_secs + 1, stagger_secs)
+    return next((offset for offset in offsets if offset not in taken), offsets[len(taken) % len(offsets)])
+
+
+def reserve(profile_name, planned_time, max_jitter_secs=None):
+    """
+    Reserve the next iteration of the profile in the calendar, staggering it if other profiles are due in the same
+    second. Nothing is reserved if jitter or stagger is disabled.
+
+    :param profile_name: Name of the profile
+    :type profile_name: str
+    :param planned_time: Time, in seconds since the epoch, the next iteration is planned for
+    :type planned_time: float
+    :param max_jitter_secs: Maximum number of seconds the iteration may be delayed, None for the configured maximum
+    :type max_jitter_secs: int
+
+    :return: Number of seconds the iteration is delayed by
+    :rtype: int
+    """
+    stagger_secs = _get_int_prop(STAGGER_PROPERTY, DEFAULT_STAGGER_SECS)
+    if max_jitter_secs is None:
+        max_jitter_secs = _get_int_prop(MAX_JITTER_PROPERTY, DEFAULT_MAX_JITTER_SECS)
+    if stagger_secs <= 0 or max_jitter_secs <= 0:
+        return 0
+    with mutexer.mutex(CALENDAR_MUTEX, persisted=True):
+        calendar = _get_calendar_entries()
+        expired = [name for name, entry in calendar.iteritems() if entry["wake"] <= planned_time - RETENTION_SECS]
+        offset = get_offset(planned_time, {name: entry for name, entry in calendar.iteritems()
+                                           if name != profile_name and name not in expired},
+                            stagger_secs, max_jitter_secs)
+        values = dict.fromkeys(expired)
+        values[profile_name] = json.dumps({"planned": planned_time, "wake": planned_time + offset})
+        persistence.default_db().update_hashes(values={CALENDAR_KEY: values})
+    if offset:
+        log.logger.debug("Next iteration of {0} staggered by {1}s, as other profiles are due at the same time"
+                         .format(profile_name, offset))
+    return offset
+
+
+def get_calendar(until=None):
+    """
+    Get the upcoming iterations of the active profiles, in the order they are due
+
+    :param until: Time, in seconds since the epoch, up to which the iterations are returned, None for all
+    :type until: float
+
+    :return: List of dictionaries of profile name, planned time and wake time
+    :rtype: list
+    """
+    now = time.time()
+    calendar = _get_calendar_entries()
+    active_profiles = persistence.get("active_workload_profiles")
+    return sorted([dict(entry, profile=name) for name, entry in calendar.iteritems()
+                   if entry["wake"] >= now and (until is None or entry["wake"] <= until) and
+                   (active_profiles is None or name in active_profiles)],
+                  key=lambda entry: (entry["wake"], entry["profile"]))
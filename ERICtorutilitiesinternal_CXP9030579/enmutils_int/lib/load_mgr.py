@@ -17,7 +17,7 @@ from packaging import version
 
 from enmutils.lib import log, persistence, mutexer, process
 from enmutils.lib.exceptions import EnvironError
-from enmutils_int.lib import node_pool_mgr, profile
+from enmutils_int.lib import node_pool_mgr, profile, profile_host
 from enmutils_int.lib.common_utils import (get_installed_version, filter_artifact_dict_for_profile_keys,
                                            return_dict_from_json_artifact)
 from enmutils_int.lib.nexus import check_nexus_version, download_mavendata_from_nexus
@@ -247,12 +247,14 @@ def get_existing_diff_objects(profile_names):
 def kill_profile_daemon_process(profile_name):
     """
     Kills a profile if a process is running. Use if profile not in persistence.
-    Will also kill forked (child) processes which will have the same name and arguments but different pid to parent
+    Will also kill forked (child) processes which will have the same name and arguments but different pid to parent.
+    A hosted profile is stopped by its profile host instead, the host process being shared with other profiles.
 
     :param profile_name: Profile name
     :type profile_name: str
     """
-
+    if profile_host.stop_hosted_profile(profile_name):
+        return
     for pid in process.get_profile_daemon_pid(profile_name):
         process.kill_process_id(int(pid))
 
@@ -18,10 +18,12 @@ from enmutils.lib.enm_node import (BaseNode, ERBSNode, ExtremeNode, SGSNNode, Ra
                                    MSCBCNode, MSCISNode, ESCNode, ERSSupportNode, Router6274Node, SbgIsNode)
 from enmutils.lib.exceptions import RemoveProfileFromNodeError, AddProfileToNodeError
 from enmutils.lib.persistence import persistable
+from enmutils_int.lib import node_pool_stats
 from enmutils_int.lib.nrm_default_configurations.basic_network import EXCLUSIVE_PROFILES
 
 
 NETEX_ENDPOINT = '/managedObjects/query?searchQuery=select%20NetworkElement'
+PERSIST_MUTEX = "persist-{0}"
 
 
 class LoadNodeMixin(object):
@@ -107,7 +109,7 @@ class LoadNodeMixin(object):
 
             return node
 
-        with mutexer.mutex("persist-{}".format(self.node_id), log_output=False):
+        with mutexer.mutex(PERSIST_MUTEX.format(self.node_id), persisted=True, log_output=False):
             uptodate_node = persistence.get_from_default_db(self.node_id)
             if not uptodate_node:
                 return _add_profile(self, in_persistence=False)
@@ -169,7 +171,7 @@ class LoadNodeMixin(object):
                     self.profiles = node.profiles
                 node._persist()
 
-        with mutexer.mutex("persist-{}".format(self.node_id), persisted=True, log_output=False):
+        with mutexer.mutex(PERSIST_MUTEX.format(self.node_id), persisted=True, log_output=False):
             # If the node is not stored yet in persistence the latest information on the node object is currently in use
             uptodate_node = persistence.get_from_default_db(self.node_id)
             if not uptodate_node:
@@ -178,14 +180,26 @@ class LoadNodeMixin(object):
                 _remove_profile(uptodate_node)
 
     def _persist_with_mutex(self):
-        with mutexer.mutex("persist-{}".format(self.node_id)):
+        with mutexer.mutex(PERSIST_MUTEX.format(self.node_id), persisted=True):
             self._persist()
 
-    def _persist(self):
+    def _persist(self, batch=None, record_stats=True):
         """
-        Add the node to the respective available persistence service
+        Add the node to the respective available persistence service, updating the node pool counters.
+
+        Updating the counters adds a WATCH/HMGET/MULTI transaction to the SET of the node, of which the duration is
+        recorded in the persistence latency stats under "update_hashes_from_values". Callers persisting many nodes
+        should not record the stats here, and update the counters of the nodes at once with record_nodes.
+
+        :param batch: Batch of persistence commands to queue the update in, None to persist the node immediately
+        :type batch: `persistence.Batch`
+        :param record_stats: Flag controlling whether the node pool counters are updated, False if the caller updates
+                            the counters of many nodes at once
+        :type record_stats: bool
         """
-        persistence.default_db().set(self.node_id, self, -1, log_values=False)
+        if record_stats:
+            node_pool_stats.record_node(self)
+        (batch or persistence.default_db()).set(self.node_id, self, -1, log_values=False)
 
     def reset(self):
         """
@@ -0,0 +1,219 @@
+# ********************************************************************
+# Name    : MO Topology Index
+# Summary : Shared index of the MOs of a given type on each node,
+#           stored in persistence as a hash per MO type, keyed by node
+#           name, so that only the requested nodes are read, written
+#           or removed. Nodes missing from the
+#           index, or indexed longer ago than the maximum age, are
+#           refreshed incrementally using bulk cmedit queries covering
+#           many nodes at a time. Used by the cell management
+#           functionality to look up the cell FDNs of nodes, instead
+#           of querying ENM node by node.
+# ********************************************************************
+
+import json
+import time
+
+from enmutils.lib import log, persistence, mutexer
+from enmutils_int.lib.script_engine_output import parse_fdns
+
+INDEX_KEY = "mo-topology-index-nodes-{0}"
+INDEX_MUTEX = "mo-topology-index-{0}"
+GET_MOS_CMD = "cmedit get {node_names} {mo_type}"
+NODES_PER_QUERY = 100
+DEFAULT_MAX_AGE_SECS = 15 * 60
+PERSISTENCE_EXPIRY_SECS = 6 * 60 * 60
+REFRESH_TIMEOUT_SECS = 5 * 60
+NODE_MO_TYPES = ["MeContext", "ManagedElement", "NetworkElement"]
+
+
+def get_node_name_from_fdn(fdn, node_names=None):
+    """
+    Get the name of the node on which the MO exists, from the MO FDN
+
+    :param fdn: FDN of the MO
+    :type fdn: str
+    :param node_names: Node names to choose from, if the FDN contains more than one candidate name
+    :type node_names: set
+
+    :return: Name of the node or None if no node name found
+    :rtype: str or None
+    """
+    for part in fdn.split(","):
+        mo_type, _, mo_id = part.partition("=")
+        if mo_type.strip() in NODE_MO_TYPES and (not node_names or mo_id.strip() in node_names):
+            return mo_id.strip()
+
+
+def _query_mo_fdns(user, node_names, mo_type):
+    """
+    Query ENM for the FDNs of the MOs of the given type on the nodes, using a single cmedit command
+
+    :param user: User who will execute the cmedit command
+    :type user: `enm_user_2.User`
+    :param node_names: List of node names
+    :type node_names: list
+    :param mo_type: MO type to query
+    :type mo_type: str
+
+    :return: Dictionary of node name to list of MO FDNs, for the nodes successfully queried
+    :rtype: dict
+    """
+    output = user.enm_execute(GET_MOS_CMD.format(node_names=";".join(node_names), mo_type=mo_type)).get_output()
+    fdns = parse_fdns(output)
+    if not fdns and any(line.strip().startswith("Error") for line in output):
+        log.logger.debug("Failed to query {0} MOs of {1} node(s), response: {2}"
+                         .format(mo_type, len(node_names), output))
+        return {}
+    mo_fdns = {node_name: [] for node_name in node_names}
+    queried_node_names = set(node_names)
+    for fdn in fdns:
+        node_name = node_names[0] if len(node_names) == 1 else get_node_name_from_fdn(fdn, queried_node_names)
+        if node_name in mo_fdns:
+            mo_fdns[node_name].append(fdn)
+    return mo_fdns
+
+
+def _get_index_entries(node_names, mo_type):
+    """
+    Read the index entries of the nodes, in a single command
+
+    :param node_names: List of node names
+    :type node_names: list
+    :param mo_type: MO type
+    :type mo_type: str
+
+    :return: Dictionary of node name to tuple of indexed time and MO FDNs, for the indexed nodes
+    :rtype: dict
+    """
+    values = persistence.default_db().get_hash_values(INDEX_KEY.format(mo_type), node_names)
+    entries = {}
+    for node_name, value in zip(node_names, values):
+        if value:
+            indexed_time, fdns = json.loads(value)
+            entries[node_name] = (indexed_time, fdns)
+    return entries
+
+
+def _get_stale_node_names(index, node_names, max_age):
+    """
+    Get the names of the nodes which are not indexed, or were indexed longer ago than the maximum age
+
+    :param index: Dictionary of node name to tuple of indexed time and MO FDNs
+    :type index: dict
+    :param node_names: List of node names
+    :type node_names: list
+    :param max_age: Maximum age in seconds of the indexed MOs
+    :type max_age: int
+
+    :return: List of node names
+    :rtype: list
+    """
+    oldest_time = time.time() - max_age
+    return [node_name for node_name in node_names
+            if node_name not in index or index[node_name][0] < oldest_time]
+
+
+def refresh(user, node_names, mo_type):
+    """
+    Query ENM for the MOs of the given type on the nodes, in bulk, and update the index entries of the nodes
+
+    :param user: User who will execute the cmedit commands
+    :type user: `enm_user_2.User`
+    :param node_names: List of node names
+    :type node_names: list
+    :param mo_type: MO type to query
+    :type mo_type: str
+
+    :return: Dictionary of node name to tuple of indexed time and MO FDNs, for the nodes successfully queried
+    :rtype: dict
+    """
+    mo_fdns = {}
+    for index in xrange(0, len(node_names), NODES_PER_QUERY):
+        mo_fdns.update(_query_mo_fdns(user, node_names[index:index + NODES_PER_QUERY], mo_type))
+    indexed_time = time.time()
+    entries = {node_name: (indexed_time, fdns) for node_name, fdns in mo_fdns.iteritems()}
+    if entries:
+        db = persistence.default_db()
+        values = {node_name: json.dumps(entry) for node_name, entry in entries.iteritems()}
+        db.update_hashes(values={INDEX_KEY.format(mo_type): values})
+        db.update_ttl(INDEX_KEY.format(mo_type), PERSISTENCE_EXPIRY_SECS)
+    log.logger.debug("Indexed {0} MO(s) of {1}/{2} node(s)".format(mo_type, len(mo_fdns), len(node_names)))
+    return entries
+
+
+def get_mo_fdns(user, node_names, mo_type, max_age=DEFAULT_MAX_AGE_SECS):
+    """
+    Get the FDNs of the MOs of the given type on the nodes, refreshing the index for any nodes out of date
+
+    :param user: User who will execute the cmedit commands if a refresh is required
+    :type user: `enm_user_2.User`
+    :param node_names: List of node names
+    :type node_names: list
+    :param mo_type: MO type to query
+    :type mo_type: str
+    :param max_age: Maximum age in seconds of the indexed MOs
+    :type max_age: int
+
+    :return: Dictionary of node name to list of MO FDNs, for the nodes successfully indexed
+    :rtype: dict
+    """
+    index = _get_index_entries(node_names, mo_type)
+    stale_node_names = _get_stale_node_names(index, node_names, max_age)
+    if stale_node_names:
+        with mutexer.mutex(INDEX_MUTEX.format(mo_type), persisted=True, timeout=REFRESH_TIMEOUT_SECS):
+            index.update(_get_index_entries(stale_node_names, mo_type))
+            stale_node_names = _get_stale_node_names(index, stale_node_names, max_age)
+            if stale_node_names:
+                index.update(refresh(user, stale_node_names, mo_type))
+    return {node_name: list(index[node_name][1]) for node_name in node_names if node_name in index}
+
+
+def get_mo_counts(user, node_names, mo_type, max_age=DEFAULT_MAX_AGE_SECS):
+    """
+    Get the number of MOs of the given type on the nodes, refreshing the index for any nodes out of date
+
+    :param user: User who will execute the cmedit commands if a refresh is required
+    :type user: `enm_user_2.User`
+    :param node_names: List of node names
+    :type node_names: list
+    :param mo_type: MO type to query
+    :type mo_type: str
+    :param max_age: Maximum age in seconds of the indexed MOs
+    :type max_age: int
+
+    :return: Dictionary of node name to number of MOs, for the nodes successfully indexed
+    :rtype: dict
+    """
+    return {node_name: len(fdns) for node_name, fdns in get_mo_fdns(user, node_names, mo_type, max_age).iteritems()}
+
+
+def invalidate(mo_type, node_names):
+    """
+    Remove the nodes from the index of the given MO type, so that they are queried again when next requested
+
+    :param mo_type: MO type
+    :type mo_type: str
+    :param node_names: List of node names
+    :type node_names: list
+    """
+    # Taken so that a refresh already querying the nodes cannot index them again with the MOs as they were before
+    with mutexer.mutex(INDEX_MUTEX.format(mo_type), persisted=True, timeout=REFRESH_TIMEOUT_SECS):
+        persistence.default_db().update_hashes(values={INDEX_KEY.format(mo_type): dict.fromkeys(node_names)})
+
+
+def invalidate_fdns(fdns):
+    """
+    Remove the nodes of the MOs from the index of the MO type, after the MOs have been created or deleted
+
+    :param fdns: List of FDNs of the MOs
+    :type fdns: list
+    """
+    node_names_per_mo_type = {}
+    for fdn in fdns:
+        mo_type = fdn.split(",")[-1].split("=")[0].strip()
+        node_name = get_node_name_from_fdn(fdn)
+        if node_name:
+            node_names_per_mo_type.setdefault(mo_type, set()).add(node_name)
+    for mo_type, node_names in node_names_per_mo_type.iteritems():
+        invalidate(mo_type, list(node_names))
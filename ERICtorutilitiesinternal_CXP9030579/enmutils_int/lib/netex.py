@@ -7,6 +7,8 @@
 #           also provides options to perform Network Explorer search
 #           queries or create, delete, query saved searches, also
 #           allows searching for Network Objects and POID(s).
+#           Collections can be created and updated from FDNs streamed
+#           into the multipart upload body, in chunks.
 # ********************************************************************
 
 import json
@@ -14,14 +16,17 @@ import random
 import re
 import time
 import os
+import uuid
+from itertools import islice
 
 from requests.exceptions import HTTPError
 from enmutils.lib import filesystem, log
 from enmutils.lib.exceptions import EnmApplicationError, EnvironError, EnvironWarning
 from enmutils.lib.headers import (JSON_SECURITY_REQUEST, SECURITY_REQUEST_HEADERS, NETEX_HEADER,
                                   NETEX_COLLECTION_HEADER, NETEX_IMPORT_HEADER)
+from enmutils_int.lib.po_attribute_fetcher import get_po_attribute_fetcher
+from enmutils_int.lib.script_engine_output import iter_fdns
 
-GET_POS_BY_POID_URL = "/managedObjects/getPosByPoIds"
 IMPORT_EXPORT_SERVICE = "/network-explorer-import/v1/collection/"
 EXPORT_COLLECTION_URL = IMPORT_EXPORT_SERVICE + "export"
 EXPORT_CUSTOM_TOPOLOGY_URL = EXPORT_COLLECTION_URL + "/nested/"
@@ -33,6 +38,9 @@ COLLECTION_ENDPOINT = "/object-configuration/collections/v4/"
 SEARCH_COLLECTION_ENDPOINT = "/object-configuration/collections/search/v4/"
 UPDATE_COLLECTION_FILE_V1 = "/network-explorer-import/v1/collections/file"
 CREATE_COLLECTION_FILE_V2 = "/network-explorer-import/v2/collections/file"
+FDN_QUERY_CMDS = ['cmedit get * MeContext', 'cmedit get * ManagedElement', 'cmedit get * NetworkElement']
+COLLECTION_UPLOAD_CHUNK_SIZE = 10000
+MULTIPART_BODY_CHUNK_LINES = 1000
 
 NUM_ATTEMPTS_EXPORT_COLLECTION_STATUS = 120
 SLEEP_TIME_EXPORT_COLLECTION_STATUS = 5
@@ -76,6 +84,60 @@ def get_all_collections(user):
     return response
 
 
+def generate_multipart_body(boundary, fields):
+    """
+    Generate the multipart/form-data body of a request, part by part, so that the body is never held in memory
+
+    :param boundary: Boundary separating the parts of the body
+    :type boundary: str
+    :param fields: List of tuples of field name, file name, content type and content, where the content is either
+                   a string, or an iterable of lines which are sent in blocks, separated by new lines
+    :type fields: list
+
+    :yields: The next block of the body
+    :rtype: str
+    """
+    for name, file_name, content_type, content in fields:
+        disposition = 'form-data; name="{0}"'.format(name)
+        if file_name:
+            disposition += '; filename="{0}"'.format(file_name)
+        yield "--{0}\r\nContent-Disposition: {1}\r\n".format(boundary, disposition)
+        yield "Content-Type: {0}\r\n\r\n".format(content_type) if content_type else "\r\n"
+        if isinstance(content, basestring):
+            yield content.encode("utf-8") if isinstance(content, unicode) else content
+        else:
+            lines = iter(content)
+            block = list(islice(lines, MULTIPART_BODY_CHUNK_LINES))
+            separator = ""
+            while block:
+                yield separator + "\n".join(block).encode("utf-8")
+                separator = "\n"
+                block = list(islice(lines, MULTIPART_BODY_CHUNK_LINES))
+        yield "\r\n"
+    yield "--{0}--\r\n".format(boundary)
+
+
+class MultipartBody(object):
+    """
+    Multipart/form-data request body, generated part by part each time the body is iterated, so that the request
+    can be resent if the session is re-established
+    """
+
+    def __init__(self, fields):
+        """
+        Init method
+
+        :param fields: List of multipart fields, see generate_multipart_body
+        :type fields: list
+        """
+        self.boundary = uuid.uuid4().hex
+        self.fields = fields
+        self.content_type = "multipart/form-data; boundary={0}".format(self.boundary)
+
+    def __iter__(self):
+        return generate_multipart_body(self.boundary, self.fields)
+
+
 class Collection(object):
     """
     Class for various methods on Collections
@@ -102,6 +164,8 @@ class Collection(object):
                                            Default value is 'fdn_list.txt'
                        "labels"          - List of labels to the collection to be created.
                                            Default value is None
+                       "fdns"            - FDNs to be uploaded when the collection is created or updated from FDNs.
+                                           Default value is None, i.e. the FDNs are queried from ENM
                        "num_results"     - Number of elements in the collection to be limited.
                                            Default value is 0
                        "parent_ids"      - List of parent ids to the collection to be created.
@@ -127,6 +191,8 @@ class Collection(object):
         self.type = kwargs.get("type", "LEAF")
         self.version = kwargs.get("version", "v4")
         self.poids = kwargs.get("poids", None)
+        self.fdns = kwargs.get("fdns", None)
+        self.stage_times = {}
 
     def _teardown(self):
         """
@@ -192,28 +258,54 @@ class Collection(object):
             raise EnmApplicationError(e)
         log.logger.debug("Successfully created collection named {0} with id {1}".format(self.name, self.id))
 
-    def create_list_of_fdns(self, num_fdns_required=25000):
+    def _record_stage_time(self, stage, start_time):
         """
-        Creates a Collection and saves it to a file at location "/network-explorer-import/v1/c/collections/file"
-        :raises: HTTPError
+        Record the time taken by a stage of the collection workflow
+
+        :param stage: Name of the stage, e.g. query, create, update
+        :type stage: str
+        :param start_time: Time at which the stage started
+        :type start_time: float
+        """
+        self.stage_times[stage] = self.stage_times.get(stage, 0) + time.time() - start_time
+        log.logger.debug("Collection {0} {1} stage time: {2:.2f}s".format(self.name, stage, self.stage_times[stage]))
+
+    def iter_fdns(self, num_fdns_required=25000):
+        """
+        Query ENM for the FDNs of the network elements, parsing the response only as the FDNs are consumed, and
+        querying the next MO type only if more FDNs are required
+
         :type num_fdns_required : int
         :param num_fdns_required: the number of FDN's required
-        :rtype: list
-        :returns: list of FDN's
+
+        :yields: FDN
+        :rtype: str
         """
-        cmds = ['cmedit get * MeContext', 'cmedit get * ManagedElement', 'cmedit get * NetworkElement']
-        key = 'FDN : '
-        fdn_list = []
-        for cmd in cmds:
+        num_fdns = 0
+        for cmd in FDN_QUERY_CMDS:
+            if num_fdns >= num_fdns_required:
+                break
+            start_time = time.time()
             response = self.user.enm_execute(cmd)
+            self._record_stage_time("query", start_time)
             if any(re.search(r'^0\sinstance\(s\)', line, re.I) for line in response.get_output()):
                 log.logger.debug("Command {0} failed to find any objects.Response was {1}"
                                  .format(cmd, " ".join(response.get_output())))
                 continue
-            for line in response.get_output():
-                if line.startswith(key):
-                    fdn_list.append(line.split(key)[-1])
-        return fdn_list[0:num_fdns_required]
+            for fdn in islice(iter_fdns(response.get_output()), num_fdns_required - num_fdns):
+                num_fdns += 1
+                yield fdn
+
+    def create_list_of_fdns(self, num_fdns_required=25000):
+        """
+        Creates a list of the FDNs of the network elements, to be saved to file or uploaded to a collection
+
+        :type num_fdns_required : int
+        :param num_fdns_required: the number of FDN's required
+        :rtype: list
+        :returns: list of FDN's
+        """
+        return list(self.iter_fdns(num_fdns_required))
 
     def create_file(self):
         """
@@ -278,6 +370,119 @@ class Collection(object):
         log.logger.debug("Successfully updated collection named {0} "
                          "from file with collection id {1}".format(self.name, self.id))
 
+    def _upload_fdns(self, method, url, fields, stage):
+        """
+        Upload the FDNs to the collection, streaming them into the multipart request body
+
+        :param method: HTTP method used to upload, i.e. post or put
+        :type method: str
+        :param url: Collection upload endpoint
+        :type url: str
+        :param fields: List of multipart fields, see generate_multipart_body
+        :type fields: list
+        :param stage: Name of the stage of the collection workflow
+        :type stage: str
+
+        :return: Response object
+        :rtype: `Response`
+        """
+        body = MultipartBody(fields)
+        headers = dict(SECURITY_REQUEST_HEADERS, **{"Content-Type": body.content_type})
+        start_time = time.time()
+        response = getattr(self.user, method)(url, data=body, headers=headers, timeout=300)
+        self._record_stage_time(stage, start_time)
+        if response.status_code != 201:
+            response.raise_for_status()
+        return response
+
+    def _get_fdns_to_upload(self, fdns, chunk_size):
+        """
+        Get the first chunk of FDNs to upload and an iterator over the remaining FDNs
+
+        :param fdns: Iterable of FDNs, None to use the collection FDNs, or those queried from ENM if not set
+        :type fdns: iterable
+        :param chunk_size: Maximum number of FDNs in the first chunk, None for the default upload chunk size
+        :type chunk_size: int
+
+        :raises EnvironError: if there are no FDNs to upload
+
+        :return: Tuple of the list of FDNs in the first chunk, the iterator over the remaining FDNs and the chunk size
+        :rtype: tuple
+        """
+        chunk_size = chunk_size or COLLECTION_UPLOAD_CHUNK_SIZE
+        fdns = iter(fdns if fdns is not None else self.fdns if self.fdns is not None else self.iter_fdns())
+        chunk = list(islice(fdns, chunk_size))
+        if not chunk:
+            raise EnvironError("Fdn list is empty, failed to retrieve FDNs from enm query. "
+                               "Please ensure node objects created on ENM deployment.")
+        return chunk, fdns, chunk_size
+
+    def create_collection_from_fdns(self, fdns=None, chunk_size=None):
+        """
+        Creates a collection on ENM from FDNs streamed into the upload, without writing them to file.
+        FDNs beyond the chunk size are added to the collection by subsequent chunked updates, so that the size of
+        each request is bounded.
+
+        :param fdns: Iterable of FDNs, defaults to the collection FDNs, or those queried from ENM if not set
+        :type fdns: iterable
+        :param chunk_size: Maximum number of FDNs uploaded per request, None for the default upload chunk size
+        :type chunk_size: int
+        """
+        log.logger.debug("Attempting to create collection named {0} from FDNs".format(self.name))
+        chunk, fdns, chunk_size = self._get_fdns_to_upload(fdns, chunk_size)
+        payload = {'name': self.name, 'sharing': self.sharing, 'labels': self.labels,
+                   'isCustomTopology': self.custom_topology, 'type': self.type}
+        fields = [('collection', None, 'application/json', json.dumps(payload)),
+                  ('contents', self.fdn_file_name, 'application/octet-stream', chunk)]
+        response = self._upload_fdns("post", CREATE_COLLECTION_FILE_V2, fields, "create")
+        self.id = response.json().get('collection').get('id')
+        log.logger.debug("Successfully created collection named {0} "
+                         "from FDNs with collection id {1}".format(self.name, self.id))
+        self._update_collection_in_chunks(list(islice(fdns, chunk_size)), fdns, 'false', chunk_size)
+
+    def update_collection_from_fdns(self, fdns=None, replace='false', chunk_size=None):
+        """
+        Updates a collection on ENM from FDNs streamed into the upload, in chunks, without writing them to file.
+        If replacing the collection contents, only the first chunk replaces the contents, the remainder are added.
+
+        :param fdns: Iterable of FDNs, defaults to the collection FDNs, or those queried from ENM if not set
+        :type fdns: iterable
+        :param replace: flag whether to replace objections in collection or not
+        :type replace: str
+        :param chunk_size: Maximum number of FDNs uploaded per request, None for the default upload chunk size
+        :type chunk_size: int
+
+        :raises EnvironError: if there are no FDNs to upload
+        """
+        chunk, fdns, chunk_size = self._get_fdns_to_upload(fdns, chunk_size)
+        self._update_collection_in_chunks(chunk, fdns, replace, chunk_size)
+
+    def _update_collection_in_chunks(self, chunk, fdns, replace, chunk_size):
+        """
+        Upload the chunk of FDNs, and the remaining FDNs in further chunks, to the collection
+
+        :param chunk: List of FDNs of the first chunk, empty if there are no FDNs to upload
+        :type chunk: list
+        :param fdns: Iterator over the remaining FDNs
+        :type fdns: iterator
+        :param replace: flag whether the first chunk replaces the objects in the collection or not
+        :type replace: str
+        :param chunk_size: Maximum number of FDNs uploaded per request
+        :type chunk_size: int
+        """
+        num_chunks = 0
+        while chunk:
+            log.logger.debug("Attempting to update collection named {0} with {1} FDNs".format(self.name, len(chunk)))
+            fields = [('file', self.fdn_file_name, 'application/octet-stream', chunk),
+                      ('collectionId', None, None, str(self.id)), ('replace', None, None, replace)]
+            self._upload_fdns("put", UPDATE_COLLECTION_FILE_V1, fields, "update")
+            num_chunks += 1
+            replace = 'false'
+            chunk = list(islice(fdns, chunk_size))
+        if num_chunks:
+            log.logger.debug("Successfully updated collection named {0} from FDNs in {1} request(s)"
+                             .format(self.name, num_chunks))
+
     def get_collection_by_id(self, collection_id=None, include_contents=False):
         """
         Get a collection based on ID , ie. Retrieve a collection based on id
@@ -539,9 +744,10 @@ def get_all_enm_network_elements(user, fullMo='false'):
     return Search.query_enm_netex('select NetworkElement', user, fullMo=fullMo)
 
 
-def get_pos_by_poids(user, poList=None, attributeMappings=None, payload=None):
+def get_pos_by_poids(user, poList=None, attributeMappings=None):
     """
-    Make POST request to getPosByPoIds netex endpoint
+    Fetch the persistent objects of the POIDs from the getPosByPoIds netex endpoint, using the shared fetcher of the
+    user which batches the request and caches the returned objects
 
     :param user: object to be used to make http requests
     :type user: `enm_user_2.User`
@@ -549,30 +755,12 @@ def get_pos_by_poids(user, poList=None, attributeMappings=None, payload=None):
     :type poList: list
     :param attributeMappings: List of dict(s) of attribute mappings
     :type attributeMappings: list
-    :param payload: Payload to be sent as part of the POST request
-    :type payload: dict
 
-    :return: Result of the query
-    :rtype: `Response` object
+    :return: List of objects returned by ENM
+    :rtype: list
     """
-    payload = payload or {
-        "attributeMappings": attributeMappings or [
-            {
-                "moType": "NetworkElement",
-                "attributeNames": [
-                    "neType"
-                ]
-            }
-        ],
-        "poList": poList
-    }
-
-    response = user.post(GET_POS_BY_POID_URL, data=json.dumps(payload), headers=JSON_SECURITY_REQUEST)
-
-    if not response.ok:
-        response.raise_for_status()
-
-    return response
+    attribute_mappings = attributeMappings or [{"moType": "NetworkElement", "attributeNames": ["neType"]}]
+    return get_po_attribute_fetcher(user).fetch(poList or [], attribute_mappings)
 
 
 class NetexFlow(object):
@@ -662,11 +850,7 @@ class NetexFlow(object):
         small_collection_dict = small_collection_response.json()
         if "contents" in small_collection_dict and small_collection_dict["contents"]:
             random_node_poid = random.choice(small_collection_dict["contents"])["id"]
-            random_node_po_data = get_pos_by_poids(self.user, [random_node_poid])
-            if not random_node_po_data or not random_node_po_data.text and not random_node_po_data.status_code == 200:
-                raise EnmApplicationError("ENM service failed to return a valid response, Response status_code {0} "
-                                          "unable to get pos from poids.".format(random_node_po_data.statuscode))
-            random_node_po_dict = random_node_po_data.json()
+            random_node_po_dict = get_pos_by_poids(self.user, [random_node_poid])
             if random_node_po_dict and "moName" in random_node_po_dict[0]:
                 random_node_name = random_node_po_dict[0]["moName"]
             else:
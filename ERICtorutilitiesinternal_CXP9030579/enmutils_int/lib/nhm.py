@@ -7,6 +7,9 @@
 #           deactivating KPI, selecting counters, selecting reporting
 #           objects, along with some helper functions for the profiles,
 #           selecting nodes used, waiting for setup profile to complete.
+#           KPI metadata and definitions are cached in persistence and
+#           shared between the NHM profiles, revalidated by age, ETag and
+#           the KPI last modified time.
 # ********************************************************************
 
 import json
@@ -17,7 +20,7 @@ from enmscripting.exceptions import TimeoutException
 from requests.exceptions import HTTPError, ConnectionError
 from retrying import retry
 
-from enmutils.lib import log, persistence
+from enmutils.lib import log, persistence, mutexer
 from enmutils.lib.enm_user_2 import raise_for_status
 from enmutils.lib.exceptions import EnmApplicationError, EnvironError
 from enmutils.lib.headers import JSON_SECURITY_REQUEST
@@ -36,7 +39,23 @@ CREATED_BY_DEFAULT = "Ericsson"
 
 # KPI information position
 KPI_NAME = 0
+KPI_ACTIVE = 1
+KPI_NE_TYPES = 4
+KPI_REPORTING_OBJECT_TYPES = 5
 KPI_CREATED_BY = 7
+KPI_LAST_MODIFIED_TIME = 9
+KPI_ATTRIBUTES = ["NAME", "ACTIVE", "UNIT", "THRESHOLD", "NE_TYPES", "REPORTING_OBJECT_TYPES", "NODE_COUNT",
+                  "CREATED_BY", "LAST_MODIFIED_BY", "LAST_MODIFIED_TIME"]
+
+# KPI metadata cache
+KPI_METADATA_KEY = "nhm-kpi-metadata"
+KPI_METADATA_MUTEX = "nhm-kpi-metadata"
+KPI_DEFINITIONS_KEY = "nhm-kpi-definitions"
+KPI_DEFINITIONS_MUTEX = "nhm-kpi-definitions"
+KPI_METADATA_MAX_AGE_SECS = 5 * 60
+KPI_METADATA_MISSING_KPI_MAX_AGE_SECS = 30
+KPI_CACHE_EXPIRY_SECS = 60 * 60
+KPI_CACHE_TIMEOUT_SECS = 2 * 60
 
 KPI_BODY = {
     "kpiModel": {
@@ -219,9 +238,7 @@ def get_kpi(user, name=None):
     :rtype: json dict
     """
 
-    body = {"kpiNames": "NAME",
-            "attributes": ["NAME", "ACTIVE", "UNIT", "THRESHOLD", "NE_TYPES", "REPORTING_OBJECT_TYPES",
-                           "NODE_COUNT", "CREATED_BY", "LAST_MODIFIED_BY", "LAST_MODIFIED_TIME"]}
+    body = {"kpiNames": "NAME", "attributes": KPI_ATTRIBUTES}
 
     if name:
         body["kpiNames"] = name
@@ -232,6 +249,105 @@ def get_kpi(user, name=None):
     return response.json()
 
 
+def _query_kpi_metadata(user, etag=None):
+    """
+    Query NHM for the attributes of all KPIs, using a conditional request if the previous listing had an ETag
+
+    :param user: user to make requests
+    :type user: enmutils.lib.enm_user_2.User
+    :param etag: ETag of the previous listing
+    :type etag: str
+
+    :return: Tuple of the ETag of the listing and the list of KPI attributes, or None if not modified
+    :rtype: tuple
+    """
+    headers = dict(JSON_SECURITY_REQUEST, **{"If-None-Match": etag}) if etag else JSON_SECURITY_REQUEST
+    response = user.post(url=NHM_KPI_ENDPOINT_ATTRIBUTE, data=json.dumps({"attributes": KPI_ATTRIBUTES}),
+                         headers=headers)
+    if etag and response.status_code == 304:
+        return etag, None
+    if response.status_code != 200:
+        response.raise_for_status()
+    return response.headers.get("ETag"), response.json()
+
+
+def _read_kpi_metadata(max_age):
+    """
+    Read the cached KPI metadata, if listed within the maximum age
+
+    :param max_age: Maximum age in seconds of the cached listing
+    :type max_age: int
+
+    :return: Dictionary of listing time, ETag and list of KPI attributes, or None if out of date
+    :rtype: dict or None
+    """
+    metadata = persistence.get(KPI_METADATA_KEY)
+    if metadata and time.time() - metadata["timestamp"] <= max_age:
+        return metadata
+
+
+def get_kpi_metadata(user, max_age=KPI_METADATA_MAX_AGE_SECS):
+    """
+    Get the attributes of all KPIs, i.e. name, active flag, NE types, reporting objects etc., from the metadata
+    shared between the NHM profiles, listing the KPIs if the cached listing is out of date
+
+    :param user: user to make requests if the KPIs need to be listed
+    :type user: enmutils.lib.enm_user_2.User
+    :param max_age: Maximum age in seconds of the cached listing
+    :type max_age: int
+
+    :return: List of the attributes of each KPI, in KPI_ATTRIBUTES order
+    :rtype: list
+    """
+    metadata = _read_kpi_metadata(max_age)
+    if not metadata:
+        with mutexer.mutex(KPI_METADATA_MUTEX, persisted=True, timeout=KPI_CACHE_TIMEOUT_SECS):
+            metadata = _read_kpi_metadata(max_age)
+            if not metadata:
+                previous_metadata = persistence.get(KPI_METADATA_KEY) or {}
+                etag, kpis = _query_kpi_metadata(user, previous_metadata.get("etag"))
+                metadata = {"timestamp": time.time(), "etag": etag,
+                            "kpis": kpis if kpis is not None else previous_metadata["kpis"]}
+                persistence.set(KPI_METADATA_KEY, metadata, KPI_CACHE_EXPIRY_SECS, log_values=False)
+                log.logger.debug("Cached metadata of {0} KPI(s){1}".format(
+                    len(metadata["kpis"]), ", not modified since last listing" if kpis is None else ""))
+    return metadata["kpis"]
+
+
+def get_cached_kpi(user, name):
+    """
+    Get the attributes of the KPI from the shared KPI metadata, listing the KPIs again if the KPI is not found in a
+    listing older than KPI_METADATA_MISSING_KPI_MAX_AGE_SECS, e.g. if the KPI was recently created
+
+    :param user: user to make requests if the KPIs need to be listed
+    :type user: enmutils.lib.enm_user_2.User
+    :param name: name of the KPI
+    :type name: str
+
+    :return: List of the attributes of the KPI, in KPI_ATTRIBUTES order, or None if the KPI does not exist
+    :rtype: list or None
+    """
+    for max_age in (KPI_METADATA_MAX_AGE_SECS, KPI_METADATA_MISSING_KPI_MAX_AGE_SECS):
+        for kpi in get_kpi_metadata(user, max_age=max_age):
+            if kpi[KPI_NAME] == name:
+                return kpi
+
+
+def invalidate_kpi_metadata(name=None):
+    """
+    Remove the cached KPI metadata, and the cached definition of the KPI, after a KPI has been modified
+
+    :param name: name of the modified KPI
+    :type name: str
+    """
+    persistence.remove(KPI_METADATA_KEY)
+    if name:
+        with mutexer.mutex(KPI_DEFINITIONS_MUTEX, persisted=True, timeout=KPI_CACHE_TIMEOUT_SECS):
+            definitions = persistence.get(KPI_DEFINITIONS_KEY) or {}
+            if definitions.pop(name, None):
+                persistence.set(KPI_DEFINITIONS_KEY, definitions, KPI_CACHE_EXPIRY_SECS, log_values=False)
+
+
 def check_is_kpi_usable_and_assign_to_node_type(user, kpi_name, node_kpi_dict, supported_node_types, supported_mos,
                                                 unsupported_kpis=None):
     """
@@ -253,10 +369,13 @@ def check_is_kpi_usable_and_assign_to_node_type(user, kpi_name, node_kpi_dict, s
     """
 
     # Get attributes of given KPI
-    kpi = get_kpi(user, kpi_name)
-    kpi_name = kpi[0][0]
-    kpi_reporting_objects = kpi[0][5]
-    kpi_node_types = kpi[0][4]
+    kpi = get_cached_kpi(user, kpi_name)
+    if not kpi:
+        log.logger.debug("KPI {0} not found in NHM".format(kpi_name))
+        return node_kpi_dict
+    kpi_name = kpi[KPI_NAME]
+    kpi_reporting_objects = kpi[KPI_REPORTING_OBJECT_TYPES]
+    kpi_node_types = kpi[KPI_NE_TYPES]
 
     # Return dict with no values if KPI name is on the unsupported list.
     if [kpi_name] in unsupported_kpis:
@@ -357,22 +476,36 @@ class NhmKpi(object):
                 self.delete()
 
     @classmethod
-    def get_kpi_info(cls, user, name=None):
+    def get_kpi_info(cls, user, name=None, use_cache=True):
         """
-        Gets the kpi information (the kpi body)
+        Gets the kpi information (the kpi body), from the shared cache of KPI definitions if the KPI has not been
+        modified since its definition was cached
 
         :param user: user to make requests
         :type user: enmutils.lib.enm_user.User
         :param name: name of the KPI
         :type name: str
+        :param use_cache: flag to use the cached KPI definition, otherwise the definition is always fetched from NHM
+        :type use_cache: bool
 
         :return: Dictionary with the KPI body
         :rtype: json dict
         """
+        kpi = get_cached_kpi(user, name) if name and use_cache else None
+        if kpi:
+            last_modified_time, definition = (persistence.get(KPI_DEFINITIONS_KEY) or {}).get(name, (None, None))
+            if definition and last_modified_time == kpi[KPI_LAST_MODIFIED_TIME]:
+                return definition
         response = user.get(url=NHM_KPI_ENDPOINT_NEW.format(name=name), headers=JSON_SECURITY_REQUEST)
         if response.status_code != 200:
             response.raise_for_status()
-        return response.json()
+        definition = response.json()
+        if kpi:
+            with mutexer.mutex(KPI_DEFINITIONS_MUTEX, persisted=True, timeout=KPI_CACHE_TIMEOUT_SECS):
+                definitions = persistence.get(KPI_DEFINITIONS_KEY) or {}
+                definitions[name] = (kpi[KPI_LAST_MODIFIED_TIME], definition)
+                persistence.set(KPI_DEFINITIONS_KEY, definitions, KPI_CACHE_EXPIRY_SECS, log_values=False)
+        return definition
 
     @classmethod
     def get_all_kpi_names(cls, user, exclude=None):
@@ -388,15 +521,7 @@ class NhmKpi(object):
         :rtype: json dict
         """
 
-        body = {"attributes": ["NAME"]}
-        response = user.post(url=NHM_KPI_ENDPOINT_ATTRIBUTE, data=json.dumps(body), headers=JSON_SECURITY_REQUEST)
-        if response.status_code != 200:
-            response.raise_for_status()
-        if exclude:
-            for kpi in response.json():
-                if exclude in kpi[0]:
-                    response.json().remove(kpi)
-        return response.json()
+        return [[kpi[KPI_NAME]] for kpi in get_kpi_metadata(user) if not exclude or exclude not in kpi[KPI_NAME]]
 
     @classmethod
     def get_all_kpi_names_active(cls, user, exclude=None):
@@ -412,26 +537,13 @@ class NhmKpi(object):
         :rtype: list
         :raises EnvironError: if no active KPIs are found on the system
         """
-        body = {"attributes": ["NAME", "ACTIVE"]}
-
-        response = user.post(url=NHM_KPI_ENDPOINT_ATTRIBUTE, data=json.dumps(body), headers=JSON_SECURITY_REQUEST)
-        raise_for_status(response, message_prefix='No active KPIs found: ')
-
-        if not response.json():
+        kpis = get_kpi_metadata(user)
+        if not kpis:
             raise EnvironError('No active KPIs found on the system. Please ensure {0} profile has run '
                                'successfully, or manually activate KPIs'.format(SETUP_PROFILE))
 
-        kpi_response = []
-        if exclude:
-            for kpi in response.json():
-                if exclude not in kpi[0] and kpi[1]:
-                    kpi_response.append([kpi[0]])
-        else:
-            for kpi in response.json():
-                if kpi[1]:
-                    kpi_response.append([kpi[0]])
-
-        return kpi_response
+        return [[kpi[KPI_NAME]] for kpi in kpis
+                if (not exclude or exclude not in kpi[KPI_NAME]) and kpi[KPI_ACTIVE]]
 
     @classmethod
     def get_kpis_created_by(cls, user, kpi_name=None):
@@ -507,12 +619,9 @@ class NhmKpi(object):
         """
 
         if name:
-            body = {"kpiNames": name,
-                    "attributes": ["NAME", "ACTIVE", "UNIT", "THRESHOLD", "NE_TYPES", "REPORTING_OBJECT_TYPES",
-                                   "NODE_COUNT", "CREATED_BY", "LAST_MODIFIED_BY", "LAST_MODIFIED_TIME"]}
+            body = {"kpiNames": name, "attributes": KPI_ATTRIBUTES}
         else:
-            body = {"attributes": ["NAME", "ACTIVE", "UNIT", "THRESHOLD", "NE_TYPES", "REPORTING_OBJECT_TYPES",
-                                   "NODE_COUNT", "CREATED_BY", "LAST_MODIFIED_BY", "LAST_MODIFIED_TIME"]}
+            body = {"attributes": KPI_ATTRIBUTES}
         response = user.post(url=NHM_KPI_ENDPOINT_ATTRIBUTE, data=json.dumps(body), headers=JSON_SECURITY_REQUEST)
         if response.status_code != 200:
             response.raise_for_status()
@@ -566,13 +675,8 @@ class NhmKpi(object):
 
         """
 
-        body = {"attributes": ["NAME"]}
-        response = user.post(url=NHM_KPI_ENDPOINT_ATTRIBUTE, data=json.dumps(body), headers=JSON_SECURITY_REQUEST)
-        if response.status_code != 200:
-            response.raise_for_status()
-        all_kpi_names_list = response.json()
-        for kpi_name in all_kpi_names_list:
-            kpi_created_by = NhmKpi.get_kpis_created_by(user, kpi_name=kpi_name)
+        for kpi in get_kpi_metadata(user):
+            kpi_name, kpi_created_by = [kpi[KPI_NAME]], kpi[KPI_CREATED_BY]
             if CREATED_BY_DEFAULT == kpi_created_by:
                 kpi_object = cls(name=kpi_name[0], user=user)
                 try:
@@ -622,6 +726,26 @@ class NhmKpi(object):
                         "Exception raised while trying to delete KPI with name {0}: {1}".format(kpi[KPI_NAME], str(e)))
                 log.logger.debug("KPI name: {0} deactivated and deleted".format(kpi[KPI_NAME]))
 
+    @classmethod
+    def _get_cached_kpi(cls, user, name):
+        """
+        Get the attributes of the KPI from the shared KPI metadata
+
+        :param user: user to make requests
+        :type user: enmutils.lib.enm_user.User
+        :param name: name of the KPI
+        :type name: str
+
+        :raises EnvironError: if the KPI does not exist
+
+        :return: List of the attributes of the KPI, in KPI_ATTRIBUTES order
+        :rtype: list
+        """
+        kpi = get_cached_kpi(user, name)
+        if not kpi:
+            raise EnvironError("KPI {0} not found in NHM".format(name))
+        return kpi
+
     @classmethod
     def check_reporting_object(cls, user, name, profile_reporting_objects):
         """
@@ -638,8 +762,7 @@ class NhmKpi(object):
         :rtype: boolean
         """
 
-        kpi_info_response = cls.get_kpi(user, name)
-        kpi_reporting_objects = kpi_info_response[0][5]
+        kpi_reporting_objects = cls._get_cached_kpi(user, name)[KPI_REPORTING_OBJECT_TYPES]
         if any(reporting_object in kpi_reporting_objects for reporting_object in profile_reporting_objects):
             return True
 
@@ -661,8 +784,7 @@ class NhmKpi(object):
         :rtype: boolean
         """
 
-        kpi_info_response = cls.get_kpi(user, name)
-        kpi_ne_types = kpi_info_response[0][4]
+        kpi_ne_types = cls._get_cached_kpi(user, name)[KPI_NE_TYPES]
 
         if all(ne_type in kpi_ne_types for ne_type in supported_node_types):
             return True
@@ -833,6 +955,7 @@ class NhmKpi(object):
                                       headers=self.headers_dict)
             if response.status_code != 200:
                 response.raise_for_status()
+            invalidate_kpi_metadata(self.name)
             log.logger.debug("KPI '{0}' was successfully created with {1} poids".format(
                 self.name, len(self.node_poids)))
             return response
@@ -916,6 +1039,7 @@ class NhmKpi(object):
         response = self.user.post(url=NHM_KPI_ENDPOINT_EDIT, data=json.dumps(body), headers=self.headers_dict)
         if response.status_code != 200:
             response.raise_for_status()
+        invalidate_kpi_metadata(self.name)
         log.logger.debug("The KPI {0} was successfully updated".format(self.name))
 
     def activate(self):
@@ -944,6 +1068,7 @@ class NhmKpi(object):
             if response.status_code != 200:
                 log.logger.debug('Failed try delete KPI. Retry: {0}'.format(self.name))
                 response.raise_for_status()
+            invalidate_kpi_metadata(self.name)
             log.logger.debug("KPI '{0}' was successfully deleted".format(self.name))
         else:
             log.logger.info("KPI profile created by default, it can't be deleted")
@@ -962,7 +1087,7 @@ class NhmKpi(object):
         if response.status_code != 200:
             log.logger.debug('Failed to activate KPI to {0}. Retry: {1}'.format(status, self.name))
             response.raise_for_status()
-
+        invalidate_kpi_metadata(self.name)
         log.logger.debug("Activation status of KPI {0} was set to {1}".format(self.name, status))
 
     def _create_kpi_equation(self):
@@ -6,15 +6,19 @@
 #           profiles read the cardinality
 #           files generated by nss_mo_info.py module, filters and
 #           selects nodes supplied against those which meet the
-#           cardinality requirements.
+#           cardinality requirements. The content of each file is
+#           cached in-process until the file is regenerated.
 # ********************************************************************
 
 import json
+import os
 
 from enmutils.lib import filesystem, log
 from enmutils.lib.exceptions import EnvironError
 from enmutils_int.lib.network_mo_info import CARDINALITY_FILE, MO_FILE
 
+FILE_CONTENT_CACHE = {}
+
 
 class NodeMoSelection(object):
 
@@ -40,12 +44,19 @@ class NodeMoSelection(object):
         """
         log.logger.debug("Starting read of node(s) file.")
         try:
+            modified_time = os.path.getmtime(file_in) if os.path.exists(file_in) else None
+            if modified_time and FILE_CONTENT_CACHE.get(file_in, (None,))[0] == modified_time:
+                log.logger.debug("Using cached content of unchanged file: {0}.".format(file_in))
+                return FILE_CONTENT_CACHE[file_in][1]
             file_data = filesystem.get_lines_from_file(file_in)
             if not file_data:
                 raise EnvironError("No file data found: {0}, please ensure the {1} information has generated "
                                    "correctly.".format(file_data, file_in))
             log.logger.debug("Completed read of node(s) cardinality file.")
-            return json.loads(file_data[0], object_hook=byteify)
+            file_content = json.loads(file_data[0], object_hook=byteify)
+            if modified_time:
+                FILE_CONTENT_CACHE[file_in] = (modified_time, file_content)
+            return file_content
         except Exception as e:
             raise EnvironError(str(e))
 
@@ -6,17 +6,24 @@
 #           locating, reading the parsed node files, will use the node
 #           id, netsim and simulation information from the arne.xml,
 #           will query ENM directly for the ne type, oss prefix,
-#           release, model identity and ne product version.
+#           release, model identity and ne product version. Large
+#           files are read and validated against ENM in chunks.
 # ********************************************************************
 
 import base64
 import csv
+from itertools import islice
 
 from enmutils.lib import filesystem, log
 from enmutils.lib.exceptions import EnmApplicationError
+from enmutils.lib.thread_queue import ThreadQueue
 from enmutils_int.lib.enm_user import get_workload_admin_user
 
 FDN_KEY = "FDN"
+INGEST_CHUNK_SIZE = 1000
+ENM_QUERY_CHUNK_SIZE = 160
+ENM_QUERY_MAX_WORKERS = 4
+ENM_QUERY_TIMEOUT_SECS = 10 * 60
 
 
 def update_row_with_enm_values(node_ids):
@@ -89,6 +96,44 @@ def parse_command_result_for_ne_values(ne_values, node_values):
     return node_values
 
 
+def _get_enm_values_of_chunk(node_ids):
+    """
+    Query ENM for the values of the chunk of nodes
+
+    :param node_ids: List of node ids created on ENM
+    :type node_ids: list
+
+    :returns: Dictionary containing the ENM values for node(s), empty if ENM could not be queried
+    :rtype: dict
+    """
+    return update_row_with_enm_values(node_ids) or {}
+
+
+def get_enm_values(node_ids, max_workers=ENM_QUERY_MAX_WORKERS):
+    """
+    Query ENM for the values of the nodes, in chunks of nodes which are queried concurrently
+
+    :param node_ids: List of node ids created on ENM
+    :type node_ids: list
+    :param max_workers: Maximum number of chunks queried concurrently
+    :type max_workers: int
+
+    :returns: Dictionary containing the ENM values for node(s)
+    :rtype: dict
+    """
+    node_chunks = [node_ids[i: i + ENM_QUERY_CHUNK_SIZE] for i in range(0, len(node_ids), ENM_QUERY_CHUNK_SIZE)]
+    if len(node_chunks) <= 1:
+        return _get_enm_values_of_chunk(node_chunks[0]) if node_chunks else {}
+    tq = ThreadQueue(node_chunks, num_workers=min(max_workers, len(node_chunks)),
+                     func_ref=_get_enm_values_of_chunk, task_join_timeout=ENM_QUERY_TIMEOUT_SECS,
+                     task_wait_timeout=ENM_QUERY_TIMEOUT_SECS)
+    tq.execute()
+    enm_node_values = {}
+    for work_entry in tq.work_entries:
+        enm_node_values.update(work_entry.result or {})
+    return enm_node_values
+
+
 def get_node_data(input_file, start_range=None, end_range=None):
     """
     Get node data based on the value returned from CSV and ENM
@@ -103,13 +148,11 @@ def get_node_data(input_file, start_range=None, end_range=None):
     :return: Tuple containing a list of node dictionaries, node ids which are not created on ENM
     :rtype: tuple
     """
-    enm_node_values = {}
     data = get_node_data_from_xml(input_file)
     start_range, end_range = set_nodes_ranges(len(data), start_range, end_range)
     row_ids = [row['node_id'] for row in data[start_range:end_range]]
     node_ids = verify_nodes_on_enm(row_ids)
-    for node_chunk in (node_ids[i: i + 160] for i in range(0, len(node_ids), 160)):
-        enm_node_values.update(update_row_with_enm_values(node_chunk))
+    enm_node_values = get_enm_values(node_ids)
     not_created = list(set(row_ids).difference(node_ids))
     found_nodes = []
     for row in data:
@@ -118,6 +161,35 @@ def get_node_data(input_file, start_range=None, end_range=None):
     return found_nodes, not_created
 
 
+def get_node_data_in_chunks(input_file, start_range=None, end_range=None, chunk_size=INGEST_CHUNK_SIZE, skip=0):
+    """
+    Get node data based on the value returned from CSV and ENM, reading and validating the nodes against ENM one
+    chunk of rows at a time, so that the whole file is never held in memory
+
+    :param input_file: File path to the .csv file to be parsed
+    :type input_file: str
+    :param start_range: The start index of the nodes to be added
+    :type start_range: int
+    :param end_range: The end index of the nodes to be added
+    :type end_range: int
+    :param chunk_size: Number of rows in each chunk
+    :type chunk_size: int
+    :param skip: Number of rows within the range already processed, i.e. when resuming an interrupted operation
+    :type skip: int
+
+    :yields: Tuple containing a list of node dictionaries, node ids which are not created on ENM and the number of
+             rows read, for each chunk
+    :ytype: tuple
+    """
+    nes_on_enm = get_nodes_on_enm()
+    for rows in get_node_data_from_xml_in_chunks(input_file, start_range, end_range, chunk_size, skip):
+        row_ids = [row['node_id'] for row in rows]
+        enm_node_values = get_enm_values([node_id for node_id in row_ids if node_id in nes_on_enm])
+        found_nodes = [update_row_values(row, enm_node_values.get(row['node_id'])) for row in rows
+                       if row['node_id'] in enm_node_values]
+        yield found_nodes, [node_id for node_id in row_ids if node_id not in nes_on_enm], len(rows)
+
+
 def update_row_values(row, node_values):
     """
     Update the .csv values with those found on ENM
@@ -161,31 +233,37 @@ def set_nodes_ranges(row_count, start_range=None, end_range=None):
     return start_range, end_range
 
 
-def verify_nodes_on_enm(node_ids):
+def get_nodes_on_enm():
     """
-    Verify the list of supplied node ids exist on ENM
-
-    :param node_ids: List of node ids to confirm if they are created on ENM
-    :type node_ids: list
+    Get the ids of the nodes created on ENM
 
     :raises EnmApplicationError: raised if the command fails to execute correctly
 
-    :returns: List of nodes created in ENM
-    :rtype: list
+    :returns: Set of node ids created in ENM
+    :rtype: set
     """
     cmd = "cmedit get * NetworkElement"
-    nes_on_enm = []
     try:
         user = get_workload_admin_user()
         response = user.enm_execute(cmd).get_output()
-        for line in response:
-            if FDN_KEY in line:
-                nes_on_enm.append(line.split("=")[-1].strip().encode('utf-8'))
-        return list(set(nes_on_enm).intersection(node_ids))
+        return {line.split("=")[-1].strip().encode('utf-8') for line in response if FDN_KEY in line}
     except Exception as e:
         raise EnmApplicationError(str(e))
 
 
+def verify_nodes_on_enm(node_ids):
+    """
+    Verify the list of supplied node ids exist on ENM
+
+    :param node_ids: List of node ids to confirm if they are created on ENM
+    :type node_ids: list
+
+    :returns: List of nodes created in ENM
+    :rtype: list
+    """
+    return list(get_nodes_on_enm().intersection(node_ids))
+
+
 def get_node_data_from_xml(input_file):
     """
     Gets the node data from the csv file
@@ -204,28 +282,71 @@ def get_node_data_from_xml(input_file):
     with open(input_file) as node_file:
         reader = csv.DictReader(node_file, skipinitialspace=True)
         for row in reader:
-            data.append(dict(
-                node_id=row['node_name'],
-                node_ip=row['node_ip'],
-                mim_version=row['mim_version'],
-                model_identity=row['oss_model_identity'],
-                subnetwork=row['subnetwork'],
-                revision=row.get('revision', None),
-                identity=row.get('identity', None),
-                primary_type=row.get('primary_type', None),
-                node_version=row.get('node_version', None),
-                netsim=row.get('netsim_fqdn', None),
-                simulation=row.get('simulation', None),
-                managed_element_type=row.get('managed_element_type', None),
-                network_function=row.get('network_function', None),
-                normal_user=base64.b64decode(row['normal_user']),
-                normal_password=base64.b64decode(row['normal_password']),
-                secure_user=base64.b64decode(row['secure_user']),
-                secure_password=base64.b64decode(row['secure_password']),
-            ))
+            data.append(_get_node_data_from_row(row))
     return data
 
 
+def get_node_data_from_xml_in_chunks(input_file, start_range=None, end_range=None, chunk_size=INGEST_CHUNK_SIZE,
+                                     skip=0):
+    """
+    Gets the node data from the csv file, reading the file one chunk of rows at a time
+
+    :param input_file: File with node data
+    :type input_file: string
+    :param start_range: The start index of the nodes to be read
+    :type start_range: int
+    :param end_range: The end index of the nodes to be read
+    :type end_range: int
+    :param chunk_size: Number of rows in each chunk
+    :type chunk_size: int
+    :param skip: Number of rows within the range to skip
+    :type skip: int
+
+    :yields: List of the node data of each row in the chunk
+    :ytype: list
+    :raises RuntimeError: raises if the file doesn't exist
+    """
+    if not filesystem.does_file_exist(input_file):
+        raise RuntimeError("Could not find specified input file {0}".format(input_file))
+
+    start_range, end_range = set_nodes_ranges(None, start_range, end_range)
+    with open(input_file) as node_file:
+        rows = islice(csv.DictReader(node_file, skipinitialspace=True), start_range + skip, end_range)
+        for chunk in iter(lambda: [_get_node_data_from_row(row) for row in islice(rows, chunk_size)], []):
+            yield chunk
+
+
+def _get_node_data_from_row(row):
+    """
+    Gets the node data from the row of the csv file
+
+    :param row: Row of the csv file
+    :type row: dict
+
+    :returns: Node data
+    :rtype: dict
+    """
+    return dict(
+        node_id=row['node_name'],
+        node_ip=row['node_ip'],
+        mim_version=row['mim_version'],
+        model_identity=row['oss_model_identity'],
+        subnetwork=row['subnetwork'],
+        revision=row.get('revision', None),
+        identity=row.get('identity', None),
+        primary_type=row.get('primary_type', None),
+        node_version=row.get('node_version', None),
+        netsim=row.get('netsim_fqdn', None),
+        simulation=row.get('simulation', None),
+        managed_element_type=row.get('managed_element_type', None),
+        network_function=row.get('network_function', None),
+        normal_user=base64.b64decode(row['normal_user']),
+        normal_password=base64.b64decode(row['normal_password']),
+        secure_user=base64.b64decode(row['secure_user']),
+        secure_password=base64.b64decode(row['secure_password']),
+    )
+
+
 def get_node_names_from_xml(input_file, start_range=None, end_range=None):
     """
     Gets the node data from the csv file
@@ -22,7 +22,8 @@ from enmutils.lib import persistence, log, mutexer, enm_node, enm_node_managemen
 from enmutils.lib.exceptions import (NoNodesAvailable, NotAllNodeTypesAvailable, RemoveProfileFromNodeError,
                                      AddProfileToNodeError, ScriptEngineResponseValidationError,
                                      NoOuputFromScriptEngineResponseError, TimeOutError, EnmApplicationError)
-from enmutils_int.lib import network_mo_info, node_mo_selection, nss_mo_info, node_parse
+from enmutils_int.lib import (network_mo_info, node_mo_selection, nss_mo_info, node_parse, node_pool_stats,
+                              sync_state_cache)
 from enmutils_int.lib.enm_mo import EnmMo, MoAttrs
 from enmutils_int.lib.enm_user import get_workload_admin_user
 from enmutils_int.lib.load_node import NODE_CLASS_MAP
@@ -42,8 +43,10 @@ UPDATED_NODES = {"SGSN-MME": "SGSN", "MINI-LINK-Indoor": "MLTN", "CISCO-ASR900":
                  "FRONTHAUL-6080": "FrontHaul-6080", "Router6672": "Router_6672", "Router6274": "Router_6274"}
 
 cached_nodes_list = []
+cached_nodes_generation = 0
 LTE_DICT = {}
 NODE_POOL_MUTEX = "node-mgr-pool-operation"
+ADD_PROGRESS_KEY = "node-mgr-pool-add-progress"
 DB_KEY = '%s-mos'
 
 
@@ -53,6 +56,15 @@ def initialize_cached_nodes_list():
     """
     global cached_nodes_list
     cached_nodes_list = []
+    increment_cached_nodes_generation()
+
+
+def increment_cached_nodes_generation():
+    """
+    Increments the generation of the cached list of nodes, to be called each time the cached list of nodes is changed
+    """
+    global cached_nodes_generation
+    cached_nodes_generation += 1
 
 
 def persist_after(func):
@@ -102,15 +114,44 @@ def get_node(node_id):
 # It should be considered to move this function to persistence.
 def remove_node(node_id):
     """
-    Removes a node from persistence
+    Removes a node from persistence and from the node pool counters
     :param node_id: Key to search for on the Database
     :type node_id: str
 
 
     """
+    node_pool_stats.record_nodes_removed([node_id])
     persistence.remove(node_id)
 
 
+def get_pool_stats():
+    """
+    Get the counters of the nodes in the workload pool per NE type, counting them from the pool if they have not been
+    built yet, or have been cleared. The counters are otherwise recounted periodically by recount_pool_stats.
+
+    :return: Dictionary of NE type to the total, allocated and exclusive counts and the dictionary of profile to the
+            number of nodes of the type allocated to the profile
+    :rtype: dict
+    """
+    stats = node_pool_stats.get_stats()
+    if stats is None:
+        with mutex():
+            stats = node_pool_stats.get_stats()
+            if stats is None:
+                node_pool_stats.rebuild(get_pool().nodes)
+                stats = node_pool_stats.get_stats()
+    return stats
+
+
+def recount_pool_stats():
+    """
+    Recount the counters of the nodes in the workload pool per NE type from the pool, so that they cannot drift from
+    the pool for long
+    """
+    with mutex():
+        node_pool_stats.rebuild(get_pool().nodes)
+
+
 @contextmanager
 def mutex(timeout=None):
     """
@@ -244,11 +285,12 @@ def remove_profile_from_nodes(nodes, profile_name):
                 persisted_node = persistence.get(node.node_id)
                 persisted_node.profiles.remove(profile_name)
                 persisted_node._is_exclusive = False
-                persisted_node._persist()
+                persisted_node._persist(record_stats=False)
                 deallocated_nodes_count += 1
                 updated_nodes[node.node_id] = persisted_node
             else:
                 log.logger.debug("Node {0} not allocated to profile {1}".format(node.node_id, profile_name))
+    node_pool_stats.record_nodes(updated_nodes.values())
 
     if cached_nodes_list:
         update_cached_list_of_nodes(updated_nodes)
@@ -349,6 +391,7 @@ class Pool(object):
             for node_type in self._nodes.keys():
                 nodes = nodes + self.db.get_keys([node for node in self._nodes[node_type] if self.db.has_key(node)])
             cached_nodes_list = nodes
+            increment_cached_nodes_generation()
         log.logger.debug("Reading nodes property complete")
         return nodes
 
@@ -479,9 +522,60 @@ class Pool(object):
                 valid_nodes.append(node_map["BaseLoadNode"](**node_dict))
         return valid_nodes, nodes_not_created
 
+    @staticmethod
+    def _load_nodes_from_file_in_chunks(file_path, node_map=None, start_range=None, end_range=None, skip=0):
+        """
+        Reads node data from the specified file one chunk at a time, and creates load_node.Node subclass instances for
+        the nodes of each chunk
+
+        :param file_path: absolute path of the node data file to be read
+        :type file_path: str
+        :param node_map: keys are the different types of node names and values are the instances of that node
+        :type node_map: dict
+        :param start_range: Start range of the supplied input file
+        :type start_range: int
+        :param end_range: End range of the supplied input file
+        :type end_range: int
+        :param skip: Number of nodes within the range already processed
+        :type skip: int
+
+        :yields: Tuple of the list of nodes, the uncreated nodes and the number of nodes read, for each chunk
+        :ytype: tuple
+        """
+        node_map = node_map or NODE_CLASS_MAP
+        for node_dicts, nodes_not_created, num_read in node_parse.get_node_data_in_chunks(
+                file_path, start_range=start_range, end_range=end_range, skip=skip):
+            yield ([node_map.get(node_dict["primary_type"], node_map["BaseLoadNode"])(**node_dict)
+                    for node_dict in node_dicts], nodes_not_created, num_read)
+
+    @staticmethod
+    def _get_add_progress(path, start, end):
+        """
+        Get the progress of the add operation, resuming the progress of an interrupted add of the same nodes
+
+        :param path: path to csv file
+        :type path: str
+        :param start: start range
+        :type start: int
+        :param end: end range
+        :type end: int
+
+        :return: Dictionary of the path, range and number of nodes processed
+        :rtype: dict
+        """
+        progress = {"path": path, "start": start, "end": end, "processed": 0}
+        persisted_progress = persistence.get(ADD_PROGRESS_KEY)
+        if persisted_progress and all(persisted_progress.get(key) == progress[key] for key in ["path", "start", "end"]):
+            log.logger.info("Resuming the interrupted add of the nodes in {0}, {1} nodes already processed."
+                            .format(path, persisted_progress["processed"]))
+            progress = persisted_progress
+        return progress
+
     def add(self, path, start=None, end=None, node_map=None, profiles=None, validate=False):
         """
-        Add nodes given the path to csv and start and end ranges
+        Add nodes given the path to csv and start and end ranges. The nodes are read, validated against ENM and
+        persisted one chunk at a time, and the progress is persisted after each chunk, so that an interrupted add of
+        the same nodes is resumed from the last chunk completed
 
         :param path: path to csv file
         :type path: str
@@ -501,14 +595,44 @@ class Pool(object):
 
         """
         self._update_node_dict()
-        node_map = node_map or NODE_CLASS_MAP
-        nodes_to_check, not_created = self._load_nodes_from_file(path, node_map=node_map, start_range=start,
-                                                                 end_range=end)
-        missing_nodes = {"ALREADY_IN_POOL": [], "NOT_ADDED": not_created, "NOT_SYNCED": [], "MISSING_PRIMARY_TYPE": []}
-        added, not_synced = [], []
+        missing_nodes = {"ALREADY_IN_POOL": [], "NOT_ADDED": [], "NOT_SYNCED": [], "MISSING_PRIMARY_TYPE": []}
+        added, not_synced = [], set()
 
         if validate:
-            not_synced = self.validate_nodes_against_enm()
+            not_synced = set(self.validate_nodes_against_enm())
+        progress = self._get_add_progress(path, start, end)
+        for nodes_to_check, not_created, num_read in self._load_nodes_from_file_in_chunks(
+                path, node_map=node_map, start_range=start, end_range=end, skip=progress["processed"]):
+            missing_nodes["NOT_ADDED"].extend(not_created)
+            with persistence.batch() as batch:
+                self._add_nodes(nodes_to_check, profiles, not_synced, added, missing_nodes, batch)
+            self.persist()
+            progress["processed"] += num_read
+            persistence.set(ADD_PROGRESS_KEY, progress, -1)
+            log.logger.info("Processed {0} nodes from {1}, {2} nodes added to the workload pool."
+                            .format(progress["processed"], path, len(added)))
+        persistence.remove(ADD_PROGRESS_KEY)
+        return added, missing_nodes
+
+    def _add_nodes(self, nodes_to_check, profiles, not_synced, added, missing_nodes, batch):
+        """
+        Add the nodes to the pool, queueing the nodes to be persisted in the batch, and update the node pool counters
+        of all the nodes added at once
+
+        :param nodes_to_check: list of nodes to be added
+        :type nodes_to_check: list
+        :param profiles: list of profiles that these nodes should be available to
+        :type profiles: list
+        :param not_synced: ids of the nodes which are not synchronized
+        :type not_synced: set
+        :param added: list of the ids of the nodes added, updated with the nodes added
+        :type added: list
+        :param missing_nodes: dictionary of the reason to the ids of the nodes not added, updated with the nodes not added
+        :type missing_nodes: dict
+        :param batch: Batch of persistence commands the nodes are persisted in
+        :type batch: `persistence.Batch`
+        """
+        added_nodes = []
         for node in nodes_to_check:
             if node.primary_type not in self._nodes.keys() or not self._nodes[node.primary_type]:
                 self._nodes[node.primary_type] = []
@@ -522,17 +646,17 @@ class Pool(object):
                 node.available_to_profiles |= set(profiles)
             if node.node_id in self._nodes[node.primary_type]:
                 missing_nodes["ALREADY_IN_POOL"].append(node.node_id)
-            elif validate and node.node_id in not_synced:
+            elif node.node_id in not_synced:
                 missing_nodes["NOT_SYNCED"].append(node.node_id)
             else:
                 self._nodes[node.primary_type].append(node.node_id)
                 node = update_lte_node(node)
-                node._persist()
-                self.persist()
+                node._persist(batch=batch, record_stats=False)
                 log.logger.debug("Successfully ADDED node: '{0}' to the workload pool and persistence."
                                  .format(node.node_id))
                 added.append(node.node_id)
-        return added, missing_nodes
+                added_nodes.append(node)
+        node_pool_stats.record_nodes(added_nodes)
 
     @staticmethod
     def validate_nodes_against_enm():
@@ -605,7 +729,8 @@ class Pool(object):
             self.db.remove('workload_pool')
             for node_type in self._nodes.keys():
                 for node_name in self._nodes[node_type]:
-                    remove_node(node_name)
+                    persistence.remove(node_name)
+            node_pool_stats.clear()
             all_nodes_removed = True
 
         return all_nodes_removed
@@ -2408,6 +2533,7 @@ def update_cached_list_of_nodes(updated_nodes):
             else:
                 cached_nodes_list.append(updated_nodes[node_id])
                 added += 1
+        increment_cached_nodes_generation()
         log.logger.debug("Cache nodes: {0} (Total) {1} (Updated) {2} (Added)"
                          .format(len(cached_nodes_list), updated, added))
 
@@ -2850,19 +2976,26 @@ def get_synced_nodes(ne_type=None, node_ids=None):
 
 def filter_unsynchronised_nodes(nodes, ne_type=None):
     """
-    Filter out any unsynchronised nodes allocated to the profile
+    Filter out any unsynchronised nodes allocated to the profile, using the cached network sync states
 
     :param nodes: List nodes allocated to the profile
     :type nodes: list
-    :param ne_type: Filter by an ENM supported ne type
+    :param ne_type: Filter by an ENM supported ne type, matched against the primary type of the nodes, including the
+                    backward compatible UPDATED_NODES aliases of the type
     :type ne_type: str
 
     :return: List of filtered synchronised nodes allocated to the profile
     :rtype: list
     """
-    node_ids = ";".join([node.node_id for node in nodes])
-    list_of_synced_node_ids = get_synced_nodes(ne_type=ne_type, node_ids=node_ids)
-    synced = [node for node in nodes if node.node_id in list_of_synced_node_ids]
+    try:
+        synced, _ = sync_state_cache.split_nodes_by_sync_state(nodes)
+    except Exception as e:
+        log.logger.debug("Failed to retrieve sync states of nodes, response: {0}".format(str(e)))
+        synced = []
+    if ne_type:
+        ne_types = ({ne_type, UPDATED_NODES.get(ne_type)} |
+                    set(new_type for new_type, old_type in UPDATED_NODES.iteritems() if old_type == ne_type))
+        synced = [node for node in synced if getattr(node, "primary_type", ne_type) in ne_types]
     log.logger.debug("Found a total of {0} synchronised nodes.".format(len(synced)))
     log.logger.debug("Node(s) selected for operations: {0}".format(', '.join(str(node_id) for node_id in synced)))
     return synced
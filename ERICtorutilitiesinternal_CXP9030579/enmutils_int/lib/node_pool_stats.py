@@ -0,0 +1,189 @@
+# ********************************************************************
+# Name    : Node Pool Stats
+# Summary : Aggregate counters of the nodes in the workload pool, per
+#           NE type: total, allocated, exclusively allocated and the
+#           number allocated to each profile. The counters are
+#           updated as nodes are persisted or removed, in a
+#           transaction with the counted state of each node, so that
+#           the pool summaries do not need to load every node. The
+#           counters are recounted from the pool periodically by the
+#           profilemanager service, and when next read whenever they
+#           could not be updated, so that they cannot drift from the
+#           pool for long.
+# ********************************************************************
+
+import time
+from collections import defaultdict
+
+from enmutils.lib import log, persistence
+
+STATS_KEY = "node-pool-stats"
+NODE_STATES_KEY = "node-pool-stats-nodes"
+INITIALISED = "initialised"
+TOTAL = "total"
+ALLOCATED = "allocated"
+EXCLUSIVE = "exclusive"
+PROFILE = "profile"
+SEPARATOR = "|"
+
+
+def get_node_state(node):
+    """
+    Get the state of the node which is counted in the counters, i.e. the NE type, exclusivity and allocated profiles
+
+    :param node: Node in the workload pool
+    :type node: `load_node.LoadNodeMixin`
+
+    :return: State of the node encoded as a string
+    :rtype: str
+    """
+    return SEPARATOR.join([node.primary_type or "", "1" if node.is_exclusive else "0",
+                           ",".join(sorted(set(node.profiles)))])
+
+
+def _get_counts(state):
+    """
+    Get the counters the node state contributes to
+
+    :param state: State of the node, as returned by get_node_state, or None if the node is not counted
+    :type state: str
+
+    :return: Dictionary of the counter fields to the amount the state contributes to them
+    :rtype: dict
+    """
+    if not state:
+        return {}
+    ne_type, exclusive, profiles = state.split(SEPARATOR, 2)
+    counts = {SEPARATOR.join([TOTAL, ne_type]): 1}
+    if profiles:
+        counts[SEPARATOR.join([ALLOCATED, ne_type])] = 1
+        if exclusive == "1":
+            counts[SEPARATOR.join([EXCLUSIVE, ne_type])] = 1
+        for profile in profiles.split(","):
+            counts[SEPARATOR.join([PROFILE, profile, ne_type])] = 1
+    return counts
+
+
+def _add_deltas(deltas, old_state, new_state):
+    """
+    Add the changes to the counters caused by the node changing from the old to the new state
+
+    :param deltas: Dictionary of the counter fields to the amount to increment them by, updated with the changes
+    :type deltas: dict
+    :param old_state: State of the node currently counted, None if the node is not counted
+    :type old_state: str
+    :param new_state: New state of the node, None if the node is removed
+    :type new_state: str
+    """
+    for field, count in _get_counts(old_state).iteritems():
+        deltas[field] -= count
+    for field, count in _get_counts(new_state).iteritems():
+        deltas[field] += count
+
+
+def _update_node_states(node_states):
+    """
+    Move the counters of the nodes from their counted state to their new state. The counted states are read and the
+    counters updated in a single transaction, retried if any node state is changed meanwhile, so that concurrent
+    updates of a node are counted once. If the transaction does not complete, the counters are cleared, to be recounted
+    when next read.
+
+    :param node_states: Dictionary of node id to the new state of the node, None if the node is removed
+    :type node_states: dict
+    """
+    node_ids = list(node_states)
+
+    def _get_updates(old_states):
+        deltas, new_states = defaultdict(int), {}
+        for node_id, old_state in zip(node_ids, old_states):
+            if node_states[node_id] != old_state:
+                _add_deltas(deltas, old_state, node_states[node_id])
+                new_states[node_id] = node_states[node_id]
+        return {STATS_KEY: deltas}, {NODE_STATES_KEY: new_states}
+
+    if node_ids and not persistence.default_db().update_hashes_from_values(NODE_STATES_KEY, node_ids, _get_updates):
+        log.logger.debug("Unable to update the node pool counters for {0} nodes, the counters will be recounted."
+                         .format(len(node_ids)))
+        clear()
+
+
+def record_nodes(nodes):
+    """
+    Update the counters with the current state of the nodes
+
+    :param nodes: Nodes in the workload pool which are to be persisted
+    :type nodes: list
+    """
+    _update_node_states({node.node_id: get_node_state(node) for node in nodes})
+
+
+def record_node(node):
+    """
+    Update the counters with the current state of the node
+
+    :param node: Node in the workload pool which is to be persisted
+    :type node: `load_node.LoadNodeMixin`
+    """
+    record_nodes([node])
+
+
+def record_nodes_removed(node_ids):
+    """
+    Remove the nodes from the counters
+
+    :param node_ids: Ids of the nodes which are to be removed from the workload pool
+    :type node_ids: list
+    """
+    _update_node_states(dict.fromkeys(node_ids))
+
+
+def rebuild(nodes):
+    """
+    Recount the counters from the nodes, replacing any existing counters, and record the time they were recounted
+
+    :param nodes: All of the nodes in the workload pool
+    :type nodes: list
+    """
+    log.logger.debug("Rebuilding the node pool counters from {0} nodes.".format(len(nodes)))
+    deltas, states = defaultdict(int), {}
+    for node in nodes:
+        states[node.node_id] = get_node_state(node)
+        _add_deltas(deltas, None, states[node.node_id])
+    with persistence.batch() as batch:
+        batch.remove(STATS_KEY)
+        batch.remove(NODE_STATES_KEY)
+        batch.update_hashes(increments={STATS_KEY: deltas},
+                            values={STATS_KEY: {INITIALISED: time.time()}, NODE_STATES_KEY: states})
+
+
+def clear():
+    """
+    Remove the counters, so they are rebuilt when next read
+    """
+    with persistence.batch() as batch:
+        batch.remove(STATS_KEY)
+        batch.remove(NODE_STATES_KEY)
+
+
+def get_stats():
+    """
+    Get the counters of the nodes in the workload pool
+
+    :return: Dictionary of NE type to the total, allocated and exclusive counts and the dictionary of profile to the
+            number of nodes of the type allocated to the profile, or None if the counters have not been built
+    :rtype: dict or None
+    """
+    counters = persistence.default_db().get_hash(STATS_KEY)
+    if INITIALISED not in counters:
+        return None
+    stats = {}
+    for field, value in counters.iteritems():
+        if field == INITIALISED or not int(value):
+            continue
+        parts = field.split(SEPARATOR)
+        ne_type_stats = stats.setdefault(parts[-1], {TOTAL: 0, ALLOCATED: 0, EXCLUSIVE: 0, "profiles": {}})
+        if parts[0] == PROFILE:
+            ne_type_stats["profiles"][parts[1]] = int(value)
+        else:
+            ne_type_stats[parts[0]] = int(value)
+    return stats
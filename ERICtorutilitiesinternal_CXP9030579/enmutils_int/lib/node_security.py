@@ -19,7 +19,6 @@ from retrying import retry
 
 from enmutils.lib import log, filesystem, config
 from enmutils.lib.kubectl_commands import CHECK_SERVICES_CMD_ON_CN
-from enmutils.lib.enm_node import get_enm_network_element_sync_states
 from enmutils.lib.enm_node_management import FmManagement
 from enmutils.lib.exceptions import (EnvironError, ScriptEngineResponseValidationError,
                                      TimeOutError, ValidationError, EnmApplicationError, DependencyException)
@@ -27,6 +26,8 @@ from enmutils.lib.headers import SECURITY_REQUEST_HEADERS
 from enmutils.lib.shell import Command, run_local_cmd, run_cmd_on_ms, run_cmd_on_vm
 from enmutils.lib.cache import is_enm_on_cloud_native, get_enm_cloud_native_namespace, is_emp, get_emp
 from enmutils_int.lib.services.nodemanager_helper_methods import node_pool_mgr, persist_node
+from enmutils_int.lib.script_engine_output import parse_tabular_output
+from enmutils_int.lib.sync_state_cache import split_nodes_by_sync_state
 
 SECURITY_LEVEL_SET_CMD = 'secadm sl set -l {security_level} -xf file:{xml_file}'
 SECURITY_LEVEL_GET_CMD = 'secadm sl get -n "{node_id}"'
@@ -143,60 +144,6 @@ def get_node_security_commands_based_on_node_type(node_type):
     return node_security_commands
 
 
-def parse_tabular_output(script_engine_response, header_line=0, skip=None, separator='\t', borders=False, multiline=False):
-    """
-    Returns a dictionary from a script engine tabular response output
-
-    :param script_engine_response: Response output from script engine
-    :type script_engine_response: list
-    :param header_line: The first line number to start reading from
-    :type header_line: integer
-    :param skip: Text row to be skipped
-    :type skip: string
-    :param separator: String to be used as field separator
-    :type separator: string
-    :param borders: Flag to enable removal of any trailing/leading occurrence of separator
-    :type borders: boolean
-    :param multiline: Flag to manage outputs where the same item is linked to multiple consecutive lines
-    :type multiline: boolean
-
-    :yields: A dictionary built with first row headers as the keys
-    :rtype: dict
-    """
-
-    index = header_line
-    headers = _get_values_from_row(script_engine_response[index], separator=separator, borders=borders)
-    item = "Unknown"
-    for line in script_engine_response[index + 1:]:
-        if line not in ('', skip):
-            values = _get_values_from_row(line, separator=separator, borders=borders)
-            if len(values) == len(headers):
-                if multiline:
-                    if values[0] != "":
-                        item = values[0]
-                    else:
-                        values[0] = item
-                yield dict(zip(headers, values))
-
-
-def _get_values_from_row(row, separator, borders):
-    """
-    Gets the list of values from the response row
-
-    :param row: Script engine row line
-    :type row: string
-    :param separator: String to be used as field separator
-    :type separator: string
-    :param borders: Flag to enable removal of any trailing/leading occurrence of separator
-    :type borders: boolean
-    :returns: List of values
-    :rtype: list
-    """
-
-    border_string = separator if borders else ""
-    return [val.strip() for val in row.strip(border_string).split(separator)]
-
-
 class SecurityConfig(object):
 
     def __init__(self, algorithm='SHA1', mode='SCEP', key_size='RSA_2048', level=1, cert_type='OAM'):
@@ -1449,9 +1396,7 @@ def check_sync_and_remove(nodes, user):
     :return: Tuple of two lists, containing synced and unsynced nodes
     """
     if nodes:
-        enm_network_element_sync_states = get_enm_network_element_sync_states(user)
-        unsynced_nodes = [node for node in nodes if enm_network_element_sync_states.get(node.node_id) != "SYNCHRONIZED"]
-        nodes = [node for node in nodes if node not in unsynced_nodes]
+        nodes, unsynced_nodes = split_nodes_by_sync_state(nodes, user=user)
         log.logger.debug("Returning {0} Synchronised nodes, and {1} unsynchronised nodes.".format(len(nodes),
                                                                                                   len(unsynced_nodes)))
         return nodes, unsynced_nodes
@@ -13,6 +13,7 @@ CENM = "Support for cENM ({})"
 CORBA_CENM = "CORBA Support for cENM ({})"
 KTT = 'Owned by KTT'
 DEPENDENT = "DEPENDENT_PROFILES"
+START_AFTER = "START_AFTER_PROFILES"  # Profiles, other than the setup profile of its application, a profile waits for
 
 # User Keys
 NUM_USERS = 'NUM_USERS'
@@ -150,7 +151,8 @@ basic = {
             'ASR_N_01': {UPDATE: 2, SUPPORTED: True, CLOUD: False, NOTE: CENM.format('RTD-16048'), PRIORITY: 2}
         },
         "asu": {
-            'ASU_01': {UPDATE: 54, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2},
+            'ASU_01': {UPDATE: 54, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2,
+                       START_AFTER: ["SHM_SETUP"]},
         },
         "bur": {
             'BUR_02': {UPDATE: 0, SUPPORTED: False, NOTE: MANUAL, PRIORITY: 'M'}
@@ -326,9 +328,12 @@ basic = {
         },
         "fm": {
             'FM_0506': {UPDATE: 45, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 1},
-            'FM_01': {UPDATE: 85, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 1},
-            'FM_02': {UPDATE: 85, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 1},
-            'FM_03': {UPDATE: 85, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 1},
+            'FM_01': {UPDATE: 85, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 1,
+                      START_AFTER: ["FM_0506"]},
+            'FM_02': {UPDATE: 85, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 1,
+                      START_AFTER: ["FM_0506"]},
+            'FM_03': {UPDATE: 85, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 1,
+                      START_AFTER: ["FM_0506"]},
             'FM_08': {UPDATE: 28, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2},
             'FM_09': {UPDATE: 26, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2},
             'FM_10': {UPDATE: 25, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2},
@@ -343,15 +348,18 @@ basic = {
             'FM_24': {UPDATE: 1, SUPPORTED: False, NOTE: KTT, PRIORITY: 'KTT'},
             'FM_25': {UPDATE: 32, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2},
             'FM_26': {UPDATE: 23, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2},
-            'FM_27': {UPDATE: 9, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2},
+            'FM_27': {UPDATE: 9, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2,
+                      START_AFTER: ["FM_0506"]},
             'FM_28': {UPDATE: 1, SUPPORTED: False, NOTE: KTT, PRIORITY: 'KTT'},
             'FM_29': {UPDATE: 1, SUPPORTED: False, NOTE: KTT, PRIORITY: 'KTT'},
             'FM_31': {UPDATE: 4, SUPPORTED: INTRUSIVE, CLOUD_NATIVE: INTRUSIVE, NOTE: '-', PRIORITY: 2},
-            'FM_32': {UPDATE: 11, SUPPORTED: INTRUSIVE, CLOUD_NATIVE: INTRUSIVE, NOTE: '-', PRIORITY: 2}
+            'FM_32': {UPDATE: 11, SUPPORTED: INTRUSIVE, CLOUD_NATIVE: INTRUSIVE, NOTE: '-', PRIORITY: 2,
+                      START_AFTER: ["FM_0506"]}
         },
         "fmx": {
             'FMX_01': {UPDATE: 35, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 1},
-            'FMX_05': {UPDATE: 40, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2}
+            'FMX_05': {UPDATE: 40, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2,
+                       START_AFTER: ["FMX_01"]}
         },
         "ftpes": {
             'FTPES_01': {UPDATE: 17, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2}
@@ -428,7 +436,8 @@ basic = {
             'NETVIEW_SETUP': {UPDATE: 13, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-',
                               RETAIN_NODES_AFTER_COMPLETED: True, PRIORITY: 2},
             'NETVIEW_01': {UPDATE: 13, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2},
-            'NETVIEW_02': {UPDATE: 18, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2},
+            'NETVIEW_02': {UPDATE: 18, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2,
+                           START_AFTER: ["PLM_01"]},
         },
         "network": {
             'NETWORK_01': {UPDATE: 4, SUPPORTED: True, NOTE: OPTIONAL_UNSUPPORTED.format("Robustness"), PRIORITY: 2, CLOUD_NATIVE: True},
@@ -438,7 +447,8 @@ basic = {
         "nhc": {
             'NHC_01': {UPDATE: 38, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2},
             'NHC_02': {UPDATE: 20, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2},
-            'NHC_04': {UPDATE: 13, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2}
+            'NHC_04': {UPDATE: 13, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2,
+                       START_AFTER: ["SHM_SETUP"]}
         },
         "nhm": {
             'NHM_SETUP': {UPDATE: 21, FOUNDATION: True, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2,
@@ -463,8 +473,10 @@ basic = {
                                    PRIORITY: 2, RETAIN_NODES_AFTER_COMPLETED: True, DEPENDENT: ["NHM_REST_NBI_01", "NHM_REST_NBI_02"]},
             'NHM_REST_NBI_01': {UPDATE: 2, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2},
             'NHM_REST_NBI_02': {UPDATE: 2, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2},
-            'NHM_REST_NBI_03': {UPDATE: 6, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2},
-            'NHM_REST_NBI_04': {UPDATE: 6, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2},
+            'NHM_REST_NBI_03': {UPDATE: 6, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2,
+                                START_AFTER: ["NHM_SETUP"]},
+            'NHM_REST_NBI_04': {UPDATE: 6, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2,
+                                START_AFTER: ["NHM_SETUP"]},
             'NHM_REST_NBI_05': {UPDATE: 1, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2},
             'NHM_REST_NBI_06': {UPDATE: 2, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2},
             'NHM_REST_NBI_07': {UPDATE: 1, SUPPORTED: True, CLOUD_NATIVE: True, NOTE: '-', PRIORITY: 2},
@@ -14,8 +14,7 @@ from requests.exceptions import HTTPError, ConnectionError
 from enmutils.lib import log
 from enmutils.lib.headers import JSON_SECURITY_REQUEST
 from enmutils_int.lib.netex import Search
-from enmutils_int.lib.common_utils import chunks
-from enmutils_int.lib.netex import get_pos_by_poids
+from enmutils_int.lib.po_attribute_fetcher import get_po_attribute_fetcher
 
 TEMPORARY_QUERY_ENDPOINT = "/managedObjects/temporaryQueryForMoClassMapping/v2/"
 UPDATE_ATTRIBUTES_ENDPOINT = "/persistentObject/{0}"
@@ -391,11 +390,7 @@ def get_fdns_from_poids(user, search, mo_type, parameter):
     """
     fdns = []
     po_ids = [element["id"] for element in search["objects"]]
-    for po_ids_chunk in chunks(po_ids, 250):
-        pos_response = get_pos_by_poids(user, po_ids_chunk,
-                                        attributeMappings=[
-                                            {"moType": mo_type, "attributeNames": [parameter]}])
-        fdns.extend(pos_response.json())
+    fdns.extend(get_po_attribute_fetcher(user).fetch(po_ids, [{"moType": mo_type, "attributeNames": [parameter]}]))
     fdns = [element["fdn"] for element in fdns]
 
     return fdns
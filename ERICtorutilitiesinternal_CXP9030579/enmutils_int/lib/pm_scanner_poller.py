@@ -0,0 +1,185 @@
+# ********************************************************************
+# Name    : PM Scanner Poller
+# Summary : Central poller of the number of active PMIC scanners of
+#           the workload subscriptions. Subscriptions waiting for
+#           their scanners to be (de)activated register in
+#           persistence, and the scanners of the registered
+#           subscriptions whose counts are out of date are counted in
+#           a single poll, by whichever profile first finds its count
+#           out of date, using a filtered count per subscription. The
+#           counts are stored in persistence, each with the time it
+#           was counted, and read by all of the waiting profiles.
+# ********************************************************************
+
+import re
+import time
+
+from enmutils.lib import log, persistence, mutexer
+
+ACTIVE_SCANNER_COUNTS_KEY = "pm-active-scanner-counts"
+POLLED_SUBSCRIPTIONS_KEY = "pm-scanner-polled-subscriptions"
+POLL_MUTEX = "pm-active-scanner-counts-poll"
+POLLED_SUBSCRIPTIONS_MUTEX = "pm-scanner-polled-subscriptions"
+DEFAULT_POLL_INTERVAL_SECS = 60
+REGISTRATION_EXPIRY_SECS = 5 * 60
+PERSISTENCE_EXPIRY_SECS = 60 * 60
+POLL_TIMEOUT_SECS = 5 * 60
+COUNT_SUBSCRIPTION_SCANNERS_CMD = "cmedit get * PMICScannerInfo.(subscriptionId=={0},status==ACTIVE) -cn"
+
+
+def register_subscription(subscription_id):
+    """
+    Register the subscription, so that its active scanners are included in the scanner polls
+
+    :param subscription_id: Id of the subscription
+    :type subscription_id: str
+    """
+    with mutexer.mutex(POLLED_SUBSCRIPTIONS_MUTEX, persisted=True):
+        subscriptions = persistence.get(POLLED_SUBSCRIPTIONS_KEY) or {}
+        subscriptions[str(subscription_id)] = time.time()
+        persistence.set(POLLED_SUBSCRIPTIONS_KEY, subscriptions, PERSISTENCE_EXPIRY_SECS, log_values=False)
+
+
+def deregister_subscription(subscription_id):
+    """
+    Deregister the subscription, so that its active scanners are no longer included in the scanner polls
+
+    :param subscription_id: Id of the subscription
+    :type subscription_id: str
+    """
+    with mutexer.mutex(POLLED_SUBSCRIPTIONS_MUTEX, persisted=True):
+        subscriptions = persistence.get(POLLED_SUBSCRIPTIONS_KEY) or {}
+        if subscriptions.pop(str(subscription_id), None):
+            persistence.set(POLLED_SUBSCRIPTIONS_KEY, subscriptions, PERSISTENCE_EXPIRY_SECS, log_values=False)
+
+
+def get_registered_subscriptions():
+    """
+    Get the ids of the subscriptions registered for scanner polling, excluding expired registrations
+
+    :return: Sorted list of subscription ids
+    :rtype: list
+    """
+    expiry_time = time.time() - REGISTRATION_EXPIRY_SECS
+    subscriptions = persistence.get(POLLED_SUBSCRIPTIONS_KEY) or {}
+    return sorted(subscription_id for subscription_id, registered_time in subscriptions.iteritems()
+                  if registered_time > expiry_time)
+
+
+def _query_active_scanner_counts(user, subscription_ids):
+    """
+    Query ENM for the number of active scanners of each of the supplied subscriptions, using a filtered count per
+    subscription rather than listing every active scanner in the network
+
+    :param user: User who will execute the cmedit commands
+    :type user: `enm_user_2.User`
+    :param subscription_ids: List of subscription ids
+    :type subscription_ids: list
+
+    :return: Dictionary of subscription id to number of active scanners, excluding subscriptions which failed to be
+            counted
+    :rtype: dict
+    """
+    scanner_counts = {}
+    for subscription_id in subscription_ids:
+        try:
+            output = user.enm_execute(COUNT_SUBSCRIPTION_SCANNERS_CMD.format(subscription_id)).get_output()
+        except Exception as e:
+            log.logger.debug("Failed to count active scanners of subscription {0}: {1}"
+                             .format(subscription_id, str(e)))
+            continue
+        match = re.search(r'.*PMICScannerInfo (\d+) instance.*', "\n".join(output))
+        scanner_counts[subscription_id] = int(match.group(1)) if match else 0
+    return scanner_counts
+
+
+def _is_fresh(polled_count, max_age):
+    """
+    Check if the polled count was counted within the maximum age
+
+    :param polled_count: Dictionary of the number of active scanners and the time they were counted, or None
+    :type polled_count: dict
+    :param max_age: Maximum age in seconds of the polled count, None if any age is out of date
+    :type max_age: int
+
+    :return: True if the count was polled within the maximum age
+    :rtype: bool
+    """
+    return bool(polled_count) and max_age is not None and time.time() - polled_count["timestamp"] <= max_age
+
+
+def poll_active_scanner_counts(user, max_age=None):
+    """
+    Query ENM for the number of active scanners of the registered subscriptions whose counts are out of date, and
+    store the counts in persistence, leaving the counts which are up to date as they are
+
+    :param user: User who will execute the cmedit command
+    :type user: `enm_user_2.User`
+    :param max_age: Maximum age in seconds of the counts which are not polled again, None to poll all counts
+    :type max_age: int
+
+    :return: Dictionary of subscription id to number of active scanners, of the registered subscriptions
+    :rtype: dict
+    """
+    subscription_ids = get_registered_subscriptions()
+    polled_counts = persistence.get(ACTIVE_SCANNER_COUNTS_KEY) or {}
+    polled_counts = {subscription_id: polled_counts[subscription_id] for subscription_id in subscription_ids
+                     if subscription_id in polled_counts}
+    missing_ids = [subscription_id for subscription_id in subscription_ids
+                   if not _is_fresh(polled_counts.get(subscription_id), max_age)]
+    if missing_ids:
+        timestamp = time.time()
+        scanner_counts = _query_active_scanner_counts(user, missing_ids)
+        polled_counts.update((subscription_id, {"count": count, "timestamp": timestamp})
+                             for subscription_id, count in scanner_counts.iteritems())
+        persistence.set(ACTIVE_SCANNER_COUNTS_KEY, polled_counts, PERSISTENCE_EXPIRY_SECS, log_values=False)
+        log.logger.debug("Polled active scanner counts of {0}/{1} subscription(s): {2}"
+                         .format(len(missing_ids), len(subscription_ids), scanner_counts))
+    return {subscription_id: polled_count["count"] for subscription_id, polled_count in polled_counts.iteritems()}
+
+
+def _read_active_scanner_count(subscription_id, max_age):
+    """
+    Read the polled number of active scanners of the subscription, if polled within the maximum age
+
+    :param subscription_id: Id of the subscription
+    :type subscription_id: str
+    :param max_age: Maximum age in seconds of the polled count
+    :type max_age: int
+
+    :return: Number of active scanners or None if the subscription has not been polled within the maximum age
+    :rtype: int or None
+    """
+    polled_count = (persistence.get(ACTIVE_SCANNER_COUNTS_KEY) or {}).get(str(subscription_id))
+    if _is_fresh(polled_count, max_age):
+        return polled_count["count"]
+
+
+def get_active_scanner_count(subscription_id, user, max_age=DEFAULT_POLL_INTERVAL_SECS):
+    """
+    Get the number of active scanners of the subscription, polling ENM if its shared count is out of date, along
+    with the other registered subscriptions whose counts are out of date
+
+    :param subscription_id: Id of the subscription
+    :type subscription_id: str
+    :param user: User who will execute the cmedit command if a poll is required
+    :type user: `enm_user_2.User`
+    :param max_age: Maximum age in seconds of the polled counts
+    :type max_age: int
+
+    :return: Number of active scanners of the subscription
+    :rtype: int
+    """
+    register_subscription(subscription_id)
+    scanner_count = _read_active_scanner_count(subscription_id, max_age)
+    if scanner_count is not None:
+        return scanner_count
+    with mutexer.mutex(POLL_MUTEX, persisted=True, timeout=POLL_TIMEOUT_SECS):
+        scanner_count = _read_active_scanner_count(subscription_id, max_age)
+        if scanner_count is not None:
+            return scanner_count
+        try:
+            return poll_active_scanner_counts(user, max_age).get(str(subscription_id), 0)
+        except Exception as e:
+            log.logger.error("Problem encountered polling active scanner counts: {0}".format(str(e)))
+            return 0
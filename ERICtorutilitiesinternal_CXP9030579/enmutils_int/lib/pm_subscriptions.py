@@ -22,6 +22,8 @@ from enmutils_int.lib.enm_user import get_workload_admin_user
 from enmutils_int.lib.flexible_counter_management import get_ebs_flex_counters, get_reserved_ebsn_flex_counters
 from enmutils_int.lib.load_node import annotate_fdn_poid_return_node_objects
 from enmutils_int.lib.pm_counters import get_tech_domain_counters_based_on_profile
+from enmutils_int.lib import pm_scanner_poller
+from enmutils_int.lib.po_attribute_fetcher import get_po_attribute_fetcher
 from requests.exceptions import HTTPError
 
 
@@ -83,7 +85,8 @@ class Subscription(object):
     def _get_pos_by_poids(self, poids, attributes=None):
         """
         Gets node information from enm
-        The function simulates the netex request by requesting nodes in batches of 250 nodes
+        The function simulates the netex request by requesting nodes in concurrent batches of up to 250 nodes, re-using
+        the nodes already fetched by the user for the same attributes within the cache period of the fetcher
         :param poids: list of node poids
         :type poids: list
         :param attributes: extra node attributes you want to get from the request
@@ -94,38 +97,15 @@ class Subscription(object):
         log.logger.debug("Validating POID's")
         attributes = [] if not attributes else attributes
         attributes.extend(["neType", "ossModelIdentity", "technologyDomain"])
-        enm_nodes = []
+        attribute_mappings = [{"moType": "NetworkElement", "attributeNames": attributes}]
 
-        data = {"poList": poids,
-                "defaultMappings": ["syncStatus"],
-                "attributeMappings": [{"moType": "NetworkElement",
-                                       "attributeNames": attributes}]}
-
-        for poid_batch in self._poid_batch_generator(poids):
-            data["poList"] = poid_batch
-            response = self.user.post(self.GET_POS_BY_POID_URL, json=data, headers=JSON_SECURITY_REQUEST)
-
-            if not response.ok:
-                response.raise_for_status()
-            else:
-                enm_nodes.extend(response.json())
+        fetcher = get_po_attribute_fetcher(self.user, headers=JSON_SECURITY_REQUEST)
+        enm_nodes = fetcher.fetch(poids, attribute_mappings, default_mappings=["syncStatus"])
 
         enm_nodes = self._validate_nodes_oss_model_identity(enm_nodes)
 
         return {int(node["poId"]): node for node in enm_nodes}
 
-    def _poid_batch_generator(self, poids, batch_size=250):
-        """
-        Generates batches of POID's from list
-
-        :param poids: List of PO ID's
-        :type poids: list
-        :param batch_size: Batch Size
-        :type batch_size: int
-        """
-        for batch in range(0, len(poids), batch_size):
-            yield poids[batch:min(batch + batch_size, len(poids))]
-
     @staticmethod
     def log_pm_disabled_nodes(json_nodes):
         """
@@ -426,22 +406,25 @@ class Subscription(object):
 
         log.logger.debug("Profile will attempt to check scanner states for subscription on ENM (until max time: {0})"
                          .format(expiry_time))
-        while datetime.datetime.now() < expiry_time:
-            number_of_active_scanners_for_subscription = self._get_number_of_active_scanners()
+        try:
+            while datetime.datetime.now() < expiry_time:
+                number_of_active_scanners_for_subscription = self._get_polled_number_of_active_scanners()
 
-            if number_of_active_scanners_for_subscription == last_count_of_active_scanners:
-                iteration_count_where_active_scanner_count_has_not_changed += 1
+                if number_of_active_scanners_for_subscription == last_count_of_active_scanners:
+                    iteration_count_where_active_scanner_count_has_not_changed += 1
 
-            last_count_of_active_scanners = number_of_active_scanners_for_subscription
+                last_count_of_active_scanners = number_of_active_scanners_for_subscription
 
-            if self.check_if_scanner_polling_complete(
-                    action, number_of_active_scanners_for_subscription,
-                    iteration_count_where_active_scanner_count_has_not_changed):
-                break
+                if self.check_if_scanner_polling_complete(
+                        action, number_of_active_scanners_for_subscription,
+                        iteration_count_where_active_scanner_count_has_not_changed):
+                    break
 
-            log.logger.debug("Sleeping for {0}s before re-checking scanner states"
-                             .format(self.SLEEP_SECONDS_BETWEEN_CHECKING_SCANNERS))
-            time.sleep(self.SLEEP_SECONDS_BETWEEN_CHECKING_SCANNERS)
+                log.logger.debug("Sleeping for {0}s before re-checking scanner states"
+                                 .format(self.SLEEP_SECONDS_BETWEEN_CHECKING_SCANNERS))
+                time.sleep(self.SLEEP_SECONDS_BETWEEN_CHECKING_SCANNERS)
+        finally:
+            pm_scanner_poller.deregister_subscription(self.id)
 
         log.logger.debug("Waiting for number of active scanners to reach expected levels is complete")
 
@@ -508,6 +491,21 @@ class Subscription(object):
             log.logger.debug("Scanners count for {0} nodes: {1}".format(node_type, scanner_count))
         return scanner_count
 
+    def _get_polled_number_of_active_scanners(self):
+        """
+        Get number of Active Scanners associated with this subscription from the central scanner poller, which
+        queries ENM once per interval for all of the subscriptions waiting on their scanners
+
+        :return: Number of Active Scanners
+        :rtype: int
+        """
+        if not self.node_types:
+            return 0
+        scanner_count = pm_scanner_poller.get_active_scanner_count(
+            self.id, self.user, max_age=self.SLEEP_SECONDS_BETWEEN_CHECKING_SCANNERS)
+        log.logger.debug("Polled active scanners count for subscription {0}: {1}".format(self.id, scanner_count))
+        return scanner_count
+
     def get_active_scanners_based_on_node_type(self, node_type):
         """
         Get number of Active Scanners in the specific node type associated with this subscription.
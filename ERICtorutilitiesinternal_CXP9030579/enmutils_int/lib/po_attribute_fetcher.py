@@ -0,0 +1,330 @@
+# ********************************************************************
+# Name    : PO Attribute Fetcher
+# Summary : Shared fetcher of persistent object attributes from the
+#           getPosByPoIds endpoint. Splits the requested POIDs into
+#           batches which are posted concurrently by a bounded
+#           number of workers, adapts the batch size to the response
+#           times and failures of ENM, and caches the returned
+#           objects per (POID, attribute set) for a short time so
+#           that objects are re-used across subscriptions and
+#           queries made in the same profile iteration. The cached
+#           objects and the shared fetchers are bounded, the least
+#           recently used being evicted first.
+# ********************************************************************
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from copy import deepcopy
+
+from requests.exceptions import HTTPError, ConnectionError, Timeout
+
+from enmutils.lib import log
+from enmutils.lib.exceptions import EnmApplicationError
+from enmutils.lib.headers import JSON_SECURITY_REQUEST
+from enmutils.lib.thread_queue import ThreadQueue
+
+GET_POS_BY_POID_URL = "/managedObjects/getPosByPoIds"
+MAX_BATCH_SIZE = 250
+MIN_BATCH_SIZE = 50
+MAX_CONCURRENT_REQUESTS = 4
+SLOW_BATCH_RESPONSE_SECS = 30
+CACHE_TTL_SECS = 5 * 60
+MAX_CACHED_POS = 20000
+MAX_FETCHERS = 20
+
+FETCHERS = OrderedDict()
+FETCHERS_LOCK = threading.Lock()
+
+
+class PoAttributeFetcher(object):
+
+    def __init__(self, user, headers=None, max_concurrent_requests=MAX_CONCURRENT_REQUESTS, cache_ttl=CACHE_TTL_SECS,
+                 max_cached_pos=MAX_CACHED_POS):
+        """
+        Fetcher of persistent object attributes for the supplied user
+
+        :param user: User who will perform the requests
+        :type user: `enm_user_2.User`
+        :param headers: Headers to be sent with each request
+        :type headers: dict
+        :param max_concurrent_requests: Maximum number of batches requested at the same time
+        :type max_concurrent_requests: int
+        :param cache_ttl: Time in seconds for which the returned objects are cached
+        :type cache_ttl: int
+        :param max_cached_pos: Maximum number of objects cached, the least recently used being evicted first
+        :type max_cached_pos: int
+        """
+        self.user = user
+        self.headers = headers or JSON_SECURITY_REQUEST
+        self.max_concurrent_requests = max_concurrent_requests
+        self.cache_ttl = cache_ttl
+        self.max_cached_pos = max_cached_pos
+        self.batch_size = MAX_BATCH_SIZE
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.requests_made = 0
+        self.cache_hits = 0
+
+    @staticmethod
+    def _get_mappings_key(attribute_mappings, default_mappings):
+        """
+        Get the key identifying the set of attributes requested
+
+        :param attribute_mappings: List of dict(s) of attribute mappings
+        :type attribute_mappings: list
+        :param default_mappings: List of default mappings
+        :type default_mappings: list
+
+        :return: Key identifying the set of attributes requested
+        :rtype: str
+        """
+        return json.dumps({"attributeMappings": attribute_mappings, "defaultMappings": default_mappings},
+                          sort_keys=True)
+
+    def _get_cached_pos(self, poids, mappings_key):
+        """
+        Get the cached objects of the supplied POIDs, which have not expired, marking them as recently used
+
+        :param poids: List of POIDs
+        :type poids: list
+        :param mappings_key: Key identifying the set of attributes requested
+        :type mappings_key: str
+
+        :return: Tuple containing the list of cached objects and the list of POIDs not cached
+        :rtype: tuple
+        """
+        cached_pos, missing_poids = [], []
+        expiry_time = time.time() - self.cache_ttl
+        with self.lock:
+            for poid in poids:
+                key = (str(poid), mappings_key)
+                cached = self.cache.pop(key, None)
+                if cached and cached[0] > expiry_time:
+                    self.cache[key] = cached
+                    cached_pos.append(deepcopy(cached[1]))
+                else:
+                    missing_poids.append(poid)
+            self.cache_hits += len(cached_pos)
+        return cached_pos, missing_poids
+
+    def _cache_pos(self, pos, mappings_key):
+        """
+        Add the supplied objects to the cache, evicting the expired and then the least recently used objects once the
+        cache is full
+
+        :param pos: List of objects returned by ENM
+        :type pos: list
+        :param mappings_key: Key identifying the set of attributes requested
+        :type mappings_key: str
+        """
+        timestamp = time.time()
+        with self.lock:
+            for po in pos:
+                if "poId" in po:
+                    key = (str(po["poId"]), mappings_key)
+                    self.cache.pop(key, None)
+                    self.cache[key] = (timestamp, deepcopy(po))
+            expiry_time = timestamp - self.cache_ttl
+            while self.cache and (len(self.cache) > self.max_cached_pos or
+                                  next(self.cache.itervalues())[0] <= expiry_time):
+                self.cache.popitem(last=False)
+
+    def clear_cache(self):
+        """
+        Remove all of the cached objects
+        """
+        with self.lock:
+            self.cache.clear()
+
+    def _post_batch(self, poid_batch, payload):
+        """
+        Post a single batch of POIDs to the getPosByPoIds endpoint
+
+        :param poid_batch: List of POIDs to be requested
+        :type poid_batch: list
+        :param payload: Payload to be sent, excluding the POIDs
+        :type payload: dict
+
+        :return: List of objects returned by ENM
+        :rtype: list
+        """
+        request_payload = dict(payload, poList=poid_batch)
+        response = self.user.post(GET_POS_BY_POID_URL, json=request_payload, headers=self.headers)
+        with self.lock:
+            self.requests_made += 1
+        if not response.ok:
+            response.raise_for_status()
+        return response.json()
+
+    def _fetch_batch(self, poid_batch, payload):
+        """
+        Fetch a batch of POIDs, splitting the batch and retrying the halves if ENM fails to handle the batch
+
+        :param poid_batch: List of POIDs to be requested
+        :type poid_batch: list
+        :param payload: Payload to be sent, excluding the POIDs
+        :type payload: dict
+
+        :raises HTTPError: if the request fails and the batch cannot be split further
+        :raises ConnectionError: if the connection fails and the batch cannot be split further
+        :raises Timeout: if the request times out and the batch cannot be split further
+
+        :return: Tuple containing the list of objects returned by ENM and the time taken in seconds
+        :rtype: tuple
+        """
+        start_time = time.time()
+        try:
+            pos = self._post_batch(poid_batch, payload)
+        except (HTTPError, ConnectionError, Timeout) as e:
+            status_code = getattr(getattr(e, "response", None), "status_code", None)
+            if len(poid_batch) <= MIN_BATCH_SIZE or (status_code and status_code < 500):
+                raise
+            log.logger.debug("Request for {0} POIDs failed, retrying in smaller batches: {1}"
+                             .format(len(poid_batch), str(e)))
+            self._reduce_batch_size(len(poid_batch))
+            middle = len(poid_batch) / 2
+            pos = (self._fetch_batch(poid_batch[:middle], payload)[0] +
+                   self._fetch_batch(poid_batch[middle:], payload)[0])
+        return pos, time.time() - start_time
+
+    def _reduce_batch_size(self, failed_batch_size):
+        """
+        Reduce the batch size used for subsequent requests
+
+        :param failed_batch_size: Size of the batch which was slow or failed
+        :type failed_batch_size: int
+        """
+        with self.lock:
+            self.batch_size = max(MIN_BATCH_SIZE, min(self.batch_size, failed_batch_size / 2))
+
+    def _adapt_batch_size(self, batch_timings):
+        """
+        Adapt the batch size to the time taken by ENM to respond to each batch
+
+        :param batch_timings: List of tuples containing the size of each batch and the time taken in seconds
+        :type batch_timings: list
+        """
+        slow_batches = [size for size, elapsed in batch_timings if elapsed > SLOW_BATCH_RESPONSE_SECS]
+        if slow_batches:
+            self._reduce_batch_size(min(slow_batches))
+        elif self.batch_size < MAX_BATCH_SIZE:
+            with self.lock:
+                self.batch_size = min(MAX_BATCH_SIZE, self.batch_size * 2)
+
+    def _fetch_batches_concurrently(self, batches, payload):
+        """
+        Fetch the supplied batches of POIDs, using a bounded number of concurrent workers
+
+        :param batches: List of batches of POIDs
+        :type batches: list
+        :param payload: Payload to be sent, excluding the POIDs
+        :type payload: dict
+
+        :raises EnmApplicationError: if the request for any batch fails without an exception being recorded
+
+        :return: List of tuples containing the objects returned for each batch and the time taken, in batch order
+        :rtype: list
+        """
+        tq = ThreadQueue(batches, num_workers=min(self.max_concurrent_requests, len(batches)),
+                         func_ref=fetch_batch_task, args=[self, payload])
+        tq.execute()
+        failed_entries = [work_entry for work_entry in tq.work_entries if work_entry.exception_raised]
+        if failed_entries:
+            raise (failed_entries[0].exception or
+                   EnmApplicationError("Failed to fetch {0} of {1} batch(es) of POIDs."
+                                       .format(len(failed_entries), len(batches))))
+        return [work_entry.result for work_entry in tq.work_entries]
+
+    def fetch(self, poids, attribute_mappings, default_mappings=None):
+        """
+        Fetch the objects of the supplied POIDs, from the cache where available
+
+        :param poids: List of POIDs
+        :type poids: list
+        :param attribute_mappings: List of dict(s) of attribute mappings
+        :type attribute_mappings: list
+        :param default_mappings: List of default mappings, i.e. ["syncStatus"]
+        :type default_mappings: list
+
+        :raises Exception: if the request for any batch of POIDs fails
+
+        :return: List of objects returned by ENM
+        :rtype: list
+        """
+        mappings_key = self._get_mappings_key(attribute_mappings, default_mappings)
+        pos, missing_poids = self._get_cached_pos(poids, mappings_key)
+        if not missing_poids:
+            return pos
+        payload = {"attributeMappings": attribute_mappings}
+        if default_mappings:
+            payload["defaultMappings"] = default_mappings
+        batch_size = self.batch_size
+        batches = [missing_poids[index:index + batch_size] for index in range(0, len(missing_poids), batch_size)]
+        log.logger.debug("Requesting {0} POIDs in {1} batch(es) of up to {2}, {3} POIDs found in cache"
+                         .format(len(missing_poids), len(batches), batch_size, len(pos)))
+        if len(batches) == 1:
+            batch_results = [self._fetch_batch(batches[0], payload)]
+        else:
+            batch_results = self._fetch_batches_concurrently(batches, payload)
+        batch_timings = []
+        for batch, (batch_pos, elapsed) in zip(batches, batch_results):
+            batch_timings.append((len(batch), elapsed))
+            self._cache_pos(batch_pos, mappings_key)
+            pos.extend(batch_pos)
+        self._adapt_batch_size(batch_timings)
+        return pos
+
+    def get_stats(self):
+        """
+        Get the request and cache statistics of the fetcher
+
+        :return: Dictionary containing the number of requests made, cache hits, cached objects and batch size
+        :rtype: dict
+        """
+        with self.lock:
+            return {"requests_made": self.requests_made, "cache_hits": self.cache_hits,
+                    "cached_objects": len(self.cache), "batch_size": self.batch_size}
+
+
+def fetch_batch_task(poid_batch, fetcher, payload):
+    """
+    Task executed by each worker of the thread queue, fetching a single batch of POIDs
+
+    :param poid_batch: List of POIDs to be requested
+    :type poid_batch: list
+    :param fetcher: Fetcher performing the request
+    :type fetcher: `PoAttributeFetcher`
+    :param payload: Payload to be sent, excluding the POIDs
+    :type payload: dict
+
+    :return: Tuple containing the list of objects returned by ENM and the time taken in seconds
+    :rtype: tuple
+    """
+    return fetcher._fetch_batch(poid_batch, payload)  # pylint: disable=protected-access
+
+
+def get_po_attribute_fetcher(user, headers=None):
+    """
+    Get the shared fetcher of the supplied user and headers, so that cached objects are re-used across requests. The
+    least recently used fetcher is dropped once there are more than the maximum number of fetchers
+
+    :param user: User who will perform the requests
+    :type user: `enm_user_2.User`
+    :param headers: Headers to be sent with each request
+    :type headers: dict
+
+    :return: Fetcher of the user and headers
+    :rtype: `PoAttributeFetcher`
+    """
+    headers = headers or JSON_SECURITY_REQUEST
+    key = (getattr(user, "username", None), tuple(sorted(headers.items())))
+    with FETCHERS_LOCK:
+        fetcher = FETCHERS.pop(key, None)
+        if not fetcher or fetcher.user is not user:
+            fetcher = PoAttributeFetcher(user, headers=headers)
+        FETCHERS[key] = fetcher
+        while len(FETCHERS) > MAX_FETCHERS:
+            FETCHERS.popitem(last=False)
+        return fetcher
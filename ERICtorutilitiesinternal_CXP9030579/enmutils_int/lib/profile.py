@@ -12,6 +12,7 @@ import random
 import re
 import signal
 import sys
+import threading
 import time
 import datetime
 from datetime import timedelta
@@ -32,7 +33,7 @@ from enmutils.lib.exceptions import (ScriptEngineResponseValidationError, ShellC
                                      MoBatchCommandReturnedError, NetsimError, ProfileError,
                                      EnvironWarning, NoNodesAvailable, ValidationWarning)
 from enmutils.lib.log import get_profiles_logger
-from enmutils_int.lib import node_pool_mgr, common_utils, status_profile
+from enmutils_int.lib import node_pool_mgr, common_utils, status_profile, iteration_scheduler
 from enmutils_int.lib.enm_user import get_workload_admin_user
 from enmutils_int.lib.services import usermanager_adaptor, nodemanager_adaptor
 from enmutils_int.lib.services.profilemanager_adaptor import timestamp
@@ -52,6 +53,16 @@ def _get_logger():
     return logger
 
 
+def _sleep(secs):
+    """
+    Sleep the profile, yielding to the other profiles of the profile host if the profile is run by a profile host
+
+    :param secs: Number of seconds to sleep
+    :type secs: float
+    """
+    getattr(threading.current_thread(), "hosted_sleep", time.sleep)(secs)
+
+
 class Profile(object):
     PID_PATH = "/var/tmp/enmutils/daemon/{0}.pid"
     LOG_PATH = "/var/log/enmutils/daemon/{0}.log"
@@ -68,6 +79,8 @@ class Profile(object):
     RETAIN_NODES_AFTER_COMPLETED = False
     ERROR_LIMIT = 2000
     DEFAULT_MAX_RSS_MEMORY_MB = 5120  # i.e. 5GB
+    HOSTABLE = False  # Profile can be run as a task of a shared profile host, if the profile host mode is enabled
+    ITERATION_JITTER_SECS = None  # Maximum stagger of a periodic iteration, None for the default, 0 to disable
 
     def __init__(self):
         """
@@ -206,6 +219,8 @@ class Profile(object):
                          "There will be no further logging for: {0}".format(self.NAME))
         if os.path.exists(self.pidfile):
             os.remove(self.pidfile)
+        if getattr(self, "hosted_by", None):  # The profile host process is shared with other profiles
+            return
         try:
             process.kill_process_id(os.getpid(), signal.SIGTERM)  # self.pid = None, once profile is in COMPLETED state
         except OSError:
@@ -372,6 +387,8 @@ class Profile(object):
 
         if sleep:
             sleep_datetime = self._next_run - time_now
+            sleep_datetime += timedelta(seconds=self._reserve_iteration(
+                time.mktime(self._next_run.timetuple()) + self._next_run.microsecond / 1e6))
             log.logger.debug("Time Now: {0}".format(str(time_now)))
             log.logger.debug("Time Next Run: {0}".format(str(self._next_run)))
 
@@ -381,7 +398,7 @@ class Profile(object):
             if int(sleep_datetime.total_seconds()) > 3600 and self.user_count:
                 common_utils.terminate_user_sessions(getattr(self, 'NAME', 'UNKNOWN'))
             self.logger.info('Profile state SLEEPING for {0} seconds. Next iteration at {1}'
-                             .format(sleep_datetime.total_seconds(), str(self._next_run)))
+                             .format(sleep_datetime.total_seconds(), str(time_now + sleep_datetime)))
             self._log_when_sleeping_for_gt_four_hours(sleep_datetime.total_seconds())
             self.state = old_state
             self.logger.info('Profile is running its next iteration now')
@@ -391,6 +408,23 @@ class Profile(object):
                              "time")
             self.logger.info('Profile is running its next iteration immediately')
 
+    def _reserve_iteration(self, planned_time):
+        """
+        Reserve the next periodic iteration in the shared iteration calendar, which staggers the iterations of the
+        profiles due at the same time
+
+        :param planned_time: Time, in seconds since the epoch, the next iteration is planned for
+        :type planned_time: float
+
+        :return: Number of seconds the next iteration is delayed by
+        :rtype: int
+        """
+        try:
+            return iteration_scheduler.reserve(self.NAME, planned_time, max_jitter_secs=self.ITERATION_JITTER_SECS)
+        except Exception as e:
+            log.logger.debug("Failed to reserve the next iteration in the iteration calendar: {0}".format(str(e)))
+            return 0
+
     @staticmethod
     def calculate_dst_offset_for_next_iteration(current_timestamp_secs, next_iteration_sleep_time_secs):
         """
@@ -614,9 +648,10 @@ class Profile(object):
         try:
             log.logger.debug("Size of profile object after pickling is {0}".format(
                 sys.getsizeof(pickle.dumps(self, pickle.HIGHEST_PROTOCOL))))
-            persistence.set(self.NAME, self, -1)
-            self.set_status_object()
-            self.set_diff_object()
+            with persistence.batch() as batch:
+                batch.set(self.NAME, self, -1)
+                self.set_status_object(batch=batch)
+                self.set_diff_object(batch=batch)
             self.check_profile_memory_usage()
         except ConnectionError as e:
             log.logger.debug("================= Found a ConnectionError ====================")
@@ -625,25 +660,31 @@ class Profile(object):
         except Exception:
             exception.process_exception()
 
-    def set_status_object(self):
+    def set_status_object(self, batch=None):
         """
         Set the status object in Redis
+
+        :param batch: Batch to queue the update on, None to update immediately
+        :type batch: `persistence.Batch`
         """
         user_count = getattr(self, "user_count", 0)
         status_values = {"name": self.NAME, "state": self.state, "start_time": self.start_time, "pid": self.pid,
                          "num_nodes": self.num_nodes, "schedule": self.schedule, "priority": self.priority,
                          "last_run": self.get_last_run_time(), "user_count": user_count}
         prof = status_profile.StatusProfile(**status_values)
-        persistence.set('{0}-status'.format(self.NAME), prof, -1)
+        (batch or persistence).set('{0}-status'.format(self.NAME), prof, -1)
 
-    def set_diff_object(self):
+    def set_diff_object(self, batch=None):
         """
         Set the diff object in Redis
+
+        :param batch: Batch to queue the update on, None to update immediately
+        :type batch: `persistence.Batch`
         """
         diff_values = {"name": self.NAME, "state": self.state, "start_time": self.start_time, "version": self.version,
                        "update_version": self.update_version, "supported": self.supported}
         diff_profile = DiffProfile(**diff_values)
-        persistence.set('{0}-diff'.format(self.NAME), diff_profile, -1)
+        (batch or persistence).set('{0}-diff'.format(self.NAME), diff_profile, -1)
 
     def check_profile_memory_usage(self):
         """
@@ -651,6 +692,10 @@ class Profile(object):
 
         :raises GeneratorExit: if RSS memory usage exceeds Max Memory limit
         """
+        if getattr(self, "hosted_by", None):
+            log.logger.debug("The RSS memory usage of the profile host is shared by all of its profiles, and is "
+                             "reported per host by the profile host")
+            return
         log.logger.debug("Checking RSS memory usage by profile")
         rss_memory_used_by_profile_daemons = 0
         running_pids = process.get_profile_daemon_pid(self.NAME)
@@ -1209,7 +1254,7 @@ class Profile(object):
         while self.state == 'COMPLETED':
             msg = "Profile has COMPLETED." or self.no_nodes_available
             self.logger.info(msg)
-            time.sleep(86400)  # Using self.sleep() will log the sleep and add to the teardown
+            _sleep(86400)  # Using self.sleep() will log the sleep and add to the teardown
 
     def sleep_during_upgrade_run(self):
         """
@@ -1226,7 +1271,7 @@ class Profile(object):
                     # wait for upgrade to complete
                     self.state = 'SLEEPING'
                     log.logger.debug("SLEEPING for 5 mins as the 'upgrade_run' flag has been enabled in persistence")
-                    time.sleep(300)
+                    _sleep(300)
                 else:
                     break
 
@@ -1244,13 +1289,13 @@ class Profile(object):
             if not count:
                 self.state = SLEEPING
             count += 1
-            time.sleep(duration_of_4hrs)
+            _sleep(duration_of_4hrs)
             duration -= duration_of_4hrs
 
         if duration > 0:
             if count:
                 log.logger.debug("Sleeping for remaining time: {0}s".format(duration))
-            time.sleep(duration)
+            _sleep(duration)
 
         self.sleep_during_upgrade_run()
 
@@ -1,13 +1,15 @@
 import copy
 import random
 import string
+import threading
 import time
+from contextlib import contextmanager
 from datetime import datetime
 from functools import partial
 
 from retrying import retry
 
-from enmutils.lib import filesystem, log, persistence, arguments, timestamp
+from enmutils.lib import filesystem, log, persistence, arguments, timestamp, config
 from enmutils.lib.arguments import get_random_string
 from enmutils.lib.enm_node_management import CmManagement
 from enmutils.lib.exceptions import (EnvironError, FailedNetsimOperation, NetsimError, MOPathMisMatch,
@@ -15,7 +17,6 @@ from enmutils.lib.exceptions import (EnvironError, FailedNetsimOperation, Netsim
 from enmutils.lib.persistence import picklable_boundmethod
 from enmutils_int.lib import netsim_mo, node_pool_mgr, load_mgr
 from enmutils_int.lib.cmsync_mo_info import CmSyncMoInfo, MSCM_MCD_RATE, MSCMCE_MCD_RATE
-from enmutils_int.lib.common_utils import chunks
 from enmutils_int.lib.ddp_info_logging import update_cm_ddp_info_log_entry
 from enmutils_int.lib.enm_user import get_workload_admin_user
 from enmutils_int.lib.helper_methods import generate_basic_dictionary_from_list_of_objects
@@ -34,6 +35,42 @@ GSM_PATHS = {}
 CREATED_EXTERNAL_ENODEB_FUNCTION_MOS = {}
 ENODEB_VALUES = "eNBId=1000000; eNodeBPlmnId=(mcc=272,mnc=7,mncLength=2)"
 MAX_NODES_PER_NOTIFICATION_GROUP = 12
+BURST_START_LANES = 12
+MAX_CONCURRENT_BURSTS_PER_HOST_PROP = "cmsync_max_concurrent_bursts_per_host"
+HOST_BURST_SEMAPHORES = {}
+HOST_BURST_SEMAPHORES_LOCK = threading.Lock()
+
+
+def get_max_concurrent_bursts_per_host():
+    """
+    Get the maximum number of bursts to be started at the same time on any NetSim host
+
+    :return: Configured maximum, or the number of burst start lanes if not configured, i.e. no limit per host
+    :rtype: int
+    """
+    key = MAX_CONCURRENT_BURSTS_PER_HOST_PROP
+    return (int(config.get_prop(key)) if config.has_prop(key) and config.get_prop(key) != "" else
+            BURST_START_LANES)
+
+
+@contextmanager
+def host_burst_slots(hosts):
+    """
+    Hold a burst start slot on each of the NetSim hosts, waiting until a slot is free on all of them
+
+    :param hosts: Names of the NetSim hosts of the nodes of the burst
+    :type hosts: list
+    """
+    with HOST_BURST_SEMAPHORES_LOCK:
+        semaphores = [HOST_BURST_SEMAPHORES.setdefault(host, threading.Semaphore(
+            max(get_max_concurrent_bursts_per_host(), 1))) for host in sorted(set(hosts))]
+    for semaphore in semaphores:
+        semaphore.acquire()
+    try:
+        yield
+    finally:
+        for semaphore in reversed(semaphores):
+            semaphore.release()
 
 
 class PersistedNotificationException(EnvironError):
@@ -255,6 +292,7 @@ class CmSyncFlow(GenericFlow):
     FDD_CELL = "FDD"
     TEARDOWN_OBJECTS = []
     BURSTS = []
+    BURST_START_TIMES = []
     START_SLEEP_TIME = 0
 
     @property
@@ -339,13 +377,15 @@ class CmSyncFlow(GenericFlow):
         log.logger.debug("Attempting to send AVC Bursts on the notifications")
         try:
             self.BURSTS = []
+            self.BURST_START_TIMES = []
             self.create_and_execute_threads(workers=notifications, thread_count=24, args=[self],
                                             wait=self.SCHEDULE_SLEEP - 230, join=10)
-            chunk_size = len(self.BURSTS) / 12 if len(self.BURSTS) / 12 else 1
-            burst_chunks = [chunk for chunk in chunks(self.BURSTS, chunk_size)]
-            log.logger.debug("Total number of burst chunks: [{0}]".format(len(burst_chunks)))
-            self.create_and_execute_threads(workers=burst_chunks, func_ref=self.start_all_bursts,
-                                            thread_count=len(burst_chunks), args=[self])
+            burst_lanes = self.schedule_bursts_by_host(self.BURSTS)
+            log.logger.debug("Total number of burst lanes: [{0}]".format(len(burst_lanes)))
+            start_time = time.time()
+            self.create_and_execute_threads(workers=burst_lanes, func_ref=self.start_all_bursts,
+                                            thread_count=len(burst_lanes), args=[self])
+            self.log_burst_start_summary(start_time)
         except KeyboardInterrupt:
             elapsed = int(time.time() - self.START_SLEEP_TIME)
             if getattr(self, 'BURST_DURATION', None) and elapsed >= getattr(self, 'BURST_DURATION'):
@@ -419,6 +459,60 @@ class CmSyncFlow(GenericFlow):
                              "[{2}] Rate per second [{3}]. nothing to do.".format(ne_type, mo_name, num_nodes,
                                                                                   notification_rate))
 
+    @staticmethod
+    def get_burst_hosts(burst):
+        """
+        Get the NetSim hosts on which the burst will be started
+
+        :param burst: MCD or AVC burst object
+        :type burst: `netsim_operations.Burst`
+
+        :return: Sorted list of the NetSim hosts of the nodes of the burst, empty if not known
+        :rtype: list
+        """
+        node_groups = getattr(burst, "node_groups", None)
+        return sorted(set(host for sim_info in node_groups.values() for host, _, _ in sim_info)) if isinstance(
+            node_groups, dict) else []
+
+    def schedule_bursts_by_host(self, bursts):
+        """
+        Split the bursts into lanes, each lane to be started sequentially by a single thread, with the bursts of the
+        different NetSim hosts interleaved so that the lanes started together are spread across the hosts.
+        The limit on the bursts started at the same time on a host is applied as each burst is started.
+
+        :param bursts: List of MCD or AVC burst objects
+        :type bursts: list
+
+        :return: List of up to BURST_START_LANES lists of bursts
+        :rtype: list
+        """
+        bursts_per_host = {}
+        for burst in bursts:
+            bursts_per_host.setdefault(tuple(self.get_burst_hosts(burst)), []).append(burst)
+        host_bursts = [bursts_per_host.get(hosts) for hosts in sorted(bursts_per_host)]
+        interleaved = [burst_list[index] for index in range(max([len(_) for _ in host_bursts] or [0]))
+                       for burst_list in host_bursts if index < len(burst_list)]
+        num_lanes = min(BURST_START_LANES, len(interleaved))
+        log.logger.debug("Scheduled {0} bursts across {1} NetSim host group(s)."
+                         .format(len(bursts), len(bursts_per_host)))
+        return [interleaved[index::num_lanes] for index in range(num_lanes)]
+
+    def log_burst_start_summary(self, start_time):
+        """
+        Log how long it took for all of the bursts to be started, i.e. for the full notification load to be in effect
+
+        :param start_time: Time at which the starting of the bursts began
+        :type start_time: float
+        """
+        start_times = self.BURST_START_TIMES
+        if not start_times:
+            log.logger.debug("No {0} bursts were started.".format(self.BURST_TYPE))
+            return
+        log.logger.debug("Started {0}/{1} {2} bursts. First burst started after {3:.1f}s, full notification load in "
+                         "effect after {4:.1f}s.".format(len(start_times), len(self.BURSTS), self.BURST_TYPE,
+                                                         min(start_times) - start_time,
+                                                         max(start_times) - start_time))
+
     @staticmethod
     def start_all_bursts(bursts, profile):
         """
@@ -883,8 +977,11 @@ class CmSyncFlow(GenericFlow):
             num_failed_nodes = 0
             try:
                 log.logger.debug("Attempting to start burst command on NetSim.")
-                burst.start()
-                log.logger.debug("Burst command, started successfully.")
+                with host_burst_slots(self.get_burst_hosts(burst)):
+                    burst.start()
+                self.BURST_START_TIMES.append(time.time())
+                log.logger.debug("Burst command, started successfully. Bursts started: {0}/{1}."
+                                 .format(len(self.BURST_START_TIMES), len(self.BURSTS)))
                 self.TEARDOWN_OBJECTS.append(picklable_boundmethod(burst.stop))
             except FailedNetsimOperation as e:
                 num_failed_nodes += len(e.nodes)
@@ -616,24 +616,21 @@ class Netex04Flow(NetexCollectionFlow):
         while self.keep_running():
             log.logger.debug("Creating collection objects in each iteration to avoid "
                              "collection name conflicts."
-                             "Also creating a single file of MOs for both create and update "
-                             "collection from file scenarios in each iteration.")
-            collections = []
-            for i, user in enumerate(users):
-                collection = Collection(user=user,
-                                        name="{0}_collection_{1}_{2}".format(self.NAME,
-                                                                             arguments.get_random_string(size=8), i),
-                                        fdn_file_name="{0}_collection_file_{1}".format(self.NAME,
-                                                                                       "create_or_update"))
-                collections.append(collection)
-
+                             "Also querying the FDNs once in each iteration, shared by both create and update "
+                             "collection from file scenarios and their retries.")
             try:
-                collections[0].create_file()
-                log.logger.debug("Sleeping for 10 seconds after file is created.")
-                time.sleep(10)
+                fdns = Collection(user=users[0], name="{0}_fdns".format(self.NAME)).create_list_of_fdns()
             except Exception as e:
                 self.add_error_as_exception(e)
             else:
+                collections = []
+                for i, user in enumerate(users):
+                    collection = Collection(user=user, fdns=fdns,
+                                            name="{0}_collection_{1}_{2}".format(
+                                                self.NAME, arguments.get_random_string(size=8), i),
+                                            fdn_file_name="{0}_collection_file_{1}".format(self.NAME,
+                                                                                           "create_or_update"))
+                    collections.append(collection)
                 self.create_and_execute_threads(collections, len(collections), args=[self])
             self.cleanup_teardown()
             self.sleep()
@@ -672,7 +669,7 @@ class Netex04Flow(NetexCollectionFlow):
         """
         log.logger.debug("Attempting to create collection from file and view it's contents.")
         if not worker.exists:
-            worker.create_collection_from_file()
+            worker.create_collection_from_fdns()
             profile.teardown_list.append(worker)
             log.logger.debug("Sleeping for 10 seconds after collection is created from file.")
             time.sleep(10)
@@ -699,7 +696,7 @@ class Netex04Flow(NetexCollectionFlow):
         """
         log.logger.debug("Attempting to update collection from file and view it's contents.")
         if worker.exists:
-            worker.update_collection_from_file(replace='true')
+            worker.update_collection_from_fdns(replace='true')
             log.logger.debug("Sleeping for 10 seconds after collection is updated from file.")
             time.sleep(10)
             worker.get_collection_by_id(collection_id=worker.id,
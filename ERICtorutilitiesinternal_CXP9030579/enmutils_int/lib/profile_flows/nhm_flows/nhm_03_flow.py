@@ -180,6 +180,6 @@ class Nhm03(NhmFlowProfile):
             time.sleep(random.randint(1, 300))
             get_nhm_kpi_home(user=operator_user)
             kpi_index = random.randint(0, len(kpi_names) - 1)
-            NhmKpi.get_kpi_info(user=operator_user, name=kpi_names[kpi_index][0])
+            NhmKpi.get_kpi_info(user=operator_user, name=kpi_names[kpi_index][0], use_cache=False)
         except Exception as e:
             profile.add_error_as_exception(EnmApplicationError(e))
@@ -169,9 +169,8 @@ class ParMgt01Flow(GenericFlow):
             # and combine the output of getPosByPoIds
             for po_ids_chunk in chunks(po_ids, 250):
                 try:
-                    pos_response = get_pos_by_poids(users[0], po_ids_chunk,
-                                                    attributeMappings=ATTRIBUTE_MAPPINGS_DICT[gen])
-                    po_content = pos_response.json()
+                    po_content = get_pos_by_poids(users[0], po_ids_chunk,
+                                                  attributeMappings=ATTRIBUTE_MAPPINGS_DICT[gen])
                 except (HTTPError, ConnectionError) as e:
                     self.add_error_as_exception(
                         EnmApplicationError("Error in fetching persistent object data {0}".format(str(e))))
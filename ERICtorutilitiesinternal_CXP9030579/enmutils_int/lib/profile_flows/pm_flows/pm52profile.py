@@ -5,7 +5,6 @@ import time
 from functools import partial
 
 from enmutils.lib import log
-from enmutils.lib.enm_node import get_enm_network_element_sync_states
 from enmutils.lib.enm_user_2 import raise_for_status
 from enmutils.lib.exceptions import EnvironError, EnmApplicationError
 from enmutils_int.lib.enm_deployment import get_fdn_list_from_enm, get_pm_function_enabled_nodes
@@ -13,6 +12,7 @@ from enmutils_int.lib.helper_methods import generate_basic_dictionary_from_list_
 from enmutils_int.lib.node_security import check_sync_and_remove
 from enmutils_int.lib.profile_flows.common_flows.common_flow import GenericFlow
 from enmutils_int.lib.profile_flows.pm_flows.pmprofile import PmProfile
+from enmutils_int.lib.sync_state_cache import get_sync_states
 
 GET_ALL_ULSA_FDNS_URL = "pmul-service/rest/dps/node/{node_name}/ulsa/"
 START_ULSA_SAMPLING = "pmul-service/rest/command/start"
@@ -435,7 +435,7 @@ class Pm52Profile(PmProfile, GenericFlow):
         log.logger.debug("Number of RfPort MO's found: {0}".format(len(rfport_fdn_list)))
 
         log.logger.debug("Get list of all synchronized nodes in ENM")
-        enm_node_sync_states = get_enm_network_element_sync_states(user)
+        enm_node_sync_states = get_sync_states(user)
 
         log.logger.debug("Exclude non-synchronized nodes from all nodes allocated to profile at startup")
         synced_nodes = [node for node in nodes_list if enm_node_sync_states[node.node_id] == "SYNCHRONIZED"]
@@ -84,8 +84,7 @@ class TOP01Flow(GenericFlow):
         :rtype: dict
         """
         subnetwork_poids = [subnetwork_object["id"] for subnetwork_object in search["objects"]]
-        subnetwork_po_data = get_pos_by_poids(user, subnetwork_poids,
-                                              [{"moType": "SubNetwork", "attributeNames": []}]).json()
+        subnetwork_po_data = get_pos_by_poids(user, subnetwork_poids, [{"moType": "SubNetwork", "attributeNames": []}])
         return {subnw["poId"]: subnw["moName"] for subnw in subnetwork_po_data}
 
     @staticmethod
@@ -0,0 +1,599 @@
+# ********************************************************************
+# Name    : Profile Host
+# Summary : Optional execution mode in which lightweight profiles, that
+#           spend most of their lifetime sleeping, run as cooperative
+#           tasks inside a shared host daemon instead of a daemon each.
+#           Only one task runs at a time; a task yields when it sleeps
+#           between iterations, through the sleeps of the profile
+#           module, and is woken by the central timer wheel of the
+#           host. Each task keeps its own profile state, log file, pid
+#           file and persisted status, and the command line of the host
+#           lists the hosted profiles so that the pgrep based lookups of
+#           the profile processes still find them. Hosted profiles are
+#           stopped through requests to their host, never by signalling
+#           the shared host process, and memory is reported per host.
+# ********************************************************************
+
+import logging
+import logging.handlers
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from enmutils.lib import config, log, multitasking, mutexer, persistence, process, zygote
+from enmutils_int.lib import profile as profile_module
+
+HOSTS_KEY = "profile-hosts"
+HOSTS_MUTEX = "profile-hosts"
+HOST_IDENTIFIER = "PROFILE_HOST_{0}"
+HOSTED_PROFILE_KEY = "{0}_hosted"
+REQUESTS_KEY = "{0}-requests"
+STOP_REQUESTS_KEY = "{0}-stop-requests"
+HOST_PROPERTY = "use_profile_host"
+HOST_CATEGORIES_PROPERTY = "profile_host_categories"
+MAX_PROFILES_PER_HOST = 12
+TICK_SECS = 1
+WHEEL_SLOTS = 3600
+IDLE_EXIT_SECS = 60
+HANDOFF_EXPIRY_SECS = 30 * 60
+MEMORY_CHECK_SECS = 5 * 60
+PID_PATH = "/var/tmp/enmutils/daemon/{0}.pid"
+# Module level state of the profile module, which is specific to the profile running in the process
+PROFILE_CONTEXT = ["_loop_generator", "_iteration_number"]
+
+_running_task = None
+
+
+def is_hostable(profile):
+    """
+    Check if the profile is to be run by a profile host, i.e. the profile host mode is enabled and either the profile
+    is flagged as hostable or its category is configured to be hosted
+
+    :param profile: Profile to be started
+    :type profile: `enmutils_int.lib.profile.Profile`
+
+    :return: True if the profile is to be run by a profile host
+    :rtype: bool
+    """
+    if not (config.has_prop(HOST_PROPERTY) and str(config.get_prop(HOST_PROPERTY)).lower() == "true"):
+        return False
+    if not zygote.can_set_process_title():
+        log.logger.debug("The setproctitle module is not installed, profiles will not be run by profile hosts")
+        return False
+    categories = config.get_prop(HOST_CATEGORIES_PROPERTY) if config.has_prop(HOST_CATEGORIES_PROPERTY) else []
+    categories = [categories] if isinstance(categories, basestring) else categories
+    return bool(getattr(profile, "HOSTABLE", False)) or profile.application.upper() in [
+        category.upper() for category in categories if category]
+
+
+def get_host(profile):
+    """
+    Get the identifier of the profile host running the profile
+
+    :param profile: Profile
+    :type profile: `enmutils_int.lib.profile.Profile`
+
+    :return: Identifier of the profile host, or None if the profile is not hosted
+    :rtype: str or None
+    """
+    hosted_by = getattr(profile, "hosted_by", None)
+    return hosted_by if isinstance(hosted_by, basestring) else None
+
+
+def get_owner():
+    """
+    Get the hosted profile task which owns the current thread, i.e. the task of the task thread, or the task running
+    for any other thread, the threads started by a task running while the task runs
+
+    :return: Hosted profile task or None if the current thread does not belong to a task
+    :rtype: `HostedProfile` or None
+    """
+    thread = threading.current_thread()
+    return thread.hosted_owner if hasattr(thread, "hosted_owner") else _running_task
+
+
+class TimerWheel(object):
+
+    def __init__(self, resolution=TICK_SECS, num_slots=WHEEL_SLOTS):
+        """
+        Hashed timer wheel, holding the tasks to be woken at a given time in the slot of the tick of that time
+
+        :param resolution: Duration in seconds of a tick of the wheel
+        :type resolution: float
+        :param num_slots: Number of slots of the wheel, timers further away than a full turn stay until their round
+        :type num_slots: int
+        """
+        self.resolution = resolution
+        self.slots = [[] for _ in xrange(num_slots)]
+        self.current_tick = self._get_tick(time.time())
+        self.timers = {}
+
+    def _get_tick(self, timestamp):
+        return int(math.ceil(timestamp / self.resolution))
+
+    def __len__(self):
+        return len(self.timers)
+
+    def schedule(self, wake_time, item):
+        """
+        Schedule the item to be returned when the wheel is advanced past the wake time
+
+        :param wake_time: Time, in seconds since the epoch, at which the item is due
+        :type wake_time: float
+        :param item: Item to be scheduled, rescheduled if already scheduled
+        :type item: object
+        """
+        self.cancel(item)
+        tick = max(self._get_tick(wake_time), self.current_tick)
+        self.slots[tick % len(self.slots)].append((tick, item))
+        self.timers[item] = tick
+
+    def cancel(self, item):
+        """
+        Remove the item from the wheel, if scheduled
+
+        :param item: Scheduled item
+        :type item: object
+        """
+        tick = self.timers.pop(item, None)
+        if tick is not None:
+            self.slots[tick % len(self.slots)].remove((tick, item))
+
+    def advance(self, now=None):
+        """
+        Advance the wheel to the current time and return the items which are due, in order of their ticks
+
+        :param now: Current time in seconds since the epoch
+        :type now: float
+
+        :return: List of items due
+        :rtype: list
+        """
+        now_tick = self._get_tick(time.time() if now is None else now)
+        due = []
+        ticks = (xrange(self.current_tick, now_tick + 1) if now_tick - self.current_tick < len(self.slots) else
+                 xrange(now_tick - len(self.slots) + 1, now_tick + 1))
+        for tick in ticks:
+            slot = self.slots[tick % len(self.slots)]
+            expired = [timer for timer in slot if timer[0] <= now_tick]
+            for timer in expired:
+                slot.remove(timer)
+                del self.timers[timer[1]]
+            due.extend(expired)
+        self.current_tick = now_tick + 1
+        return [item for _, item in sorted(due, key=lambda timer: timer[0])]
+
+
+class HostedProfile(object):
+
+    def __init__(self, host, profile):
+        """
+        Cooperative task running a profile inside the profile host
+
+        :param host: Profile host running the task
+        :type host: `ProfileHost`
+        :param profile: Profile to be run
+        :type profile: `enmutils_int.lib.profile.Profile`
+        """
+        self.host = host
+        self.profile = profile
+        self.name = profile.NAME
+        self.resume = threading.Event()
+        self.stop_requested = False
+        self.finished = False
+        self.context = {"_loop_generator": None, "_iteration_number": 0}
+        self.log_handler = None
+        self.thread = threading.Thread(target=self.run, name=self.name)
+        self.thread.daemon = True
+        self.thread.hosted_owner = self
+        # Read by the sleeps of the profile module, so that the profile yields to the other tasks when it sleeps
+        self.thread.hosted_sleep = host.sleep
+
+    def run(self):
+        """
+        Run the profile, once first scheduled by the host, isolating the host from any failure of the profile
+        """
+        self.resume.wait()
+        try:
+            self.profile()
+        except BaseException as e:
+            log.logger.debug("Hosted profile {0} exited abnormally: {1}".format(self.name, str(e)))
+        finally:
+            self.finished = True
+            self.host.yielded.set()
+
+    def save_context(self):
+        """
+        Save the module level state of the profile module belonging to this profile
+        """
+        self.context = {name: getattr(profile_module, name) for name in PROFILE_CONTEXT}
+
+    def restore_context(self):
+        """
+        Restore the module level state of the profile module belonging to this profile
+        """
+        for name, value in self.context.iteritems():
+            setattr(profile_module, name, value)
+
+    def check_stop_requested(self):
+        """
+        Interrupt the profile if a stop has been requested, as done by the SIGINT sent to a profile daemon
+
+        :raises KeyboardInterrupt: if a stop of the profile has been requested
+        """
+        if self.stop_requested:
+            self.stop_requested = False
+            raise KeyboardInterrupt
+
+
+class _OwnerLogFilter(logging.Filter):
+
+    def __init__(self, owner):
+        """
+        Filter passing the log records of the threads belonging to the owner task, or to no task if no owner
+
+        :param owner: Hosted profile task or None
+        :type owner: `HostedProfile` or None
+        """
+        super(_OwnerLogFilter, self).__init__()
+        self.owner = owner
+
+    def filter(self, record):
+        return get_owner() is self.owner
+
+
+class ProfileHost(object):
+
+    def __init__(self, identifier, resolution=TICK_SECS, idle_exit_secs=IDLE_EXIT_SECS):
+        """
+        Host process running profiles as cooperative tasks
+
+        :param identifier: Identifier of the host
+        :type identifier: str
+        :param resolution: Duration in seconds of a tick of the timer wheel
+        :type resolution: float
+        :param idle_exit_secs: Number of seconds the host runs without any profile before exiting
+        :type idle_exit_secs: int
+        """
+        self.identifier = identifier
+        self.resolution = resolution
+        self.idle_exit_secs = idle_exit_secs
+        self.wheel = TimerWheel(resolution)
+        self.ready = deque()
+        self.tasks = {}
+        self.yielded = threading.Event()
+        self.title = list(sys.argv[:3])
+        self.last_active = time.time()
+        self.registered_profiles = None
+        self.rss = 0
+        self.last_memory_check = 0
+
+    def sleep(self, secs):
+        """
+        Sleep of the hosted profiles: a task yields to the other tasks until woken by the timer wheel, any other
+        thread sleeps as usual
+
+        :param secs: Number of seconds to sleep
+        :type secs: float
+        """
+        task = get_owner()
+        if task is None or task.thread is not threading.current_thread():
+            time.sleep(secs)
+            return
+        task.check_stop_requested()
+        self.wheel.schedule(time.time() + secs, task)
+        task.resume.clear()
+        self.yielded.set()
+        task.resume.wait()
+        task.check_stop_requested()
+
+    def _switch_to(self, task):
+        """
+        Run the task until it sleeps or finishes
+
+        :param task: Hosted profile task
+        :type task: `HostedProfile`
+        """
+        global _running_task
+        task.restore_context()
+        self.yielded.clear()
+        _running_task = task
+        try:
+            task.resume.set()
+            self.yielded.wait()
+        finally:
+            _running_task = None
+        task.save_context()
+
+    def add(self, profile):
+        """
+        Add the profile as a task of the host, with its own pid file and log file
+
+        :param profile: Profile to be run
+        :type profile: `enmutils_int.lib.profile.Profile`
+        """
+        task = HostedProfile(self, profile)
+        profile.hosted_by = self.identifier
+        with open(PID_PATH.format(task.name), "w+") as pid_file:
+            pid_file.write("{0}\n".format(os.getpid()))
+        log_dir = os.path.join(config.get_log_dir(), "daemon")
+        task.log_handler = logging.handlers.WatchedFileHandler(os.path.join(log_dir, task.name.lower() + ".log"))
+        task.log_handler.setFormatter(log.LogFormatter("%(asctime)s %(levelname)s %(message)s"))
+        task.log_handler.addFilter(_OwnerLogFilter(task))
+        log.logger.addHandler(task.log_handler)
+        self.tasks[task.name] = task
+        task.thread.start()
+        self.ready.append(task)
+        log.logger.debug("Hosting profile {0}".format(task.name))
+
+    def remove(self, task):
+        """
+        Remove the finished task from the host
+
+        :param task: Hosted profile task
+        :type task: `HostedProfile`
+        """
+        self.tasks.pop(task.name, None)
+        self.wheel.cancel(task)
+        log.logger.removeHandler(task.log_handler)
+        task.log_handler.close()
+        if os.path.exists(PID_PATH.format(task.name)):
+            os.remove(PID_PATH.format(task.name))
+        log.logger.debug("Profile {0} is no longer hosted".format(task.name))
+
+    def request_stop(self, name):
+        """
+        Interrupt the hosted profile, waking it if sleeping
+
+        :param name: Name of the profile
+        :type name: str
+        """
+        task = self.tasks.get(name)
+        if task and not task.finished:
+            task.stop_requested = True
+            if task not in self.ready:
+                self.wheel.cancel(task)
+                self.ready.append(task)
+
+    def process_requests(self):
+        """
+        Take the profiles handed to the host and the stop requests of its profiles, and update the registration of the
+        host, the shared mutex only being taken if there are requests or the registration is out of date
+
+        :return: True if the host is to keep running, i.e. it has profiles or was recently active
+        :rtype: bool
+        """
+        request_keys = [REQUESTS_KEY.format(self.identifier), STOP_REQUESTS_KEY.format(self.identifier)]
+        keep_running = bool(self.tasks) or time.time() - self.last_active < self.idle_exit_secs
+        if (keep_running and self.registered_profiles == sorted(self.tasks) and
+                not any(persistence.has_key(key) for key in request_keys)):
+            return True
+        with mutexer.mutex(HOSTS_MUTEX, persisted=True):
+            names, stop_names = [persistence.get(key) or [] for key in request_keys]
+            for key in request_keys:
+                persistence.remove(key)
+            for name in names:
+                profile = persistence.get(HOSTED_PROFILE_KEY.format(name))
+                persistence.remove(HOSTED_PROFILE_KEY.format(name))
+                if profile and name not in self.tasks:
+                    self.add(profile)
+            for name in stop_names:
+                self.request_stop(name)
+            hosts = persistence.get(HOSTS_KEY) or {}
+            if self.tasks or names or keep_running:
+                self.registered_profiles = sorted(self.tasks)
+                hosts[self.identifier] = {"pid": os.getpid(), "profiles": self.registered_profiles, "time": time.time(),
+                                          "rss": self.rss}
+            else:
+                hosts.pop(self.identifier, None)
+            persistence.set(HOSTS_KEY, hosts, -1)
+            return self.identifier in hosts
+
+    def check_memory_usage(self):
+        """
+        Measure the RSS memory usage of the host, shared by all of its profiles, at most once per check interval, and
+        have it included in the registration of the host
+        """
+        if time.time() - self.last_memory_check < MEMORY_CHECK_SECS:
+            return
+        self.last_memory_check = time.time()
+        self.rss = process.get_current_rss_memory_for_current_process()
+        log.logger.debug("Profile host {0} RSS memory usage: {1} MB, hosting {2} profile(s)"
+                         .format(self.identifier, self.rss / 1024, len(self.tasks)))
+        self.registered_profiles = None
+
+    def update_title(self):
+        """
+        Set the command line of the host to include the name of each hosted profile, as in the profile daemon command
+        """
+        title = self.title + [word for name in sorted(self.tasks) for word in (name, name.lower())]
+        if not zygote.set_process_title(title):
+            log.logger.debug("Failed to list the hosted profiles in the command line of the host")
+
+    def run_tasks(self):
+        """
+        Run the tasks which are due, until none is ready
+        """
+        self.ready.extend(task for task in self.wheel.advance() if task not in self.ready)
+        while self.ready:
+            task = self.ready.popleft()
+            if not task.finished:
+                self._switch_to(task)
+            if task.finished:
+                self.remove(task)
+                self.update_title()
+            self.ready.extend(task for task in self.wheel.advance() if task not in self.ready)
+
+    def run(self):
+        """
+        Run the hosted profiles until none remain and no profile has been handed to the host for the idle period
+        """
+        host_handlers = list(log.logger.handlers)
+        host_filter = _OwnerLogFilter(None)
+        for handler in host_handlers:
+            handler.addFilter(host_filter)
+        threading.current_thread().hosted_owner = None
+        self.last_active = time.time()
+        try:
+            while True:
+                try:
+                    num_tasks = len(self.tasks)
+                    self.check_memory_usage()
+                    if not self.process_requests():
+                        break
+                    if len(self.tasks) != num_tasks:
+                        self.update_title()
+                    self.run_tasks()
+                    if self.tasks:
+                        self.last_active = time.time()
+                    time.sleep(self.resolution)
+                except KeyboardInterrupt:
+                    log.logger.debug("Profile host interrupted, stopping all hosted profiles")
+                    for name in list(self.tasks):
+                        self.request_stop(name)
+        finally:
+            del threading.current_thread().hosted_owner
+            for handler in host_handlers:
+                handler.removeFilter(host_filter)
+        log.logger.debug("Profile host {0} exiting, no profiles left to run".format(self.identifier))
+
+
+class ProfileHostDaemon(multitasking.UtilitiesDaemon):
+    """
+    Daemon of the profile host
+    """
+    use_zygote = True
+
+    def __init__(self, identifier):
+        """
+        :param identifier: Identifier of the host
+        :type identifier: str
+        """
+        super(ProfileHostDaemon, self).__init__(identifier, run_host, args=[identifier],
+                                                log_identifier=identifier.lower())
+
+
+def run_host(identifier):
+    """
+    Run the profile host, the target of the profile host daemon
+
+    :param identifier: Identifier of the host
+    :type identifier: str
+    """
+    ProfileHost(identifier).run()
+
+
+def _get_hosts():
+    """
+    Get the registered profile hosts, removing any host no longer running
+
+    :return: Dictionary of host identifier to dictionary of pid, hosted profile names, registration time and RSS
+            memory usage (kB)
+    :rtype: dict
+    """
+    hosts = persistence.get(HOSTS_KEY) or {}
+    for identifier, host in hosts.items():
+        if (host["pid"] and not os.path.exists("/proc/{0}".format(host["pid"])) or
+                not host["pid"] and time.time() - host["time"] > HANDOFF_EXPIRY_SECS):
+            log.logger.debug("Profile host {0} is no longer running".format(identifier))
+            del hosts[identifier]
+    return hosts
+
+
+def add_profile(profile):
+    """
+    Hand the profile to a running profile host with spare capacity, starting a new host if none
+
+    :param profile: Profile to be started
+    :type profile: `enmutils_int.lib.profile.Profile`
+
+    :return: Identifier of the profile host
+    :rtype: str
+    """
+    with mutexer.mutex(HOSTS_MUTEX, persisted=True):
+        hosts = _get_hosts()
+        identifier = next((identifier for identifier, host in sorted(hosts.iteritems())
+                           if len(host["profiles"]) < MAX_PROFILES_PER_HOST), None)
+        start_host = identifier is None
+        if start_host:
+            identifier = next(HOST_IDENTIFIER.format(index) for index in xrange(1, len(hosts) + 2)
+                              if HOST_IDENTIFIER.format(index) not in hosts)
+            hosts[identifier] = {"pid": None, "profiles": [], "time": time.time()}
+        hosts[identifier]["profiles"].append(profile.NAME)
+        persistence.set(HOSTED_PROFILE_KEY.format(profile.NAME), profile, HANDOFF_EXPIRY_SECS)
+        requests = persistence.get(REQUESTS_KEY.format(identifier)) or []
+        persistence.set(REQUESTS_KEY.format(identifier), requests + [profile.NAME], HANDOFF_EXPIRY_SECS)
+        persistence.set(HOSTS_KEY, hosts, -1)
+    if start_host:
+        ProfileHostDaemon(identifier).start()
+    log.logger.debug("Profile {0} handed to profile host {1}".format(profile.NAME, identifier))
+    return identifier
+
+
+def get_memory_usage():
+    """
+    Get the RSS memory usage of each running profile host, which is shared by the profiles of the host
+
+    :return: Dictionary of host identifier to tuple of RSS memory usage (kB) and hosted profile names
+    :rtype: dict
+    """
+    return {identifier: (host.get("rss", 0), host["profiles"]) for identifier, host in _get_hosts().iteritems()}
+
+
+def get_hosting_host(profile_name):
+    """
+    Get the identifier of the running profile host registered as hosting the profile
+
+    :param profile_name: Name of the profile
+    :type profile_name: str
+
+    :return: Identifier of the profile host, or None if the profile is not hosted
+    :rtype: str or None
+    """
+    return next((identifier for identifier, host in sorted(_get_hosts().iteritems())
+                 if profile_name in host["profiles"]), None)
+
+
+def _add_stop_request(identifier, profile_name):
+    """
+    Request the profile host to stop the profile
+
+    :param identifier: Identifier of the profile host
+    :type identifier: str
+    :param profile_name: Name of the profile
+    :type profile_name: str
+    """
+    stop_key = STOP_REQUESTS_KEY.format(identifier)
+    with mutexer.mutex(HOSTS_MUTEX, persisted=True):
+        persistence.set(stop_key, (persistence.get(stop_key) or []) + [profile_name], HANDOFF_EXPIRY_SECS)
+    log.logger.debug("Requested profile host {0} to stop profile {1}".format(identifier, profile_name))
+
+
+def request_stop(profile):
+    """
+    Request the profile host running the profile to stop the profile
+
+    :param profile: Hosted profile
+    :type profile: `enmutils_int.lib.profile.Profile`
+    """
+    _add_stop_request(get_host(profile), profile.NAME)
+
+
+def stop_hosted_profile(profile_name):
+    """
+    Request the profile host hosting the profile, if any, to stop the profile, instead of signalling the host process
+    shared with the other hosted profiles
+
+    :param profile_name: Name of the profile
+    :type profile_name: str
+
+    :return: Identifier of the profile host requested to stop the profile, or None if the profile is not hosted
+    :rtype: str or None
+    """
+    identifier = get_hosting_host(profile_name)
+    if identifier:
+        _add_stop_request(identifier, profile_name)
+    return identifier
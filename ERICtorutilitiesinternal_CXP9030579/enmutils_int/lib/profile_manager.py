@@ -13,7 +13,7 @@ import time
 from enmutils.lib import cache, config, filesystem, log, multitasking, persistence, shell, mutexer, process
 from enmutils.lib.exceptions import EnvironError, NoNodesAvailable, ProfileAlreadyRunning
 from enmutils.lib.multitasking import UtilitiesDaemon
-from enmutils_int.lib import node_pool_mgr, profile
+from enmutils_int.lib import node_pool_mgr, profile, allocation_planner, profile_host
 from enmutils_int.lib.services import nodemanager_adaptor
 
 
@@ -112,7 +112,9 @@ class ProfileManager(object):
         """
         log.logger.debug("Allocation of nodes to profile (if applicable)")
         if self._profile_requires_nodes():
-            if not self.profile.EXCLUSIVE:
+            if self._planned_nodes_allocated():
+                log.logger.debug("Nodes already allocated to profile by the allocation planner")
+            elif not self.profile.EXCLUSIVE:
                 log.logger.debug("Allocation of nodes to non-exclusive profile")
                 self.nodes_mgr.allocate_nodes(self.profile)
             else:
@@ -122,6 +124,24 @@ class ProfileManager(object):
         else:
             log.logger.debug("The profile {0} is not dependent on nodes".format(self.profile))
 
+    def _planned_nodes_allocated(self):
+        """
+        Check if the nodes planned for the profile at workload start are still allocated to it
+
+        :return: Boolean indicating if the planned nodes are allocated to the profile
+        :rtype: bool
+        """
+        planned_node_count = allocation_planner.pop_planned_allocation(self.profile.NAME)
+        if not planned_node_count:
+            return False
+        allocated_node_count = len(self.profile.get_nodes_list_by_attribute(node_attributes=["node_id"]))
+        log.logger.debug("Nodes planned for profile: {0}, currently allocated: {1}"
+                         .format(planned_node_count, allocated_node_count))
+        if allocated_node_count != planned_node_count:
+            return False
+        self.profile.num_nodes = allocated_node_count
+        return True
+
     def _exclusive_profile_nodes_allocated(self):
         """
         Check if the profile already has all of its required nodes allocated
@@ -253,6 +273,10 @@ class ProfileManager(object):
             count += 1
             if count % 60 == 0:
                 log.logger.info("{0} stop initiation still in progress.".format(self.profile.NAME))
+        if profile_host.get_host(self.profile):
+            log.logger.debug("Hosted profile has not yet responded to the stop request, profile host {0} will stop it "
+                             "when the profile next sleeps".format(profile_host.get_host(self.profile)))
+            return
         log.logger.debug("Profile has failed to respond to Keyboard Interrupt - terminating processes")
         process.kill_pid(self.profile.pid, signal.SIGKILL)
         log.logger.debug("Now attempting to initiate the stop profile daemon")
@@ -262,6 +286,15 @@ class ProfileManager(object):
         """
         Starts a profile.
         """
+        self.profile.hosted_by = None
+        if profile_host.is_hostable(self.profile):
+            ProfileDaemon.check_for_existing_process(self.profile.NAME)
+            host_identifier = profile_host.add_profile(self.profile)
+            log.logger.info(log.green_text(
+                "Successfully initiated the profile {0} in profile host {1}.\nYou may watch/tail the logs to view it's "
+                "progress located: {2}/daemon/{3}.log".format(self.profile.NAME.upper(), host_identifier,
+                                                              config.get_log_dir(), self.profile.NAME.lower())))
+            return
 
         daemon = ProfileDaemon(
             self.profile.NAME, self.profile, log_identifier=self.profile.NAME)
@@ -281,7 +314,9 @@ class ProfileManager(object):
         if (isinstance(self.profile, profile.CMImportProfile) and
                 (not self.profile.EXCLUSIVE or (self.profile.EXCLUSIVE and self.release_nodes))):
             persistence.remove('%s-mos' % self.profile.NAME)
-        if self.profile.running:
+        if self.profile.running and profile_host.get_host(self.profile):
+            profile_host.request_stop(self.profile)
+        elif self.profile.running:
             log.logger.debug("Profile processes are still running")
             process.kill_spawned_process(self.profile.NAME, self.profile.pid)
             log.logger.debug("Initiating teardown in running profile by sending interrupt (SIGINT) to profile "
@@ -300,7 +335,10 @@ class ProfileManager(object):
         Kills the profile PID, removes the PID file and removes the profile from persistence.
         """
         try:
-            process.kill_process_id(self.profile.pid, signal.SIGINT)
+            if profile_host.get_host(self.profile):
+                profile_host.request_stop(self.profile)
+            else:
+                process.kill_process_id(self.profile.pid, signal.SIGINT)
         except Exception as e:
             log.logger.debug("Failed to kill pid, may have already been killed, continuing teardown: {0}"
                              .format(e.message))
@@ -312,6 +350,7 @@ class ProfileDaemon(UtilitiesDaemon):
     """
     Overrides Utilities daemon to store the pid on the remote MS instead of local host
     """
+    use_zygote = True
 
     def __init__(self, identifier, profile, *args, **kwargs):
         """
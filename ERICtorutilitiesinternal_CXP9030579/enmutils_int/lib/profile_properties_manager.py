@@ -20,16 +20,19 @@ from enmutils_int.lib.workload_network_manager import InputData
 
 class ProfilePropertiesManager(object):
 
-    def __init__(self, profile_names, config_file=None):
+    def __init__(self, profile_names, config_file=None, network_config=None):
         """
         Manages the extraction of properties from a config file and the profile_values.py.
         :param profile_names: list of profile names
         :type profile_names: list
         :param config_file: config file supplied by the user
         :type config_file: str
+        :param network_config: Specific network configuration mapping to use
+        :type network_config: str
         """
         self.profile_names = profile_names
         self.config_file = self._load_config_file(config_file) if config_file else None
+        self.network_config = network_config
 
     @property
     def current_day(self):
@@ -78,7 +81,7 @@ class ProfilePropertiesManager(object):
         profile_names = []
 
         profile_objs = load_mgr.get_profile_objects_from_profile_names(self.profile_names)
-        config_data = InputData()
+        config_data = InputData(network_config=self.network_config)
         if config_data.pool:
             for profile_obj in profile_objs:
                 profile_name = profile_obj.NAME
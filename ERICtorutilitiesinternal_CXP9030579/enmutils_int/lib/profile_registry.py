@@ -0,0 +1,309 @@
+# ********************************************************************
+# Name    : Profile Registry
+# Summary : Precomputed registry of workload profiles, generated at
+#           build time from the network configuration values, so
+#           the read-only operations of the workload tool can list,
+#           categorise and describe the profiles, from their module,
+#           category, priority, supported flags and node
+#           requirements per network size, without importing the
+#           profile modules, the network values or the operations.
+#           Also provides the import time benchmark recorded for
+#           each release of the package.
+# ********************************************************************
+
+import glob
+import json
+import os
+import pkgutil
+import re
+import subprocess
+import sys
+import time
+
+from enmutils.lib import log
+
+ENMUTILS_INT_PATH = pkgutil.get_loader('enmutils_int').filename
+REGISTRY_FILE = os.path.join(ENMUTILS_INT_PATH, 'etc', 'profile_registry.json')
+NETWORK_CONFIGURATIONS_PATH = os.path.join(ENMUTILS_INT_PATH, 'lib', 'nrm_default_configurations')
+WORKLOAD_PATH = os.path.join(ENMUTILS_INT_PATH, 'lib', 'workload')
+WORKLOAD_MODULE = "enmutils_int.lib.workload.{0}"
+SUPPORTED_FLAGS = ['SUPPORTED', 'PHYSICAL_SUPPORTED', 'CLOUD_SUPPORTED', 'CLOUD_NATIVE_SUPPORTED', 'INTRUSIVE',
+                   'EXCLUSIVE', 'FOUNDATION', 'RETAIN_NODES_AFTER_COMPLETED']
+NODE_REQUIREMENT_KEYS = ['NUM_NODES', 'SUPPORTED_NODE_TYPES', 'TOTAL_NODES', 'EXCLUDE_NODES_FROM', 'NODE_FILTER',
+                         'NODES_PER_HOST']
+TERE_LINK = "https://eteamspace.internal.ericsson.com/pages/viewpage.action?pageId=1982554551"
+BENCHMARK_MODULES = ["enmutils_int.lib.profile_registry", "enmutils_int.bin.workload",
+                     "enmutils_int.lib.nrm_default_configurations.profile_values", "enmutils_int.lib.workload_ops",
+                     "enmutils_int.lib.load_mgr"]
+BENCHMARK_REPEAT = 3
+
+_REGISTRY = {}
+
+
+def get_category(profile_name):
+    """
+    Get the workload category of the given profile
+
+    :param profile_name: Name of the profile
+    :type profile_name: str
+
+    :return: Category of the profile
+    :rtype: str
+    """
+    profile_name = profile_name.lower()
+    if re.search(r'\d+$', profile_name) and not re.search(r'setup', profile_name):
+        return re.split(r'_\d{1,2}', profile_name)[0]
+    return profile_name.split('_')[0]
+
+
+def get_source_checksum():
+    """
+    Get the signature of the network configuration sources from which the registry is built, from the size and
+    modification time of each source rather than its contents, so that checking the registry is up to date is cheap
+
+    :return: Signature of the network configuration modules
+    :rtype: str
+    """
+    signature = []
+    for file_path in sorted(glob.glob(os.path.join(NETWORK_CONFIGURATIONS_PATH, '*.py'))):
+        stat = os.stat(file_path)
+        signature.append("{0}:{1}:{2}".format(os.path.basename(file_path), stat.st_size, int(stat.st_mtime)))
+    return ",".join(signature)
+
+
+def build_registry(networks=None):
+    """
+    Build the profile registry from the profiles of the basic network configuration, with the node requirements of
+    each profile in the other network configurations
+
+    :param networks: Dictionary of network configuration values, defaults to the profile values of the package
+    :type networks: dict
+
+    :return: Dictionary containing the signature of the sources and the registry entry of each profile
+    :rtype: dict
+    """
+    if networks is None:
+        from enmutils_int.lib.nrm_default_configurations.profile_values import networks
+    profiles = {}
+    for app, app_profiles in networks.get('basic', {}).iteritems():
+        for profile_name, values in app_profiles.iteritems():
+            module_name = profile_name.lower()
+            profiles[profile_name.upper()] = {
+                "module": (WORKLOAD_MODULE.format(module_name)
+                           if os.path.isfile(os.path.join(WORKLOAD_PATH, "{0}.py".format(module_name))) else None),
+                "app": app,
+                "category": get_category(profile_name),
+                "priority": values.get('PRIORITY'),
+                "supported": {flag: values[flag] for flag in SUPPORTED_FLAGS if flag in values},
+                "node_requirements": {},
+                "basic_values": values}
+    for network_name, network in networks.iteritems():
+        if network_name == 'basic':
+            continue
+        for app_profiles in network.itervalues():
+            for profile_name, values in app_profiles.iteritems():
+                requirements = {key: values[key] for key in NODE_REQUIREMENT_KEYS if key in values}
+                if requirements and profile_name.upper() in profiles:
+                    profiles[profile_name.upper()]["node_requirements"][network_name] = requirements
+    return {"source_checksum": get_source_checksum(), "profiles": profiles}
+
+
+def generate_registry_file(path_to_save=REGISTRY_FILE):
+    """
+    Generate the profile registry file
+
+    :param path_to_save: Absolute path of the file to be written
+    :type path_to_save: str
+
+    :return: Number of profiles written to the registry file
+    :rtype: int
+    """
+    registry = build_registry()
+    with open(path_to_save, 'w') as registry_file:
+        json.dump(registry, registry_file, sort_keys=True)
+    return len(registry["profiles"])
+
+
+def _read_registry_file():
+    """
+    Read the generated profile registry file, if available
+
+    :return: Dictionary containing the generated registry or None if the file could not be read
+    :rtype: dict
+    """
+    try:
+        with open(REGISTRY_FILE) as registry_file:
+            return json.load(registry_file)
+    except (IOError, ValueError) as e:
+        log.logger.debug("Unable to read profile registry file {0}: {1}".format(REGISTRY_FILE, str(e)))
+
+
+def load_registry():
+    """
+    Load the profile registry, building it from the network configuration values if the generated file is missing or
+    no longer matches the network configuration sources
+
+    :return: Dictionary of profile name to registry entry
+    :rtype: dict
+    """
+    if not _REGISTRY:
+        registry = _read_registry_file()
+        if not registry or registry.get("source_checksum") != get_source_checksum():
+            log.logger.debug("Profile registry file not available or out of date, building registry from the network "
+                             "configuration values.")
+            registry = build_registry()
+        _REGISTRY.update(registry["profiles"])
+    return _REGISTRY
+
+
+def clear_registry():
+    """
+    Clear the loaded profile registry, so that it is reloaded on next use
+    """
+    _REGISTRY.clear()
+
+
+def get_profile_entry(profile_name):
+    """
+    Get the registry entry for the given profile
+
+    :param profile_name: Name of the profile
+    :type profile_name: str
+
+    :return: Registry entry of the profile or None if the profile is not known
+    :rtype: dict
+    """
+    return load_registry().get(profile_name.upper())
+
+
+def get_all_profile_names():
+    """
+    Returns the profiles in the registry
+
+    :rtype: list
+    :return: A sorted list of all profile names, in lower case
+    """
+    return sorted(profile_name.lower() for profile_name in load_registry())
+
+
+def get_categories():
+    """
+    Gets all of the valid workload categories
+
+    :rtype: list
+    :returns: Sorted list of all valid categories
+    """
+    return sorted(set(entry["category"] for entry in load_registry().itervalues()))
+
+
+def _encode(value):
+    """
+    Encode the unicode strings read from the registry file, so that values are displayed as defined in the network
+    configuration
+
+    :param value: Value read from the registry file
+    :type value: object
+
+    :return: Value with all unicode strings encoded
+    :rtype: object
+    """
+    if isinstance(value, dict):
+        return {_encode(key): _encode(item) for key, item in value.iteritems()}
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    return value.encode('utf-8') if isinstance(value, unicode) else value
+
+
+def print_profile_description(profile_name):
+    """
+    Print a link to the latest ENM TERE in order to find profile description.
+
+    :param profile_name: name of the profile
+    :type profile_name: str
+
+    :returns: Link to the latest ENM TERE
+    :rtype: str
+    """
+    primary_message = '\n Description of the profile: {0}: \n'.format(profile_name.upper())
+    log.logger.info(log.cyan_text(primary_message))
+    secondary_message = "\n Please refer to the latest ENM TERE at: \n {0} \n ".format(TERE_LINK)
+    log.logger.info(secondary_message)
+    return log.cyan_text(primary_message) + secondary_message
+
+
+def print_basic_network_values(profile_name):
+    """
+    Print the profile values from basic_network.py
+
+    :param profile_name: name of the profile to print the basic network values of
+    :type profile_name: str
+
+    :returns: Basic network values of the matching profile
+    :rtype: str
+    """
+    entry = get_profile_entry(profile_name)
+    primary_message = '\n Basic network values for {0}: \n'.format(profile_name.upper())
+    log.logger.info(log.cyan_text(primary_message))
+    secondary_message = '{0}\n'.format(_encode(entry["basic_values"]) if entry else None)
+    log.logger.info(secondary_message)
+    return log.cyan_text(primary_message) + secondary_message
+
+
+def benchmark_imports(modules=None, repeat=BENCHMARK_REPEAT):
+    """
+    Measure the time taken to import each of the given modules in a new interpreter
+
+    :param modules: List of module names to be imported, defaults to the modules used by the workload tool
+    :type modules: list
+    :param repeat: Number of imports of each module, the fastest being recorded
+    :type repeat: int
+
+    :return: Dictionary of module name to import time in seconds
+    :rtype: dict
+    """
+    import_times = {}
+    for module in modules or BENCHMARK_MODULES:
+        timings = []
+        for _ in xrange(repeat):
+            start_time = time.time()
+            subprocess.check_call([sys.executable, "-c", "import {0}".format(module)])
+            timings.append(time.time() - start_time)
+        import_times[module] = round(min(timings), 3)
+    return import_times
+
+
+def _print_help():
+    print """
+    Supported options
+     --generate     Generate the profile registry file
+     --benchmark    Record the import time of the modules used by the workload tool
+     --version=<version-that-the-benchmark-is-recorded-against.Usually-the-rpm-version>
+     --path-to-save=<absolute-path-to-new-file>
+
+     Example:
+       profile_registry.py --generate
+       profile_registry.py --benchmark --version=4.34.32 --path-to-save=/tmp/workload_import_times_4.34.32.json
+
+       If '--path-to-save' is not specified with '--generate', the registry file is written to:
+       enmutils_int/etc/profile_registry.json
+     """
+
+
+def cli():
+    if '--help' in sys.argv:
+        _print_help()
+
+    path_to_save = ''.join([p.split('=')[1] for p in sys.argv if p.startswith('--path-to-save=')])
+    if '--generate' in sys.argv:
+        print "Profiles written to registry: {0}".format(generate_registry_file(path_to_save or REGISTRY_FILE))
+    elif '--benchmark' in sys.argv:
+        version = ''.join([v.split('=')[1] for v in sys.argv if v.startswith('--version=')]) or 'not_specified'
+        benchmark = json.dumps({"version": version, "import_times": benchmark_imports()}, sort_keys=True)
+        if path_to_save:
+            with open(path_to_save, 'w') as benchmark_file:
+                benchmark_file.write(benchmark)
+        print benchmark
+
+
+if __name__ == '__main__':  # pragma: no cover
+    cli()
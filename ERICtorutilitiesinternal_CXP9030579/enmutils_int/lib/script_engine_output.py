@@ -0,0 +1,199 @@
+# ********************************************************************
+# Name    : Script Engine Output
+# Summary : Shared parsing of script engine command output. Provides
+#           single pass parsing of tabular (-t) output, either as a
+#           dictionary per row or as a list of values per column, and
+#           extraction of the FDNs from "FDN : <fdn>" output.
+#           Also provides the parsing benchmark used to compare the
+#           throughput of the parsers on large outputs.
+# ********************************************************************
+
+import time
+from itertools import izip
+
+FDN_PREFIX = "FDN"
+PADDING_CHARACTERS = " \t\r"
+BENCHMARK_ROWS = 100000
+BENCHMARK_REPEAT = 3
+BENCHMARK_HEADERS = ["Node Name", "Enroll State", "Enroll Info", "Subject", "Serial Number", "Issuer"]
+
+
+def _has_padded_values(output, separator):
+    """
+    Check if any of the values in the output are padded with whitespace, using substring searches of the whole output
+
+    :param output: Script engine response output, or part thereof
+    :type output: list
+    :param separator: String used as field separator
+    :type separator: str
+
+    :return: True if any value needs to be stripped of whitespace
+    :rtype: bool
+    """
+    text = "\n".join(output)
+    padding_characters = PADDING_CHARACTERS.replace(separator, "") if len(separator) == 1 else PADDING_CHARACTERS
+    if text[:1] in padding_characters or text[-1:] in padding_characters:
+        return bool(text)
+    return any(padded in text for character in padding_characters
+               for padded in (character + separator, separator + character, "\n" + character, character + "\n"))
+
+
+def split_tabular_rows(output, skip=None, separator='\t', borders=False, num_columns=None):
+    """
+    Split each row of the script engine tabular output into its list of values
+
+    :param output: Script engine response output, or part thereof
+    :type output: list
+    :param skip: Text row to be skipped
+    :type skip: str
+    :param separator: String to be used as field separator
+    :type separator: str
+    :param borders: Flag to enable removal of any trailing/leading occurrence of separator
+    :type borders: bool
+    :param num_columns: Number of values a row must contain to be returned, all rows returned if not supplied
+    :type num_columns: int
+
+    :return: List containing the list of the stripped values of each non empty row
+    :rtype: list
+    """
+    lines = [line.strip(separator) if borders else line for line in output if line and line != skip]
+    if _has_padded_values(lines, separator):
+        rows = [[value.strip() for value in line.split(separator)] for line in lines]
+    else:
+        rows = [line.split(separator) for line in lines]
+    return rows if num_columns is None else [values for values in rows if len(values) == num_columns]
+
+
+def get_tabular_headers(output, header_line=0, separator='\t', borders=False):
+    """
+    Get the column headers of the script engine tabular output
+
+    :param output: Script engine response output
+    :type output: list
+    :param header_line: Index of the line containing the column headers
+    :type header_line: int
+    :param separator: String to be used as field separator
+    :type separator: str
+    :param borders: Flag to enable removal of any trailing/leading occurrence of separator
+    :type borders: bool
+
+    :return: List of column headers
+    :rtype: list
+    """
+    return split_tabular_rows([output[header_line]], separator=separator, borders=borders)[0]
+
+
+def parse_tabular_output(output, header_line=0, skip=None, separator='\t', borders=False, multiline=False):
+    """
+    Returns a dictionary per row from a script engine tabular response output
+
+    :param output: Response output from script engine
+    :type output: list
+    :param header_line: The first line number to start reading from
+    :type header_line: int
+    :param skip: Text row to be skipped
+    :type skip: str
+    :param separator: String to be used as field separator
+    :type separator: str
+    :param borders: Flag to enable removal of any trailing/leading occurrence of separator
+    :type borders: bool
+    :param multiline: Flag to manage outputs where the same item is linked to multiple consecutive lines
+    :type multiline: bool
+
+    :yields: A dictionary built with first row headers as the keys
+    :rtype: dict
+    """
+    headers = get_tabular_headers(output, header_line, separator=separator, borders=borders)
+    item = "Unknown"
+    for values in split_tabular_rows(output[header_line + 1:], skip=skip, separator=separator, borders=borders,
+                                     num_columns=len(headers)):
+        if multiline:
+            if values[0] != "":
+                item = values[0]
+            else:
+                values[0] = item
+        yield dict(izip(headers, values))
+
+
+def parse_tabular_columns(output, header_line=0, skip=None, separator='\t', borders=False):
+    """
+    Returns the list of values of each column of a script engine tabular response output
+
+    :param output: Response output from script engine
+    :type output: list
+    :param header_line: The first line number to start reading from
+    :type header_line: int
+    :param skip: Text row to be skipped
+    :type skip: str
+    :param separator: String to be used as field separator
+    :type separator: str
+    :param borders: Flag to enable removal of any trailing/leading occurrence of separator
+    :type borders: bool
+
+    :return: Dictionary of column header to list of the column values, in row order
+    :rtype: dict
+    """
+    headers = get_tabular_headers(output, header_line, separator=separator, borders=borders)
+    rows = split_tabular_rows(output[header_line + 1:], skip=skip, separator=separator, borders=borders,
+                              num_columns=len(headers))
+    columns = izip(*rows) if rows else [()] * len(headers)
+    return {header: list(values) for header, values in izip(headers, columns)}
+
+
+def iter_fdns(output):
+    """
+    Yield the FDNs listed in the script engine response output, i.e. from the "FDN : <fdn>" lines, as each line is
+    parsed, so that callers needing only some of the FDNs stop parsing once they have them
+
+    :param output: Response output from script engine
+    :type output: list
+
+    :yields: FDN
+    :ytype: str
+    """
+    for line in output:
+        key, _, value = line.partition(":")
+        if value and key.strip() == FDN_PREFIX:
+            yield value.strip()
+
+
+def parse_fdns(output):
+    """
+    Get the FDNs listed in the script engine response output, i.e. from the "FDN : <fdn>" lines
+
+    :param output: Response output from script engine
+    :type output: list
+
+    :return: List of FDNs
+    :rtype: list
+    """
+    return list(iter_fdns(output))
+
+
+def benchmark(num_rows=BENCHMARK_ROWS, repeat=BENCHMARK_REPEAT):
+    """
+    Measure the time taken by the tabular parsers to parse a generated output of the given number of rows
+
+    :param num_rows: Number of rows of the generated output
+    :type num_rows: int
+    :param repeat: Number of times each parser is run, the fastest being recorded
+    :type repeat: int
+
+    :return: Dictionary of parser name to parse time in seconds
+    :rtype: dict
+    """
+    output = ["\t".join(BENCHMARK_HEADERS)]
+    output.extend(u"NetworkElement=LTE{0:05}\tENROLLED\tNot Applicable\tCN=LTE{0:05}oam\t{0}\tCN=ENM_OAM_CA"
+                  .format(index) for index in xrange(num_rows))
+    output.extend([u"", u"Command Executed Successfully"])
+    parsers = {"parse_tabular_output": lambda: list(parse_tabular_output(output)),
+               "parse_tabular_columns": lambda: parse_tabular_columns(output)}
+    parse_times = {}
+    for name, parser in parsers.iteritems():
+        timings = []
+        for _ in xrange(repeat):
+            start_time = time.time()
+            parser()
+            timings.append(time.time() - start_time)
+        parse_times[name] = round(min(timings), 3)
+    return parse_times
@@ -0,0 +1,230 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from enmutils.lib import log
+
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+COMPLETED = "COMPLETED"
+FAILED = "FAILED"
+FINISHED_STATES = [COMPLETED, FAILED]
+
+
+class AllocationJob(object):
+
+    def __init__(self, profile_name, nodes=None, profile_values=None, network_config=None):
+        """
+        Allocation request submitted by a profile
+
+        :param profile_name: Name of the profile requesting nodes
+        :type profile_name: str
+        :param nodes: Comma-separated list of node names to be allocated
+        :type nodes: str
+        :param profile_values: Dictionary containing profile key,values to be set on the retrieved profile instance
+        :type profile_values: dict
+        :param network_config: Specific network configuration mapping to use
+        :type network_config: str
+        """
+        self.job_id = str(uuid.uuid4())
+        self.profile_name = profile_name
+        self.nodes = nodes
+        self.profile_values = profile_values
+        self.network_config = network_config
+        self.state = QUEUED
+        self.success = None
+        self.message = ""
+        self.submitted_time = time.time()
+        self.finished_time = None
+
+    def complete(self, success, message=""):
+        """
+        Record the outcome of the allocation
+
+        :param success: Boolean indicating if the allocation was successful
+        :type success: bool
+        :param message: Message describing the outcome
+        :type message: str
+        """
+        self.state = COMPLETED if success else FAILED
+        self.success = success
+        self.message = message
+        self.finished_time = time.time()
+
+    def to_dict(self):
+        """
+        Dictionary representation of the job returned to clients
+
+        :return: Dictionary of job values
+        :rtype: dict
+        """
+        return {"job_id": self.job_id, "profile": self.profile_name, "state": self.state, "success": self.success,
+                "message": self.message}
+
+
+class AllocationScheduler(object):
+
+    def __init__(self, batch_handler, max_batch_size=50, job_retention_secs=3600):
+        """
+        Queues allocation requests and hands them in batches to the supplied handler on a background thread
+
+        :param batch_handler: Function which is passed a list of `AllocationJob` and completes each of them
+        :type batch_handler: function
+        :param max_batch_size: Maximum number of jobs handed to the batch handler at once
+        :type max_batch_size: int
+        :param job_retention_secs: Time in seconds that finished jobs remain available to be queried
+        :type job_retention_secs: int
+        """
+        self.batch_handler = batch_handler
+        self.max_batch_size = max_batch_size
+        self.job_retention_secs = job_retention_secs
+        self.jobs = {}
+        self.active = {}
+        self.pending = OrderedDict()
+        self.condition = threading.Condition()
+        self.worker = None
+
+    def submit(self, profile_name, nodes=None, profile_values=None, network_config=None):
+        """
+        Queue an allocation request, a request still queued for the same profile is replaced by the new request and
+        a request made while the allocation for the same profile is running is answered with the running job
+
+        :param profile_name: Name of the profile requesting nodes
+        :type profile_name: str
+        :param nodes: Comma-separated list of node names to be allocated
+        :type nodes: str
+        :param profile_values: Dictionary containing profile key,values to be set on the retrieved profile instance
+        :type profile_values: dict
+        :param network_config: Specific network configuration mapping to use
+        :type network_config: str
+
+        :return: Id of the queued or running job
+        :rtype: str
+        """
+        with self.condition:
+            job = self.active.get(profile_name)
+            if job and job.state == RUNNING:
+                log.logger.debug("Allocation already running for {0} - returning job {1}"
+                                 .format(profile_name, job.job_id))
+                return job.job_id
+            if job:
+                log.logger.debug("Allocation already queued for {0} - updating job {1}"
+                                 .format(profile_name, job.job_id))
+                job.nodes, job.profile_values, job.network_config = nodes, profile_values, network_config
+            else:
+                job = AllocationJob(profile_name, nodes=nodes, profile_values=profile_values,
+                                    network_config=network_config)
+                self.jobs[job.job_id] = job
+                self.active[profile_name] = job
+                self.pending[profile_name] = job
+                log.logger.debug("Allocation job {0} queued for {1}, jobs queued: {2}"
+                                 .format(job.job_id, profile_name, len(self.pending)))
+            self._start_worker()
+            self.condition.notify_all()
+            return job.job_id
+
+    def get_job_status(self, job_id, wait=0):
+        """
+        Get the status of a job, optionally waiting for the job to finish
+
+        :param job_id: Id of the job
+        :type job_id: str
+        :param wait: Maximum time in seconds to wait for the job to finish
+        :type wait: int
+
+        :return: Dictionary of job values or None if the job is unknown
+        :rtype: dict|None
+        """
+        end_time = time.time() + wait
+        with self.condition:
+            job = self.jobs.get(job_id)
+            while job and job.state not in FINISHED_STATES and time.time() < end_time:
+                self.condition.wait(end_time - time.time())
+            return job.to_dict() if job else None
+
+    def is_profile_queued(self, profile_name):
+        """
+        Check if an allocation for the profile is queued or running
+
+        :param profile_name: Name of the profile
+        :type profile_name: str
+
+        :return: Boolean indicating if an allocation is outstanding for the profile
+        :rtype: bool
+        """
+        return self.get_active_job_id(profile_name) is not None
+
+    def get_active_job_id(self, profile_name):
+        """
+        Get the id of the queued or running allocation job of the profile
+
+        :param profile_name: Name of the profile
+        :type profile_name: str
+
+        :return: Id of the outstanding job or None if no allocation is outstanding for the profile
+        :rtype: str|None
+        """
+        with self.condition:
+            job = self.active.get(profile_name)
+            return job.job_id if job else None
+
+    def process_next_batch(self, block=True):
+        """
+        Take the next batch of queued jobs and pass them to the batch handler
+
+        :param block: Boolean indicating if the call should wait for jobs to be queued
+        :type block: bool
+
+        :return: List of jobs processed
+        :rtype: list
+        """
+        with self.condition:
+            while block and not self.pending:
+                self.condition.wait()
+            batch = []
+            while self.pending and len(batch) < self.max_batch_size:
+                batch.append(self.pending.popitem(last=False)[1])
+            for job in batch:
+                job.state = RUNNING
+        if batch:
+            log.logger.debug("Processing batch of {0} allocation job(s): {1}"
+                             .format(len(batch), ", ".join(job.profile_name for job in batch)))
+            try:
+                self.batch_handler(batch)
+            except Exception as e:
+                log.logger.debug("Error encountered while processing allocation batch: {0}".format(str(e)))
+            with self.condition:
+                for job in batch:
+                    if job.state not in FINISHED_STATES:
+                        job.complete(False, "Allocation did not complete for {0}".format(job.profile_name))
+                    if self.active.get(job.profile_name) is job:
+                        del self.active[job.profile_name]
+                self._remove_expired_jobs()
+                self.condition.notify_all()
+        return batch
+
+    def _remove_expired_jobs(self):
+        """
+        Remove finished jobs older than the retention period
+        """
+        expiry_time = time.time() - self.job_retention_secs
+        for job_id, job in self.jobs.items():
+            if job.state in FINISHED_STATES and job.finished_time < expiry_time:
+                del self.jobs[job_id]
+
+    def _run(self):
+        """
+        Worker loop processing queued jobs
+        """
+        while True:
+            self.process_next_batch()
+
+    def _start_worker(self):
+        """
+        Start the worker thread if not already running
+        """
+        if not self.worker or not self.worker.is_alive():
+            self.worker = threading.Thread(target=self._run, name="AllocationScheduler")
+            self.worker.daemon = True
+            self.worker.start()
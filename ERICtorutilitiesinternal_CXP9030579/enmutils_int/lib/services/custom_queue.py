@@ -1,58 +1,112 @@
-import Queue
+import threading
 import time
+from collections import OrderedDict
 
 
-class CustomContainsQueue(Queue.Queue):
+class KeyedWorkRegistry(object):
+
+    def __init__(self):
+        """
+        Registry of in-progress work items keyed by item, each item having an event which is set once it is removed
+        """
+        self.mutex = threading.Lock()
+        self.items = OrderedDict()
+        self.timeouts = 0
+        self.total_wait_time = 0
 
     def __contains__(self, item):
         """
-        Function to check if Queue contains a specific item
+        Function to check if the registry contains a specific item
 
-        :param item: Item to be checked against the Queue
+        :param item: Item to be checked against the registry
         :type item: object
 
-        :return: Boolean indicating if item is currently in the Queue
+        :return: Boolean indicating if item is currently in the registry
         :rtype: bool
         """
         with self.mutex:
-            return item in self.queue
+            return item in self.items
+
+    def __len__(self):
+        with self.mutex:
+            return len(self.items)
+
+    def qsize(self):
+        """
+        Function to return the number of items in the registry
+
+        :return: Number of items in the registry
+        :rtype: int
+        """
+        return len(self)
 
     def get_item(self, item):
         """
-        Function to get a specific item from the Queue
+        Function to remove a specific item from the registry, waking any waiters on the item
 
-        :param item: Item to be returned from the Queue
+        :param item: Item to be removed from the registry
         :type item: object
         """
-        if self.__contains__(item):
-            self.queue.remove(item)
+        with self.mutex:
+            event = self.items.pop(item, None)
+        if event:
+            event.set()
 
     def put_unique(self, item):
         """
-        Function to add a specific item from the Queue
+        Function to add a specific item to the registry, if not already present
 
-        :param item: Item to be added to the Queue
+        :param item: Item to be added to the registry
         :type item: object
+
+        :return: Boolean indicating if the item was added
+        :rtype: bool
         """
-        if not self.__contains__(item):
-            self.put_nowait(item)
+        with self.mutex:
+            if item in self.items:
+                return False
+            self.items[item] = threading.Event()
+            return True
 
     def block_until_item_removed(self, item, logger, max_time_to_wait=300):
         """
-        Function to block until item is removed or timeout is reached.
+        Function to block until item is removed or timeout is reached, the item being removed if the timeout is reached
 
-        :param item: Item to be poll the Queue for, until removed or timeout reached
+        :param item: Item to wait on, until removed or timeout reached
         :type item: object
         :param logger: Logger instance supplied to the function
         :type logger: `log.logger`
         :param max_time_to_wait: Maximum time in seconds to wait until removing the blocking item
         :type max_time_to_wait: int
+
+        :return: Boolean indicating if the item was removed before the timeout was reached
+        :rtype: bool
         """
-        elapsed_time = 0
-        while self.__contains__(item) and elapsed_time <= max_time_to_wait:
-            elapsed_time += 5
-            sleep_time = max_time_to_wait if 1 <= max_time_to_wait <= 5 else 5
-            logger.debug("Blocking operation in progress for {0}, waiting for {1} seconds before rechecking.".format(
-                item, sleep_time))
-            time.sleep(sleep_time)
-        self.get_item(item)
+        with self.mutex:
+            event = self.items.get(item)
+        if not event:
+            return True
+        logger.debug("Blocking operation in progress for {0}, waiting up to {1} seconds for it to complete."
+                     .format(item, max_time_to_wait))
+        start_time = time.time()
+        removed = event.wait(max_time_to_wait)
+        with self.mutex:
+            self.total_wait_time += time.time() - start_time
+            if not removed:
+                self.timeouts += 1
+        if not removed:
+            logger.debug("Blocking operation for {0} did not complete within {1} seconds, removing item."
+                         .format(item, max_time_to_wait))
+            self.get_item(item)
+        return removed
+
+    def get_stats(self):
+        """
+        Function to return the current size and wait accounting of the registry
+
+        :return: Dictionary containing the item count, number of waits timed out and total time spent waiting
+        :rtype: dict
+        """
+        with self.mutex:
+            return {"items": len(self.items), "timeouts": self.timeouts,
+                    "total_wait_time": round(self.total_wait_time, 2)}
@@ -7,7 +7,8 @@ from enmutils.lib import log, mutexer
 from enmutils.lib.exceptions import NoNodesAvailable
 from enmutils_int.lib import node_pool_mgr
 from enmutils_int.lib.services import nodemanager_helper_methods as helper
-from enmutils_int.lib.services.custom_queue import CustomContainsQueue
+from enmutils_int.lib.services.allocation_scheduler import AllocationScheduler
+from enmutils_int.lib.services.custom_queue import KeyedWorkRegistry
 from enmutils_int.lib.services.service_common_utils import (get_json_response, abort_with_message,
                                                             create_and_start_background_scheduled_job)
 from enmutils_int.lib.services.service_values import URL_PREFIX
@@ -15,7 +16,9 @@ from enmutils_int.lib.services.service_values import URL_PREFIX
 SERVICE_NAME = "nodemanager"
 
 application_blueprint = Blueprint(SERVICE_NAME, __name__, url_prefix=URL_PREFIX)
-PROFILE_ALLOCATION_QUEUE = CustomContainsQueue()
+PROFILE_ALLOCATION_QUEUE = KeyedWorkRegistry()
+MAX_ALLOCATION_STATUS_WAIT = 120
+SYNC_STATES_REFRESH_INTERVAL_MINS = 5
 
 
 def at_startup():
@@ -29,6 +32,9 @@ def at_startup():
     create_and_start_background_scheduled_job(
         helper.retrieve_cell_information_and_apply_cell_type, 360, "{0}_APPLY_LTE_TYPE_SIX_HOURLY".format(
             SERVICE_NAME), log.logger)
+    create_and_start_background_scheduled_job(
+        helper.refresh_network_sync_states, SYNC_STATES_REFRESH_INTERVAL_MINS,
+        "{0}_REFRESH_SYNC_STATES".format(SERVICE_NAME), log.logger)
     log.logger.debug("Startup functions complete")
 
 
@@ -54,9 +60,12 @@ def add_nodes():
 
         poid_update_failures = 0
         if added:
-            helper.update_cached_nodes_list()
-            poid_update_failures = helper.update_poid_attributes_on_pool_nodes()
-            helper.retrieve_cell_information_and_apply_cell_type(rebuild_dict=True)
+            helper.update_cached_nodes_list(node_ids=added)
+            poid_update_failures = helper.update_poid_attributes_on_pool_nodes(node_ids=added)
+            lte_nodes = [node for node in helper.get_cached_nodes_by_id(added)
+                         if node.primary_type in ["ERBS", "RadioNode"]]
+            if lte_nodes:
+                helper.retrieve_cell_information_and_apply_cell_type(allocated_nodes=lte_nodes, rebuild_dict=True)
         helper.update_total_node_count()
         total_missing = sum([len(nodes) for nodes in missing_nodes.itervalues()])
 
@@ -165,7 +174,8 @@ def list_nodes():
 
     :raises HTTPException: 500 raised if POST request fails
 
-    :return: dict containing node_id's and corresponding profiles assigned to node
+    :return: dict containing node_id's and corresponding profiles assigned to node, or 202 response containing the
+            id of the allocation job if a queued allocation is outstanding for the profile
     :rtype: dict
     """
     request_data = request.get_json()
@@ -173,10 +183,17 @@ def list_nodes():
     node_attributes = request_data.get('node_attributes')
     match_patterns = request_data.get('match_patterns')
 
+    job_id = ALLOCATION_SCHEDULER.get_active_job_id(profile) if profile else None
+    if job_id:
+        log.logger.debug("Allocation job {0} currently ongoing for {1} - "
+                         "nodes to be listed once allocation completes".format(job_id, profile))
+        return get_json_response(message={"job_id": job_id}, rc=202)
+
     if profile and profile in PROFILE_ALLOCATION_QUEUE:
         log.logger.debug("Allocation currently ongoing for {0} - "
                          "Waiting for allocation to complete first".format(profile))
-        PROFILE_ALLOCATION_QUEUE.block_until_item_removed(profile, log.logger, max_time_to_wait=1800)
+        if not PROFILE_ALLOCATION_QUEUE.block_until_item_removed(profile, log.logger, max_time_to_wait=1800):
+            log.logger.debug("Allocation queue: {0}".format(PROFILE_ALLOCATION_QUEUE.get_stats()))
         log.logger.debug("Waiting complete - proceeding to return list of nodes")
 
     json_response = dict()
@@ -184,6 +201,7 @@ def list_nodes():
     try:
         nodes = node_pool_mgr.cached_nodes_list
         json_response["total_node_count"] = len(nodes)
+        json_response["cache_generation"] = helper.get_cached_nodes_generation()
 
         if match_patterns:
             nodes = list_nodes_that_match_patterns(nodes, match_patterns)
@@ -235,6 +253,58 @@ def allocate_nodes():
             PROFILE_ALLOCATION_QUEUE.get_item(profile_name)
 
 
+def submit_allocation():
+    """
+    Route to queue node allocation for a particular profile, the allocation being performed in the background
+
+    POST /nodes/allocate_async
+
+    :raises HTTPException: 500 raised if POST request fails
+    :raises RuntimeError: raised if no profile name is supplied
+
+    :return: Json response containing the id of the queued allocation job
+    :rtype: dict
+    """
+    request_data = request.get_json()
+    profile_name = request_data.get('profile')
+    try:
+        if not profile_name:
+            raise RuntimeError("Profile name missing")
+        job_id = ALLOCATION_SCHEDULER.submit(profile_name, nodes=request_data.get('nodes'),
+                                             profile_values=request_data.get('profile_values'),
+                                             network_config=request_data.get('network_config'))
+        return get_json_response(message={"job_id": job_id})
+    except Exception as e:
+        abort_with_message("Could not queue node allocation", log.logger, SERVICE_NAME, log.SERVICES_LOG_DIR, e)
+
+
+def allocation_status():
+    """
+    Route to query the status of a queued node allocation, optionally waiting for the allocation to finish
+
+    POST /nodes/allocation_status
+
+    :raises HTTPException: 500 raised if POST request fails
+
+    :return: Json response containing the state and outcome of the allocation job
+    :rtype: dict
+    """
+    request_data = request.get_json()
+    job_id = request_data.get('job_id')
+    wait = min(int(request_data.get('wait') or 0), MAX_ALLOCATION_STATUS_WAIT)
+    try:
+        job = ALLOCATION_SCHEDULER.get_job_status(job_id, wait=wait)
+        if not job:
+            return get_json_response(success=False, message="Allocation job {0} not found".format(job_id))
+        return get_json_response(message=job)
+    except Exception as e:
+        abort_with_message("Could not retrieve node allocation status", log.logger, SERVICE_NAME,
+                           log.SERVICES_LOG_DIR, e)
+
+
+ALLOCATION_SCHEDULER = AllocationScheduler(helper.perform_batch_allocation_tasks)
+
+
 def deallocate_nodes():
     """
     Route to deallocate node information to a particular profile
@@ -288,6 +358,46 @@ def update_nodes_cache_on_request():
                            log.SERVICES_LOG_DIR, e)
 
 
+def get_nodes_cache_generation():
+    """
+    Route to GET the generation of the nodes cache list in nodemanager service
+
+    GET /nodes/cache_generation
+
+    :raises HTTPException: 500 raised if GET request fails
+
+    :return: Json response containing the generation counter, incremented each time the cache is changed
+    :rtype: dict
+    """
+    try:
+        return get_json_response(message={"cache_generation": helper.get_cached_nodes_generation()})
+    except Exception as e:
+        abort_with_message("Failure occurred while reading nodes cache generation", log.logger, SERVICE_NAME,
+                           log.SERVICES_LOG_DIR, e)
+
+
+def get_sync_states():
+    """
+    Route to GET the cached CM sync states of the network elements
+
+    POST /nodes/sync_states
+
+    :raises HTTPException: 500 raised if POST request fails
+
+    :return: Json response containing the dictionary of node id to sync state
+    :rtype: dict
+    """
+    request_data = request.get_json() or {}
+    try:
+        max_age = request_data.get('max_age')
+        sync_states = helper.get_sync_states(node_ids=request_data.get('node_ids'),
+                                             max_age=int(max_age) if max_age is not None else None)
+        return get_json_response(message=sync_states)
+    except Exception as e:
+        abort_with_message("Failure occurred while retrieving network sync states", log.logger, SERVICE_NAME,
+                           log.SERVICES_LOG_DIR, e)
+
+
 ########################
 # Application Functions
 ########################
@@ -344,7 +454,7 @@ def remove_nodes_from_pool(nodes_file_path, node_range, force):
         removed, missing, allocated = node_pool_mgr.remove(nodes_file_path, start=range_start, end=range_end,
                                                            force=force)
         if removed:
-            helper.update_cached_nodes_list()
+            helper.update_cached_nodes_list(node_ids=removed)
         message = update_remove_message(removed, missing, allocated, profiles_still_using_nodes_msg)
     return message
 
@@ -1,5 +1,6 @@
 import imp
 import re
+import time
 
 from retrying import retry
 
@@ -21,11 +22,17 @@ REMOVE_NODES_URL = "nodes/remove"
 RESET_NODES_URL = "nodes/reset"
 UPDATE_NODE_URL = ""
 ALLOCATE_NODES_URL = "nodes/allocate"
+ALLOCATE_NODES_ASYNC_URL = "nodes/allocate_async"
+ALLOCATION_STATUS_URL = "nodes/allocation_status"
 DEALLOCATE_NODES_URL = "nodes/deallocate"
 UPDATE_POIDS_URL = "nodes/update_poids"
 UPDATE_NODES_CACHE = "nodes/update_cache_on_request"
+NODES_CACHE_GENERATION = "nodes/cache_generation"
+SYNC_STATES_URL = "nodes/sync_states"
 MAX_NODES_COUNT_PER_REQUEST = 1000
 RETRY_TIME_SECS = 10
+ALLOCATION_STATUS_WAIT_SECS = 60
+MAX_ALLOCATION_WAIT_SECS = 60 * 60
 
 
 def can_service_be_used(profile=None):
@@ -244,7 +251,7 @@ def allocate_nodes(profile, nodes=None):
             json_data = {'profile': profile_name, 'nodes': nodes,
                          'profile_values': get_profile_attributes_and_values(profile_name),
                          'network_config': config.get_prop('network_config') if config.has_prop('network_config') else None}
-            response_data = send_request_to_service(POST_METHOD, ALLOCATE_NODES_URL, json_data=json_data).json()
+            response_data = wait_for_allocation_job(submit_allocation_job(json_data))
 
         if not response_data["success"]:
             raise NoNodesAvailable("Could not allocate nodes to {0}: {1}."
@@ -255,6 +262,48 @@ def allocate_nodes(profile, nodes=None):
     log.logger.debug("Completed allocation of nodes to {0}".format(profile_name))
 
 
+def submit_allocation_job(json_data):
+    """
+    Queue the allocation of nodes to a profile in the service
+
+    :param json_data: Allocation request data
+    :type json_data: dict
+
+    :return: Id of the queued allocation job
+    :rtype: str
+    """
+    job_id = service_adaptor.validate_response(
+        send_request_to_service(POST_METHOD, ALLOCATE_NODES_ASYNC_URL, json_data=json_data)).get("job_id")
+    log.logger.debug("Allocation job {0} queued for {1}".format(job_id, json_data.get("profile")))
+    return job_id
+
+
+def wait_for_allocation_job(job_id, timeout=MAX_ALLOCATION_WAIT_SECS):
+    """
+    Long-poll the service until the queued allocation job has finished
+
+    :param job_id: Id of the queued allocation job
+    :type job_id: str
+    :param timeout: Maximum time in seconds to wait for the job to finish
+    :type timeout: int
+
+    :return: Dictionary containing the state and outcome of the allocation job
+    :rtype: dict
+
+    :raises EnvironError: if the job does not finish within the timeout
+    """
+    elapsed_time = 0
+    while elapsed_time < timeout:
+        start_time = time.time()
+        job = service_adaptor.validate_response(send_request_to_service(
+            POST_METHOD, ALLOCATION_STATUS_URL, json_data={"job_id": job_id, "wait": ALLOCATION_STATUS_WAIT_SECS}))
+        if job.get("state") in ["COMPLETED", "FAILED"]:
+            return job
+        elapsed_time += max(time.time() - start_time, 1)
+        log.logger.debug("Allocation job {0} is {1} - waiting for completion".format(job_id, job.get("state")))
+    raise EnvironError("Allocation job {0} did not complete within {1}s".format(job_id, timeout))
+
+
 def nodes_preference_check():
     """
     checks radio nodes available or not in the deployment
@@ -340,6 +389,34 @@ def update_nodes_cache_on_request():
     log.logger.debug("Completed nodes cache update")
 
 
+def get_nodes_cache_generation():
+    """
+    Get the generation of the nodes cache list in nodemanager service
+
+    :return: Generation counter of the nodes cache, which changes each time the cache is updated
+    :rtype: int
+    """
+    response_data = service_adaptor.validate_response(send_request_to_service(GET_METHOD, NODES_CACHE_GENERATION))
+    return response_data.get("cache_generation")
+
+
+def get_sync_states(node_ids=None, max_age=None):
+    """
+    Get the cached CM sync states of the network elements from nodemanager service
+
+    :param node_ids: List of node ids to return the sync states of, all network elements if not supplied
+    :type node_ids: list
+    :param max_age: Maximum age in seconds of the cached states, defaults to the configured maximum age
+    :type max_age: int
+
+    :return: Dictionary of node id to sync state
+    :rtype: dict
+    """
+    json_data = {"node_ids": node_ids, "max_age": max_age}
+    return service_adaptor.validate_response(send_request_to_service(POST_METHOD, SYNC_STATES_URL,
+                                                                     json_data=json_data))
+
+
 def exchange_nodes(profile):
     """
     Exchange nodes tied to a profile
@@ -1,9 +1,10 @@
 import threading
 
 from retrying import retry
-from enmutils.lib.exceptions import EnmApplicationError
+from enmutils.lib.exceptions import EnmApplicationError, NoNodesAvailable
 from enmutils.lib import log, persistence, config, mutexer
-from enmutils_int.lib import node_pool_mgr, profile_properties_manager, profile_manager
+from enmutils_int.lib import (allocation_planner, load_node, node_pool_mgr, node_pool_stats, profile_properties_manager,
+                              profile_manager, sync_state_cache)
 from enmutils_int.lib.services.deploymentinfomanager_adaptor import poid_refresh
 from enmutils_int.lib.workload_network_manager import NETWORK_TYPE, NETWORK_CELL_COUNT
 
@@ -13,44 +14,53 @@ SUPPORTED_NODE_TYPES = "SUPPORTED_NODE_TYPES"
 DEFAULT_NODES = "DEFAULT_NODES"
 
 
-def update_poid_attributes_on_pool_nodes():
+def update_poid_attributes_on_pool_nodes(node_ids=None):
     """
     Update POID values on Node objects in DB
 
+    :param node_ids: List of node ids to be updated, if not supplied all cached nodes are updated
+    :type node_ids: list
+
     :return: Boolean to indicate if failures occurred
     :rtype:
     """
     log.logger.debug("Updating POID attributes on Nodes in Workload Pool")
-    if node_pool_mgr.cached_nodes_list:
+    nodes = get_cached_nodes_by_id(node_ids) if node_ids is not None else node_pool_mgr.cached_nodes_list
+    if nodes:
         with mutexer.mutex("node-poid-update", log_output=True, persisted=True):
             node_poid_data = poid_refresh()
 
         if not node_poid_data:
             log.logger.debug("No data returned by Deployment Info Manager service - cannot update POID's on nodes")
-            return len(node_pool_mgr.cached_nodes_list)
+            return len(nodes)
 
-        return update_poid_attribute_on_nodes(node_poid_data)
+        if node_ids is None:
+            return update_poid_attribute_on_nodes(node_poid_data)
+        return update_poid_attribute_on_nodes(node_poid_data, nodes=nodes)
     else:
         log.logger.debug("No nodes in pool - update not required")
 
 
-def update_poid_attribute_on_nodes(node_poid_data):
+def update_poid_attribute_on_nodes(node_poid_data, nodes=None):
     """
     Update POID attribute on Node objects
 
     :param node_poid_data: Dictionary of Node-POID data
     :type node_poid_data: dict
+    :param nodes: List of Node objects to be updated, if not supplied all cached nodes are updated
+    :type nodes: list
     :return: Number of failed node updates
     :rtype: int
     :raises e: if node_poid_data dictionary is empty
     """
+    nodes = node_pool_mgr.cached_nodes_list if nodes is None else nodes
     log.logger.debug("Updating POID attribute on {0} pool nodes (ENM nodes: {1})"
-                     .format(len(node_pool_mgr.cached_nodes_list), len(node_poid_data.keys())))
+                     .format(len(nodes), len(node_poid_data.keys())))
 
     failed_nodes = 0
 
     with node_pool_mgr.mutex():
-        for node in node_pool_mgr.cached_nodes_list:
+        for node in nodes:
             try:
                 if len(node_poid_data) == 0:
                     raise EnmApplicationError("Length of node_poid_data is {0}".format(len(node_poid_data)))
@@ -71,7 +81,7 @@ def update_poid_attribute_on_nodes(node_poid_data):
                     failed_nodes += 1
 
     log.logger.debug("Update operation complete on {0} nodes. Failures: {1}"
-                     .format(len(node_pool_mgr.cached_nodes_list), failed_nodes))
+                     .format(len(nodes), failed_nodes))
     return failed_nodes
 
 
@@ -172,13 +182,13 @@ def deallocate_profile_from_nodes(nodes, profile_name):
 
 def persist_node(node):
     """
-    Function to persist a node
+    Function to persist a node, updating the node pool counters
 
     :param node: Node instance to be persisted
     :type node: `load_node.LoadNodeMixin`
     """
-    with mutexer.mutex("persist-{0}".format(node.node_id), persisted=True):
-        persistence.default_db().set(node.node_id, node, -1, log_values=False)
+    with mutexer.mutex(load_node.PERSIST_MUTEX.format(node.node_id), persisted=True):
+        node._persist()
 
 
 def select_all_nodes_from_redis():
@@ -198,16 +208,79 @@ def select_all_nodes_from_redis():
     return nodes
 
 
-def update_cached_nodes_list():
+def update_cached_nodes_list(node_ids=None):
     """
     Update list of cached nodes
+
+    :param node_ids: List of node ids added, removed or updated in redis since the last update, if not supplied the
+                    full list of nodes is re-read from redis
+    :type node_ids: list
     """
     log.logger.debug("Updating list of cached nodes")
     with node_pool_mgr.mutex():
-        log.logger.debug("Emptying the cached list of nodes before populating")
-        node_pool_mgr.cached_nodes_list = []
-        node_pool_mgr.cached_nodes_list = select_all_nodes_from_redis()
-    log.logger.debug("Cached list of nodes has been updated")
+        if node_ids is None:
+            log.logger.debug("Emptying the cached list of nodes before populating")
+            node_pool_mgr.cached_nodes_list = []
+            node_pool_mgr.cached_nodes_list = select_all_nodes_from_redis()
+        else:
+            refresh_cached_nodes(node_ids)
+        node_pool_mgr.increment_cached_nodes_generation()
+    log.logger.debug("Cached list of nodes has been updated, generation: {0}".format(
+        node_pool_mgr.cached_nodes_generation))
+
+
+def refresh_cached_nodes(node_ids):
+    """
+    Re-fetch only the supplied nodes from redis and merge them into the cached list of nodes
+
+    Nodes no longer in redis are dropped from the cache, updated nodes replace their cached entry (retaining the
+    position in the list) and new nodes are appended.
+
+    :param node_ids: List of node ids added, removed or updated in redis
+    :type node_ids: list
+    """
+    node_ids = set(node_ids)
+    log.logger.debug("Fetching {0} changed node(s) from redis".format(len(node_ids)))
+    persisted_nodes = persistence.default_db().get_keys(list(node_ids)) if node_ids else []
+    changed_nodes = {node.node_id: node for node in persisted_nodes if getattr(node, "node_id", None) in node_ids}
+    cached_nodes = []
+    removed = updated = 0
+    for node in node_pool_mgr.cached_nodes_list:
+        if node.node_id not in node_ids:
+            cached_nodes.append(node)
+        elif node.node_id in changed_nodes:
+            cached_nodes.append(changed_nodes.pop(node.node_id))
+            updated += 1
+        else:
+            removed += 1
+    cached_nodes.extend(changed_nodes.values())
+    node_pool_mgr.cached_nodes_list = cached_nodes
+    log.logger.debug("Cache nodes: {0} (Total) {1} (Updated) {2} (Added) {3} (Removed)"
+                     .format(len(cached_nodes), updated, len(changed_nodes), removed))
+
+
+def get_cached_nodes_by_id(node_ids):
+    """
+    Get the cached node objects matching the supplied node ids
+
+    :param node_ids: List of node ids
+    :type node_ids: list
+
+    :return: List of cached Node objects
+    :rtype: list
+    """
+    node_ids = set(node_ids)
+    return [node for node in node_pool_mgr.cached_nodes_list if node.node_id in node_ids]
+
+
+def get_cached_nodes_generation():
+    """
+    Get the generation of the cached list of nodes, incremented each time the cache is changed
+
+    :return: Generation counter of the cached list of nodes
+    :rtype: int
+    """
+    return node_pool_mgr.cached_nodes_generation
 
 
 def set_deallocation_in_progress(profile_name=None):
@@ -261,7 +334,7 @@ def perform_deallocate_actions(profile_name, unused_nodes=None):
     log.logger.debug("De-allocation actions complete")
 
 
-def get_profile_object_from_profile_manager(profile_name, profile_values=None):
+def get_profile_object_from_profile_manager(profile_name, profile_values=None, network_config=None):
     """
     Get profile object from Profile Manager
 
@@ -269,13 +342,16 @@ def get_profile_object_from_profile_manager(profile_name, profile_values=None):
     :type profile_name: str
     :param profile_values: Dictionary containing key, value pairs of node allocation related variables
     :type profile_values: dict
+    :param network_config: Specific network configuration mapping to use
+    :type network_config: str
 
     :return: Profile object
     :rtype: `profile.Profile`
 
     """
 
-    profile_object = profile_properties_manager.ProfilePropertiesManager([profile_name]).get_profile_objects()[0]
+    profile_object = profile_properties_manager.ProfilePropertiesManager(
+        [profile_name], network_config=network_config).get_profile_objects()[0]
     num_nodes = getattr(profile_object, NUM_NODES, False)
     profile_values = profile_values if profile_values else {}
     matched = any([key for key in profile_values.keys() if key in [NUM_NODES, SUPPORTED_NODE_TYPES, DEFAULT_NODES]])
@@ -302,12 +378,11 @@ def perform_allocation_tasks(profile_name, nodes, profile_values=None, network_c
     :type network_config: str
     :raises RuntimeError: if profile name not specified
     """
-    if network_config:
-        config.set_prop('network_config', network_config)
     log.logger.debug("Node allocation tasks being executed by this thread")
     if not profile_name:
         raise RuntimeError("Profile name missing")
-    profile = get_profile_object_from_profile_manager(profile_name, profile_values=profile_values)
+    profile = get_profile_object_from_profile_manager(profile_name, profile_values=profile_values,
+                                                      network_config=network_config)
     log.logger.debug("Attempting to allocate nodes to {0}".format(profile_name))
     redis_nodes = node_pool_mgr.cached_nodes_list
     if nodes:
@@ -317,6 +392,98 @@ def perform_allocation_tasks(profile_name, nodes, profile_values=None, network_c
     log.logger.debug("Node allocation tasks completed")
 
 
+def perform_batch_allocation_tasks(jobs):
+    """
+    Perform allocation tasks for a batch of queued allocation jobs, holding the node allocation mutex for the batch.
+    The nodes of the jobs which can be planned are selected in a single pass over the pool, the remaining jobs are
+    allocated one at a time.
+
+    :param jobs: List of queued allocation jobs
+    :type jobs: list
+    """
+    log.logger.debug("Performing allocation tasks for batch of {0} profile(s)".format(len(jobs)))
+    with mutexer.mutex("node-allocation", log_output=True):
+        for job in plan_batch_allocation(jobs):
+            try:
+                perform_allocation_tasks(job.profile_name, job.nodes, profile_values=job.profile_values,
+                                         network_config=job.network_config)
+                job.complete(True)
+            except NoNodesAvailable as e:
+                job.complete(False, str(e))
+            except Exception as e:
+                log.logger.debug("Could not allocate nodes to {0} - error encountered :: {1}"
+                                 .format(job.profile_name, str(e)))
+                job.complete(False, "Could not allocate nodes - error encountered :: {0}".format(str(e)))
+    log.logger.debug("Allocation tasks for batch completed")
+
+
+def plan_batch_allocation(jobs):
+    """
+    Allocate nodes to the queued allocation jobs which can be planned, selecting the nodes for all of those jobs in a
+    single pass over the cached pool and persisting the allocations in a single transaction
+
+    :param jobs: List of queued allocation jobs
+    :type jobs: list
+
+    :return: List of the jobs not allocated by the plan, i.e. jobs for specific nodes, jobs which cannot be planned
+            and jobs without enough nodes available
+    :rtype: list
+    """
+    planned_jobs = {}
+    profiles = []
+    for job in jobs:
+        if job.nodes or not job.profile_name:
+            continue
+        try:
+            profile = get_profile_object_from_profile_manager(job.profile_name, profile_values=job.profile_values,
+                                                              network_config=job.network_config)
+        except Exception as e:
+            log.logger.debug("Could not plan allocation for {0} - error encountered :: {1}"
+                             .format(job.profile_name, str(e)))
+            continue
+        if allocation_planner.AllocationPlanner.can_be_planned(profile):
+            profiles.append(profile)
+            planned_jobs[profile.NAME] = job
+    if not profiles:
+        return jobs
+
+    deallocate_profiles_from_nodes(node_pool_mgr.cached_nodes_list, planned_jobs.keys())
+    planner = allocation_planner.AllocationPlanner(profiles)
+    planner.plan(nodes=node_pool_mgr.cached_nodes_list)
+    planner.commit(record=False)
+    allocated_jobs = [job for profile_name, job in planned_jobs.iteritems() if profile_name not in planner.shortfalls]
+    for job in allocated_jobs:
+        job.complete(True)
+    log.logger.debug("Allocated {0} of {1} profile(s) by the batch allocation plan"
+                     .format(len(allocated_jobs), len(jobs)))
+    return [job for job in jobs if job not in allocated_jobs]
+
+
+def deallocate_profiles_from_nodes(nodes, profile_names):
+    """
+    Deallocate the supplied profiles from the supplied nodes if applicable, in a single pass over the nodes
+
+    :param nodes: List of `load_node.LoadNodeMixin` instances
+    :type nodes: list
+    :param profile_names: Names of the profiles to remove from the nodes
+    :type profile_names: list
+    """
+    profile_names = set(profile_names)
+    updated_nodes = {}
+    with mutexer.mutex(node_pool_mgr.NODE_POOL_MUTEX, persisted=True, log_output=True):
+        with persistence.batch() as batch:
+            for node in nodes:
+                if profile_names.intersection(node.profiles):
+                    node.profiles = [profile for profile in node.profiles if profile not in profile_names]
+                    node._is_exclusive = False
+                    node._persist(batch=batch, record_stats=False)
+                    updated_nodes[node.node_id] = node
+            node_pool_stats.record_nodes(updated_nodes.values())
+        if updated_nodes:
+            node_pool_mgr.update_cached_list_of_nodes(updated_nodes)
+    log.logger.debug("Deallocated {0} profile(s) from {1} node(s)".format(len(profile_names), len(updated_nodes)))
+
+
 def convert_mos_to_dictionary(node_mo_dict):
     """
     Recursive function to unpack the EnmMo instance(s)
@@ -464,3 +631,31 @@ def create_cell_dict():
     if cell_dict:
         return cell_dict
     raise RuntimeError("Unable to retrieve cell dict from persistence.")
+
+
+def refresh_network_sync_states():
+    """
+    Refresh the cached sync states of the network elements, if older than the configured maximum age
+    """
+    try:
+        sync_state_cache.get_sync_states(max_age=sync_state_cache.get_max_age() / 2)
+    except Exception as e:
+        log.logger.debug("Failed to refresh the cached network sync states, error encountered: [{0}]".format(str(e)))
+
+
+def get_sync_states(node_ids=None, max_age=None):
+    """
+    Get the cached sync states of the supplied or all network elements
+
+    :param node_ids: List of node ids to return the sync states of, all network elements if not supplied
+    :type node_ids: list
+    :param max_age: Maximum age in seconds of the cached states, defaults to the configured maximum age
+    :type max_age: int
+
+    :return: Dictionary of node id to sync state, nodes unknown to ENM being omitted
+    :rtype: dict
+    """
+    sync_states = sync_state_cache.get_sync_states(max_age=max_age)
+    if node_ids is None:
+        return sync_states
+    return {node_id: sync_states[node_id] for node_id in node_ids if node_id in sync_states}
@@ -1,13 +1,14 @@
 import datetime
 import json
 import os
-import re
 import threading
 
 from flask import Blueprint, request
 
-from enmutils.lib import persistence, log, timestamp, config
+from enmutils.lib import persistence, persistence_monitor, persistence_snapshot, log, timestamp, config
+from enmutils_int.lib import iteration_scheduler, node_pool_mgr
 from enmutils_int.lib.load_mgr import clear_profile_errors, get_persisted_profiles_by_name
+from enmutils_int.lib.profile_registry import print_basic_network_values, print_profile_description
 from enmutils_int.lib.services.profilemanager_helper_methods import diff_profiles, get_all_profile_names, get_categories
 from enmutils_int.lib.services.profilemanager_monitor import verify_profile_state
 from enmutils_int.lib.services.service_common_utils import (get_json_response, abort_with_message,
@@ -15,7 +16,6 @@ from enmutils_int.lib.services.service_common_utils import (get_json_response, a
                                                             create_and_start_once_off_background_scheduled_job)
 from enmutils_int.lib.services.service_values import URL_PREFIX
 from enmutils_int.lib.status_profile import StatusProfile, UNWANTED_GLOBAL_ITEMS
-from enmutils_int.lib.workload_network_manager import get_all_networks
 
 SERVICE_NAME = "profilemanager"
 TIMESTAMP = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
@@ -23,8 +23,9 @@ EXPORT_PROP_FILE_NAME = "_prop_" + TIMESTAMP + ".py"
 
 application_blueprint = Blueprint(SERVICE_NAME, __name__, url_prefix=URL_PREFIX)
 
-TERE_LINK = "https://eteamspace.internal.ericsson.com/pages/viewpage.action?pageId=1982554551"
 SCHEDULER_INTERVAL_MINS = 60
+PERSISTENCE_HEALTH_INTERVAL_MINS = 15
+NODE_POOL_STATS_RECOUNT_INTERVAL_MINS = 60
 CONSISTENTLY_DEAD_PROFILES = []
 DEAD_PROFILES = {}
 VERIFICATION_KEY = "profile-check-key"
@@ -39,9 +40,59 @@ def at_startup():
                                                        "{0}_VERIFY_PROFILE_ONCE_OFF".format(SERVICE_NAME), log.logger)
     create_and_start_background_scheduled_job(verify_profiles, SCHEDULER_INTERVAL_MINS * 4,
                                               "{0}_VERIFY_PROFILE_FOUR_HOURLY".format(SERVICE_NAME), log.logger)
+    create_and_start_background_scheduled_job(record_persistence_health_sample, PERSISTENCE_HEALTH_INTERVAL_MINS,
+                                              "{0}_PERSISTENCE_HEALTH".format(SERVICE_NAME), log.logger)
+    create_and_start_background_scheduled_job(recount_node_pool_stats, NODE_POOL_STATS_RECOUNT_INTERVAL_MINS,
+                                              "{0}_NODE_POOL_STATS_RECOUNT".format(SERVICE_NAME), log.logger)
+    schedule_persistence_snapshots()
     log.logger.debug("Startup complete")
 
 
+def record_persistence_health_sample():
+    """
+    Records a sample of the health of the persistence DB in the rolling history of samples
+    """
+    try:
+        persistence_monitor.record_sample()
+    except Exception as e:
+        log.logger.debug("Failed to record persistence health sample: {0}".format(str(e)))
+
+
+def recount_node_pool_stats():
+    """
+    Recounts the counters of the nodes in the workload pool, so that the pool summaries never pay for the recount
+    """
+    try:
+        node_pool_mgr.recount_pool_stats()
+    except Exception as e:
+        log.logger.debug("Failed to recount node pool stats: {0}".format(str(e)))
+
+
+def schedule_persistence_snapshots():
+    """
+    Applies the snapshot strategy of the persistence DB, and schedules the background snapshots if enabled
+    """
+    try:
+        persistence_snapshot.configure()
+    except Exception as e:
+        log.logger.debug("Failed to apply persistence snapshot settings: {0}".format(str(e)))
+        return
+    interval_mins = persistence_snapshot.get_interval_mins()
+    if interval_mins > 0:
+        create_and_start_background_scheduled_job(take_persistence_snapshot, interval_mins,
+                                                  "{0}_PERSISTENCE_SNAPSHOT".format(SERVICE_NAME), log.logger)
+
+
+def take_persistence_snapshot():
+    """
+    Takes the scheduled background snapshot of the persistence DB
+    """
+    try:
+        persistence_snapshot.run_scheduled_snapshot()
+    except Exception as e:
+        log.logger.debug("Failed to take persistence snapshot: {0}".format(str(e)))
+
+
 def once_off_function_holder():
     """
     Single function to pass to background scheduler
@@ -169,6 +220,24 @@ def categories_list():
         abort_with_message("Failed to retrieve categories list.", log.logger, SERVICE_NAME, log.SERVICES_LOG_DIR, e)
 
 
+def iteration_calendar():
+    """
+    Route to POST the calendar of the upcoming iterations of the active profiles.
+
+    POST /iterations/calendar
+
+    :raises HTTPException: 500 raised if POST request fails
+
+    :return: 200 Response object
+    :rtype: `requests.Response`
+    """
+    try:
+        return get_json_response(message=iteration_scheduler.get_calendar())
+    except Exception as e:
+        abort_with_message("Failed to retrieve iteration calendar.", log.logger, SERVICE_NAME, log.SERVICES_LOG_DIR,
+                           e)
+
+
 def clear_errors():
     """
     Route to POST to clear Profile(s) errors
@@ -395,43 +464,6 @@ def build_describe_message_for_profiles(profile_names):
     return messages
 
 
-def print_profile_description(profile_name):
-    """
-    Print a link to the latest ENM TERE in order to find profile description.
-
-    :param profile_name: name of the profile
-    :type profile_name: str
-
-    :returns: Link to the latest ENM TERE
-    :rtype: str
-    """
-    primary_message = '\n Description of the profile: {0}: \n'.format(profile_name.upper())
-    log.logger.info(log.cyan_text(primary_message))
-    secondary_message = "\n Please refer to the latest ENM TERE at: \n {0} \n ".format(TERE_LINK)
-    log.logger.info(secondary_message)
-    return log.cyan_text(primary_message) + secondary_message
-
-
-def print_basic_network_values(profile_name):
-    """
-    Print the profile values from basic_network.py
-
-    :param profile_name: name of the profile to print the basic network values of
-    :type profile_name: str
-
-    :returns: Basic network values of the matching profile
-    :rtype: str
-    """
-    basic_network_dict = get_all_networks().get('basic')
-    application = re.split(r'_[0-9]', profile_name.lower())[0].replace('_setup', '')
-    profile_basic_network_values = basic_network_dict.get(application).get(profile_name.upper())
-    primary_message = '\n Basic network values for {0}: \n'.format(profile_name.upper())
-    log.logger.info(log.cyan_text(primary_message))
-    secondary_message = '{0}\n'.format(profile_basic_network_values)
-    log.logger.info(secondary_message)
-    return log.cyan_text(primary_message) + secondary_message
-
-
 def generate_export_file(profiles_to_export, export_file_path, categories_to_export=None, all_profiles=False,
                          all_categories=False):
     """
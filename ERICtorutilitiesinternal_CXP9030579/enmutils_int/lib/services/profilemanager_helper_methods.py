@@ -14,7 +14,7 @@ from enmutils_int.lib.load_mgr import (get_updated_active_profiles, get_all_acti
 from enmutils_int.lib.nexus import check_nexus_version
 from enmutils_int.lib.services import deployment_info_helper_methods
 from enmutils_int.lib.workload_network_manager import get_all_networks
-from enmutils_int.lib import node_pool_mgr
+from enmutils_int.lib import node_pool_mgr, profile_registry
 
 
 INVALID_VERSION_MESSAGE = "invalid_version"
@@ -644,14 +644,7 @@ def get_all_profile_names():
     :rtype: list
     :return: A sorted list of all profiles in the basic network
     """
-    log.logger.debug("Getting profile names from the basic network")
-    basic = get_all_networks().get('basic')
-    profiles = []
-    for app in basic.iterkeys():
-        for profile in basic.get(app).iterkeys():
-            profiles.append(profile.lower())
-    log.logger.debug("Finished getting profile names from the basic network")
-    return sorted(profiles)
+    return profile_registry.get_all_profile_names()
 
 
 def get_categories():
@@ -661,9 +654,7 @@ def get_categories():
     :rtype: set
     :returns: all valid categories:
     """
-    return sorted(set([re.split(r'_\d{1,2}', profile)[0]
-                       if re.search(r'\d+$', profile) and not re.search(r'setup', profile) else profile.split('_')[0]
-                       for profile in get_all_profile_names()]))
+    return sorted(set([profile_registry.get_category(profile) for profile in get_all_profile_names()]))
 
 
 def get_synced_count():
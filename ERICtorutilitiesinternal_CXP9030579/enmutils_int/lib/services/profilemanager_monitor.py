@@ -10,6 +10,7 @@ import time
 from datetime import datetime
 
 from enmutils.lib import process, timestamp, persistence
+from enmutils_int.lib import profile_host
 
 logger = logging.getLogger(__name__)
 PROFILE_MONITOR_LOG_PATH = "/home/enmutils/services/profile_monitor.log"
@@ -225,7 +226,10 @@ def profile_clean_up(profile):
     """
     logger.debug("Performing profile cleanup on {0}".format(profile.NAME))
     try:
-        process.kill_spawned_process(profile.NAME, profile.pid)
+        if profile_host.get_host(profile):  # The profile host process is shared with other profiles
+            profile_host.request_stop(profile)
+        else:
+            process.kill_spawned_process(profile.NAME, profile.pid)
     except Exception as e:
         logger.debug(str(e))
     finally:
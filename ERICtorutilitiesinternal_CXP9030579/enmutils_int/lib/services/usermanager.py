@@ -7,7 +7,7 @@ from enmutils.lib import enm_user_2, log, persistence
 from enmutils_int.lib.common_utils import delete_profile_users, create_users_operation
 from enmutils_int.lib.enm_user import get_workload_admin_user, workload_admin_with_hostname
 from enmutils_int.lib.services import usermanager_helper_methods as helper
-from enmutils_int.lib.services.custom_queue import CustomContainsQueue
+from enmutils_int.lib.services.custom_queue import KeyedWorkRegistry
 from enmutils_int.lib.services.service_common_utils import (get_json_response, abort_with_message,
                                                             create_and_start_once_off_background_scheduled_job,
                                                             create_and_start_background_scheduled_job)
@@ -17,7 +17,7 @@ SERVICE_NAME = "usermanager"
 USER_COUNT_THRESHOLD = 5000
 application_blueprint = Blueprint(SERVICE_NAME, __name__, url_prefix=URL_PREFIX)
 
-DELETION_QUEUE = CustomContainsQueue()
+DELETION_QUEUE = KeyedWorkRegistry()
 SCHEDULER_INTERVAL_MINS = 60
 
 
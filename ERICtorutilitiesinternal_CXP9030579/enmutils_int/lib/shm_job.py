@@ -20,6 +20,7 @@ from enmutils.lib import log
 from enmutils.lib.exceptions import (EnmApplicationError, JobExecutionError,
                                      JobValidationError, TimeOutError)
 from enmutils.lib.headers import SHM_LONG_HEADER
+from enmutils_int.lib import shm_job_monitor
 from enmutils_int.lib.shm_data import (PLATFORM_TYPES, SHM_JOB_CREATE_ENDPOINT,
                                        SHM_JOB_DELETE_ENDPOINT,
                                        SHM_JOB_DETAILS,
@@ -554,18 +555,38 @@ class ShmJob(object):
         else:
             job_time = 45
         log.logger.debug("Maximum time considered for performing SHM Job activity is {0} minutes".format(job_time))
+        poll_interval = shm_job_monitor.get_poll_interval(job_time)
         expiry_time = datetime.datetime.now() + datetime.timedelta(minutes=job_time)
-        while datetime.datetime.now() < expiry_time:
-            shm_job = self._get_job_response()
-            if shm_job["status"] in ["COMPLETED", "SCHEDULED"]:
-                log.logger.debug('Status of the SHM Job "{0}" is "{1}"'.format(self.name, shm_job["status"]))
-                return shm_job["status"]
-            elif shm_job["status"] not in ["RUNNING", "CREATED"]:
-                raise EnmApplicationError("SHM Job changed to unexpected status. HTTPResponse was {0}"
-                                          .format(str(shm_job)))
-            log.logger.debug("Sleeping for {0} seconds before re-trying..".format(30))
-            sleep(30)
-        raise TimeOutError('Cannot verify the state "{0}" for job "{1}"'.format(shm_job["status"], self.name))
+        try:
+            while datetime.datetime.now() < expiry_time:
+                shm_job = self._get_monitored_job_response(poll_interval)
+                if not shm_job:
+                    log.logger.debug('SHM Job "{0}" not found in the job list'.format(self.name))
+                elif shm_job["status"] in ["COMPLETED", "SCHEDULED"]:
+                    log.logger.debug('Status of the SHM Job "{0}" is "{1}"'.format(self.name, shm_job["status"]))
+                    return shm_job["status"]
+                elif shm_job["status"] not in ["RUNNING", "CREATED"]:
+                    raise EnmApplicationError("SHM Job changed to unexpected status. HTTPResponse was {0}"
+                                              .format(str(shm_job)))
+                log.logger.debug("Sleeping for {0} seconds before re-trying..".format(poll_interval))
+                sleep(poll_interval)
+        finally:
+            shm_job_monitor.deregister_job(self.name)
+        raise TimeOutError('Cannot verify the state "{0}" for job "{1}"'.format(
+            shm_job["status"] if shm_job else None, self.name))
+
+    def _get_monitored_job_response(self, max_age):
+        """
+        Retrieve the job result from the SHM job monitor, which polls the job list for the states of the jobs being
+        waited upon which are out of date
+
+        :param max_age: Maximum age in seconds of the job state polled by the monitor
+        :type max_age: int
+
+        :return: Job result as returned in the SHM job list, or None if the job was not found
+        :rtype: dict or None
+        """
+        return shm_job_monitor.get_job_state(self.name, self.user, max_age=max_age)
 
     def _teardown(self):
         """
@@ -650,9 +671,9 @@ class ShmJob(object):
         :raises EnmApplicationError: when KeyError occurs
         :raises IndexError: when the shm job is not in the list of 50 SHM jobs.
         """
-        retry = 0
-        offset, limit = 1, 50
+        retry = page = 0
         while retry <= 60:
+            offset, limit = shm_job_monitor.get_page_bounds(page)
             try:
                 if self.name == "CapacityExpansionLicenseJob":
                     payload = self.construct_capacity_expansion_license_job_payload(limit)
@@ -664,8 +685,7 @@ class ShmJob(object):
                                                           jobName=self.name)[0]
                 return list_of_jobs
             except IndexError as e:
-                offset += 50
-                limit += 50
+                page += 1
                 log.logger.debug("Unable to retrieve job list using {0}".format(SHM_JOBS_LIST_ENDPOINT))
             except Exception as e:
                 log.logger.debug("Unable to retrieve job list using {0}".format(str(e)))
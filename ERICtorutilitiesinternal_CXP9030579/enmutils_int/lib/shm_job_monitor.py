@@ -0,0 +1,222 @@
+# ********************************************************************
+# Name    : SHM Job Monitor
+# Summary : Central monitor of the state of the SHM jobs created by
+#           the workload. Jobs being waited upon register in
+#           persistence, and a single paged query of the SHM job
+#           list covering the registered jobs whose states are out
+#           of date is made by whichever profile first finds its job
+#           state out of date. The states are stored in persistence,
+#           each with the time it was polled. The polling interval
+#           adapts to the expected duration of the job being waited
+#           upon.
+# ********************************************************************
+
+import json
+import time
+
+from enmutils.lib import log, persistence, mutexer
+from enmutils.lib.exceptions import EnmApplicationError
+from enmutils.lib.headers import SHM_LONG_HEADER
+from enmutils_int.lib.shm_data import SHM_JOBS_LIST_ENDPOINT
+
+SHM_JOB_STATES_KEY = "shm-job-states"
+MONITORED_JOBS_KEY = "shm-monitored-jobs"
+POLL_MUTEX = "shm-job-states-poll"
+MONITORED_JOBS_MUTEX = "shm-monitored-jobs"
+PAGE_SIZE = 50
+MAX_PAGES = 20
+MIN_POLL_INTERVAL_SECS = 30
+MAX_POLL_INTERVAL_SECS = 180
+POLLS_PER_EXPECTED_JOB_DURATION = 90
+REGISTRATION_EXPIRY_SECS = 15 * 60
+PERSISTENCE_EXPIRY_SECS = 60 * 60
+POLL_TIMEOUT_SECS = 5 * 60
+
+
+def get_poll_interval(expected_job_time_mins):
+    """
+    Get the polling interval of a job, based on the expected duration of the job
+
+    :param expected_job_time_mins: Maximum time in minutes expected for the job to complete
+    :type expected_job_time_mins: int
+
+    :return: Polling interval in seconds
+    :rtype: int
+    """
+    interval = expected_job_time_mins * 60 / POLLS_PER_EXPECTED_JOB_DURATION
+    return max(MIN_POLL_INTERVAL_SECS, min(MAX_POLL_INTERVAL_SECS, interval))
+
+
+def get_page_bounds(page):
+    """
+    Get the offset and limit of the page of the SHM job list, i.e. the positions of its first and last jobs
+
+    :param page: Index of the page, starting from 0
+    :type page: int
+
+    :return: Tuple of the offset and limit of the page
+    :rtype: tuple
+    """
+    return page * PAGE_SIZE + 1, (page + 1) * PAGE_SIZE
+
+
+def register_job(job_name):
+    """
+    Register the job, so that its state is included in the job list polls
+
+    :param job_name: Name of the SHM job
+    :type job_name: str
+    """
+    with mutexer.mutex(MONITORED_JOBS_MUTEX, persisted=True):
+        jobs = persistence.get(MONITORED_JOBS_KEY) or {}
+        jobs[job_name] = time.time()
+        persistence.set(MONITORED_JOBS_KEY, jobs, PERSISTENCE_EXPIRY_SECS, log_values=False)
+
+
+def deregister_job(job_name):
+    """
+    Deregister the job, so that its state is no longer included in the job list polls
+
+    :param job_name: Name of the SHM job
+    :type job_name: str
+    """
+    with mutexer.mutex(MONITORED_JOBS_MUTEX, persisted=True):
+        jobs = persistence.get(MONITORED_JOBS_KEY) or {}
+        if jobs.pop(job_name, None):
+            persistence.set(MONITORED_JOBS_KEY, jobs, PERSISTENCE_EXPIRY_SECS, log_values=False)
+
+
+def get_monitored_jobs():
+    """
+    Get the names of the jobs registered for monitoring, excluding expired registrations
+
+    :return: Set of job names
+    :rtype: set
+    """
+    expiry_time = time.time() - REGISTRATION_EXPIRY_SECS
+    jobs = persistence.get(MONITORED_JOBS_KEY) or {}
+    return set(job_name for job_name, registered_time in jobs.iteritems() if registered_time > expiry_time)
+
+
+def _query_job_states(user, job_names):
+    """
+    Query the SHM job list, page by page, until all of the supplied jobs have been found
+
+    :param user: User who will query the SHM job list
+    :type user: `enm_user_2.User`
+    :param job_names: Set of job names
+    :type job_names: set
+
+    :raises EnmApplicationError: if the SHM job list cannot be retrieved
+
+    :return: Dictionary of job name to job result, for the jobs found
+    :rtype: dict
+    """
+    job_states = {}
+    for page in xrange(MAX_PAGES):
+        offset, limit = get_page_bounds(page)
+        payload = json.dumps({"columns": [], "offset": offset, "limit": limit, "sortBy": "startTime",
+                              "orderBy": "desc"})
+        response = user.post(SHM_JOBS_LIST_ENDPOINT, data=payload, headers=SHM_LONG_HEADER)
+        if not response.ok:
+            raise EnmApplicationError("Failed to retrieve SHM job list, status code: {0}, response: {1}"
+                                      .format(response.status_code, response.text))
+        results = response.json()["result"]
+        job_states.update({result["jobName"]: result for result in results if result.get("jobName") in job_names})
+        if len(results) < PAGE_SIZE or len(job_states) == len(job_names):
+            break
+    return job_states
+
+
+def _is_fresh(polled_state, max_age):
+    """
+    Check if the polled state was polled within the maximum age
+
+    :param polled_state: Dictionary of the job result and the time it was polled, or None
+    :type polled_state: dict
+    :param max_age: Maximum age in seconds of the polled state, None if any age is out of date
+    :type max_age: int
+
+    :return: True if the state was polled within the maximum age
+    :rtype: bool
+    """
+    return bool(polled_state) and max_age is not None and time.time() - polled_state["timestamp"] <= max_age
+
+
+def poll_job_states(user, max_age=None):
+    """
+    Query the SHM job list for the state of the registered jobs whose states are out of date, and store the states in
+    persistence, leaving the states which are up to date as they are
+
+    :param user: User who will query the SHM job list
+    :type user: `enm_user_2.User`
+    :param max_age: Maximum age in seconds of the states which are not polled again, None to poll all states
+    :type max_age: int
+
+    :return: Dictionary of job name to job result, for the registered jobs found
+    :rtype: dict
+    """
+    job_names = get_monitored_jobs()
+    polled_states = persistence.get(SHM_JOB_STATES_KEY) or {}
+    polled_states = {job_name: polled_states[job_name] for job_name in job_names if job_name in polled_states}
+    missing_job_names = set(job_name for job_name in job_names
+                            if not _is_fresh(polled_states.get(job_name), max_age))
+    if missing_job_names:
+        timestamp = time.time()
+        job_states = _query_job_states(user, missing_job_names)
+        for job_name, result in job_states.iteritems():
+            previous_status = polled_states.get(job_name, {}).get("result", {}).get("status")
+            if previous_status != result.get("status"):
+                log.logger.debug("Status of SHM job {0} changed from {1} to {2}"
+                                 .format(job_name, previous_status, result.get("status")))
+            polled_states[job_name] = {"result": result, "timestamp": timestamp}
+        persistence.set(SHM_JOB_STATES_KEY, polled_states, PERSISTENCE_EXPIRY_SECS, log_values=False)
+        log.logger.debug("Polled state of {0} of {1} out of date SHM job(s), {2} monitored"
+                         .format(len(job_states), len(missing_job_names), len(job_names)))
+    return {job_name: polled_state["result"] for job_name, polled_state in polled_states.iteritems()}
+
+
+def _read_job_state(job_name, max_age):
+    """
+    Read the polled state of the job, if polled within the maximum age
+
+    :param job_name: Name of the SHM job
+    :type job_name: str
+    :param max_age: Maximum age in seconds of the polled state
+    :type max_age: int
+
+    :return: Job result or None if the job has not been found in a poll within the maximum age
+    :rtype: dict or None
+    """
+    polled_state = (persistence.get(SHM_JOB_STATES_KEY) or {}).get(job_name)
+    if _is_fresh(polled_state, max_age):
+        return polled_state["result"]
+
+
+def get_job_state(job_name, user, max_age=MIN_POLL_INTERVAL_SECS):
+    """
+    Get the state of the job, polling the SHM job list if its shared state is out of date, along with the other
+    registered jobs whose states are out of date
+
+    :param job_name: Name of the SHM job
+    :type job_name: str
+    :param user: User who will query the SHM job list if a poll is required
+    :type user: `enm_user_2.User`
+    :param max_age: Maximum age in seconds of the polled states
+    :type max_age: int
+
+    :return: Job result as returned in the SHM job list, or None if the job was not found
+    :rtype: dict or None
+    """
+    register_job(job_name)
+    job_state = _read_job_state(job_name, max_age)
+    if job_state:
+        return job_state
+    with mutexer.mutex(POLL_MUTEX, persisted=True, timeout=POLL_TIMEOUT_SECS):
+        job_state = _read_job_state(job_name, max_age)
+        if job_state:
+            return job_state
+        try:
+            return poll_job_states(user, max_age).get(job_name)
+        except Exception as e:
+            log.logger.debug("Problem encountered polling SHM job states: {0}".format(str(e)))
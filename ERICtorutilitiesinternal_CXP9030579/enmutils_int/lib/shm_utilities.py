@@ -29,6 +29,7 @@ from enmutils.lib.shell import Command, run_local_cmd
 from enmutils_int.lib import netsim_operations, node_pool_mgr
 from enmutils_int.lib.common_utils import chunks
 from enmutils_int.lib.load_node import annotate_fdn_poid_return_node_objects
+from enmutils_int.lib.script_engine_output import split_tabular_rows
 from enmutils_int.lib.services import deploymentinfomanager_adaptor, nodemanager_adaptor
 from enmutils_int.lib.shm_backup_jobs import (BackupJobBSC, BackupJobCOMECIM, BackupJobCPP,
                                               BackupJobMiniLink, BackupJobMiniLink669x,
@@ -1205,8 +1206,7 @@ class SoftwarePackage(object):
         if "0 instance(s)" in response.get_output():
             log.logger.debug("Failed to retrieve NetworkElement ossModelIdentities from ENM.")
             return model_ids
-        for line in response.get_output()[2:-2]:
-            values = line.strip().split("\t")
+        for values in split_tabular_rows(response.get_output()[2:-2]):
             try:
                 model_ids[values[0]] = values[1]
             except IndexError:
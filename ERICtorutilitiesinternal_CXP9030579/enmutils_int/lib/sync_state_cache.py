@@ -0,0 +1,125 @@
+# ********************************************************************
+# Name    : Sync State Cache
+# Summary : Shared cache of the CM synchronization state of the
+#           network elements in ENM. The states are retrieved by a
+#           single network wide query, stored in persistence grouped
+#           by state, and re-used by all profiles until the cached
+#           states are older than the allowed staleness. Refreshed
+#           on a schedule by the nodemanager service.
+# ********************************************************************
+
+import time
+from collections import defaultdict
+
+from enmutils.lib import log, persistence, mutexer, config
+from enmutils.lib.enm_node import get_enm_network_element_sync_states
+from enmutils_int.lib.enm_user import get_workload_admin_user
+
+SYNC_STATES_KEY = "network-sync-states"
+SYNC_STATES_MUTEX = "network-sync-states-refresh"
+SYNC_STATES_EXPIRY = 60 * 60
+SYNC_STATES_REFRESH_TIMEOUT = 5 * 60
+DEFAULT_MAX_AGE = 10 * 60
+MAX_AGE_PROPERTY = "sync_state_max_age"
+SYNCHRONIZED = "SYNCHRONIZED"
+
+
+def get_max_age():
+    """
+    Get the maximum age in seconds of cached sync states which may be used, configurable by property
+
+    :return: Maximum age in seconds of the cached sync states
+    :rtype: int
+    """
+    return int(config.get_prop(MAX_AGE_PROPERTY)) if config.has_prop(MAX_AGE_PROPERTY) else DEFAULT_MAX_AGE
+
+
+def _read_cached_sync_states():
+    """
+    Read the cached sync states from persistence
+
+    :return: Tuple containing the time the states were retrieved and the dictionary of node id to sync state
+    :rtype: tuple
+    """
+    cached = persistence.get(SYNC_STATES_KEY)
+    if not cached:
+        return 0, {}
+    sync_states = {node_id: state for state, node_ids in cached["states"].iteritems() for node_id in node_ids}
+    return cached["timestamp"], sync_states
+
+
+def refresh_sync_states(user=None):
+    """
+    Query ENM for the sync state of all network elements and store the states in persistence, grouped by state
+
+    :param user: User who will query the sync states, defaults to the workload admin user
+    :type user: `enm_user_2.User`
+
+    :return: Dictionary of node id to sync state
+    :rtype: dict
+    """
+    user = user or get_workload_admin_user()
+    sync_states = get_enm_network_element_sync_states(user)
+    grouped_states = defaultdict(list)
+    for node_id, state in sync_states.iteritems():
+        grouped_states[state].append(node_id)
+    persistence.set(SYNC_STATES_KEY, {"timestamp": time.time(), "states": dict(grouped_states)}, SYNC_STATES_EXPIRY,
+                    log_values=False)
+    log.logger.debug("Cached sync states of {0} network elements, {1} synchronized."
+                     .format(len(sync_states), len(grouped_states.get(SYNCHRONIZED, []))))
+    return sync_states
+
+
+def get_sync_states(user=None, max_age=None):
+    """
+    Get the sync state of all network elements, refreshing the cached states if older than the maximum age
+
+    :param user: User who will query the sync states if a refresh is required, defaults to the workload admin user
+    :type user: `enm_user_2.User`
+    :param max_age: Maximum age in seconds of the cached states, defaults to the configured maximum age
+    :type max_age: int
+
+    :return: Dictionary of node id to sync state
+    :rtype: dict
+    """
+    max_age = get_max_age() if max_age is None else max_age
+    timestamp, sync_states = _read_cached_sync_states()
+    if time.time() - timestamp <= max_age:
+        return sync_states
+    with mutexer.mutex(SYNC_STATES_MUTEX, persisted=True, timeout=SYNC_STATES_REFRESH_TIMEOUT):
+        timestamp, sync_states = _read_cached_sync_states()
+        if time.time() - timestamp <= max_age:
+            return sync_states
+        return refresh_sync_states(user)
+
+
+def get_cache_age():
+    """
+    Get the age of the cached sync states
+
+    :return: Age in seconds of the cached sync states, or None if there are no cached states
+    :rtype: float or None
+    """
+    timestamp, _ = _read_cached_sync_states()
+    return round(time.time() - timestamp, 2) if timestamp else None
+
+
+def split_nodes_by_sync_state(nodes, user=None, max_age=None):
+    """
+    Split the supplied nodes into the synchronised and unsynchronised nodes, using the cached sync states
+
+    :param nodes: List of `enm_node.Node` instances
+    :type nodes: list
+    :param user: User who will query the sync states if a refresh is required, defaults to the workload admin user
+    :type user: `enm_user_2.User`
+    :param max_age: Maximum age in seconds of the cached states, defaults to the configured maximum age
+    :type max_age: int
+
+    :return: Tuple of two lists, containing synced and unsynced nodes
+    :rtype: tuple
+    """
+    sync_states = get_sync_states(user=user, max_age=max_age)
+    synced, unsynced = [], []
+    for node in nodes:
+        (synced if sync_states.get(node.node_id) == SYNCHRONIZED else unsynced).append(node)
+    return synced, unsynced
@@ -128,14 +128,17 @@ class InputData(object):
     FIFTEEN_K_NETWORK_SIZE = 27500
     FORTY_K_NETWORK_SIZE = 50000
 
-    def __init__(self):
+    def __init__(self, network_config=None):
         """
         Initialise method of the class
 
+        :param network_config: Specific network configuration mapping to use, instead of the configured or detected one
+        :type network_config: str
         """
         self.pool = node_pool_mgr.get_pool() or {}
         self.networks = get_all_networks()
         self.ignore_warning = False
+        self.network_config = network_config
 
     @property
     def get_all_exclusive_profiles(self):
@@ -166,14 +169,14 @@ class InputData(object):
 
     @property
     def network_key(self):
-        network_size = self.network_size
-        if not network_size:
+        network_size = None if self.network_config else self.network_size
+        if not self.network_config and not network_size:
             if not persistence.get(NETWORK_TYPE):
                 detect_transport_network_and_set_transport_size()
             else:
                 config.set_prop('network_config', persistence.get(NETWORK_TYPE))
-        if config.has_prop('network_config'):
-            return map_synonym_to_network_size(config.get_prop('network_config'))
+        if self.network_config or config.has_prop('network_config'):
+            return map_synonym_to_network_size(self.network_config or config.get_prop('network_config'))
         elif 0 < network_size <= self.EXTRA_SMALL:
             return self.EXTRA_K
         elif network_size and network_size <= self.FIVE_K_NETWORK_SIZE:
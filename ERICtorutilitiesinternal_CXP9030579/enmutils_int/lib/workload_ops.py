@@ -18,14 +18,15 @@ from textwrap import TextWrapper
 
 from tabulate import tabulate
 
-from enmutils.lib import log, persistence, mutexer, cache, shell, config, process
+from enmutils.lib import log, persistence, persistence_monitor, mutexer, cache, shell, config, process
 from enmutils.lib.cache import is_enm_on_cloud_native, is_host_physical_deployment
 from enmutils.lib.enm_user_2 import User
 from enmutils.lib.exceptions import EnvironError, ProfileError, EnmApplicationError, NetsimError
 from enmutils.lib.thread_queue import ThreadQueue
 from enmutils_int.bin.network import network_health_check
 from enmutils_int.lib import (load_mgr, node_pool_mgr, workload_schedule,
-                              common_utils, profile_properties_manager, profile_manager)
+                              common_utils, profile_properties_manager, profile_manager, allocation_planner,
+                              profile_host)
 from enmutils_int.lib.common_utils import (remove_profile_from_active_workload_profiles,
                                            add_profile_to_active_workload_profiles)
 from enmutils_int.lib.services import deployment_info_helper_methods
@@ -344,10 +345,19 @@ class WorkloadPoolSummaryOperation(WorkloadInfoOperation):
 
     def _print_node_pool_summary(self):
         """
-        Prints the total number of nodes in the workload pool.
+        Prints the total number of nodes in the workload pool, and the number of nodes of each NE type allocated,
+        unallocated and exclusively allocated, taken from the node pool counters rather than the nodes themselves.
         """
         log.logger.info("{0}".format(log.green_text(log.underline_text("\nNodes Summary\n"))))
         log.logger.info(log.blue_text("  TOTAL NODES FOUND: %d" % self.total_nodes))
+        stats = node_pool_mgr.get_pool_stats() if self.total_nodes else None
+        if stats:
+            log.logger.info("")
+            log.logger.info(tabulate(
+                [[ne_type, ne_type_stats["total"], ne_type_stats["allocated"],
+                  ne_type_stats["total"] - ne_type_stats["allocated"], ne_type_stats["exclusive"]]
+                 for ne_type, ne_type_stats in sorted(stats.iteritems())],
+                headers=["NE Type", "Total", "Allocated", "Unallocated", "Exclusive"]))
         log.logger.info("")
 
 
@@ -583,14 +593,6 @@ class ListNodesOperation(WorkloadPoolSummaryOperation):
                 log.logger.info(','.join(str_representation))
                 log.logger.info("NODES COUNT of Profile {0}: {1}".format(profile, total_nodes))
 
-    def _print_node_pool_summary(self):
-        """
-        Prints a summary of total/available/error nodes in the workload pool
-        """
-        log.logger.info("{0}".format(log.green_text(log.underline_text("\nNodes Summary\n"))))
-        log.logger.info(log.blue_text("  TOTAL NODES FOUND: %d" % self.total_nodes))
-        log.logger.info("")
-
 
 class StatusOperation(WorkloadPoolSummaryOperation):
     ERROR_TYPES = [obj().__class__.__name__ for obj in [NetsimError, EnvironError, EnmApplicationError, ProfileError]]
@@ -670,6 +672,7 @@ class StatusOperation(WorkloadPoolSummaryOperation):
                 self._print_node_pool_summary()
                 self.check_count_of_workload_admin_users()
                 self.check_if_enm_accessible()
+                self.check_persistence_health()
 
     def _validate(self):
         """
@@ -844,6 +847,21 @@ class StatusOperation(WorkloadPoolSummaryOperation):
         except Exception as e:
             log.logger.debug('Error occured while chekcking password-less access to enm. Error: {0}'.format(e))
 
+    @staticmethod
+    def check_persistence_health():
+        """
+        Warns the user if the latest sample of the persistence DB health reports high memory usage, slow commands or
+        key growth
+        """
+        try:
+            log.logger.debug('Checking the health of the persistence DB')
+            history = persistence_monitor.get_history()
+            if history:
+                for warning in persistence_monitor.check_health(history[-1], history[:-1]):
+                    log.logger.warn("PERSISTENCE WARNING : {0}".format(warning))
+        except Exception as e:
+            log.logger.debug('Error occurred while checking the health of the persistence DB. Error: {0}'.format(e))
+
     def get_dependent_services_status(self):
         """
         Check the status of the dependent services
@@ -1264,8 +1282,12 @@ class KillOperation(WorkloadInfoOperation):
                 log.logger.info("Successfully removed profile {0} data keys in persistence".format(profile_name))
                 log.logger.debug("Fetching process id for {0}".format(profile_name))
                 log.logger.info("{0} was removed in active_workload_profiles list in persistence.".format(profile_name))
-            profile_pid = process.get_profile_daemon_pid(profile_name)
-            if profile_pid:
+            host_identifier = profile_host.stop_hosted_profile(profile_name)
+            profile_pid = None if host_identifier else process.get_profile_daemon_pid(profile_name)
+            if host_identifier:
+                log.logger.info("{0} is hosted by profile host {1}, which has been requested to stop it, as the "
+                                "host process is shared with other profiles".format(profile_name, host_identifier))
+            elif profile_pid:
                 profile_pid = profile_pid[0]
                 log.logger.debug("Process id for {0} - {1}".format(profile_name, profile_pid))
                 log.logger.info("Process id for {0} - {1}".format(profile_name, profile_pid))
@@ -1536,6 +1558,8 @@ class StartOperation(WorkloadHealthCheckOperation):
         self.priority = argument_dict['--priority']
         self.new_only = argument_dict['--new-only'] if argument_dict['--new-only'] else False
         self.updated = argument_dict['--updated'] if argument_dict['--updated'] else False
+        self.dry_run = argument_dict.get('--dry-run', False)
+        self.plan_allocation = argument_dict.get('--plan-allocation', False) or self.dry_run
         self.operation_type = "start"
 
     def _validate(self):
@@ -1705,8 +1729,13 @@ class StartOperation(WorkloadHealthCheckOperation):
         Starts profiles
         """
         deployment_info_helper_methods.output_network_basic()
+        if self.dry_run:
+            self._plan_node_allocation()
+            return
         if not self.no_exclusive:
             self._allocate_nodes_to_exclusive_profiles()
+        if self.plan_allocation:
+            self._plan_node_allocation()
         schedule = workload_schedule.WorkloadSchedule(schedule_file=self.schedule_file,
                                                       profile_dict=self.valid_profiles,
                                                       release_nodes=self.release_nodes)
@@ -1733,6 +1762,21 @@ class StartOperation(WorkloadHealthCheckOperation):
                 node_pool_mgr.cached_nodes_list = node_pool_mgr.get_pool().nodes
                 self._allocate_exclusive_nodes(profile_list=self.profile_names, service_to_be_used=False)
 
+    def _plan_node_allocation(self):
+        """
+        Plan the node allocation for all profiles being started in a single pass, and commit it unless a dry run
+        """
+        log.logger.info("Planning node allocation for {0} profile(s), please wait.".format(len(self.valid_profiles)))
+        planner = allocation_planner.AllocationPlanner(self.valid_profiles.values())
+        planner.plan()
+        planner.log_plan()
+        if self.dry_run:
+            log.logger.info("Dry run: no nodes allocated and no profiles started.")
+            return
+        planner.commit()
+        if self.nodemanager_service_to_be_used:
+            nodemanager_adaptor.update_nodes_cache_on_request()
+
     def _remove_already_started_profiles(self):
         """
         Removes profiles from starting list if profile already started.
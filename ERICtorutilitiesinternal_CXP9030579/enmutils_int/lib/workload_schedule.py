@@ -5,11 +5,15 @@
 #           in which profiles will be started, and the sleep between
 #           those profiles, triggers the stop and start operations,
 #           performs management around unsupported and already
-#           running profiles.
+#           running profiles. Profiles are started concurrently where
+#           the start dependencies, parallelism and load budget allow.
 # ********************************************************************
 
 import imp
+import math
 import os
+import re
+import threading
 import time
 from collections import OrderedDict
 
@@ -17,8 +21,198 @@ from enmutils.lib import exception
 from enmutils.lib import log, filesystem, config, persistence, shell, mutexer
 from enmutils.lib.exceptions import NoNodesAvailable
 from enmutils_int.lib import profile_manager
+from enmutils_int.lib.nrm_default_configurations import basic_network, profile_values
 from enmutils_int.lib.schedules import full_schedule
 
+START_PARALLELISM_PROPERTY = "workload_start_parallelism"
+START_LOAD_BUDGET_PROPERTY = "workload_start_load_budget"
+TIMELINE_WIDTH = 60
+
+
+def get_configured_start_dependencies():
+    """
+    Get the profiles each profile waits for before doing any work, as configured in the basic network, i.e. the
+    profiles listed as its start after profiles, and the profiles listing it as one of their dependent profiles
+
+    :return: Dictionary of profile name to the list of names of the profiles it waits for
+    :rtype: dict
+    """
+    dependencies = {}
+    for application_profiles in profile_values.networks.get('basic').itervalues():
+        for name, values in application_profiles.iteritems():
+            dependencies.setdefault(name, []).extend(values.get(basic_network.START_AFTER, []))
+            for dependent_profile in values.get(basic_network.DEPENDENT, []):
+                dependencies.setdefault(dependent_profile, []).append(name)
+    return dependencies
+
+
+def get_start_dependencies(profile_names):
+    """
+    Get the profiles each profile is to be started after, i.e. the setup profile of its application and any profile it
+    is configured to wait for, where those profiles are also being started
+
+    :param profile_names: Names of the profiles being started
+    :type profile_names: list
+
+    :return: Dictionary of profile name to the list of names of the profiles it depends on
+    :rtype: dict
+    """
+    configured_dependencies = get_configured_start_dependencies()
+    dependencies = {}
+    for name in profile_names:
+        setup_profile = "{0}_SETUP".format(re.split(r'_\d+', name.upper())[0])
+        required = configured_dependencies.get(name, []) + [setup_profile]
+        dependencies[name] = [dependency for index, dependency in enumerate(required)
+                              if dependency in profile_names and dependency != name and
+                              dependency not in required[:index]]
+    return dependencies
+
+
+class StartScheduler(object):
+
+    def __init__(self, profiles_in_schedule_order, dependencies, start_func, parallelism=1, load_budget=0):
+        """
+        Starts the profiles in schedule order, as soon as the profiles they depend on have been started, running up to
+        the given number of starts concurrently. The start sleep of a profile is the load its start puts on ENM, the
+        load of the starts in progress being kept within the budget.
+
+        :param profiles_in_schedule_order: Ordered dict of profile name to start and stop sleeps
+        :type profiles_in_schedule_order: `OrderedDict`
+        :param dependencies: Dictionary of profile name to the names of the profiles it is to be started after
+        :type dependencies: dict
+        :param start_func: Function called with the profile name and sleeps, which starts the profile
+        :type start_func: function
+        :param parallelism: Maximum number of profile starts in progress
+        :type parallelism: int
+        :param load_budget: Maximum load of the profile starts in progress, 0 for no limit. A profile whose load
+                            exceeds the budget is started once no other start is in progress.
+        :type load_budget: int
+        """
+        self.pending = OrderedDict(profiles_in_schedule_order)
+        self.dependencies = dependencies
+        self.start_func = start_func
+        self.parallelism = max(1, parallelism)
+        self.load_budget = load_budget
+        self.in_progress = {}
+        self.started = set()
+        self.timeline = OrderedDict()
+        self.start_time = None
+        self.condition = threading.Condition()
+
+    def _get_next_profile(self):
+        """
+        Get the first profile in schedule order whose dependencies have all been started
+
+        :return: Name of the profile or None if no profile is ready to be started
+        :rtype: str or None
+        """
+        return next((name for name in self.pending
+                     if all(dependency in self.started for dependency in self.dependencies.get(name, []))), None)
+
+    def _can_start(self, load):
+        """
+        Check if a profile start of the given load fits within the parallelism and load budget
+
+        :param load: Load of the profile start
+        :type load: int
+
+        :return: True if the profile can be started now
+        :rtype: bool
+        """
+        if not self.in_progress:
+            return True
+        return len(self.in_progress) < self.parallelism and (
+            not self.load_budget or sum(self.in_progress.values()) + load <= self.load_budget)
+
+    def _start(self, name, sleeps):
+        """
+        Start the profile in a thread of its own
+        """
+        self.in_progress[name] = sleeps[0]
+        self.timeline[name] = [time.time(), None]
+        thread = threading.Thread(target=self._run, args=(name, sleeps), name=name)
+        thread.daemon = True
+        thread.start()
+
+    def _run(self, name, sleeps):
+        """
+        Run the start function of the profile, then release its slot to the profiles waiting
+        """
+        try:
+            self.start_func(name, sleeps)
+        except Exception as e:
+            log.logger.debug("Failed to start profile {0}: {1}".format(name, str(e)))
+        finally:
+            with self.condition:
+                self._finish(name)
+
+    def _finish(self, name):
+        """
+        Record the start of the profile as completed, waking the scheduler. Called with the condition held.
+
+        :param name: Name of the profile
+        :type name: str
+        """
+        self.in_progress.pop(name, None)
+        self.started.add(name)
+        self.timeline[name][1] = time.time()
+        self.condition.notify_all()
+
+    def _start_ready_profiles(self):
+        """
+        Start the profiles, in schedule order, until the next profile is waiting for its dependencies, the parallelism
+        or the load budget. Called with the condition held.
+
+        :return: Names of the profiles started
+        :rtype: list
+        """
+        started = []
+        while self.pending:
+            name = self._get_next_profile()
+            if name and self._can_start(self.pending[name][0]):
+                self._start(name, self.pending.pop(name))
+                started.append(name)
+            elif not name and not self.in_progress:
+                name = next(iter(self.pending))
+                log.logger.debug("Dependencies of {0} cannot be met, starting it regardless: {1}"
+                                 .format(name, self.dependencies.get(name)))
+                self.dependencies[name] = []
+            else:
+                break
+        return started
+
+    def run(self):
+        """
+        Start all the profiles, returning once all the starts have completed
+        """
+        self.start_time = time.time()
+        with self.condition:
+            while self.pending or self.in_progress:
+                self._start_ready_profiles()
+                if self.in_progress:
+                    self.condition.wait(1)
+
+    def get_timeline(self):
+        """
+        Get a chart of the time each profile start was in progress, in the order the profiles were started
+
+        :return: Chart of the profile starts, one line per profile
+        :rtype: str
+        """
+        if not self.timeline:
+            return ""
+        duration = max(float(max(end for _, end in self.timeline.values()) - self.start_time), 0.001)
+        name_width = max(len(name) for name in self.timeline)
+        lines = ["Workload start timeline, {0:.0f}s in total, {1:.1f}s per column:".format(
+            duration, duration / TIMELINE_WIDTH)]
+        for name, (start, end) in self.timeline.iteritems():
+            first = min(int((start - self.start_time) / duration * TIMELINE_WIDTH), TIMELINE_WIDTH - 1)
+            last = max(first + 1, int(math.ceil((end - self.start_time) / duration * TIMELINE_WIDTH)))
+            lines.append("{0} |{1}{2}{3}| {4:6.1f}s - {5:.1f}s".format(
+                name.ljust(name_width), " " * first, "#" * (last - first), " " * (TIMELINE_WIDTH - last),
+                start - self.start_time, end - self.start_time))
+        return "\n".join(lines)
+
 
 class WorkloadSchedule(object):
 
@@ -45,6 +239,8 @@ class WorkloadSchedule(object):
         self.initial_install_teardown = initial_install_teardown
         self.once_before_stability = once_before_stability
         self.release_nodes = release_nodes
+        self.start_index = 0
+        self.start_index_lock = threading.Lock()
 
     @staticmethod
     def _finished(action):
@@ -151,17 +347,53 @@ class WorkloadSchedule(object):
                     self._sleep(sleep, profile.profile.NAME)
         return index
 
+    @staticmethod
+    def _get_int_prop(key, default):
+        """
+        Get the value of the integer property, or the default if the property is not set
+
+        :param key: Name of the property
+        :type key: str
+        :param default: Value returned if the property is not set
+        :type default: int
+
+        :return: Value of the property
+        :rtype: int
+        """
+        return int(config.get_prop(key)) if config.has_prop(key) and config.get_prop(key) else default
+
+    def _start_profile(self, profile, sleeps, profiles_in_schedule_order):
+        """
+        Starts the profile, unless already running, then sleeps for its start sleep
+
+        :param profile: Name of the profile
+        :type profile: str
+        :param sleeps: Start and stop sleeps of the profile
+        :type sleeps: tuple
+        :param profiles_in_schedule_order: Ordered dict of the profiles being started
+        :type profiles_in_schedule_order: `OrderedDict`
+        """
+        if self.check_for_existing_process(profile):
+            return
+        with self.start_index_lock:
+            index = self.start_index
+            self.start_index += 1
+        self._execute(index, profile, profiles_in_schedule_order, sleeps)
+
     def start(self):
         """
-        Executes the start schedule operation
+        Executes the start schedule operation, starting the profiles independent of each other concurrently
         """
         profiles_in_schedule_order = self.get_profiles_from_schedule([profile for profile in self.profile_dict.keys()])
-        index = 0
         if profiles_in_schedule_order:
-            for profile, sleeps in profiles_in_schedule_order.iteritems():
-                if self.check_for_existing_process(profile):
-                    continue
-                index = self._execute(index, profile, profiles_in_schedule_order, sleeps)
+            scheduler = StartScheduler(profiles_in_schedule_order,
+                                       get_start_dependencies(profiles_in_schedule_order.keys()),
+                                       lambda profile, sleeps: self._start_profile(profile, sleeps,
+                                                                                   profiles_in_schedule_order),
+                                       parallelism=self._get_int_prop(START_PARALLELISM_PROPERTY, 1),
+                                       load_budget=self._get_int_prop(START_LOAD_BUDGET_PROPERTY, 0))
+            scheduler.run()
+            log.logger.debug(scheduler.get_timeline())
         else:
             log.logger.error("No profiles found in the schedule. Add profile into 'full_schedule' module")
         self._finished("start")
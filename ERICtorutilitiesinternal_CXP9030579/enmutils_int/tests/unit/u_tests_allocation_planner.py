@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+import unittest2
+from mock import patch, Mock
+
+from enmutils.lib import persistence
+from enmutils_int.lib import allocation_planner, node_pool_stats
+from enmutils_int.lib.allocation_planner import AllocationPlanner
+from testslib import unit_test_utils
+
+
+class AllocationPlannerUnitTests(unittest2.TestCase):
+
+    def setUp(self):
+        unit_test_utils.setup()
+        self.erbs_nodes = (unit_test_utils.setup_test_node_objects(4, host_name="netsim1") +
+                           [node for node in unit_test_utils.setup_test_node_objects(8, host_name="netsim2")][4:])
+        self.radio_nodes = unit_test_utils.setup_test_node_objects(4, primary_type="RadioNode", host_name="netsim3")
+        self.nodes = self.erbs_nodes + self.radio_nodes
+
+    def tearDown(self):
+        unit_test_utils.tear_down()
+
+    @staticmethod
+    def get_profile(name, **kwargs):
+        return Mock(NAME=name, EXCLUSIVE=False, spec=["NAME", "EXCLUSIVE"] + [key for key in kwargs], **kwargs)
+
+    def test_can_be_planned__returns_false_for_exclusive_or_special_profiles(self):
+        self.assertFalse(AllocationPlanner.can_be_planned(Mock(NAME="TEST_01", EXCLUSIVE=True)))
+        self.assertFalse(AllocationPlanner.can_be_planned(Mock(NAME="HA_01", EXCLUSIVE=False)))
+        self.assertFalse(AllocationPlanner.can_be_planned(self.get_profile("TEST_01", NUM_NODES={"ERBS": 1},
+                                                                           BATCH_MO_SIZE=1)))
+        self.assertFalse(AllocationPlanner.can_be_planned(self.get_profile("TEST_01", NUM_NODES={})))
+
+    def test_can_be_planned__returns_true_for_num_nodes_or_supported_types(self):
+        self.assertTrue(AllocationPlanner.can_be_planned(self.get_profile("TEST_01", NUM_NODES={"ERBS": 1})))
+        self.assertTrue(AllocationPlanner.can_be_planned(
+            self.get_profile("TEST_01", SUPPORTED_NODE_TYPES=["ERBS"], TOTAL_NODES=2)))
+
+    def test_get_requirements__shares_total_nodes_between_supported_types(self):
+        profile = self.get_profile("TEST_01", SUPPORTED_NODE_TYPES=["ERBS", "RadioNode"], TOTAL_NODES=5)
+        self.assertEqual({"ERBS": 3, "RadioNode": 2},
+                         dict(AllocationPlanner.get_requirements(profile, {"ERBS": 8, "RadioNode": 4})))
+        self.assertEqual({"ERBS": 4, "RadioNode": 1},
+                         dict(AllocationPlanner.get_requirements(profile, {"ERBS": 8, "RadioNode": 1})))
+
+    def test_get_requirements__fills_remaining_total_for_num_nodes_of_minus_one(self):
+        profile = self.get_profile("TEST_01", NUM_NODES={"ERBS": -1, "RadioNode": 2}, TOTAL_NODES=5)
+        self.assertEqual({"ERBS": 3, "RadioNode": 2},
+                         dict(AllocationPlanner.get_requirements(profile, {"ERBS": 8, "RadioNode": 4})))
+        profile = self.get_profile("TEST_01", NUM_NODES={"ERBS": -1})
+        self.assertEqual({"ERBS": 8}, dict(AllocationPlanner.get_requirements(profile, {"ERBS": 8})))
+
+    def test_plan__balances_nodes_across_hosts_and_nodes(self):
+        planner = AllocationPlanner([self.get_profile("TEST_01", NUM_NODES={"ERBS": 4}),
+                                     self.get_profile("TEST_02", NUM_NODES={"ERBS": 4})])
+        allocations = planner.plan(nodes=self.nodes)
+        for profile_name in ["TEST_01", "TEST_02"]:
+            hosts = [planner.nodes[node_id].netsim for node_id in allocations[profile_name]]
+            self.assertEqual(2, hosts.count("netsim1"))
+            self.assertEqual(2, hosts.count("netsim2"))
+        self.assertFalse(set(allocations["TEST_01"]).intersection(allocations["TEST_02"]))
+        self.assertEqual({}, planner.shortfalls)
+        self.assertEqual([], self.nodes[0].profiles)
+
+    def test_plan__respects_exclude_nodes_from_and_nodes_per_host(self):
+        planner = AllocationPlanner([
+            self.get_profile("TEST_02", NUM_NODES={"ERBS": 4}, EXCLUDE_NODES_FROM=["TEST_01"], NODES_PER_HOST=1),
+            self.get_profile("TEST_01", NUM_NODES={"ERBS": 6})])
+        allocations = planner.plan(nodes=self.nodes)
+        self.assertEqual(6, len(allocations["TEST_01"]))
+        self.assertEqual(2, len(allocations["TEST_02"]))
+        self.assertFalse(set(allocations["TEST_01"]).intersection(allocations["TEST_02"]))
+        self.assertEqual({"ERBS": 2}, planner.shortfalls["TEST_02"])
+
+    def test_plan__releases_nodes_of_profile_with_shortfall_for_later_profiles(self):
+        planner = AllocationPlanner([self.get_profile("TEST_01", NUM_NODES={"ERBS": 6, "RadioNode": 5}),
+                                     self.get_profile("TEST_02", NUM_NODES={"ERBS": 8})])
+        allocations = planner.plan(nodes=self.nodes)
+        self.assertEqual({"RadioNode": 1}, planner.shortfalls["TEST_01"])
+        self.assertNotIn("TEST_02", planner.shortfalls)
+        self.assertEqual(8, len(allocations["TEST_02"]))
+        self.assertFalse(any("TEST_01" in node.profiles for node in planner.nodes.itervalues()))
+        host_load = dict((host, load) for host, load in planner.host_load.iteritems() if load)
+        self.assertEqual({"netsim1": 4, "netsim2": 4}, host_load)
+
+    def test_plan__retains_nodes_already_allocated_to_profile(self):
+        self.erbs_nodes[0].profiles = ["TEST_01"]
+        planner = AllocationPlanner([self.get_profile("TEST_01", NUM_NODES={"ERBS": 2})])
+        allocations = planner.plan(nodes=self.nodes)
+        self.assertIn(self.erbs_nodes[0].node_id, allocations["TEST_01"])
+        self.assertEqual(2, len(allocations["TEST_01"]))
+
+    def test_plan__records_profiles_not_planned(self):
+        planner = AllocationPlanner([self.get_profile("TEST_01", NUM_NODES={"ERBS": 1}, BATCH_MO_SIZE=1),
+                                     self.get_profile("TEST_02")])
+        self.assertEqual({}, planner.plan(nodes=self.nodes))
+        self.assertEqual(["TEST_01"], planner.unplanned)
+
+    @patch("enmutils_int.lib.allocation_planner.node_pool_mgr.mutex")
+    @patch("enmutils_int.lib.allocation_planner.node_pool_mgr.update_cached_list_of_nodes")
+    def test_commit__persists_planned_allocations_in_single_transaction(self, mock_update_cache, _):
+        for node in self.nodes:
+            node._persist()
+        planner = AllocationPlanner([self.get_profile("TEST_01", NUM_NODES={"ERBS": 2}),
+                                     self.get_profile("TEST_02", NUM_NODES={"RadioNode": 5})])
+        planner.plan(nodes=self.nodes)
+        with patch.object(persistence.Persistence, "set_keys",
+                          autospec=True, side_effect=persistence.Persistence.set_keys) as mock_set_keys:
+            self.assertEqual(2, planner.commit())
+        self.assertEqual(1, mock_set_keys.call_count)
+        for node_id in planner.allocations["TEST_01"]:
+            self.assertEqual(["TEST_01"], persistence.get(node_id).profiles)
+        self.assertEqual(2, len(mock_update_cache.call_args[0][0]))
+        self.assertEqual(2, int(persistence.default_db().get_hash(node_pool_stats.STATS_KEY)["profile|TEST_01|ERBS"]))
+        self.assertEqual(2, allocation_planner.pop_planned_allocation("TEST_01"))
+        self.assertEqual(0, allocation_planner.pop_planned_allocation("TEST_01"))
+        self.assertEqual(0, allocation_planner.pop_planned_allocation("TEST_02"))
+
+    def test_commit__does_nothing_if_nothing_planned(self):
+        self.assertEqual(0, AllocationPlanner([]).commit())
+
+    @patch("enmutils_int.lib.allocation_planner.log.logger.info")
+    def test_log_plan__logs_allocations_shortfalls_and_unplanned_profiles(self, mock_info):
+        planner = AllocationPlanner([self.get_profile("TEST_01", NUM_NODES={"RadioNode": 5}),
+                                     self.get_profile("TEST_02", NUM_NODES={"ERBS": 1}, BATCH_MO_SIZE=1)])
+        planner.plan(nodes=self.nodes)
+        planner.log_plan()
+        self.assertEqual(4, mock_info.call_count)
+
+    def test_pop_planned_allocation__returns_zero_if_nothing_planned(self):
+        self.assertEqual(0, allocation_planner.pop_planned_allocation("TEST_01"))
+
+
+if __name__ == "__main__":
+    unittest2.main(verbosity=2)
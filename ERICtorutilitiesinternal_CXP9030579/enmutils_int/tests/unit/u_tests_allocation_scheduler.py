@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+import unittest2
+from mock import patch, Mock, MagicMock
+
+from enmutils_int.lib.services import allocation_scheduler
+from testslib import unit_test_utils
+
+
+class AllocationSchedulerUnitTests(unittest2.TestCase):
+
+    def setUp(self):
+        unit_test_utils.setup()
+        self.batch_handler = Mock()
+        self.scheduler = allocation_scheduler.AllocationScheduler(self.batch_handler, max_batch_size=2)
+        self.scheduler._start_worker = Mock()
+
+    def tearDown(self):
+        unit_test_utils.tear_down()
+
+    def test_submit__queues_job_and_returns_job_id(self):
+        job_id = self.scheduler.submit("TEST_01")
+        self.assertEqual("QUEUED", self.scheduler.get_job_status(job_id)["state"])
+        self.assertTrue(self.scheduler.is_profile_queued("TEST_01"))
+        self.assertTrue(self.scheduler._start_worker.called)
+
+    def test_submit__updates_queued_job_for_same_profile(self):
+        job_id = self.scheduler.submit("TEST_01", nodes="node1")
+        self.assertEqual(job_id, self.scheduler.submit("TEST_01", nodes="node2"))
+        self.assertEqual(1, len(self.scheduler.pending))
+        self.assertEqual("node2", self.scheduler.jobs[job_id].nodes)
+
+    def test_submit__returns_running_job_for_same_profile_without_queueing_duplicate(self):
+        job_id = self.scheduler.submit("TEST_01")
+        self.batch_handler.side_effect = lambda batch: self.assertEqual(job_id, self.scheduler.submit("TEST_01"))
+        self.scheduler.process_next_batch(block=False)
+        self.assertEqual(1, self.batch_handler.call_count)
+        self.assertEqual(0, len(self.scheduler.pending))
+        self.assertEqual([job_id], self.scheduler.jobs.keys())
+        self.assertIsNone(self.scheduler.get_active_job_id("TEST_01"))
+
+    def test_submit__queues_new_job_once_previous_job_for_profile_finished(self):
+        job_id = self.scheduler.submit("TEST_01")
+        self.scheduler.process_next_batch(block=False)
+        new_job_id = self.scheduler.submit("TEST_01")
+        self.assertNotEqual(job_id, new_job_id)
+        self.assertEqual(new_job_id, self.scheduler.get_active_job_id("TEST_01"))
+
+    def test_get_job_status__returns_none_for_unknown_job(self):
+        self.assertIsNone(self.scheduler.get_job_status("unknown"))
+
+    def test_get_job_status__waits_until_timeout_if_job_not_finished(self):
+        job_id = self.scheduler.submit("TEST_01")
+        self.scheduler.condition = MagicMock()
+        with patch("enmutils_int.lib.services.allocation_scheduler.time.time", side_effect=[0, 0, 0, 2]):
+            self.assertEqual("QUEUED", self.scheduler.get_job_status(job_id, wait=1)["state"])
+        self.scheduler.condition.wait.assert_called_with(1)
+
+    def test_process_next_batch__processes_jobs_in_batches(self):
+        job_ids = [self.scheduler.submit("TEST_0{0}".format(i)) for i in range(3)]
+
+        def complete_jobs(jobs):
+            for job in jobs:
+                job.complete(True)
+        self.batch_handler.side_effect = complete_jobs
+
+        self.assertEqual(2, len(self.scheduler.process_next_batch(block=False)))
+        self.assertEqual(1, len(self.scheduler.process_next_batch(block=False)))
+        self.assertEqual([], self.scheduler.process_next_batch(block=False))
+        self.assertEqual(["COMPLETED"] * 3, [self.scheduler.get_job_status(job_id)["state"] for job_id in job_ids])
+        self.assertFalse(self.scheduler.is_profile_queued("TEST_00"))
+
+    def test_process_next_batch__fails_jobs_not_completed_by_handler(self):
+        job_id = self.scheduler.submit("TEST_01")
+        self.batch_handler.side_effect = Exception("error")
+        self.scheduler.process_next_batch(block=False)
+        job = self.scheduler.get_job_status(job_id)
+        self.assertEqual("FAILED", job["state"])
+        self.assertFalse(job["success"])
+
+    def test_process_next_batch__removes_expired_jobs(self):
+        job_id = self.scheduler.submit("TEST_01")
+        self.scheduler.process_next_batch(block=False)
+        self.scheduler.jobs[job_id].finished_time = 0
+        self.scheduler.submit("TEST_02")
+        self.scheduler.process_next_batch(block=False)
+        self.assertIsNone(self.scheduler.get_job_status(job_id))
+
+
+if __name__ == "__main__":
+    unittest2.main(verbosity=2)
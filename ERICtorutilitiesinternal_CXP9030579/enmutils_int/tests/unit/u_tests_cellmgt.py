@@ -277,6 +277,7 @@ class CellMgtUnitTests(ParameterizedTestCase):
     # populate_node_cell_data TESTS ##################################################################################
 
     @patch('time.sleep')
+    @patch('enmutils_int.lib.cellmgt.mo_topology_index.get_mo_fdns')
     @patch('enmutils_int.lib.cellmgt.get_cell_attributes')
     @patch('enmutils_int.lib.cellmgt.get_all_fdn_list_of_cells_on_node')
     def test_populate_node_cell_data(self, mock_get_all_fdn_list_of_cells_on_node, mock_get_cell_attributes, *_):
@@ -303,6 +304,7 @@ class CellMgtUnitTests(ParameterizedTestCase):
             self.user, REQUIRED_NUMBER_OF_CELLS_PER_NODE, MO_TYPE, self.dummy_erbs_nodes[:2], MO_ATTRIBUTE_DATA))
 
     @patch('time.sleep')
+    @patch('enmutils_int.lib.cellmgt.mo_topology_index.get_mo_fdns')
     @patch('enmutils_int.lib.cellmgt.get_cell_attributes')
     @patch('enmutils_int.lib.cellmgt.get_all_fdn_list_of_cells_on_node')
     def test_populate_node_cell_data_have_no_attribute_data(self, mock_get_all_fdn_list_of_cells_on_node,
@@ -696,12 +698,14 @@ class CellMgtUnitTests(ParameterizedTestCase):
     def test_get_list_of_existing_cells_on_nodes_is_successful(self):
         response = Mock()
         response.get_output.return_value = [u'FDN : SubNetwork=ERBS-SUBNW-1,MeContext=netsim_LTE02ERBS00029,'
-                                            u'ManagedElement=1,ENodeBFunction=1,EUtranCellFDD=LTE02ERBS00029-1'
+                                            u'ManagedElement=1,ENodeBFunction=1,EUtranCellFDD=LTE02ERBS00029-1',
                                             u'FDN : SubNetwork=ERBS-SUBNW-1,MeContext=netsim_LTE02ERBS00029,'
                                             u'ManagedElement=1,ENodeBFunction=1,EUtranCellFDD=LTE02ERBS00029-2']
         self.mock_user.enm_execute.return_value = response
 
         expected_list_of_cells = [u'SubNetwork=ERBS-SUBNW-1,MeContext=netsim_LTE02ERBS00029,ManagedElement=1,'
+                                  u'ENodeBFunction=1,EUtranCellFDD=LTE02ERBS00029-1',
+                                  u'SubNetwork=ERBS-SUBNW-1,MeContext=netsim_LTE02ERBS00029,ManagedElement=1,'
                                   u'ENodeBFunction=1,EUtranCellFDD=LTE02ERBS00029-2']
         self.assertEqual(cellmgt.get_list_of_existing_cells_on_node(
             user=self.mock_user, node_name=node_name, cell_mo_type='EutranCelFDD'), expected_list_of_cells)
@@ -752,27 +756,40 @@ class CellMgtUnitTests(ParameterizedTestCase):
 
         self.assertTrue(mock_error.called)
 
-    @patch("enmutils_int.lib.cellmgt.get_all_fdn_list_of_cells_on_node")
+    @patch("enmutils_int.lib.cellmgt.mo_topology_index.get_mo_fdns")
     @patch('enmutils_int.lib.cellmgt.filter_nodes_having_poid_set')
-    def test_verify_nodes_on_enm_mo_cell_fdn_dict(self, mock_filter_nodes_having_poid_set,
-                                                  mock_get_all_fdn_list_of_cells_on_node):
-        mock_filter_nodes_having_poid_set.return_value = [Mock()]
-
-        verify_nodes_on_enm_and_return_mo_cell_fdn_dict(Mock(), [Mock()], [Mock(), Mock()])
+    def test_verify_nodes_on_enm_mo_cell_fdn_dict(self, mock_filter_nodes_having_poid_set, mock_get_mo_fdns):
+        mock_filter_nodes_having_poid_set.return_value = [Mock(node_id="Node1"), Mock(node_id="Node2")]
+        mock_get_mo_fdns.side_effect = [{"Node1": ["FDD1"], "Node2": ["FDD2"]}, {"Node2": ["TDD2"]}]
 
+        self.assertEqual({"EUtranCellFDD": ["FDD1", "FDD2"], "EUtranCellTDD": ["TDD2"]},
+                         verify_nodes_on_enm_and_return_mo_cell_fdn_dict(Mock(), [Mock()],
+                                                                         ["EUtranCellFDD", "EUtranCellTDD"]))
         self.assertTrue(mock_filter_nodes_having_poid_set.called)
-        self.assertTrue(mock_get_all_fdn_list_of_cells_on_node.called)
+        self.assertEqual(2, mock_get_mo_fdns.call_count)
 
-    @patch("enmutils_int.lib.cellmgt.get_all_fdn_list_of_cells_on_node")
+    @patch("enmutils_int.lib.cellmgt.mo_topology_index.get_mo_fdns")
     @patch('enmutils_int.lib.cellmgt.filter_nodes_having_poid_set')
     def test_verify_nodes_on_enm_mo_cell_fdn_dict_no_verified_nodes(self, mock_filter_nodes_having_poid_set,
-                                                                    mock_get_all_fdn_list_of_cells_on_node):
+                                                                    mock_get_mo_fdns):
         mock_filter_nodes_having_poid_set.return_value = []
 
         verify_nodes_on_enm_and_return_mo_cell_fdn_dict(Mock(), [Mock()], [Mock(), Mock()])
 
         self.assertTrue(mock_filter_nodes_having_poid_set.called)
-        self.assertFalse(mock_get_all_fdn_list_of_cells_on_node.called)
+        self.assertFalse(mock_get_mo_fdns.called)
+
+    def test_get_all_fdn_list_of_cells_on_node__uses_index_until_cell_created(self):
+        cell_fdn = "SubNetwork=ERBS-SUBNW-1,MeContext=LTE01ERBS00001,ManagedElement=1,ENodeBFunction=1,EUtranCellFDD="
+        self.mock_user.enm_execute.return_value.get_output.return_value = ["FDN : {0}1".format(cell_fdn),
+                                                                           "1 instance(s) updated"]
+        cellmgt.get_all_fdn_list_of_cells_on_node(self.mock_user, "LTE01ERBS00001", "EUtranCellFDD")
+        cellmgt.get_all_fdn_list_of_cells_on_node(self.mock_user, "LTE01ERBS00001", "EUtranCellFDD")
+        self.assertEqual(1, self.mock_user.enm_execute.call_count)
+        cellmgt.execute_cmedit_command_to_create_new_cell(self.mock_user, "cmedit create", "LTE01ERBS00001",
+                                                          "{0}2".format(cell_fdn))
+        cellmgt.get_all_fdn_list_of_cells_on_node(self.mock_user, "LTE01ERBS00001", "EUtranCellFDD")
+        self.assertEqual(3, self.mock_user.enm_execute.call_count)
 
     def test_get_fdn_of_node_b_function_is_successful(self):
         existing_cells = {'LTE01ERBS00002':
@@ -311,7 +311,8 @@ class CmSyncFlowUnitTests(ParameterizedTestCase):
         self.assertEqual(mock_read_gsm_relations.call_count, 0)
 
     @patch('enmutils_int.lib.profile_flows.cmsync_flows.cmsync_flow.time.time', return_value=0)
-    @patch('enmutils_int.lib.profile_flows.cmsync_flows.cmsync_flow.chunks', return_value=[])
+    @patch('enmutils_int.lib.profile_flows.cmsync_flows.cmsync_flow.CmSyncFlow.schedule_bursts_by_host',
+           return_value=[])
     @patch("enmutils_int.lib.profile_flows.cmsync_flows.cmsync_flow.log.logger.debug")
     @patch("enmutils_int.lib.profile_flows.common_flows.common_flow.GenericFlow.create_and_execute_threads")
     def test_threads_for_notifications__burst_size_is_zero(self, mock_execute_threads, *_):
@@ -320,18 +321,66 @@ class CmSyncFlowUnitTests(ParameterizedTestCase):
         self.flow.execute_threads_for_notifications([[Mock()]])
         self.assertEqual(mock_execute_threads.call_count, 2)
 
-    @patch('enmutils_int.lib.profile_flows.cmsync_flows.cmsync_flow.chunks', return_value=[])
     @patch("enmutils_int.lib.profile_flows.cmsync_flows.cmsync_flow.log.logger.debug")
     @patch("enmutils_int.lib.profile_flows.common_flows.common_flow.GenericFlow.create_and_execute_threads")
-    def test_execute_threads_for_notifications__is_successful_when_burst_chunk_size_is_non_zero(
+    def test_execute_threads_for_notifications__starts_bursts_in_lanes_per_netsim_host(
             self, mock_create_and_execute_threads, *_):
+        bursts = [Mock(node_groups={"ERBS": [("netsim_{0}".format(index % 3), "sim", [])]}) for index in range(12)]
+
         def set_bursts_to_non_zero(*args, **kwargs):
-            self.flow.BURSTS = [Mock()] * 12
+            self.flow.BURSTS = bursts
         self.flow.NUM_NODES = {"ERBS": 1, "RNC": 1, "RadioNode": 0}
         self.flow.NAME = "CMSYNC_01"
         mock_create_and_execute_threads.side_effect = set_bursts_to_non_zero
         self.flow.execute_threads_for_notifications([[Mock()]])
         self.assertEqual(mock_create_and_execute_threads.call_count, 2)
+        lanes = mock_create_and_execute_threads.call_args[1]["workers"]
+        self.assertEqual(12, len(lanes))
+        self.assertEqual(12, mock_create_and_execute_threads.call_args[1]["thread_count"])
+        self.assertEqual(sorted(bursts), sorted(burst for lane in lanes for burst in lane))
+
+    def test_schedule_bursts_by_host__interleaves_hosts_across_lanes(self):
+        host_a_bursts = [Mock(node_groups={"ERBS": [("netsim_a", "sim1", [])]}) for _ in range(14)]
+        host_b_bursts = [Mock(node_groups={"RadioNode": [("netsim_b", "sim2", []), ("netsim_c", "sim3", [])]})]
+        unknown_burst = Mock(node_groups=None)
+        lanes = self.flow.schedule_bursts_by_host(host_a_bursts + host_b_bursts + [unknown_burst])
+        self.assertEqual(cmsync_flow.BURST_START_LANES, len(lanes))
+        self.assertEqual([unknown_burst, host_a_bursts[0], host_b_bursts[0]] + host_a_bursts[1:10],
+                         [lane[0] for lane in lanes])
+        self.assertEqual(host_a_bursts[10:], [lane[1] for lane in lanes if len(lane) > 1])
+        self.assertEqual(["netsim_b", "netsim_c"], self.flow.get_burst_hosts(host_b_bursts[0]))
+        self.assertEqual([], self.flow.get_burst_hosts(unknown_burst))
+
+    def test_schedule_bursts_by_host__returns_empty_list_if_no_bursts(self):
+        self.assertEqual([], self.flow.schedule_bursts_by_host([]))
+
+    @patch("enmutils_int.lib.profile_flows.cmsync_flows.cmsync_flow.config.get_prop", return_value="1")
+    @patch("enmutils_int.lib.profile_flows.cmsync_flows.cmsync_flow.config.has_prop", return_value=True)
+    def test_host_burst_slots__limits_concurrent_bursts_on_every_host_of_a_burst(self, *_):
+        with patch.dict(cmsync_flow.HOST_BURST_SEMAPHORES, clear=True):
+            with cmsync_flow.host_burst_slots(["netsim_b", "netsim_a"]):
+                self.assertFalse(cmsync_flow.HOST_BURST_SEMAPHORES["netsim_a"].acquire(False))
+                self.assertFalse(cmsync_flow.HOST_BURST_SEMAPHORES["netsim_b"].acquire(False))
+                with cmsync_flow.host_burst_slots(["netsim_c"]):
+                    self.assertFalse(cmsync_flow.HOST_BURST_SEMAPHORES["netsim_c"].acquire(False))
+            for host in ["netsim_a", "netsim_b", "netsim_c"]:
+                self.assertTrue(cmsync_flow.HOST_BURST_SEMAPHORES[host].acquire(False))
+
+    @patch("enmutils_int.lib.profile_flows.cmsync_flows.cmsync_flow.config.has_prop", return_value=False)
+    def test_get_max_concurrent_bursts_per_host__defaults_to_number_of_lanes(self, _):
+        self.assertEqual(cmsync_flow.BURST_START_LANES, cmsync_flow.get_max_concurrent_bursts_per_host())
+
+    @patch("enmutils_int.lib.profile_flows.cmsync_flows.cmsync_flow.log.logger.debug")
+    def test_log_burst_start_summary__logs_time_for_full_notification_load(self, mock_debug):
+        self.flow.BURST_TYPE = "AVC"
+        self.flow.BURSTS = [Mock()] * 3
+        self.flow.BURST_START_TIMES = []
+        self.flow.log_burst_start_summary(100)
+        mock_debug.assert_called_with("No AVC bursts were started.")
+        self.flow.BURST_START_TIMES = [102, 110.5]
+        self.flow.log_burst_start_summary(100)
+        mock_debug.assert_called_with("Started 2/3 AVC bursts. First burst started after 2.0s, full notification "
+                                      "load in effect after 10.5s.")
 
     @patch('enmutils_int.lib.profile_flows.cmsync_flows.cmsync_flow.persistence.get', return_value={"CMSYNC_01": [["RNC", "UtranCell", 4, 2]]})
     def test_get_notification_information_for_profile(self, *_):
@@ -591,10 +640,12 @@ class CmSyncFlowUnitTests(ParameterizedTestCase):
         burst.start.side_effect = None
         burst.nodes = [Mock()]
         self.flow.TEARDOWN_OBJECTS = []
+        self.flow.BURST_START_TIMES = []
         self.flow.NAME = "CMSYNC_01"
         self.assertEqual(0, len(self.flow.TEARDOWN_OBJECTS))
         self.flow.start_bursts([burst])
         self.assertEqual(1, len(self.flow.TEARDOWN_OBJECTS))
+        self.assertEqual(1, len(self.flow.BURST_START_TIMES))
 
     @patch('enmutils_int.lib.profile_flows.cmsync_flows.cmsync_flow.CmSyncFlow.add_error_as_exception')
     def test_start_bursts_handles_empty_bursts(self, mock_add_error_as_exception):
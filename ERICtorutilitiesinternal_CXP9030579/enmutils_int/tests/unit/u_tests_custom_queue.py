@@ -1,59 +1,67 @@
 #!/usr/bin/env python
+import threading
+
 import unittest2
-from mock import patch, Mock
+from mock import Mock
 
 from enmutils_int.lib.services import custom_queue
 from testslib import unit_test_utils
 
 
-class CustomContainsQueueUnitTests(unittest2.TestCase):
+class KeyedWorkRegistryUnitTests(unittest2.TestCase):
 
     def setUp(self):
         unit_test_utils.setup()
-        self.queue = custom_queue.CustomContainsQueue()
+        self.registry = custom_queue.KeyedWorkRegistry()
         self.item = "TEST_00"
         self.item_two = "TEST_01"
 
     def tearDown(self):
         unit_test_utils.tear_down()
 
-    def test_queue__contains__item(self):
-        self.queue.empty()
-        self.queue.put_unique(self.item)
-        self.assertIn(self.item, self.queue)
-        self.assertNotIn(self.item_two, self.queue)
+    def test_registry__contains__item(self):
+        self.registry.put_unique(self.item)
+        self.assertIn(self.item, self.registry)
+        self.assertNotIn(self.item_two, self.registry)
 
     def test_get_item__removes_item(self):
-        self.queue.empty()
-        self.queue.put_unique(self.item)
-        self.assertIn(self.item, self.queue)
-        self.queue.get_item(self.item)
-        self.assertNotIn(self.item, self.queue)
+        self.registry.put_unique(self.item)
+        self.assertIn(self.item, self.registry)
+        self.registry.get_item(self.item)
+        self.assertNotIn(self.item, self.registry)
+        self.registry.get_item(self.item)
 
     def test_put_item__only_adds_unique(self):
-        self.queue.empty()
-        self.queue.put_unique(self.item)
-        self.assertIn(self.item, self.queue)
-        self.assertEqual(self.queue.qsize(), 1)
-        self.queue.put_unique(self.item_two)
-        self.assertEqual(self.queue.qsize(), 2)
-        self.queue.put_unique(self.item)
-        self.assertEqual(self.queue.qsize(), 2)
-
-    @patch('enmutils_int.lib.services.custom_queue.time.sleep', return_value=0)
-    def test_block_until_item_removed__no_sleep_if_item_not_found(self, _):
+        self.assertTrue(self.registry.put_unique(self.item))
+        self.assertEqual(self.registry.qsize(), 1)
+        self.assertTrue(self.registry.put_unique(self.item_two))
+        self.assertEqual(self.registry.qsize(), 2)
+        self.assertFalse(self.registry.put_unique(self.item))
+        self.assertEqual(self.registry.qsize(), 2)
+
+    def test_block_until_item_removed__does_not_wait_if_item_not_found(self):
         logger = Mock()
-        self.queue.empty()
-        self.queue.block_until_item_removed(self.item, logger)
+        self.assertTrue(self.registry.block_until_item_removed(self.item, logger))
         self.assertEqual(0, logger.debug.call_count)
 
-    @patch('enmutils_int.lib.services.custom_queue.time.sleep', return_value=0)
-    def test_block_until_item_removed__block_until_item_removed(self, _):
+    def test_block_until_item_removed__wakes_when_item_removed(self):
+        logger = Mock()
+        self.registry.put_unique(self.item)
+        timer = threading.Timer(0.01, self.registry.get_item, args=(self.item,))
+        timer.start()
+        self.assertTrue(self.registry.block_until_item_removed(self.item, logger, max_time_to_wait=5))
+        timer.join()
+        self.assertEqual(0, self.registry.get_stats()["timeouts"])
+
+    def test_block_until_item_removed__removes_item_and_records_timeout(self):
         logger = Mock()
-        self.queue.empty()
-        self.queue.put_unique(self.item)
-        self.queue.block_until_item_removed(self.item, logger, max_time_to_wait=6)
+        self.registry.put_unique(self.item)
+        self.assertFalse(self.registry.block_until_item_removed(self.item, logger, max_time_to_wait=0.01))
+        self.assertNotIn(self.item, self.registry)
         self.assertEqual(2, logger.debug.call_count)
+        stats = self.registry.get_stats()
+        self.assertEqual(1, stats["timeouts"])
+        self.assertEqual(0, stats["items"])
 
 
 if __name__ == "__main__":
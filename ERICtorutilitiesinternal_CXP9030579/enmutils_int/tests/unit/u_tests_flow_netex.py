@@ -842,24 +842,46 @@ class Netex04FlowUnitTests(NetexCollectionTestUtils):
         self.flow.execute_flow()
         self.assertTrue(mock_create_and_execute_threads.called)
 
+    @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.Netex04Flow.cleanup_teardown')
+    @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.Netex04Flow.cleanup_collections_based_on_type')
     @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.time.sleep')
     @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.Netex04Flow.state', new_callable=PropertyMock)
     @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.Netex04Flow.sleep')
     @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.Netex04Flow.keep_running', side_effect=[True, False])
     @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.arguments.get_random_string', return_value="abc")
+    @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.Collection')
+    @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.Netex04Flow.create_and_execute_threads')
+    @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.Netex04Flow.create_profile_users')
+    def test_execute_flow__queries_fdns_once_and_shares_them_between_the_uploads(self, mock_create_profile_users,
+                                                                                 mock_create_and_execute_threads,
+                                                                                 mock_collection, *_):
+        mock_create_profile_users.return_value = [Mock(), Mock()]
+        fdns = mock_collection.return_value.create_list_of_fdns.return_value
+        self.flow.execute_flow()
+        self.assertEqual(1, mock_collection.return_value.create_list_of_fdns.call_count)
+        self.assertFalse(mock_collection.return_value.iter_fdns.called)
+        self.assertEqual(2, len(mock_create_and_execute_threads.call_args[0][0]))
+        self.assertEqual([fdns, fdns], [call[1]["fdns"] for call in mock_collection.call_args_list
+                                        if "fdns" in call[1]])
+
+    @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.Netex04Flow.cleanup_teardown')
+    @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.Netex04Flow.cleanup_collections_based_on_type')
+    @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.time.sleep')
+    @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.Netex04Flow.state', new_callable=PropertyMock)
+    @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.Netex04Flow.sleep')
+    @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.Netex04Flow.keep_running', side_effect=[True, False])
     @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.Netex04Flow.add_error_as_exception')
     @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.Collection')
     @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.Netex04Flow.create_and_execute_threads')
     @patch('enmutils_int.lib.profile_flows.netex_flows.netex_flow.Netex04Flow.create_profile_users')
-    def test_execute_flow__adds_exception_when_file_not_created(self, mock_create_profile_users,
-                                                                mock_create_and_execute_threads,
-                                                                mock_collection,
-                                                                mock_add_error_as_exception, *_):
+    def test_execute_flow__adds_error_if_fdns_query_fails(self, mock_create_profile_users,
+                                                          mock_create_and_execute_threads, mock_collection,
+                                                          mock_add_error_as_exception, *_):
         mock_create_profile_users.return_value = [Mock()]
-        mock_collection.return_value.create_file.side_effect = Exception
+        mock_collection.return_value.create_list_of_fdns.side_effect = self.exception
         self.flow.execute_flow()
+        mock_add_error_as_exception.assert_called_with(self.exception)
         self.assertFalse(mock_create_and_execute_threads.called)
-        self.assertTrue(mock_add_error_as_exception.called)
 
     def test_delete__is_successful_when_collection_in_teatdown_list(self):
         mock_collection = Mock()
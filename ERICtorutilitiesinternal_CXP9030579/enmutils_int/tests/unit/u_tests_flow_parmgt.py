@@ -38,7 +38,7 @@ class ParMgt01UnitTests(unittest2.TestCase):
         users = [self.user]
         mock_temporary_query_for_mo_class_mapping.return_value = {
             'moDetails': [{'moTypes': {'ENodeBFunction': [{'poId': '281475024838824', 'nodeName': 'LTE01'}]}}]}
-        mock_get_pos_by_poids.return_value.json.return_value = \
+        mock_get_pos_by_poids.return_value = \
             [{'mibRootName': 'LTE01', 'moName': '1', 'parentRDN': 'ManagedElement=1',
               'fullMoType': 'ENodeBFunction', 'moType': 'ENodeBFunction',
               'fdn': 'SubNetwork=ERBS-SUBNW-1,MeContext=LTE01,ManagedElement=1,ENodeBFunction=1',
@@ -59,7 +59,7 @@ class ParMgt01UnitTests(unittest2.TestCase):
                                                                         mock_temporary_query_for_mo_class_mapping, _):
         users = [self.user]
         mock_temporary_query_for_mo_class_mapping.return_value = {}
-        mock_get_pos_by_poids.return_value.json.return_value = \
+        mock_get_pos_by_poids.return_value = \
             [{'mibRootName': 'LTE01', 'moName': '1', 'parentRDN': 'ManagedElement=1',
               'fullMoType': 'ENodeBFunction', 'moType': 'ENodeBFunction',
               'fdn': 'SubNetwork=ERBS-SUBNW-1,MeContext=LTE01,ManagedElement=1,ENodeBFunction=1',
@@ -340,7 +340,7 @@ class ParMgt01UnitTests(unittest2.TestCase):
                         mock_temporary_query_for_mo_class_mapping.return_value = {
                             'moDetails': [
                                 {'moTypes': {'ENodeBFunction': [{'poId': '281475024838824', 'nodeName': 'LTE01'}]}}]}
-                        mock_get_pos_by_poids.return_value.json.return_value = \
+                        mock_get_pos_by_poids.return_value = \
                             [{'mibRootName': 'LTE01', 'moName': '1', 'parentRDN': 'ManagedElement=1',
                               'fullMoType': 'ENodeBFunction', 'moType': 'ENodeBFunction',
                               'fdn': 'SubNetwork=ERBS-SUBNW-1,MeContext=LTE01,ManagedElement=1,ENodeBFunction=1',
@@ -383,7 +383,7 @@ class ParMgt01UnitTests(unittest2.TestCase):
                             'moDetails': [
                                 {'moTypes': {
                                     'ENodeBFunction': [{'poId': '281475024838824', 'nodeName': 'LTE01'}]}}]}
-                        mock_get_pos_by_poids.return_value.json.return_value = \
+                        mock_get_pos_by_poids.return_value = \
                             [{'mibRootName': 'LTE01', 'moName': '1', 'parentRDN': 'ManagedElement=1',
                               'fullMoType': 'ENodeBFunction', 'moType': 'ENodeBFunction',
                               'fdn': 'SubNetwork=ERBS-SUBNW-1,MeContext=LTE01,ManagedElement=1,ENodeBFunction=1',
@@ -428,7 +428,7 @@ class ParMgt01UnitTests(unittest2.TestCase):
                             'moDetails': [
                                 {'moTypes': {
                                     'ENodeBFunction': [{'poId': '281475024838824', 'nodeName': 'LTE01'}]}}]}
-                        mock_get_pos_by_poids.return_value.json.return_value = \
+                        mock_get_pos_by_poids.return_value = \
                             [{'mibRootName': 'LTE01', 'moName': '1', 'parentRDN': 'ManagedElement=1',
                               'fullMoType': 'ENodeBFunction', 'moType': 'ENodeBFunction',
                               'fdn': 'SubNetwork=ERBS-SUBNW-1,MeContext=LTE01,ManagedElement=1,ENodeBFunction=1',
@@ -472,7 +472,7 @@ class ParMgt01UnitTests(unittest2.TestCase):
                     mock_temporary_query_for_mo_class_mapping.return_value = {
                         'moDetails': [
                             {'moTypes': {'ENodeBFunction': [{'poId': '281475024838824', 'nodeName': 'LTE01'}]}}]}
-                    mock_get_pos_by_poids.return_value.json.return_value = \
+                    mock_get_pos_by_poids.return_value = \
                         [{'mibRootName': 'LTE01', 'moName': '1', 'parentRDN': 'ManagedElement=1',
                           'fullMoType': 'ENodeBFunction', 'moType': 'ENodeBFunction',
                           'fdn': 'SubNetwork=ERBS-SUBNW-1,MeContext=LTE01,ManagedElement=1,ENodeBFunction=1',
@@ -515,7 +515,7 @@ class ParMgt01UnitTests(unittest2.TestCase):
                     mock_temporary_query_for_mo_class_mapping.return_value = {
                         'moDetails': [
                             {'moTypes': {'ENodeBFunction': [{'poId': '281475024838824', 'nodeName': 'LTE01'}]}}]}
-                    mock_get_pos_by_poids.return_value.json.return_value = \
+                    mock_get_pos_by_poids.return_value = \
                         [{'mibRootName': 'LTE01', 'moName': '1', 'parentRDN': 'ManagedElement=1',
                           'fullMoType': 'ENodeBFunction', 'moType': 'ENodeBFunction',
                           'fdn': 'SubNetwork=ERBS-SUBNW-1,MeContext=LTE01,ManagedElement=1,ENodeBFunction=1',
@@ -547,7 +547,7 @@ class ParMgt01UnitTests(unittest2.TestCase):
                 mock_create_profile_users.return_value = [self.user]
                 mock_check_sync_and_remove.return_value = ([], [])
                 mock_keep_running.side_effect = [True, False]
-                mock_get_pos_by_poids.return_value.json.return_value = \
+                mock_get_pos_by_poids.return_value = \
                     [{'mibRootName': 'LTE01', 'moName': '1', 'parentRDN': 'ManagedElement=1',
                       'fullMoType': 'ENodeBFunction', 'moType': 'ENodeBFunction',
                       'fdn': 'SubNetwork=ERBS-SUBNW-1,MeContext=LTE01,ManagedElement=1,ENodeBFunction=1',
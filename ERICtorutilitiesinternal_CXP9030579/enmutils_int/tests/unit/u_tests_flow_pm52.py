@@ -115,7 +115,7 @@ class Pm52ProfileUnitTests(unittest2.TestCase):
     @patch("enmutils_int.lib.profile_flows.pm_flows.pm52profile.Pm52Profile.update_nodes_info_with_ulsa_mos")
     @patch("enmutils_int.lib.profile_flows.pm_flows.pm52profile.Pm52Profile."
            "select_nodes_from_pool_that_contain_rfport_mo")
-    @patch("enmutils_int.lib.profile_flows.pm_flows.pm52profile.get_enm_network_element_sync_states")
+    @patch("enmutils_int.lib.profile_flows.pm_flows.pm52profile.get_sync_states")
     def test_select_nodes_to_use__returns_nodes_successfully(self, mock_get_enm_network_element_sync_states,
                                                              mock_select_nodes_from_pool_that_contain_rfport_mo,
                                                              mock_update_nodes_info_with_ulsa_mos, *_):
@@ -149,7 +149,7 @@ class Pm52ProfileUnitTests(unittest2.TestCase):
            "update_nodes_info_with_ulsa_mos")
     @patch("enmutils_int.lib.profile_flows.pm_flows.pm52profile.Pm52Profile."
            "select_nodes_from_pool_that_contain_rfport_mo")
-    @patch("enmutils_int.lib.profile_flows.pm_flows.pm52profile.get_enm_network_element_sync_states")
+    @patch("enmutils_int.lib.profile_flows.pm_flows.pm52profile.get_sync_states")
     def test_select_nodes_to_use__returns_none_if_no_synced_nodes(self, mock_get_enm_network_element_sync_states,
                                                                   mock_select_nodes_from_pool_that_contain_rfport_mo,
                                                                   mock_update_nodes_info_with_ulsa_mos,
@@ -861,7 +861,7 @@ class Pm52ProfileUnitTests(unittest2.TestCase):
     @patch("enmutils_int.lib.profile_flows.pm_flows.pm52profile.Pm52Profile.update_nodes_info_with_ulsa_mos")
     @patch("enmutils_int.lib.profile_flows.pm_flows.pm52profile.Pm52Profile."
            "select_nodes_from_pool_that_contain_rfport_mo")
-    @patch("enmutils_int.lib.profile_flows.pm_flows.pm52profile.get_enm_network_element_sync_states")
+    @patch("enmutils_int.lib.profile_flows.pm_flows.pm52profile.get_sync_states")
     def test_deallocate_unused_nodes_and_update_profile_persistence(self, mock_get_enm_network_element_sync_states,
                                                                     mock_select_nodes_from_pool_that_contain_rfport_mo,
                                                                     mock_update_nodes_info_with_ulsa_mos,
@@ -894,7 +894,7 @@ class Pm52ProfileUnitTests(unittest2.TestCase):
     @patch("enmutils_int.lib.profile_flows.pm_flows.pm52profile.Pm52Profile.update_nodes_info_with_ulsa_mos")
     @patch("enmutils_int.lib.profile_flows.pm_flows.pm52profile.Pm52Profile."
            "select_nodes_from_pool_that_contain_rfport_mo")
-    @patch("enmutils_int.lib.profile_flows.pm_flows.pm52profile.get_enm_network_element_sync_states")
+    @patch("enmutils_int.lib.profile_flows.pm_flows.pm52profile.get_sync_states")
     def test_deallocate_unused_nodes_if_sync_nodes_only(
             self, mock_get_enm_network_element_sync_states, mock_select_nodes_from_pool_that_contain_rfport_mo,
             mock_update_nodes_info_with_ulsa_mos, mock_update_profile_persistence_nodes_list, *_):
@@ -930,7 +930,7 @@ class Pm52ProfileUnitTests(unittest2.TestCase):
     @patch("enmutils_int.lib.profile_flows.pm_flows.pm52profile.Pm52Profile.update_nodes_info_with_ulsa_mos")
     @patch("enmutils_int.lib.profile_flows.pm_flows.pm52profile.Pm52Profile."
            "select_nodes_from_pool_that_contain_rfport_mo")
-    @patch("enmutils_int.lib.profile_flows.pm_flows.pm52profile.get_enm_network_element_sync_states")
+    @patch("enmutils_int.lib.profile_flows.pm_flows.pm52profile.get_sync_states")
     def test_deallocate_unused_nodes_if_no_synced_nodes(self, mock_get_enm_network_element_sync_states,
                                                         mock_select_nodes_from_pool_that_contain_rfport_mo,
                                                         mock_update_nodes_info_with_ulsa_mos,
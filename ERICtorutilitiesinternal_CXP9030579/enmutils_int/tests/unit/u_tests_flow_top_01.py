@@ -158,7 +158,7 @@ class TOP01UnitTests(unittest2.TestCase):
     @patch('enmutils_int.lib.profile_flows.top_flows.top_01_flow.get_pos_by_poids')
     def test_get_subnetwork_poids_and_names__is_successful(self, mock_get_pos_by_poids):
         search = {"objects": [{"id": "14102", "type": "SubNetwork", "targetTypeAttribute": None}]}
-        mock_get_pos_by_poids.return_value.json.return_value = [{"moName": "NETSimW", "poId": "14102"}]
+        mock_get_pos_by_poids.return_value = [{"moName": "NETSimW", "poId": "14102"}]
         self.assertEqual(self.flow.get_subnetwork_poids_and_names(self.user, search), {u'14102': u'NETSimW'})
 
     def test_update_nodes_with_subnet_poids__is_successful(self):
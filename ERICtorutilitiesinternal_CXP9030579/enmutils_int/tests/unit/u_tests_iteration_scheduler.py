@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+import json
+
+import unittest2
+from mock import patch
+
+from enmutils.lib import persistence
+from enmutils_int.lib import iteration_scheduler
+from testslib import unit_test_utils
+
+
+class IterationSchedulerUnitTests(unittest2.TestCase):
+
+    def setUp(self):
+        unit_test_utils.setup()
+
+    def tearDown(self):
+        unit_test_utils.tear_down()
+
+    def test_get_offset__returns_first_offset_not_taken_by_profiles_due_in_same_second(self):
+        calendar = {"TEST_01": {"planned": 1000.2, "wake": 1000.2},
+                    "TEST_02": {"planned": 1000.7, "wake": 1004.7},
+                    "TEST_03": {"planned": 1001, "wake": 1003}}
+        self.assertEqual(2, iteration_scheduler.get_offset(1000.5, calendar, 2, 30))
+        self.assertEqual(0, iteration_scheduler.get_offset(1002, calendar, 2, 30))
+
+    def test_get_offset__wraps_around_once_all_offsets_within_jitter_taken(self):
+        calendar = {"TEST_0{0}".format(index): {"planned": 1000, "wake": 1000 + offset}
+                    for index, offset in enumerate([0, 2, 4, 0])}
+        self.assertEqual(2, iteration_scheduler.get_offset(1000, calendar, 2, 4))
+
+    def test_get_offset__returns_zero_if_jitter_disabled(self):
+        calendar = {"TEST_01": {"planned": 1000, "wake": 1000}}
+        self.assertEqual(0, iteration_scheduler.get_offset(1000, calendar, 2, 0))
+
+    def test_reserve__staggers_profiles_due_at_same_time(self):
+        offsets = [iteration_scheduler.reserve(name, 1000, max_jitter_secs=10) for name in ["TEST_01", "TEST_02"]]
+        offsets.append(iteration_scheduler.reserve("TEST_01", 1000, max_jitter_secs=10))
+
+        self.assertEqual([0, 2, 0], offsets)
+        self.assertEqual({"planned": 1000, "wake": 1002}, iteration_scheduler._get_calendar_entries()["TEST_02"])
+
+    def test_reserve__uses_default_maximum_jitter_if_not_set_by_profile(self):
+        iteration_scheduler.reserve("TEST_01", 1000)
+        self.assertEqual(2, iteration_scheduler.reserve("TEST_02", 1000))
+
+    def test_reserve__drops_iterations_long_past_from_calendar(self):
+        iteration_scheduler.reserve("TEST_01", 1000, max_jitter_secs=10)
+        iteration_scheduler.reserve("TEST_02", 1000 + iteration_scheduler.RETENTION_SECS + 1, max_jitter_secs=10)
+        self.assertEqual(["TEST_02"], persistence.default_db().get_hash(iteration_scheduler.CALENDAR_KEY).keys())
+
+    @patch("enmutils_int.lib.iteration_scheduler.mutexer.mutex")
+    @patch("enmutils_int.lib.iteration_scheduler._get_int_prop",
+           side_effect=lambda key, default: 0 if key == iteration_scheduler.MAX_JITTER_PROPERTY else default)
+    def test_reserve__does_not_reserve_iteration_if_jitter_disabled(self, _, mock_mutex):
+        self.assertEqual(0, iteration_scheduler.reserve("TEST_01", 1000))
+        self.assertEqual(0, iteration_scheduler.reserve("TEST_02", 1000, max_jitter_secs=0))
+
+        self.assertFalse(mock_mutex.called)
+        self.assertEqual({}, iteration_scheduler._get_calendar_entries())
+
+    @patch("enmutils_int.lib.iteration_scheduler.time.time", return_value=1000)
+    def test_get_calendar__returns_upcoming_iterations_of_active_profiles_in_order(self, _):
+        entries = {"TEST_01": {"planned": 1100, "wake": 1102}, "TEST_02": {"planned": 1050, "wake": 1050},
+                   "TEST_03": {"planned": 900, "wake": 900}, "TEST_04": {"planned": 1010, "wake": 1010},
+                   "TEST_05": {"planned": 5000, "wake": 5000}}
+        persistence.default_db().update_hashes(values={iteration_scheduler.CALENDAR_KEY: {
+            name: json.dumps(entry) for name, entry in entries.iteritems()}})
+        persistence.set("active_workload_profiles", {"TEST_01", "TEST_02", "TEST_03", "TEST_05"}, -1)
+
+        self.assertEqual(["TEST_02", "TEST_01"],
+                         [entry["profile"] for entry in iteration_scheduler.get_calendar(until=2000)])
+
+
+if __name__ == "__main__":
+    unittest2.main(verbosity=2)
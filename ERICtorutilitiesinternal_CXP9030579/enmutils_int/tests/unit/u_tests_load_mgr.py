@@ -132,6 +132,13 @@ class LoadManagerUnitTests(ParameterizedTestCase):
         load_mgr.kill_profile_daemon_process('TEST_01')
         self.assertEqual([call(123), call(456)], mock_kill_process_id.mock_calls)
 
+    @patch('enmutils_int.lib.load_mgr.profile_host.stop_hosted_profile', return_value="PROFILE_HOST_1")
+    @patch('enmutils_int.lib.load_mgr.process.get_profile_daemon_pid', return_value=["123"])
+    @patch('enmutils_int.lib.load_mgr.process.kill_process_id')
+    def test_kill_profile_daemon_process__does_not_kill_host_of_hosted_profile(self, mock_kill_process_id, *_):
+        load_mgr.kill_profile_daemon_process('TEST_01')
+        self.assertFalse(mock_kill_process_id.called)
+
     def test_get_active_foundation_profiles(self):
         profiles = self._get_profiles(num_profiles=6, num_nodes=10)
         profile_names = [profile.NAME for profile in profiles.values()]
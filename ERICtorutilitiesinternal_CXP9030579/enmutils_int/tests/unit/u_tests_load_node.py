@@ -36,7 +36,7 @@ class LoadNodeUnitTests(ParameterizedTestCase):
         mock_persist.assert_called_once_with()
         mock_get_from_db.assert_called_once_with('test_id')
         self.assertFalse(mock_debug.called)
-        mock_mutex.assert_called_once_with('persist-test_id', log_output=False)
+        mock_mutex.assert_called_once_with('persist-test_id', persisted=True, log_output=False)
 
     @patch('enmutils_int.lib.load_node.LoadNodeMixin.__init__', return_value=None)
     @patch('enmutils_int.lib.load_node.LoadNodeMixin.compare_and_update_persisted_node')
@@ -76,7 +76,7 @@ class LoadNodeUnitTests(ParameterizedTestCase):
         mock_persist.assert_called_once_with()
         mock_get_from_db.assert_called_once_with('test_id')
         self.assertFalse(mock_debug.called)
-        mock_mutex.assert_called_once_with('persist-test_id', log_output=False)
+        mock_mutex.assert_called_once_with('persist-test_id', persisted=True, log_output=False)
 
     @patch('enmutils_int.lib.load_node.LoadNodeMixin.__init__', return_value=None)
     @patch('enmutils_int.lib.load_node.LoadNodeMixin.compare_and_update_persisted_node')
@@ -97,7 +97,7 @@ class LoadNodeUnitTests(ParameterizedTestCase):
         mock_persist.assert_called_once_with()
         mock_get_from_db.assert_called_once_with('test_id')
         self.assertFalse(mock_debug.called)
-        mock_mutex.assert_called_once_with('persist-test_id', log_output=False)
+        mock_mutex.assert_called_once_with('persist-test_id', persisted=True, log_output=False)
 
     @patch('enmutils_int.lib.load_node.LoadNodeMixin._persist')
     def test_remove_profile_successfully_removes_a_profile_from_a_node(self, mock_persist):
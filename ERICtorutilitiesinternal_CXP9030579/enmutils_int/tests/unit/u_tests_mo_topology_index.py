@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+import unittest2
+from mock import patch, Mock
+
+from enmutils.lib import persistence
+from enmutils_int.lib import mo_topology_index
+from testslib import unit_test_utils
+
+CELL_FDN = "SubNetwork=ERBS-SUBNW-1,MeContext={0},ManagedElement=1,ENodeBFunction=1,EUtranCellFDD={0}-{1}"
+RADIO_CELL_FDN = "SubNetwork=NETSimW,ManagedElement={0},ENodeBFunction=1,EUtranCellFDD={0}-{1}"
+QUERY_OUTPUT = ["FDN : {0}".format(CELL_FDN.format("LTE01", 1)), "", "FDN : {0}".format(CELL_FDN.format("LTE01", 2)),
+                "", "FDN : {0}".format(RADIO_CELL_FDN.format("LTE02", 1)), "", "3 instance(s)"]
+
+
+class MoTopologyIndexUnitTests(unittest2.TestCase):
+
+    def setUp(self):
+        unit_test_utils.setup()
+        self.user = Mock()
+        self.user.enm_execute.return_value.get_output.return_value = QUERY_OUTPUT
+
+    def tearDown(self):
+        unit_test_utils.tear_down()
+
+    def test_get_node_name_from_fdn__returns_name_of_cpp_or_radio_node(self):
+        self.assertEqual("LTE01", mo_topology_index.get_node_name_from_fdn(CELL_FDN.format("LTE01", 1)))
+        self.assertEqual("LTE02", mo_topology_index.get_node_name_from_fdn(RADIO_CELL_FDN.format("LTE02", 1)))
+        self.assertIsNone(mo_topology_index.get_node_name_from_fdn("SubNetwork=NETSimW"))
+
+    def test_query_mo_fdns__groups_fdns_of_all_nodes_queried_by_node(self):
+        self.assertEqual({"LTE01": [CELL_FDN.format("LTE01", 1), CELL_FDN.format("LTE01", 2)],
+                          "LTE02": [RADIO_CELL_FDN.format("LTE02", 1)], "LTE03": []},
+                         mo_topology_index._query_mo_fdns(self.user, ["LTE01", "LTE02", "LTE03"], "EUtranCellFDD"))
+        self.user.enm_execute.assert_called_once_with("cmedit get LTE01;LTE02;LTE03 EUtranCellFDD")
+
+    def test_query_mo_fdns__returns_no_nodes_if_query_fails(self):
+        self.user.enm_execute.return_value.get_output.return_value = ["Error 1004 : Invalid scope"]
+        self.assertEqual({}, mo_topology_index._query_mo_fdns(self.user, ["LTE01"], "EUtranCellFDD"))
+
+    @patch("enmutils_int.lib.mo_topology_index.NODES_PER_QUERY", 2)
+    def test_refresh__queries_nodes_in_chunks_and_adds_nodes_to_index(self):
+        mo_topology_index.refresh(self.user, ["LTE04"], "EUtranCellFDD")
+        entries = mo_topology_index.refresh(self.user, ["LTE01", "LTE02", "LTE03"], "EUtranCellFDD")
+        self.assertEqual(["LTE01", "LTE02", "LTE03"], sorted(entries))
+        self.assertEqual(3, self.user.enm_execute.call_count)
+        self.assertEqual(["LTE01", "LTE02", "LTE03", "LTE04"],
+                         sorted(persistence.default_db().get_hash(mo_topology_index.INDEX_KEY.format("EUtranCellFDD"))))
+        self.assertEqual(entries, mo_topology_index._get_index_entries(["LTE01", "LTE02", "LTE03"], "EUtranCellFDD"))
+
+    def test_get_mo_fdns__only_queries_nodes_not_already_indexed(self):
+        self.user.enm_execute.return_value.get_output.return_value = QUERY_OUTPUT[:3]
+        mo_topology_index.get_mo_fdns(self.user, ["LTE01"], "EUtranCellFDD")
+        self.user.enm_execute.return_value.get_output.return_value = QUERY_OUTPUT[4:]
+        self.assertEqual({"LTE01": [CELL_FDN.format("LTE01", 1), CELL_FDN.format("LTE01", 2)],
+                          "LTE02": [RADIO_CELL_FDN.format("LTE02", 1)]},
+                         mo_topology_index.get_mo_fdns(self.user, ["LTE01", "LTE02"], "EUtranCellFDD"))
+        self.assertEqual(2, self.user.enm_execute.call_count)
+        self.user.enm_execute.assert_called_with("cmedit get LTE02 EUtranCellFDD")
+        self.assertEqual({"LTE01": 2, "LTE02": 1},
+                         mo_topology_index.get_mo_counts(self.user, ["LTE01", "LTE02"], "EUtranCellFDD"))
+        self.assertEqual(2, self.user.enm_execute.call_count)
+
+    @patch("enmutils_int.lib.mo_topology_index.time.time")
+    def test_get_mo_fdns__queries_nodes_again_when_indexed_longer_ago_than_max_age(self, mock_time):
+        mock_time.return_value = 1000
+        mo_topology_index.get_mo_fdns(self.user, ["LTE01"], "EUtranCellFDD", max_age=60)
+        mock_time.return_value = 1061
+        mo_topology_index.get_mo_fdns(self.user, ["LTE01"], "EUtranCellFDD", max_age=60)
+        self.assertEqual(2, self.user.enm_execute.call_count)
+
+    def test_invalidate_fdns__removes_nodes_of_created_or_deleted_mos_from_index(self):
+        mo_topology_index.get_mo_fdns(self.user, ["LTE01", "LTE02"], "EUtranCellFDD")
+        mo_topology_index.invalidate_fdns([CELL_FDN.format("LTE01", 3), "SubNetwork=NETSimW"])
+        self.assertEqual(["LTE02"], persistence.default_db().get_hash(
+            mo_topology_index.INDEX_KEY.format("EUtranCellFDD")).keys())
+
+    @patch("enmutils_int.lib.mo_topology_index.persistence.default_db")
+    def test_get_mo_fdns__reads_only_the_requested_nodes_from_index(self, mock_default_db):
+        mock_default_db.return_value.get_hash_values.return_value = [
+            '[{0}, ["{1}"]]'.format(mo_topology_index.time.time(), CELL_FDN.format("LTE01", 1))]
+        self.assertEqual({"LTE01": [CELL_FDN.format("LTE01", 1)]},
+                         mo_topology_index.get_mo_fdns(self.user, ["LTE01"], "EUtranCellFDD"))
+        mock_default_db.return_value.get_hash_values.assert_called_once_with(
+            mo_topology_index.INDEX_KEY.format("EUtranCellFDD"), ["LTE01"])
+        self.assertFalse(mock_default_db.return_value.get_hash.called)
+        self.assertFalse(self.user.enm_execute.called)
+
+
+if __name__ == "__main__":
+    unittest2.main(verbosity=2)
@@ -11,7 +11,8 @@ from enmutils_int.lib.netex import (Collection, NetexFlow, Search, get_all_enm_n
                                     search_collections, NETEX_HEADER, JSON_SECURITY_REQUEST,
                                     download_exported_collections, get_status_of_import_collections,
                                     initiate_import_collections, retrieve_import_collection_status,
-                                    create_export_dir_and_file, handle_errors_in_retreive_import_collection_status)
+                                    create_export_dir_and_file, handle_errors_in_retreive_import_collection_status,
+                                    generate_multipart_body, MultipartBody)
 from testslib import unit_test_utils
 
 QUERY = "select%20all"
@@ -227,6 +228,88 @@ class NetexUnitTests(unittest2.TestCase):
         self.collection.update_collection_from_file()
         self.assertTrue(self.collection.user.put().raise_for_status.called)
 
+    def test_iter_fdns__stops_querying_when_enough_fdns_found(self):
+        response = Mock()
+        response.get_output.return_value = self.fdns_with_FDN_prefix
+        self.user.enm_execute.return_value = response
+        self.assertEqual(2, len(self.collection.create_list_of_fdns(num_fdns_required=2)))
+        self.assertEqual(1, self.user.enm_execute.call_count)
+        self.assertIn("query", self.collection.stage_times)
+
+    def test_generate_multipart_body__streams_lines_in_blocks(self):
+        fields = [("collection", None, "application/json", u'{"name": "c"}'),
+                  ("file", "fdns.txt", "application/octet-stream", ("FDN{0}".format(i) for i in xrange(3)))]
+        with patch("enmutils_int.lib.netex.MULTIPART_BODY_CHUNK_LINES", 2):
+            blocks = list(generate_multipart_body("xyz", fields))
+        self.assertIn("FDN0\nFDN1", blocks)
+        self.assertIn("\nFDN2", blocks)
+        body = "".join(blocks)
+        self.assertTrue(body.startswith('--xyz\r\nContent-Disposition: form-data; name="collection"\r\n'))
+        self.assertIn('name="file"; filename="fdns.txt"\r\nContent-Type: application/octet-stream\r\n\r\n'
+                      'FDN0\nFDN1\nFDN2\r\n', body)
+        self.assertTrue(body.endswith("--xyz--\r\n"))
+
+    def test_multipart_body__can_be_iterated_again_when_resent(self):
+        body = MultipartBody([("file", "fdns.txt", None, ["FDN1", "FDN2"]), ("replace", None, None, "true")])
+        self.assertEqual("".join(body), "".join(body))
+        self.assertIn(body.boundary, body.content_type)
+
+    def test_create_collection_from_fdns__creates_with_first_chunk_and_adds_remainder(self):
+        self.user.post.return_value = Mock(status_code=201)
+        self.user.post.return_value.json.return_value = {"collection": {"id": "123"}}
+        self.user.put.return_value = Mock(status_code=201)
+        self.collection.fdns = ["FDN{0}".format(i) for i in xrange(5)]
+        self.collection.create_collection_from_fdns(chunk_size=2)
+        self.assertEqual("123", self.collection.id)
+        self.assertIn("FDN0\nFDN1\r\n", "".join(self.user.post.call_args[1]["data"]))
+        self.assertEqual(2, self.user.put.call_count)
+        self.assertIn("FDN4\r\n", "".join(self.user.put.call_args[1]["data"]))
+        self.assertEqual(["create", "update"], sorted(self.collection.stage_times))
+        self.assertFalse(self.user.enm_execute.called)
+
+    @patch("enmutils_int.lib.netex.COLLECTION_UPLOAD_CHUNK_SIZE", 3)
+    def test_create_collection_from_fdns__uploads_more_fdns_than_the_default_chunk_size_in_chunks(self):
+        self.user.post.return_value = Mock(status_code=201)
+        self.user.post.return_value.json.return_value = {"collection": {"id": "123"}}
+        self.user.put.return_value = Mock(status_code=201)
+        self.collection.fdns = ["FDN{0}".format(i) for i in xrange(8)]
+        self.collection.create_collection_from_fdns()
+        self.assertIn("FDN0\nFDN1\nFDN2\r\n", "".join(self.user.post.call_args[1]["data"]))
+        bodies = ["".join(call[1]["data"]) for call in self.user.put.call_args_list]
+        self.assertEqual(2, len(bodies))
+        self.assertIn("FDN3\nFDN4\nFDN5\r\n", bodies[0])
+        self.assertIn("FDN6\nFDN7\r\n", bodies[1])
+
+    def test_update_collection_from_fdns__only_first_chunk_replaces_contents(self):
+        self.user.put.return_value = Mock(status_code=201)
+        self.collection.id = 123
+        self.collection.update_collection_from_fdns(iter(["FDN1", "FDN2", "FDN3"]), replace='true', chunk_size=2)
+        bodies = ["".join(call[1]["data"]) for call in self.user.put.call_args_list]
+        self.assertEqual(2, len(bodies))
+        self.assertIn('name="replace"\r\n\r\ntrue\r\n', bodies[0])
+        self.assertIn('name="replace"\r\n\r\nfalse\r\n', bodies[1])
+        self.assertIn('name="collectionId"\r\n\r\n123\r\n', bodies[1])
+
+    def test_create_collection_from_fdns__streams_fdns_queried_from_enm(self):
+        self.user.enm_execute.return_value.get_output.return_value = self.fdns_with_FDN_prefix
+        self.user.post.return_value = Mock(status_code=201)
+        self.user.post.return_value.json.return_value = {"collection": {"id": "123"}}
+        self.user.put.return_value = Mock(status_code=201)
+        self.collection.create_collection_from_fdns(chunk_size=2)
+        self.assertEqual(3, self.user.enm_execute.call_count)
+        self.assertIn("netsim_RNC01RBS23\nSubNetwork", "".join(self.user.post.call_args[1]["data"]))
+        self.assertEqual(4, self.user.put.call_count)
+
+    def test_update_collection_from_fdns__raises_environ_error_if_no_fdns(self):
+        self.collection.id = 123
+        self.assertRaises(EnvironError, self.collection.update_collection_from_fdns, [])
+        self.assertFalse(self.user.put.called)
+
+    def test_update_collection_from_fdns__raises_http_error(self):
+        self.user.put.return_value = Mock(status_code=500)
+        self.user.put.return_value.raise_for_status.side_effect = HTTPError
+        self.assertRaises(HTTPError, self.collection.update_collection_from_fdns, ["FDN1"])
+
     def test_get_collection_by_id_success(self):
         self.collection.id = "123456"
         response = Mock(status_code=201)
@@ -612,16 +695,19 @@ class NetexUnitTests(unittest2.TestCase):
         self.collection.delete()
         self.assertFalse(self.user.delete_request.called)
 
-    def test_get_pos_by_poids_success(self):
+    @patch("enmutils_int.lib.netex.get_po_attribute_fetcher")
+    def test_get_pos_by_poids__fetches_objects_with_shared_fetcher_of_user(self, mock_get_fetcher):
         user = Mock()
-        get_pos_by_poids(user, poList=["1"])
-        self.assertTrue(user.post.called)
+        self.assertEqual(mock_get_fetcher.return_value.fetch.return_value, get_pos_by_poids(user, poList=["1"]))
+        mock_get_fetcher.assert_called_with(user)
+        mock_get_fetcher.return_value.fetch.assert_called_with(
+            ["1"], [{"moType": "NetworkElement", "attributeNames": ["neType"]}])
 
-    def test_get_pos_by_poids_raises_exception(self):
+    def test_get_pos_by_poids__raises_error_if_request_fails(self):
         user = Mock()
         user.post.return_value.ok = False
-        get_pos_by_poids(user, poList=["1"])
-        self.assertTrue(user.post.return_value.raise_for_status.called)
+        user.post.return_value.raise_for_status.side_effect = HTTPError("Error")
+        self.assertRaises(HTTPError, get_pos_by_poids, user, poList=["1"])
 
     def test_initiate_export_collections_success_when_nested_is_false(self):
         self.mock_user.post.return_value.json.return_value = {"sessionId": "1"}
@@ -1006,7 +1092,7 @@ class NetexFlowUnitTests(unittest2.TestCase):
         self.flow.small_collection = MagicMock()
         self.flow.small_collection.get_collection_by_id.return_value.json.return_value = {"contents": [{"id": 1}]}
         mock_choice.return_value.__getitem__.return_value = 1
-        mock_get_pos_by_poids.return_value.json.return_value = [{"moName": "ieatnetsimv010-07_RNC11RBS01"}]
+        mock_get_pos_by_poids.return_value = [{"moName": "ieatnetsimv010-07_RNC11RBS01"}]
         self.flow.query_on_partial_node_name()
         self.assertEqual(self.flow.query, "ieatnetsimv010-07_RNC11*")
 
@@ -1017,7 +1103,7 @@ class NetexFlowUnitTests(unittest2.TestCase):
         self.flow.small_collection = MagicMock()
         self.flow.small_collection.get_collection_by_id.return_value.json.return_value = {"contents": [{"id": 1}]}
         mock_choice.return_value.__getitem__.return_value = 1
-        mock_get_pos_by_poids.return_value.json.return_value = [{"moName": "CORE88MLTN6-0-1-01"}]
+        mock_get_pos_by_poids.return_value = [{"moName": "CORE88MLTN6-0-1-01"}]
         self.flow.query_on_partial_node_name()
         self.assertEqual(self.flow.query, "CORE88*")
 
@@ -1028,7 +1114,7 @@ class NetexFlowUnitTests(unittest2.TestCase):
         self.flow.small_collection = MagicMock()
         self.flow.small_collection.get_collection_by_id.return_value.json.return_value = {"contents": [{"id": 1}]}
         mock_choice.return_value.__getitem__.return_value = 1
-        mock_get_pos_by_poids.return_value.json.return_value = [{"moName": "NR01gNodeBRadio00001"}]
+        mock_get_pos_by_poids.return_value = [{"moName": "NR01gNodeBRadio00001"}]
         self.flow.query_on_partial_node_name()
         self.assertEqual(self.flow.query, "NR01*")
 
@@ -1039,7 +1125,7 @@ class NetexFlowUnitTests(unittest2.TestCase):
         self.flow.small_collection = MagicMock()
         self.flow.small_collection.get_collection_by_id.return_value.json.return_value = {"contents": [{"id": 1}]}
         mock_choice.return_value.__getitem__.return_value = 1
-        mock_get_pos_by_poids.return_value.json.return_value = [{"moName": "LTE02dg2ERBS00001"}]
+        mock_get_pos_by_poids.return_value = [{"moName": "LTE02dg2ERBS00001"}]
         self.flow.query_on_partial_node_name()
         self.assertEqual(self.flow.query, "LTE02*")
 
@@ -1075,7 +1161,7 @@ class NetexFlowUnitTests(unittest2.TestCase):
         mock_get_pos_by_poids.status_code = 401
         self.flow.small_collection.get_collection_by_id.return_value.json.return_value = {"contents": [{"id": 1}]}
         mock_choice.return_value.__getitem__.return_value = 1
-        mock_get_pos_by_poids.return_value.text = None
+        mock_get_pos_by_poids.return_value = []
         with self.assertRaises(EnmApplicationError):
             self.flow.query_on_partial_node_name()
 
@@ -1088,7 +1174,7 @@ class NetexFlowUnitTests(unittest2.TestCase):
         self.flow.small_collection = MagicMock()
         self.flow.small_collection.get_collection_by_id.return_value.json.return_value = {"contents": [{"id": 1}]}
         mock_choice.return_value.__getitem__.return_value = 1
-        mock_get_pos_by_poids.return_value.json.return_value = [{"SomeName": "LTE02dg2ERBS00001"}]
+        mock_get_pos_by_poids.return_value = [{"SomeName": "LTE02dg2ERBS00001"}]
         with self.assertRaises(EnmApplicationError):
             self.flow.query_on_partial_node_name()
 
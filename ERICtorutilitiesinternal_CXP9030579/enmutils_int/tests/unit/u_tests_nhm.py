@@ -11,7 +11,8 @@ from enmutils.lib.exceptions import EnvironError
 from enmutils_int.lib.nhm import (CREATED_BY_DEFAULT, KPI_BODY, sleep_until_profile_persisted,
                                   wait_for_nhm_setup_profile, get_nhm_nodes, get_kpi,
                                   check_is_kpi_usable_and_assign_to_node_type, NhmKpi,
-                                  get_counters_if_enodeb, transport_counters, ROUTER_COUNTERS)
+                                  get_counters_if_enodeb, transport_counters, ROUTER_COUNTERS, get_kpi_metadata,
+                                  get_cached_kpi, invalidate_kpi_metadata, KPI_METADATA_MAX_AGE_SECS)
 from enmutils_int.lib.profile_flows.nhm_flows.nhm_09_flow import Nhm09
 from testslib import unit_test_utils
 
@@ -21,6 +22,8 @@ KPI_INFO_TEST = {u'name': u'unit_test_kpi', u'kpiActivation': {u'active': True,
 
 
 class NhmKpiUnitTests(unittest2.TestCase):
+    KPI_NAMES = ['Total_UL_PDCP_Cell_Throughput', 'Average_UL_PDCP_UE_Throughput_For_Carrier_Aggregation',
+                 'E-RAB_Retainability_Session_Time_Normalized_Loss_Rate', 'Total_DL_PDCP_Cell_Throughput']
 
     def setUp(self):
         unit_test_utils.setup()
@@ -123,6 +126,13 @@ class NhmKpiUnitTests(unittest2.TestCase):
         self.assertTrue(mock_add_error_as_exception.called)
         self.assertTrue(mock_time_sleep.called)
 
+    @staticmethod
+    def get_kpi_listing_response(kpi_names, created_by):
+        response = Mock(status_code=200, headers={})
+        response.json.return_value = [[kpi_name, True, u'PERCENTAGE', {}, [u'ERBS'], [u'EUtranCellFDD'], 0, created_by,
+                                       u'administrator', u'20171017162049745'] for kpi_name in kpi_names]
+        return response
+
     @patch('enmutils_int.lib.nhm.log.logger.debug')
     @patch("enmutils_int.lib.nhm.NhmKpi.update")
     @patch("enmutils_int.lib.nhm.time.sleep")
@@ -130,59 +140,32 @@ class NhmKpiUnitTests(unittest2.TestCase):
     @patch('enmutils_int.lib.nhm.NhmKpi.get_kpis_created_by')
     def test_clean_down_system_kpis_success(self, mock_get_kpis_created_by, mock_deactivate,
                                             mock_time_sleep, mock_update, mock_logger_debug,):
-        response = Mock()
-        response.status_code = 200
-        response.json.return_value = ['Total_UL_PDCP_Cell_Throughput', 'Average_UL_PDCP_UE_Throughput_For_Carrier_Aggregation',
-                                      'E-RAB_Retainability_Session_Time_Normalized_Loss_Rate', 'Total_DL_PDCP_Cell_Throughput']
-        self.user.post.return_value = response
-        mock_get_kpis_created_by.return_value = CREATED_BY_DEFAULT
-        mock_deactivate.return_value = response
-        mock_time_sleep.return_value = response
-        mock_update.return_value = response
+        self.user.post.return_value = self.get_kpi_listing_response(self.KPI_NAMES, CREATED_BY_DEFAULT)
         NhmKpi.clean_down_system_kpis(self.user)
-        self.assertEqual(4, mock_get_kpis_created_by.call_count)
+        self.assertFalse(mock_get_kpis_created_by.called)
         self.assertEqual(4, mock_deactivate.call_count)
+        self.assertEqual(4, mock_update.call_count)
         self.assertTrue(mock_time_sleep.called)
         self.assertTrue(mock_logger_debug.called)
-        self.assertTrue(self.user.post.called)
+        self.assertEqual(1, self.user.post.call_count)
 
-    @patch('enmutils_int.lib.nhm.log.logger.debug')
     @patch("enmutils_int.lib.nhm.NhmKpi.update")
     @patch("enmutils_int.lib.nhm.time.sleep")
     @patch("enmutils_int.lib.nhm.NhmKpi.deactivate")
-    @patch('enmutils_int.lib.nhm.NhmKpi.get_kpis_created_by')
-    def test_clean_down_system_kpis_no_default_kpi(self, mock_get_kpis_created_by, mock_deactivate, mock_time_sleep,
-                                                   mock_update, mock_logger_debug):
-        response = Mock()
-        response.status_code = 200
-        response.json.return_value = ['Total_UL_PDCP_Cell_Throughput', 'Average_UL_PDCP_UE_Throughput_For_Carrier_Aggregation',
-                                      'E-RAB_Retainability_Session_Time_Normalized_Loss_Rate', 'Total_DL_PDCP_Cell_Throughput']
-        self.user.post.return_value = response
-        mock_get_kpis_created_by.return_value = self.user.username
+    def test_clean_down_system_kpis_no_default_kpi(self, mock_deactivate, mock_time_sleep, mock_update):
+        self.user.post.return_value = self.get_kpi_listing_response(self.KPI_NAMES, self.user.username)
         NhmKpi.clean_down_system_kpis(self.user)
-        self.assertEqual(4, mock_get_kpis_created_by.call_count)
         self.assertFalse(mock_deactivate.called)
         self.assertFalse(mock_time_sleep.called)
         self.assertFalse(mock_update.called)
-        self.assertEqual(4, mock_logger_debug.call_count)
 
     @patch("enmutils_int.lib.nhm.NhmKpi.update")
     @patch("enmutils_int.lib.nhm.time.sleep")
     @patch("enmutils_int.lib.nhm.NhmKpi.deactivate")
-    @patch('enmutils_int.lib.nhm.NhmKpi.get_kpis_created_by')
-    def test_clean_down_system_kpis_deactivate_error(self, mock_get_kpis_created_by, mock_deactivate, mock_time_sleep,
-                                                     mock_update):
-        response = Mock()
-        response.status_code = 200
-        response.json.return_value = ['Total_UL_PDCP_Cell_Throughput',
-                                      'Average_UL_PDCP_UE_Throughput_For_Carrier_Aggregation',
-                                      'E-RAB_Retainability_Session_Time_Normalized_Loss_Rate',
-                                      'Total_DL_PDCP_Cell_Throughput']
-        self.user.post.return_value = response
-        mock_get_kpis_created_by.return_value = CREATED_BY_DEFAULT
+    def test_clean_down_system_kpis_deactivate_error(self, mock_deactivate, mock_time_sleep, mock_update):
+        self.user.post.return_value = self.get_kpi_listing_response(self.KPI_NAMES, CREATED_BY_DEFAULT)
         mock_deactivate.side_effect = Exception
         NhmKpi.clean_down_system_kpis(self.user)
-        self.assertEqual(4, mock_get_kpis_created_by.call_count)
         self.assertTrue(mock_time_sleep.called)
         self.assertEqual(4, mock_deactivate.call_count)
         self.assertEqual(4, mock_update.call_count)
@@ -190,24 +173,65 @@ class NhmKpiUnitTests(unittest2.TestCase):
     @patch("enmutils_int.lib.nhm.NhmKpi.update")
     @patch("enmutils_int.lib.nhm.time.sleep")
     @patch("enmutils_int.lib.nhm.NhmKpi.deactivate")
-    @patch('enmutils_int.lib.nhm.NhmKpi.get_kpis_created_by')
-    def test_clean_down_system_kpis_update_error(self, mock_get_kpis_created_by, mock_deactivate, mock_time_sleep,
-                                                 mock_update):
-        response = Mock()
-        response.status_code = 205
-        response.json.return_value = ['Total_UL_PDCP_Cell_Throughput',
-                                      'Average_UL_PDCP_UE_Throughput_For_Carrier_Aggregation',
-                                      'E-RAB_Retainability_Session_Time_Normalized_Loss_Rate',
-                                      'Total_DL_PDCP_Cell_Throughput']
-        self.user.post.return_value = response
-        mock_get_kpis_created_by.return_value = CREATED_BY_DEFAULT
+    def test_clean_down_system_kpis_update_error(self, mock_deactivate, mock_time_sleep, mock_update):
+        self.user.post.return_value = self.get_kpi_listing_response(self.KPI_NAMES, CREATED_BY_DEFAULT)
         mock_update.side_effect = Exception
         NhmKpi.clean_down_system_kpis(self.user)
-        self.assertEqual(4, mock_get_kpis_created_by.call_count)
         self.assertTrue(mock_time_sleep.called)
         self.assertEqual(4, mock_deactivate.call_count)
         self.assertEqual(4, mock_update.call_count)
 
+    def test_get_all_kpi_names_active__uses_shared_metadata_until_kpi_modified(self):
+        self.user.post.return_value = self.get_kpi_listing_response(self.KPI_NAMES, CREATED_BY_DEFAULT)
+        self.assertEqual(4, len(NhmKpi.get_all_kpi_names_active(self.user)))
+        self.assertTrue(NhmKpi.check_supported_node_types(Mock(), self.KPI_NAMES[0], ['ERBS']))
+        self.assertFalse(NhmKpi.check_reporting_object(Mock(), self.KPI_NAMES[1], ['UtranCell']))
+        self.assertEqual(1, self.user.post.call_count)
+        self.user.put.return_value = Mock(status_code=200)
+        self.kpi.deactivate()
+        NhmKpi.get_all_kpi_names(self.user)
+        self.assertEqual(2, self.user.post.call_count)
+
+    @patch("enmutils_int.lib.nhm.time.time")
+    def test_get_kpi_metadata__revalidates_listing_with_etag_when_out_of_date(self, mock_time):
+        mock_time.return_value = 1000
+        response = self.get_kpi_listing_response(self.KPI_NAMES, CREATED_BY_DEFAULT)
+        response.headers = {"ETag": "v1"}
+        self.user.post.return_value = response
+        get_kpi_metadata(self.user)
+        mock_time.return_value = 1000 + KPI_METADATA_MAX_AGE_SECS + 1
+        self.user.post.return_value = Mock(status_code=304)
+        self.assertEqual(4, len(get_kpi_metadata(self.user)))
+        self.assertEqual("v1", self.user.post.call_args[1]["headers"]["If-None-Match"])
+
+    def test_get_cached_kpi__lists_again_if_kpi_not_found(self):
+        self.user.post.side_effect = [self.get_kpi_listing_response(self.KPI_NAMES[:1], CREATED_BY_DEFAULT),
+                                      self.get_kpi_listing_response(self.KPI_NAMES, CREATED_BY_DEFAULT)]
+        get_kpi_metadata(self.user)
+        with patch("enmutils_int.lib.nhm.KPI_METADATA_MISSING_KPI_MAX_AGE_SECS", -1):
+            self.assertEqual(self.KPI_NAMES[1], get_cached_kpi(self.user, self.KPI_NAMES[1])[0])
+        self.assertEqual(2, self.user.post.call_count)
+
+    def test_check_reporting_object__raises_environ_error_if_kpi_not_found(self):
+        self.user.post.return_value = self.get_kpi_listing_response([], CREATED_BY_DEFAULT)
+        with patch("enmutils_int.lib.nhm.KPI_METADATA_MISSING_KPI_MAX_AGE_SECS", 60):
+            self.assertRaises(EnvironError, NhmKpi.check_reporting_object, self.user, "unknown", ['EUtranCellFDD'])
+
+    def test_get_kpi_info__uses_cached_definition_until_kpi_last_modified_time_changes(self):
+        listing = self.get_kpi_listing_response(self.KPI_NAMES, CREATED_BY_DEFAULT)
+        self.user.post.return_value = listing
+        self.user.get.return_value = Mock(status_code=200)
+        self.user.get.return_value.json.return_value = {"name": self.KPI_NAMES[0]}
+        NhmKpi.get_kpi_info(self.user, self.KPI_NAMES[0])
+        self.assertEqual({"name": self.KPI_NAMES[0]}, NhmKpi.get_kpi_info(self.user, self.KPI_NAMES[0]))
+        self.assertEqual(1, self.user.get.call_count)
+        NhmKpi.get_kpi_info(self.user, self.KPI_NAMES[0], use_cache=False)
+        self.assertEqual(2, self.user.get.call_count)
+        listing.json.return_value[0][9] = u'20200101000000000'
+        invalidate_kpi_metadata()
+        NhmKpi.get_kpi_info(self.user, self.KPI_NAMES[0])
+        self.assertEqual(3, self.user.get.call_count)
+
     def test_get_kpi_body_success(self):
         response = Mock()
         response.status_code = 200
@@ -226,7 +250,7 @@ class NhmKpiUnitTests(unittest2.TestCase):
 
     @patch("enmutils_int.lib.nhm.raise_for_status")
     def test_get_all_kpi_names_active_exclude_success(self, _):
-        response = Mock()
+        response = Mock(headers={})
         self.user.post.return_value = response
         returned = [[["A", "B"]]]
         response.json.return_value = [[["A", "B"], [["C", "D"]]]]
@@ -236,7 +260,7 @@ class NhmKpiUnitTests(unittest2.TestCase):
 
     @patch("enmutils_int.lib.nhm.raise_for_status")
     def test_get_all_kpi_names_active_if_condition_success(self, *_):
-        response = Mock()
+        response = Mock(headers={})
         response.json.return_value = [[["A", "B"], [["C", "D"]]]]
         self.user.post.return_value = response
         returned = [[['A', 'B']]]
@@ -245,26 +269,26 @@ class NhmKpiUnitTests(unittest2.TestCase):
         self.assertEqual(self.kpi.get_all_kpi_names_active(self.user, exclude='NHM_03'), returned)
 
     @patch("enmutils_int.lib.nhm.raise_for_status")
-    def test_get_all_kpi_names_active_else_condition_success(self, mock_raise_for_status):
-        response = Mock()
+    def test_get_all_kpi_names_active_else_condition_success(self, _):
+        response = Mock(headers={})
         response.json.return_value = [[["A", "B"], ["C", "D"]]]
         returned = [[['A', 'B']]]
         self.user.post.return_value = response
         self.assertEqual(self.kpi.get_all_kpi_names_active(self.user), returned)
-        self.assertTrue(mock_raise_for_status.called)
+        self.assertTrue(self.user.post.called)
 
     @patch("enmutils_int.lib.nhm.raise_for_status")
-    def test_get_all_kpi_names_active_if_kpi1_is_null(self, mock_raise_for_status):
-        response = Mock()
+    def test_get_all_kpi_names_active_if_kpi1_is_null(self, _):
+        response = Mock(headers={})
         response.json.return_value = [[["A", "B"], []]]
         returned = []
         self.user.post.return_value = response
         self.assertEqual(self.kpi.get_all_kpi_names_active(self.user), returned)
-        self.assertTrue(mock_raise_for_status.called)
+        self.assertTrue(self.user.post.called)
 
     @patch("enmutils_int.lib.nhm.raise_for_status")
     def test_get_all_kpi_names_active_if_exclude_in_kpi(self, *_):
-        response = Mock()
+        response = Mock(headers={})
         response.json.return_value = [[u'NHM_03 Average_DL_UE_PDCP_DRB_Latency_per_QCI'], [u'NHM_03 kpi']]
         self.user.post.return_value = response
         returned = []
@@ -273,7 +297,7 @@ class NhmKpiUnitTests(unittest2.TestCase):
 
     @patch("enmutils_int.lib.nhm.raise_for_status")
     def test_get_all_kpi_names_active_if_exclude_not_in_kpi(self, *_):
-        response = Mock()
+        response = Mock(headers={})
         response.json.return_value = [[['A', 'B'], ['C', 'D']]]
         self.user.post.return_value = response
         returned = [[['A', 'B']]]
@@ -281,7 +305,7 @@ class NhmKpiUnitTests(unittest2.TestCase):
         self.assertTrue(self.user.post.called)
 
     def test_get_all_kpi_names_active_raises_environ_error(self):
-        response = Mock()
+        response = Mock(headers={})
         response.json.return_value = []
         self.mock_user.post.return_value = response
         self.assertRaises(EnvironError, self.kpi.get_all_kpi_names_active, self.mock_user)
@@ -297,14 +321,15 @@ class NhmKpiUnitTests(unittest2.TestCase):
         self.assertTrue(mock_log_logger_debug.called)
 
     def test_get_all_kpi_names_success(self):
-        response = Mock()
+        response = Mock(headers={})
         response.status_code = 200
+        response.json.return_value = []
         self.user.post.return_value = response
         NhmKpi.get_all_kpi_names(self.user)
         self.assertTrue(self.user.post.called)
 
     def test_get_all_kpi_names_exclude_success(self):
-        response = Mock()
+        response = Mock(headers={})
         response.json.return_value = [[u'Average_DL_UE_PDCP_DRB_Latency_per_QCI'], [u'NHM_03 kpi']]
         returned = [[u'Average_DL_UE_PDCP_DRB_Latency_per_QCI']]
         self.user.post.return_value = response
@@ -312,7 +337,7 @@ class NhmKpiUnitTests(unittest2.TestCase):
         self.assertTrue(self.user.post.called)
 
     def test_get_all_kpi_names_if_exclude_not_in_kpi(self):
-        response = Mock()
+        response = Mock(headers={})
         response.json.return_value = [[u'Average_DL_UE_PDCP_DRB_Latency_per_QCI'], [u'NHM_03 kpi']]
         returned = [[u'Average_DL_UE_PDCP_DRB_Latency_per_QCI'], [u'NHM_03 kpi']]
         self.user.post.return_value = response
@@ -943,7 +968,7 @@ class NhmKpiUnitTests(unittest2.TestCase):
         self.assertTrue(transport_counters(reporting_object='EUtranCellFDD') == [])
 
     def test_g_node_types_returns_true_if_all_supported(self):
-        response = Mock()
+        response = Mock(headers={})
         response.json.return_value = [
             [u'unit_test_kpi', False, u'PERCENTAGE', {u'thresholdDomain': None, u'thresholdValue': None},
              [u'ERBS', u'RadioNode'], [u'EUtranCellTDD', u'EUtranCellFDD'], 0, u'Ericsson',
@@ -953,7 +978,7 @@ class NhmKpiUnitTests(unittest2.TestCase):
         self.assertTrue(self.kpi.check_supported_node_types(self.mock_user, self.kpi.name, ['ERBS', 'RadioNode']))
 
     def test_check_supported_node_types_returns_false_if_erbs_not_in_ne_types(self):
-        response = Mock()
+        response = Mock(headers={})
         response.json.return_value = [
             [u'unit_test_kpi', False, u'PERCENTAGE', {u'thresholdDomain': None, u'thresholdValue': None},
              [u'RBS', u'RadioNode'], [u'EUtranCellTDD', u'EUtranCellFDD'], 0, u'Ericsson',
@@ -962,7 +987,7 @@ class NhmKpiUnitTests(unittest2.TestCase):
         self.assertFalse(self.kpi.check_supported_node_types(self.mock_user, self.kpi.name, ['ERBS', 'RadioNode']))
 
     def test_check_supported_node_types_returns_true_if_more_than_erbs_radio_nodes_in_ne_types(self):
-        response = Mock()
+        response = Mock(headers={})
         response.json.return_value = [
             [u'unit_test_kpi', False, u'PERCENTAGE', {u'thresholdDomain': None, u'thresholdValue': None},
              [u'ERBS', u'RadioNode', u'RBS', u'RNC'], [u'EUtranCellTDD', u'EUtranCellFDD'], 0, u'Ericsson',
@@ -971,7 +996,7 @@ class NhmKpiUnitTests(unittest2.TestCase):
         self.assertTrue(self.kpi.check_supported_node_types(self.mock_user, self.kpi.name, ['ERBS', 'RadioNode']))
 
     def test_check_reporting_object_returns_true_if_any_or_all_of_the_reporting_objects_match(self):
-        response = Mock()
+        response = Mock(headers={})
         response.json.return_value = [
             [u'unit_test_kpi', False, u'PERCENTAGE', {u'thresholdDomain': None, u'thresholdValue': None},
              [u'ERBS', u'RadioNode'], [u'EUtranCellTDD', u'EUtranCellFDD'], 0, u'Ericsson',
@@ -981,7 +1006,7 @@ class NhmKpiUnitTests(unittest2.TestCase):
                                                         profile_reporting_objects=['EUtranCellTDD', 'EUtranCellFDD']))
 
     def test_check_reporting_object_returns_false_if_reporting_objects_do_not_match(self):
-        response = Mock()
+        response = Mock(headers={})
         response.json.return_value = [
             [u'unit_test_kpi', False, u'PERCENTAGE', {u'thresholdDomain': None, u'thresholdValue': None},
              [u'ERBS', u'RadioNode'], [u'IP_interface'], 0, u'Ericsson',
@@ -1098,7 +1123,7 @@ class NhmUnitTests(unittest2.TestCase):
         self.assertRaises(HTTPError, get_kpi, user=self.user)
 
     def test_check_is_kpi_usable_and_assign_to_node_type(self):
-        response = Mock()
+        response = Mock(headers={})
         response.status_code = 200
         kpi_name = 'Total_UL_PDCP_Cell_Throughput'
         response.json.return_value = [['Total_UL_PDCP_Cell_Throughput', False, u'MEGA_BITS_PER_SECOND',
@@ -1110,7 +1135,7 @@ class NhmUnitTests(unittest2.TestCase):
         self.assertTrue(result == {'ERBS': []})
 
     def test_check_is_kpi_usable_and_assign_to_node_type_kpi_is_unsupported(self):
-        response = Mock()
+        response = Mock(headers={})
         response.status_code = 200
         kpi_name = 'Total_UL_PDCP_Cell_Throughput'
         response.json.return_value = [['Total_UL_PDCP_Cell_Throughput', False, u'MEGA_BITS_PER_SECOND',
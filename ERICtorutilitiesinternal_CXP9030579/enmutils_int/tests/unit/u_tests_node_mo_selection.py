@@ -42,6 +42,19 @@ class NodeMoSelectionUnitTests(ParameterizedTestCase):
         self.mo_selection.read_information_from_file("FILE")
         mock_debug.assert_called_with("Completed read of node(s) cardinality file.")
 
+    @patch('enmutils_int.lib.node_mo_selection.FILE_CONTENT_CACHE', {})
+    @patch('enmutils_int.lib.node_mo_selection.os.path.exists', return_value=True)
+    @patch('enmutils_int.lib.node_mo_selection.os.path.getmtime')
+    @patch('enmutils_int.lib.node_mo_selection.filesystem.get_lines_from_file', return_value=['{"LTE01": {}}'])
+    def test_read_information_from_file__reuses_content_until_file_modified(self, mock_get_lines, mock_getmtime, _):
+        mock_getmtime.return_value = 1000
+        self.assertEqual({"LTE01": {}}, self.mo_selection.read_information_from_file("FILE"))
+        self.assertEqual({"LTE01": {}}, NodeMoSelection().read_information_from_file("FILE"))
+        self.assertEqual(1, mock_get_lines.call_count)
+        mock_getmtime.return_value = 1001
+        self.mo_selection.read_information_from_file("FILE")
+        self.assertEqual(2, mock_get_lines.call_count)
+
     @patch('enmutils_int.lib.node_mo_selection.filesystem.get_lines_from_file', return_value=[])
     @patch('enmutils_int.lib.node_mo_selection.json.loads')
     def test_read_information_from_file_raises_environ_error_empty_file(self, *_):
@@ -273,34 +273,86 @@ class NodeMgrUnitTests(ParameterizedTestCase):
         mock_node_dict.return_value = {"SGSN": {node1.node_id: node1}, "SGSN-MME": {node2.node_id: node2}}
         self.assertListEqual([node2, node1], self.pool.handle_backward_compatibility([node2], "SGSN-MME"))
 
+    @patch('enmutils_int.lib.node_pool_mgr.node_pool_stats.record_nodes')
     @patch('enmutils_int.lib.node_pool_mgr.update_lte_node')
     @patch('enmutils_int.lib.node_pool_mgr.Pool._update_node_dict')
-    @patch('enmutils_int.lib.node_pool_mgr.Pool._load_nodes_from_file')
+    @patch('enmutils_int.lib.node_pool_mgr.Pool._load_nodes_from_file_in_chunks')
     def test_add__nodes_if_profiles_passed_in(self, mock_load_nodes_from_file, *_):
         profile = get_profile()
         profile2 = get_profile()
         profile = [profile, profile2]
         nodes = get_nodes(5)
-        mock_load_nodes_from_file.return_value = (nodes, [])
+        mock_load_nodes_from_file.return_value = iter([(nodes, [], 5)])
         self.pool.add('mock_file_path', profiles=profile)
 
     @patch('enmutils_int.lib.node_pool_mgr.Pool._update_node_dict')
-    @patch('enmutils_int.lib.node_pool_mgr.Pool._load_nodes_from_file')
+    @patch('enmutils_int.lib.node_pool_mgr.Pool._load_nodes_from_file_in_chunks')
     def test_add_nodes__if_primary_type_not_in_nodes_dict(self, mock_load_from_file, *_):
         node = Mock(node_id="LTE01", primary_type=None)
-        mock_load_from_file.return_value = ([node], [])
+        mock_load_from_file.return_value = iter([([node], [], 1)])
         _, missing = self.pool.add('file_path')
         self.assertEqual(len(missing["MISSING_PRIMARY_TYPE"]), 1)
 
     @patch('enmutils_int.lib.node_pool_mgr.Pool._update_node_dict')
     @patch('enmutils_int.lib.node_pool_mgr.Pool.validate_nodes_against_enm', return_value=["LTE01"])
-    @patch('enmutils_int.lib.node_pool_mgr.Pool._load_nodes_from_file')
+    @patch('enmutils_int.lib.node_pool_mgr.Pool._load_nodes_from_file_in_chunks')
     def test_add__validates_sync(self, mock_load_from_file, *_):
         node = Mock(node_id="LTE01", primary_type="ERBS")
-        mock_load_from_file.return_value = ([node], [])
+        mock_load_from_file.return_value = iter([([node], [], 1)])
         _, missing = self.pool.add('file_path', validate=True)
         self.assertEqual(len(missing["NOT_SYNCED"]), 1)
 
+    @patch('enmutils_int.lib.node_pool_mgr.node_pool_stats.record_nodes')
+    @patch('enmutils_int.lib.node_pool_mgr.Pool.persist')
+    @patch('enmutils_int.lib.node_pool_mgr.Pool._update_node_dict')
+    @patch('enmutils_int.lib.node_pool_mgr.Pool._load_nodes_from_file_in_chunks')
+    def test_add__persists_nodes_and_pool_once_per_chunk(self, mock_load_from_file, _, mock_persist,
+                                                         mock_record_nodes, *__):
+        nodes = [Mock(node_id="LTE0{0}".format(_), primary_type="MGW") for _ in range(3)]
+        mock_load_from_file.return_value = iter([(nodes[:2], ["LTE10"], 3), (nodes[2:], [], 1)])
+
+        added, missing = self.pool.add('file_path')
+
+        self.assertEqual(["LTE00", "LTE01", "LTE02"], added)
+        self.assertEqual(["LTE10"], missing["NOT_ADDED"])
+        self.assertEqual(2, mock_persist.call_count)
+        self.assertIsNotNone(nodes[0]._persist.call_args[1]["batch"])
+        self.assertFalse(nodes[0]._persist.call_args[1]["record_stats"])
+        self.assertEqual([call(nodes[:2]), call(nodes[2:])], mock_record_nodes.call_args_list)
+        self.assertIsNone(node_pool_mgr.persistence.get(node_pool_mgr.ADD_PROGRESS_KEY))
+
+    @patch('enmutils_int.lib.node_pool_mgr.node_pool_stats.record_nodes')
+    @patch('enmutils_int.lib.node_pool_mgr.Pool.persist')
+    @patch('enmutils_int.lib.node_pool_mgr.Pool._update_node_dict')
+    @patch('enmutils_int.lib.node_pool_mgr.Pool._load_nodes_from_file_in_chunks')
+    def test_add__resumes_interrupted_add_of_the_same_nodes(self, mock_load_from_file, *_):
+        def load_nodes(*_, **__):
+            yield [Mock(node_id="LTE01", primary_type="MGW")], [], 1000
+            raise KeyboardInterrupt()
+
+        mock_load_from_file.side_effect = load_nodes
+        with self.assertRaises(KeyboardInterrupt):
+            self.pool.add('file_path', 1, 5000)
+        self.assertEqual(1000, node_pool_mgr.persistence.get(node_pool_mgr.ADD_PROGRESS_KEY)["processed"])
+
+        mock_load_from_file.side_effect = None
+        mock_load_from_file.return_value = iter([])
+        self.pool.add('file_path', 1, 5000)
+        self.assertEqual(1000, mock_load_from_file.call_args[1]["skip"])
+        self.pool.add('other_file_path', 1, 5000)
+        self.assertEqual(0, mock_load_from_file.call_args[1]["skip"])
+
+    @patch('enmutils_int.lib.node_pool_mgr.node_parse.get_node_data_in_chunks')
+    def test_load_nodes_from_file_in_chunks__creates_nodes_of_each_chunk(self, mock_get_node_data_in_chunks, *_):
+        mock_get_node_data_in_chunks.return_value = iter([([{'primary_type': 'ERBS'}, {'primary_type': 'mock_type'}],
+                                                           ["Node3"], 3)])
+        chunks = [chunk for chunk in self.pool._load_nodes_from_file_in_chunks('mock_file_path', skip=10)]
+        self.assertEqual(1, len(chunks))
+        self.assertEqual([NODE_CLASS_MAP["ERBS"], NODE_CLASS_MAP["BaseLoadNode"]],
+                         [type(node) for node in chunks[0][0]])
+        self.assertEqual((["Node3"], 3), chunks[0][1:])
+        self.assertEqual(10, mock_get_node_data_in_chunks.call_args[1]["skip"])
+
     @patch('enmutils_int.lib.node_pool_mgr.node_parse.get_node_data')
     def test_load_nodes_from_file__if_no_key_for_primary_type__defaults_to_base_load_node(self, mock_get_node_data, *_):
         mock_get_node_data.return_value = ([{'primary_type': 'mock_type'}], [])
@@ -555,8 +607,8 @@ class NodeMgrUnitTests(ParameterizedTestCase):
     @patch('enmutils_int.lib.node_pool_mgr.distribute_nodes')
     @patch('enmutils_int.lib.node_pool_mgr.Pool.node_dict', new_callable=PropertyMock)
     @patch('enmutils_int.lib.node_pool_mgr.NodesFilter')
-    @patch('enmutils_int.lib.node_pool_mgr.get_synced_nodes')
-    def test_get_random_available_nodes_is_successful_check_sync(self, mock_get_synced_nodes, mock_filter,
+    @patch('enmutils_int.lib.sync_state_cache.get_sync_states')
+    def test_get_random_available_nodes_is_successful_check_sync(self, mock_get_sync_states, mock_filter,
                                                                  mock_nodes_dict, mock_distribute, *_):
         profile = Mock()
         profile.NUM_NODES = {'ERBS': 3}
@@ -565,10 +617,13 @@ class NodeMgrUnitTests(ParameterizedTestCase):
         node, node1, node2, node3 = Mock(), Mock(), Mock(), Mock()
         node.node_id, node1.node_id, node2.node_id, node3.node_id = "ERBS01", "ERBS02", "ERBS03", "ERBS04"
         nodes = [node, node1, node2, node3]
+        for _ in nodes:
+            _.primary_type = "ERBS"
         mock_nodes_dict.return_value = {"ERBS": nodes}
         mock_distribute.return_value = nodes
         mock_filter.return_value.execute.return_value = nodes
-        mock_get_synced_nodes.return_value = ["ERBS01", "ERBS02"]
+        mock_get_sync_states.return_value = {"ERBS01": "SYNCHRONIZED", "ERBS02": "SYNCHRONIZED",
+                                             "ERBS03": "UNSYNCHRONIZED"}
         available_nodes = self.pool.get_random_available_nodes(profile)
         self.assertEqual(len(available_nodes), 2)
 
@@ -901,12 +956,13 @@ class NodeMgrUnitTests(ParameterizedTestCase):
 
         node_pool_mgr.cached_nodes_list = []
 
+    @patch("enmutils_int.lib.node_pool_mgr.node_pool_stats.record_nodes")
     @patch("enmutils_int.lib.node_pool_mgr.mutexer.mutex")
     @patch("enmutils_int.lib.node_pool_mgr.log.logger.debug")
     @patch("enmutils_int.lib.node_pool_mgr.update_cached_list_of_nodes")
     @patch("enmutils_int.lib.node_pool_mgr.persistence")
     def test_remove_profile_from_nodes__updates_cached_nodes_list(
-            self, mock_persistence, mock_update_cached_list_of_nodes, *_):
+            self, mock_persistence, mock_update_cached_list_of_nodes, mock_debug, mock_mutex, mock_record_nodes, *_):
         node1 = Mock(node_id="node1", profiles=["TEST_01", "TEST_02"])
         node2 = Mock(node_id="node2", profiles=["TEST_01"])
         node3 = Mock(node_id="node3", profiles=["TEST_02"])
@@ -922,6 +978,9 @@ class NodeMgrUnitTests(ParameterizedTestCase):
         node_pool_mgr.cached_nodes_list = [node3, persisted_node1, persisted_node2]
         mock_update_cached_list_of_nodes.assert_called_with({persisted_node1.node_id: persisted_node1,
                                                              persisted_node2.node_id: persisted_node2})
+        persisted_node1._persist.assert_called_once_with(record_stats=False)
+        self.assertEqual(1, mock_record_nodes.call_count)
+        self.assertItemsEqual([persisted_node1, persisted_node2], mock_record_nodes.call_args[0][0])
         node_pool_mgr.cached_nodes_list = []
 
     @patch('enmutils_int.lib.node_pool_mgr.Pool.add_filtered_node_types_in_message')
@@ -1589,9 +1648,11 @@ class NodeMgrUnitTests(ParameterizedTestCase):
         node2 = Mock(node_id="TEST_NODE2", profiles=["TEST_02"])
         node3 = Mock(node_id="TEST_NODE3", profiles=["TEST_03"])
         node_pool_mgr.cached_nodes_list = [node1_old, node2]
+        generation = node_pool_mgr.cached_nodes_generation
 
         node_pool_mgr.update_cached_list_of_nodes({"TEST_NODE1": node1_new, "TEST_NODE3": node3})
         self.assertEqual(node_pool_mgr.cached_nodes_list, [node1_new, node2, node3])
+        self.assertEqual(generation + 1, node_pool_mgr.cached_nodes_generation)
         self.assertTrue(call("Cache nodes: 3 (Total) 1 (Updated) 1 (Added)") in mock_debug.mock_calls)
         node_pool_mgr.cached_nodes_list = []
 
@@ -2276,6 +2337,28 @@ class NodePoolMgrUnitTests(unittest2.TestCase):
         mock_get_or_create_admin_user.return_value.enm_execute.return_value = response
         self.assertEqual(expected, node_pool_mgr.get_synced_nodes())
 
+    @patch('enmutils_int.lib.sync_state_cache.get_sync_states')
+    def test_filter_unsynchronised_nodes__filters_by_cached_sync_state_and_ne_type(self, mock_get_sync_states):
+        nodes = [Mock(node_id="Node1", primary_type="BSC"), Mock(node_id="Node2", primary_type="BSC"),
+                 Mock(node_id="Node3", primary_type="RadioNode")]
+        mock_get_sync_states.return_value = {"Node1": "SYNCHRONIZED", "Node2": "UNSYNCHRONIZED",
+                                             "Node3": "SYNCHRONIZED"}
+        self.assertEqual([nodes[0], nodes[2]], node_pool_mgr.filter_unsynchronised_nodes(nodes))
+        self.assertEqual([nodes[0]], node_pool_mgr.filter_unsynchronised_nodes(nodes, ne_type="BSC"))
+
+    @patch('enmutils_int.lib.sync_state_cache.get_sync_states')
+    def test_filter_unsynchronised_nodes__keeps_nodes_of_aliased_ne_types(self, mock_get_sync_states):
+        nodes = [Mock(node_id="Node1", primary_type="MINI-LINK-Indoor"), Mock(node_id="Node2", primary_type="MLTN"),
+                 Mock(node_id="Node3", primary_type="SGSN-MME"), Mock(node_id="Node4", primary_type="ERBS")]
+        mock_get_sync_states.return_value = {node.node_id: "SYNCHRONIZED" for node in nodes}
+        self.assertEqual(nodes[:2], node_pool_mgr.filter_unsynchronised_nodes(nodes, ne_type="MLTN"))
+        self.assertEqual(nodes[:2], node_pool_mgr.filter_unsynchronised_nodes(nodes, ne_type="MINI-LINK-Indoor"))
+        self.assertEqual([nodes[2]], node_pool_mgr.filter_unsynchronised_nodes(nodes, ne_type="SGSN"))
+
+    @patch('enmutils_int.lib.sync_state_cache.get_sync_states', side_effect=Exception("Error"))
+    def test_filter_unsynchronised_nodes__returns_no_nodes_if_sync_states_unavailable(self, _):
+        self.assertEqual([], node_pool_mgr.filter_unsynchronised_nodes([Mock(node_id="Node1")]))
+
     @patch('enmutils_int.lib.node_pool_mgr.get_pool')
     def test_get_allocated_node_summary_raises_no_nodes_available(self, mock_allocated_nodes):
         mock_allocated_nodes.return_value.allocated_nodes.return_value = []
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+import unittest2
+from mock import patch, Mock
+
+from enmutils.lib import persistence
+from enmutils_int.lib import load_node, node_pool_mgr, node_pool_stats
+from testslib import unit_test_utils
+
+
+class NodePoolStatsUnitTests(unittest2.TestCase):
+
+    def setUp(self):
+        unit_test_utils.setup()
+        self.erbs_nodes = [load_node.ERBSLoadNode(node_id="ERBS{0}".format(i), primary_type="ERBS") for i in range(3)]
+        self.radio_node = load_node.RadioLoadNode(node_id="Radio1", primary_type="RadioNode")
+        node_pool_stats.rebuild([])
+
+    def tearDown(self):
+        unit_test_utils.tear_down()
+
+    def test_persisting_nodes__updates_counters_for_add_allocate_and_deallocate(self):
+        with persistence.batch() as batch:
+            for node in self.erbs_nodes + [self.radio_node]:
+                node._persist(batch=batch)
+        self.erbs_nodes[0].add_profile(Mock(NAME="FM_01", EXCLUSIVE=False))
+        self.erbs_nodes[1].add_profile(Mock(NAME="SHM_01", EXCLUSIVE=True))
+        self.radio_node.add_profile(Mock(NAME="FM_01", EXCLUSIVE=False))
+        self.radio_node.remove_profile(Mock(NAME="FM_01"))
+
+        self.assertEqual({"ERBS": {"total": 3, "allocated": 2, "exclusive": 1, "profiles": {"FM_01": 1, "SHM_01": 1}},
+                          "RadioNode": {"total": 1, "allocated": 0, "exclusive": 0, "profiles": {}}},
+                         node_pool_stats.get_stats())
+
+    def test_persisting_node__is_not_counted_twice(self):
+        self.erbs_nodes[0]._persist()
+        persistence.get(self.erbs_nodes[0].node_id)._persist()
+        self.assertEqual(1, node_pool_stats.get_stats()["ERBS"]["total"])
+
+    def test_remove_node__removes_node_from_counters(self):
+        for node in self.erbs_nodes:
+            node.profiles = ["FM_01"]
+            node._persist()
+        node_pool_mgr.remove_node(self.erbs_nodes[0].node_id)
+        node_pool_mgr.remove_node("missing")
+
+        self.assertEqual({"total": 2, "allocated": 2, "exclusive": 0, "profiles": {"FM_01": 2}},
+                         node_pool_stats.get_stats()["ERBS"])
+
+    def test_rebuild__replaces_existing_counters(self):
+        self.radio_node._persist()
+        self.erbs_nodes[0].profiles = ["FM_01"]
+        node_pool_stats.rebuild(self.erbs_nodes)
+
+        self.assertEqual({"ERBS": {"total": 3, "allocated": 1, "exclusive": 0, "profiles": {"FM_01": 1}}},
+                         node_pool_stats.get_stats())
+
+    def test_get_stats__returns_none_until_counters_are_built(self):
+        node_pool_stats.clear()
+        self.erbs_nodes[0]._persist()
+        self.assertIsNone(node_pool_stats.get_stats())
+
+    def test_record_nodes__counts_nodes_of_chunk_in_one_transaction(self):
+        with patch.object(persistence.default_db(), "update_hashes_from_values",
+                          wraps=persistence.default_db().update_hashes_from_values) as mock_update:
+            node_pool_stats.record_nodes(self.erbs_nodes + [self.radio_node])
+            node_pool_stats.record_nodes(self.erbs_nodes)
+
+        self.assertEqual(2, mock_update.call_count)
+        self.assertEqual(3, node_pool_stats.get_stats()["ERBS"]["total"])
+        self.assertEqual(1, node_pool_stats.get_stats()["RadioNode"]["total"])
+
+    def test_record_nodes__clears_counters_if_update_does_not_complete(self):
+        with patch.object(persistence.default_db(), "update_hashes_from_values", return_value=False):
+            node_pool_stats.record_nodes(self.erbs_nodes)
+        self.assertIsNone(node_pool_stats.get_stats())
+
+    @patch("enmutils_int.lib.node_pool_mgr.mutex")
+    def test_recount_pool_stats__recounts_counters_from_pool(self, _):
+        node_pool_stats.clear()
+        with patch.object(node_pool_mgr, "get_pool", return_value=Mock(nodes=self.erbs_nodes)):
+            node_pool_mgr.recount_pool_stats()
+        self.assertEqual(len(self.erbs_nodes), node_pool_stats.get_stats()["ERBS"]["total"])
+
+    @patch("enmutils_int.lib.node_pool_mgr.ProfilePool._is_in_use", return_value=False)
+    def test_remove_all__clears_counters(self, _):
+        self.erbs_nodes[0]._persist()
+        node_pool_mgr.ProfilePool().remove_all()
+        self.assertIsNone(node_pool_stats.get_stats())
+
+    @patch("enmutils_int.lib.node_pool_mgr.get_pool")
+    def test_get_pool_stats__rebuilds_counters_from_pool_only_if_not_built(self, mock_get_pool):
+        node_pool_stats.clear()
+        mock_get_pool.return_value.nodes = self.erbs_nodes
+
+        self.assertEqual(3, node_pool_mgr.get_pool_stats()["ERBS"]["total"])
+        self.assertEqual(3, node_pool_mgr.get_pool_stats()["ERBS"]["total"])
+        self.assertEqual(1, mock_get_pool.call_count)
+
+
+if __name__ == "__main__":
+    unittest2.main(verbosity=2)
@@ -260,28 +260,27 @@ class NodeSecurityUnitTests(unittest2.TestCase):
         self.assertRaises(Exception, check_sync, self.nodes[0].node_id, self.user)
         self.assertEqual(mock_log.call_count, 3)
 
-    @patch("enmutils_int.lib.node_security.get_enm_network_element_sync_states")
+    @patch("enmutils_int.lib.sync_state_cache.get_sync_states")
     @patch('enmutils_int.lib.node_security.log.logger.debug')
-    def test_sync_and_remove_remove__is_successful(self, mock_debug, mock_get_enm_network_element_sync_states):
+    def test_sync_and_remove_remove__is_successful(self, mock_debug, mock_get_sync_states):
         node1 = Mock(node_id="node1")
         node2 = Mock(node_id="node2")
         node3 = Mock(node_id="node3")
-        mock_get_enm_network_element_sync_states.return_value = {"node1": "UNSYNCHRONIZED",
-                                                                 "node2": "SYNCHRONIZED",
-                                                                 "node3": "PENDING"}
+        mock_get_sync_states.return_value = {"node1": "UNSYNCHRONIZED", "node2": "SYNCHRONIZED", "node3": "PENDING"}
         sync, unsynced = check_sync_and_remove([node1, node2, node3], self.user)
         self.assertTrue(mock_debug.called)
         self.assertEqual(1, len(sync))
         self.assertEqual(2, len(unsynced))
-        self.assertEqual(1, mock_get_enm_network_element_sync_states.call_count)
+        mock_get_sync_states.assert_called_with(user=self.user, max_age=None)
 
-    @patch("enmutils_int.lib.node_security.get_enm_network_element_sync_states")
+    @patch("enmutils_int.lib.sync_state_cache.get_sync_states")
     @patch('enmutils_int.lib.node_security.log.logger.debug')
-    def test_check_sync_and_remove__is_successful_if_no_nodes_supplied(self, mock_debug, _):
+    def test_check_sync_and_remove__is_successful_if_no_nodes_supplied(self, mock_debug, mock_get_sync_states):
         sync, unsynced = check_sync_and_remove([], self.user)
         self.assertEqual(0, len(sync))
         self.assertEqual(0, len(unsynced))
         self.assertTrue(mock_debug.called)
+        self.assertFalse(mock_get_sync_states.called)
 
     @patch('enmutils_int.lib.node_security.filesystem')
     def test_teardown_is_successful(self, _):
@@ -537,21 +536,7 @@ class NodeTrustUnitTests(unittest2.TestCase):
     def tearDown(self):
         unit_test_utils.tear_down()
 
-    @patch("enmutils_int.lib.node_security._get_values_from_row")
-    def test_parse_tabular_output__is_successful(self, mock_get_values_from_row):
-        mock_get_values_from_row.side_effect = [[u'Node Name', u'Install State', u'Install Error Message', u'Subject', u'Serial Number', u'Issuer'],
-                                                [u'NetworkElement=netsim_LTE01ERBS00001', u'IDLE', u'Not Applicable',
-                                                 u'C=SE, O=Ericsson, OU=EAB, CN=CPP Ericsson1 Root Certificate Authority',
-                                                 u'0', u'C=SE, O=Ericsson, OU=EAB, CN=CPP Ericsson1 Root Certificate Authority'],
-                                                [u'', u'', u'', u'CN=ENM_Infrastructure_CA,OU=BUCI_DUAC_NAM,C=SE,O=ERICSSON',
-                                                 u'9177108028339044770', u'CN=ENM_PKI_Root_CA,OU=BUCI_DUAC_NAM,C=SE,O=ERICSSON'],
-                                                [u'', u'', u'', u'CN=ENM_OAM_CA,OU=BUCI_DUAC_NAM,C=SE,O=ERICSSON', u'4783093685370282770',
-                                                 u'CN=ENM_Infrastructure_CA,OU=BUCI_DUAC_NAM,C=SE,O=ERICSSON'],
-                                                [u'', u'', u'', u'CN=ENM_PKI_Root_CA,OU=BUCI_DUAC_NAM,C=SE,O=ERICSSON',
-                                                 u'9158922812223589770', u'CN=ENM_PKI_Root_CA,OU=BUCI_DUAC_NAM,C=SE,O=ERICSSON'],
-                                                [u'NetworkElement=netsim_LTE01ERBS00002', u'IDLE', u'Not Applicable',
-                                                 u'C=SE, O=Ericsson, OU=EAB, CN=CPP Ericsson1 Root Certificate Authority',
-                                                 u'0', u'C=SE, O=Ericsson, OU=EAB, CN=CPP Ericsson1 Root Certificate Authority']]
+    def test_parse_tabular_output__is_successful(self):
         response = [u'Node Name\tInstall State\tInstall Error Message\tSubject\tSerial Number\tIssuer',
                     u'NetworkElement=netsim_LTE01ERBS00001\tIDLE\tNot Applicable\tC=SE,O=Ericsson,OU=EAB,CN=CPP Ericsson1 '
                     u'Root Certificate Authority\t0\tC=SE,O=Ericsson,OU=EAB,CN=CPP Ericsson1 Root Certificate Authority',
@@ -563,7 +548,6 @@ class NodeTrustUnitTests(unittest2.TestCase):
                     u'', u'Command Executed Successfully']
         self.assertEqual(4, len([tc for tc in parse_tabular_output(response, skip="Command Executed Successfully",
                                                                    multiline=True)]))
-        self.assertEqual(mock_get_values_from_row.call_count, 5)
 
     def test_get_ca_trust_certificates_is_successful(self):
         response = self.user.enm_execute.return_value
@@ -56,9 +56,10 @@ class NodeManagerServiceUnitTests(ParameterizedTestCase):
             nodes.append(node)
         return nodes
 
+    @patch("enmutils_int.lib.services.nodemanager.helper.get_cached_nodes_generation", return_value=1)
     @patch("enmutils_int.lib.services.nodemanager.convert_node_to_dictionary")
     @patch("enmutils_int.lib.services.nodemanager.get_json_response")
-    def test_list_nodes__is_successful(self, mock_response, mock_convert_node_to_dictionary):
+    def test_list_nodes__is_successful(self, mock_response, mock_convert_node_to_dictionary, _):
         mock1, mock2 = Mock(), Mock()
         mock_convert_node_to_dictionary.side_effect = [mock1, mock2]
         node1, node2 = Mock(node_id="node1"), Mock(node_id="node2")
@@ -66,16 +67,17 @@ class NodeManagerServiceUnitTests(ParameterizedTestCase):
         with app.test_request_context(LIST_NODES_URL, json={'profile': None, 'match_patterns': None,
                                                             'node_attributes': None, }):
             nodemanager.list_nodes()
-        mock_response.assert_called_with(message={"node_data": [mock1, mock2],
+        mock_response.assert_called_with(message={"node_data": [mock1, mock2], 'cache_generation': 1,
                                                   'node_count_from_query': 2, 'total_node_count': 2})
         self.assertEqual([call(node1, None, profile_name=None), call(node2, None, profile_name=None)],
                          mock_convert_node_to_dictionary.mock_calls)
 
+    @patch("enmutils_int.lib.services.nodemanager.helper.get_cached_nodes_generation", return_value=1)
     @patch("enmutils_int.lib.services.nodemanager.log.logger")
     @patch("enmutils_int.lib.services.nodemanager.convert_node_to_dictionary")
     @patch("enmutils_int.lib.services.nodemanager.get_json_response")
     def test_list_nodes__is_successful_if_profile_specified(
-            self, mock_response, mock_convert_node_to_dictionary, mock_logger):
+            self, mock_response, mock_convert_node_to_dictionary, mock_logger, _):
         mock_queue = MagicMock()
         mock_queue.__contains__.return_value = True
         nodemanager.PROFILE_ALLOCATION_QUEUE = mock_queue
@@ -89,15 +91,33 @@ class NodeManagerServiceUnitTests(ParameterizedTestCase):
                                                             'node_attributes': ["node_id", "profiles"]}):
             nodemanager.list_nodes()
         mock_response.assert_called_with(
-            message={'node_data': [mock1, mock2], 'node_count_from_query': 2, 'total_node_count': 3})
+            message={'node_data': [mock1, mock2], 'node_count_from_query': 2, 'total_node_count': 3,
+                     'cache_generation': 1})
         self.assertEqual([call(node1, ["node_id", "profiles"], profile_name=u'PROFILE2'),
                           call(node2, ["node_id", "profiles"], profile_name=u'PROFILE2')],
                          mock_convert_node_to_dictionary.mock_calls)
         mock_queue.block_until_item_removed.assert_called_with("PROFILE2", mock_logger, max_time_to_wait=1800)
 
+    @patch("enmutils_int.lib.services.nodemanager.ALLOCATION_SCHEDULER")
     @patch("enmutils_int.lib.services.nodemanager.convert_node_to_dictionary")
     @patch("enmutils_int.lib.services.nodemanager.get_json_response")
-    def test_list_nodes__is_successful_if_pattern_specified(self, mock_response, mock_convert_node_to_dictionary):
+    def test_list_nodes__returns_202_with_job_id_if_queued_allocation_outstanding_for_profile(
+            self, mock_response, mock_convert_node_to_dictionary, mock_scheduler):
+        mock_queue = MagicMock()
+        nodemanager.PROFILE_ALLOCATION_QUEUE = mock_queue
+        mock_scheduler.get_active_job_id.return_value = "1234"
+        with app.test_request_context(LIST_NODES_URL, json={'profile': "PROFILE2", 'match_patterns': None,
+                                                            'node_attributes': ["node_id"]}):
+            nodemanager.list_nodes()
+        mock_scheduler.get_active_job_id.assert_called_with("PROFILE2")
+        mock_response.assert_called_with(message={"job_id": "1234"}, rc=202)
+        self.assertFalse(mock_queue.block_until_item_removed.called)
+        self.assertFalse(mock_convert_node_to_dictionary.called)
+
+    @patch("enmutils_int.lib.services.nodemanager.helper.get_cached_nodes_generation", return_value=1)
+    @patch("enmutils_int.lib.services.nodemanager.convert_node_to_dictionary")
+    @patch("enmutils_int.lib.services.nodemanager.get_json_response")
+    def test_list_nodes__is_successful_if_pattern_specified(self, mock_response, mock_convert_node_to_dictionary, _):
         mock1, mock2 = Mock(), Mock()
         mock_convert_node_to_dictionary.side_effect = [mock1, mock2]
         node1, node2, node3 = Mock(node_id="node1"), Mock(node_id="node2"), Mock(node_id="node3")
@@ -106,7 +126,8 @@ class NodeManagerServiceUnitTests(ParameterizedTestCase):
                                                             'node_attributes': ["node_id"]}):
             nodemanager.list_nodes()
         mock_response.assert_called_with(
-            message={'node_data': [mock1, mock2], 'node_count_from_query': 2, 'total_node_count': 3})
+            message={'node_data': [mock1, mock2], 'node_count_from_query': 2, 'total_node_count': 3,
+                     'cache_generation': 1})
         self.assertEqual([call(node1, ["node_id"], profile_name=None), call(node2, ["node_id"], profile_name=None)],
                          mock_convert_node_to_dictionary.mock_calls)
 
@@ -127,10 +148,12 @@ class NodeManagerServiceUnitTests(ParameterizedTestCase):
     @patch('enmutils_int.lib.services.nodemanager.helper.update_cached_nodes_list')
     @patch('enmutils_int.lib.services.nodemanager.helper.retrieve_cell_information_and_apply_cell_type')
     @patch('enmutils_int.lib.services.nodemanager.helper.update_poid_attributes_on_pool_nodes')
-    def test_at_startup__success(self, mock_update_poid_attributes_on_pool_nodes, mock_apply, *_):
+    def test_at_startup__success(self, mock_update_poid_attributes_on_pool_nodes, mock_apply, _, mock_create_job):
         nodemanager.at_startup()
         self.assertEqual(1, mock_update_poid_attributes_on_pool_nodes.call_count)
         self.assertEqual(1, mock_apply.call_count)
+        self.assertEqual(2, mock_create_job.call_count)
+        self.assertEqual(nodemanager.helper.refresh_network_sync_states, mock_create_job.call_args[0][0])
 
     @patch("enmutils_int.lib.services.nodemanager.helper.determine_start_and_end_range", return_value=(1, 1))
     @patch("enmutils_int.lib.services.nodemanager.helper.update_total_node_count", return_value=40)
@@ -150,6 +173,39 @@ class NodeManagerServiceUnitTests(ParameterizedTestCase):
         mock_get_json_response.assert_called_with(
             message="Msg\nFailures occurred while trying to update nodes with POID info from ENM")
 
+    @patch("enmutils_int.lib.services.nodemanager.helper.determine_start_and_end_range", return_value=(1, 1))
+    @patch("enmutils_int.lib.services.nodemanager.helper.update_total_node_count", return_value=40)
+    @patch('enmutils_int.lib.services.nodemanager.get_json_response')
+    @patch('enmutils_int.lib.services.nodemanager.helper.get_cached_nodes_by_id')
+    @patch('enmutils_int.lib.services.nodemanager.helper.retrieve_cell_information_and_apply_cell_type')
+    @patch('enmutils_int.lib.services.nodemanager.helper.update_poid_attributes_on_pool_nodes', return_value=0)
+    @patch('enmutils_int.lib.services.nodemanager.helper.update_cached_nodes_list')
+    @patch('enmutils_int.lib.services.nodemanager.node_pool_mgr.add', return_value=[["LTE01", "MSC01"], {}])
+    def test_add_nodes__only_refreshes_and_enriches_added_nodes(
+            self, _, mock_update_cached_nodes_list, mock_update_poids, mock_apply_cell_type, mock_get_cached_nodes,
+            *__):
+        lte_node, msc_node = Mock(node_id="LTE01", primary_type="RadioNode"), Mock(node_id="MSC01", primary_type="MSC")
+        mock_get_cached_nodes.return_value = [lte_node, msc_node]
+        with app.test_request_context(ADD_NODES_URL, json=dict(file_name="nodes", node_range="1")):
+            nodemanager.add_nodes()
+        mock_update_cached_nodes_list.assert_called_with(node_ids=["LTE01", "MSC01"])
+        mock_update_poids.assert_called_with(node_ids=["LTE01", "MSC01"])
+        mock_apply_cell_type.assert_called_with(allocated_nodes=[lte_node], rebuild_dict=True)
+
+    @patch("enmutils_int.lib.services.nodemanager.helper.determine_start_and_end_range", return_value=(1, 1))
+    @patch("enmutils_int.lib.services.nodemanager.helper.update_total_node_count", return_value=40)
+    @patch('enmutils_int.lib.services.nodemanager.get_json_response')
+    @patch('enmutils_int.lib.services.nodemanager.helper.get_cached_nodes_by_id',
+           return_value=[Mock(node_id="MSC01", primary_type="MSC")])
+    @patch('enmutils_int.lib.services.nodemanager.helper.retrieve_cell_information_and_apply_cell_type')
+    @patch('enmutils_int.lib.services.nodemanager.helper.update_poid_attributes_on_pool_nodes', return_value=0)
+    @patch('enmutils_int.lib.services.nodemanager.helper.update_cached_nodes_list')
+    @patch('enmutils_int.lib.services.nodemanager.node_pool_mgr.add', return_value=[["MSC01"], {}])
+    def test_add_nodes__does_not_rebuild_cell_dict_if_no_lte_nodes_added(self, _, __, ___, mock_apply_cell_type, *____):
+        with app.test_request_context(ADD_NODES_URL, json=dict(file_name="nodes", node_range="1")):
+            nodemanager.add_nodes()
+        self.assertFalse(mock_apply_cell_type.called)
+
     @patch("enmutils_int.lib.services.nodemanager.helper.determine_start_and_end_range", return_value=(1, 1))
     @patch("enmutils_int.lib.services.nodemanager.helper.update_poid_attributes_on_pool_nodes", return_value=0)
     @patch('enmutils_int.lib.services.nodemanager.log.logger')
@@ -284,6 +340,55 @@ class NodeManagerServiceUnitTests(ParameterizedTestCase):
         mock_queue.put_unique.get_item("profile1")
         self.assertTrue(mock_abort_with_message.called)
 
+    @patch("enmutils_int.lib.services.nodemanager.ALLOCATION_SCHEDULER")
+    @patch("enmutils_int.lib.services.nodemanager.abort_with_message")
+    @patch("enmutils_int.lib.services.nodemanager.get_json_response")
+    def test_submit_allocation__queues_job_and_returns_job_id(
+            self, mock_get_json_response, mock_abort_with_message, mock_scheduler):
+        mock_queue = MagicMock()
+        nodemanager.PROFILE_ALLOCATION_QUEUE = mock_queue
+        mock_scheduler.submit.return_value = "1234"
+        with app.test_request_context("nodes/allocate_async", json={'profile': 'profile1', 'nodes': None}):
+            nodemanager.submit_allocation()
+        self.assertFalse(mock_queue.put_unique.called)
+        mock_scheduler.submit.assert_called_with("profile1", nodes=None, profile_values=None, network_config=None)
+        mock_get_json_response.assert_called_with(message={"job_id": "1234"})
+        self.assertFalse(mock_abort_with_message.called)
+
+    @patch("enmutils_int.lib.services.nodemanager.ALLOCATION_SCHEDULER")
+    @patch("enmutils_int.lib.services.nodemanager.abort_with_message")
+    def test_submit_allocation__aborts_if_no_profile_specified(self, mock_abort_with_message, mock_scheduler):
+        with app.test_request_context("nodes/allocate_async", json={'profile': None, 'nodes': None}):
+            nodemanager.submit_allocation()
+        self.assertTrue(mock_abort_with_message.called)
+        self.assertFalse(mock_scheduler.submit.called)
+
+    @patch("enmutils_int.lib.services.nodemanager.ALLOCATION_SCHEDULER")
+    @patch("enmutils_int.lib.services.nodemanager.get_json_response")
+    def test_allocation_status__returns_job_and_caps_wait(self, mock_get_json_response, mock_scheduler):
+        mock_scheduler.get_job_status.return_value = {"job_id": "1234", "state": "COMPLETED"}
+        with app.test_request_context("nodes/allocation_status", json={'job_id': '1234', 'wait': 1000}):
+            nodemanager.allocation_status()
+        mock_scheduler.get_job_status.assert_called_with("1234", wait=nodemanager.MAX_ALLOCATION_STATUS_WAIT)
+        mock_get_json_response.assert_called_with(message={"job_id": "1234", "state": "COMPLETED"})
+
+    @patch("enmutils_int.lib.services.nodemanager.ALLOCATION_SCHEDULER")
+    @patch("enmutils_int.lib.services.nodemanager.get_json_response")
+    def test_allocation_status__unsuccessful_if_job_not_found(self, mock_get_json_response, mock_scheduler):
+        mock_scheduler.get_job_status.return_value = None
+        with app.test_request_context("nodes/allocation_status", json={'job_id': '1234'}):
+            nodemanager.allocation_status()
+        mock_scheduler.get_job_status.assert_called_with("1234", wait=0)
+        mock_get_json_response.assert_called_with(success=False, message="Allocation job 1234 not found")
+
+    @patch("enmutils_int.lib.services.nodemanager.ALLOCATION_SCHEDULER")
+    @patch("enmutils_int.lib.services.nodemanager.abort_with_message")
+    def test_allocation_status__aborts_if_error_occurs(self, mock_abort_with_message, mock_scheduler):
+        mock_scheduler.get_job_status.side_effect = Exception("error")
+        with app.test_request_context("nodes/allocation_status", json={'job_id': '1234'}):
+            nodemanager.allocation_status()
+        self.assertTrue(mock_abort_with_message.called)
+
     @patch("enmutils_int.lib.services.nodemanager.helper.set_deallocation_in_progress", return_value=None)
     @patch("enmutils_int.lib.services.nodemanager.abort_with_message")
     @patch("enmutils_int.lib.services.nodemanager.helper.set_deallocation_complete")
@@ -359,6 +464,38 @@ class NodeManagerServiceUnitTests(ParameterizedTestCase):
                                                    nodemanager.SERVICE_NAME, log.SERVICES_LOG_DIR, error)
         self.assertFalse(mock_get_json_response.called)
 
+    @patch("enmutils_int.lib.services.nodemanager.helper.get_cached_nodes_generation", return_value=3)
+    @patch("enmutils_int.lib.services.nodemanager.get_json_response")
+    def test_get_nodes_cache_generation__is_successful(self, mock_get_json_response, _):
+        with app.test_request_context('cache_generation'):
+            nodemanager.get_nodes_cache_generation()
+        mock_get_json_response.assert_called_with(message={"cache_generation": 3})
+
+    @patch("enmutils_int.lib.services.nodemanager.abort_with_message")
+    @patch("enmutils_int.lib.services.nodemanager.helper.get_cached_nodes_generation", side_effect=Exception("error"))
+    def test_get_nodes_cache_generation__calls_abort_if_error_occurs(self, _, mock_abort_with_message):
+        with app.test_request_context('cache_generation'):
+            nodemanager.get_nodes_cache_generation()
+        self.assertTrue(mock_abort_with_message.called)
+
+    @patch("enmutils_int.lib.services.nodemanager.helper.get_sync_states", return_value={"node1": "SYNCHRONIZED"})
+    @patch("enmutils_int.lib.services.nodemanager.get_json_response")
+    def test_get_sync_states__is_successful(self, mock_get_json_response, mock_get_sync_states):
+        with app.test_request_context('sync_states', json={"node_ids": ["node1"], "max_age": "60"}):
+            nodemanager.get_sync_states()
+        mock_get_sync_states.assert_called_with(node_ids=["node1"], max_age=60)
+        mock_get_json_response.assert_called_with(message={"node1": "SYNCHRONIZED"})
+        with app.test_request_context('sync_states', json={}):
+            nodemanager.get_sync_states()
+        mock_get_sync_states.assert_called_with(node_ids=None, max_age=None)
+
+    @patch("enmutils_int.lib.services.nodemanager.abort_with_message")
+    @patch("enmutils_int.lib.services.nodemanager.helper.get_sync_states", side_effect=Exception("error"))
+    def test_get_sync_states__calls_abort_if_error_occurs(self, _, mock_abort_with_message):
+        with app.test_request_context('sync_states', json={}):
+            nodemanager.get_sync_states()
+        self.assertTrue(mock_abort_with_message.called)
+
     def test_list_nodes_that_match_patterns__is_successful(self):
         nodes = self.setup_nodes()
         self.assertEqual([nodes[0], nodes[2]], nodemanager.list_nodes_that_match_patterns(nodes, "*de0*,node2"))
@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 import unittest2
-from enmutils.lib.exceptions import NoNodesAvailable
+from enmutils.lib.exceptions import NoNodesAvailable, EnvironError
 from enmutils.lib.enm_node import BaseNodeLite
 from enmutils_int.lib.services import nodemanager_adaptor
 from mock import patch, Mock, call
@@ -241,23 +241,27 @@ class NodeManagerAdaptorUnitTests(ParameterizedTestCase):
         nodemanager_adaptor.allocate_nodes(profile)
 
     @patch('enmutils_int.lib.services.nodemanager_adaptor.get_profile_attributes_and_values', return_value={})
-    @patch("enmutils_int.lib.services.nodemanager_adaptor.send_request_to_service")
+    @patch("enmutils_int.lib.services.nodemanager_adaptor.wait_for_allocation_job", return_value={"success": True})
+    @patch("enmutils_int.lib.services.nodemanager_adaptor.submit_allocation_job")
     @patch("enmutils_int.lib.services.nodemanager_adaptor.get_list_of_nodes_from_service")
-    def test_allocate_node__is_successful(self, mock_list, mock_send_request_to_service, _):
+    def test_allocate_node__is_successful(self, mock_list, mock_submit_allocation_job, mock_wait_for_allocation_job,
+                                          _):
         nodemanager_adaptor.MAX_NODES_COUNT_PER_REQUEST = 4
         profile = Mock(NAME="TEST_01")
         nodemanager_adaptor.allocate_nodes(profile)
-        self.assertTrue(
-            call(nodemanager_adaptor.POST_METHOD, nodemanager_adaptor.ALLOCATE_NODES_URL,
-                 json_data={'profile': 'TEST_01', 'nodes': None, 'profile_values': {}, 'network_config': None}) in
-            mock_send_request_to_service.mock_calls)
+        mock_submit_allocation_job.assert_called_with(
+            {'profile': 'TEST_01', 'nodes': None, 'profile_values': {}, 'network_config': None})
+        mock_wait_for_allocation_job.assert_called_with(mock_submit_allocation_job.return_value)
         self.assertEqual(1, mock_list.call_count)
 
     @patch('enmutils_int.lib.services.nodemanager_adaptor.get_profile_attributes_and_values', return_value={})
     @patch("enmutils_int.lib.services.nodemanager_adaptor.print_service_operation_message")
+    @patch("enmutils_int.lib.services.nodemanager_adaptor.wait_for_allocation_job", return_value={"success": True})
+    @patch("enmutils_int.lib.services.nodemanager_adaptor.submit_allocation_job")
     @patch("enmutils_int.lib.services.nodemanager_adaptor.send_request_to_service")
     @patch("enmutils_int.lib.services.nodemanager_adaptor.get_list_of_nodes_from_service")
-    def test_allocate_node__is_successful_if_nodes_specified(self, mock_list, mock_send_request_to_service, *_):
+    def test_allocate_node__is_successful_if_nodes_specified(self, mock_list, mock_send_request_to_service,
+                                                             mock_submit_allocation_job, *_):
         nodemanager_adaptor.MAX_NODES_COUNT_PER_REQUEST = 4
         profile = Mock(NAME="TEST_01")
         nodes = [Mock(node_id="node{0}".format(i + 1)) for i in xrange(10)]
@@ -275,28 +279,49 @@ class NodeManagerAdaptorUnitTests(ParameterizedTestCase):
                  json_data={"profile": "TEST_01", "nodes": "node9,node10"}) in mock_send_request_to_service.mock_calls)
 
         nodemanager_adaptor.allocate_nodes(profile)
-        self.assertTrue(
-            call(nodemanager_adaptor.POST_METHOD, nodemanager_adaptor.ALLOCATE_NODES_URL,
-                 json_data={"profile": "TEST_01", "nodes": None, 'profile_values': {},
-                            'network_config': None}) in mock_send_request_to_service.mock_calls)
-        self.assertTrue(call(nodemanager_adaptor.POST_METHOD, nodemanager_adaptor.ALLOCATE_NODES_URL,
-                             json_data={"profile": "TEST_01", "nodes": None, 'profile_values': {},
-                                        'network_config': None}) in mock_send_request_to_service.mock_calls)
+        mock_submit_allocation_job.assert_called_with({"profile": "TEST_01", "nodes": None, 'profile_values': {},
+                                                       'network_config': None})
+        self.assertEqual(3, mock_send_request_to_service.call_count)
         self.assertEqual(2, mock_list.call_count)
 
     @patch('enmutils_int.lib.services.nodemanager_adaptor.config.has_prop', return_value=True)
     @patch('enmutils_int.lib.services.nodemanager_adaptor.config.get_prop', return_value='40k')
     @patch('enmutils_int.lib.services.nodemanager_adaptor.get_profile_attributes_and_values', return_value={})
-    @patch("enmutils_int.lib.services.nodemanager_adaptor.send_request_to_service")
-    def test_allocate_node__raises_nonodesavailable(self, mock_send_request_to_service, *_):
+    @patch("enmutils_int.lib.services.nodemanager_adaptor.wait_for_allocation_job",
+           return_value={"success": False, "message": "Could not allocate some node type"})
+    @patch("enmutils_int.lib.services.nodemanager_adaptor.submit_allocation_job")
+    def test_allocate_node__raises_nonodesavailable(self, mock_submit_allocation_job, *_):
         profile = Mock(NAME="TEST_01")
-        mock_send_request_to_service.return_value.json.return_value = {
-            "success": False, "message": "Could not allocate some node type"}
         self.assertRaises(NoNodesAvailable, nodemanager_adaptor.allocate_nodes, profile)
-        self.assertTrue(
-            call(nodemanager_adaptor.POST_METHOD, nodemanager_adaptor.ALLOCATE_NODES_URL,
-                 json_data={"profile": "TEST_01", "nodes": None, 'profile_values': {}, 'network_config': "40k"}) in
-            mock_send_request_to_service.mock_calls)
+        mock_submit_allocation_job.assert_called_with(
+            {"profile": "TEST_01", "nodes": None, 'profile_values': {}, 'network_config': "40k"})
+
+    @patch("enmutils_int.lib.services.nodemanager_adaptor.service_adaptor.validate_response",
+           return_value={"job_id": "1234"})
+    @patch("enmutils_int.lib.services.nodemanager_adaptor.send_request_to_service")
+    def test_submit_allocation_job__returns_job_id(self, mock_send_request_to_service, _):
+        json_data = {"profile": "TEST_01", "nodes": None}
+        self.assertEqual("1234", nodemanager_adaptor.submit_allocation_job(json_data))
+        mock_send_request_to_service.assert_called_with(nodemanager_adaptor.POST_METHOD,
+                                                        nodemanager_adaptor.ALLOCATE_NODES_ASYNC_URL,
+                                                        json_data=json_data)
+
+    @patch("enmutils_int.lib.services.nodemanager_adaptor.service_adaptor.validate_response",
+           side_effect=[{"state": "RUNNING"}, {"state": "COMPLETED", "success": True}])
+    @patch("enmutils_int.lib.services.nodemanager_adaptor.send_request_to_service")
+    def test_wait_for_allocation_job__polls_until_job_finished(self, mock_send_request_to_service, _):
+        self.assertEqual({"state": "COMPLETED", "success": True}, nodemanager_adaptor.wait_for_allocation_job("1234"))
+        self.assertEqual(2, mock_send_request_to_service.call_count)
+        mock_send_request_to_service.assert_called_with(
+            nodemanager_adaptor.POST_METHOD, nodemanager_adaptor.ALLOCATION_STATUS_URL,
+            json_data={"job_id": "1234", "wait": nodemanager_adaptor.ALLOCATION_STATUS_WAIT_SECS})
+
+    @patch("enmutils_int.lib.services.nodemanager_adaptor.service_adaptor.validate_response",
+           return_value={"state": "QUEUED"})
+    @patch("enmutils_int.lib.services.nodemanager_adaptor.send_request_to_service")
+    def test_wait_for_allocation_job__raises_environ_error_if_job_not_finished(self, mock_send_request_to_service, _):
+        self.assertRaises(EnvironError, nodemanager_adaptor.wait_for_allocation_job, "1234", timeout=2)
+        self.assertEqual(2, mock_send_request_to_service.call_count)
 
     @patch("enmutils_int.lib.services.nodemanager_adaptor.print_service_operation_message")
     @patch("enmutils_int.lib.services.nodemanager_adaptor.send_request_to_service")
@@ -333,6 +358,23 @@ class NodeManagerAdaptorUnitTests(ParameterizedTestCase):
         mock_validate_response.assert_called_with(mock_send_request_to_service.return_value)
         mock_send_request_to_service.assert_called_with(nodemanager_adaptor.GET_METHOD, nodemanager_adaptor.UPDATE_NODES_CACHE)
 
+    @patch("enmutils_int.lib.services.nodemanager_adaptor.service_adaptor.validate_response",
+           return_value={"cache_generation": 2})
+    @patch("enmutils_int.lib.services.nodemanager_adaptor.send_request_to_service")
+    def test_get_nodes_cache_generation__is_successful(self, mock_send_request_to_service, _):
+        self.assertEqual(2, nodemanager_adaptor.get_nodes_cache_generation())
+        mock_send_request_to_service.assert_called_with(nodemanager_adaptor.GET_METHOD,
+                                                        nodemanager_adaptor.NODES_CACHE_GENERATION)
+
+    @patch("enmutils_int.lib.services.nodemanager_adaptor.service_adaptor.validate_response",
+           return_value={"Node1": "SYNCHRONIZED"})
+    @patch("enmutils_int.lib.services.nodemanager_adaptor.send_request_to_service")
+    def test_get_sync_states__is_successful(self, mock_send_request_to_service, _):
+        self.assertEqual({"Node1": "SYNCHRONIZED"}, nodemanager_adaptor.get_sync_states(["Node1"], max_age=60))
+        mock_send_request_to_service.assert_called_with(nodemanager_adaptor.POST_METHOD,
+                                                        nodemanager_adaptor.SYNC_STATES_URL,
+                                                        json_data={"node_ids": ["Node1"], "max_age": 60})
+
     @patch("enmutils_int.lib.services.nodemanager_adaptor.allocate_nodes")
     @patch("enmutils_int.lib.services.nodemanager_adaptor.deallocate_nodes")
     def test_exchange_nodes__is_successful(self, mock_allocate_nodes, mock_deallocate_nodes):
@@ -4,7 +4,7 @@ from enmutils_int.lib.services import nodemanager_helper_methods
 from enmutils_int.lib import node_pool_mgr
 from mock import patch, Mock, call
 from testslib import unit_test_utils
-from enmutils.lib.exceptions import EnmApplicationError
+from enmutils.lib.exceptions import EnmApplicationError, NoNodesAvailable
 
 
 class NodeManagerHelperMethodsUnitTests(unittest2.TestCase):
@@ -182,12 +182,11 @@ class NodeManagerHelperMethodsUnitTests(unittest2.TestCase):
         self.assertFalse(mock_update_cached_list_of_nodes.called)
 
     @patch('enmutils_int.lib.services.nodemanager_helper_methods.mutexer.mutex')
-    @patch('enmutils_int.lib.services.nodemanager_helper_methods.persistence.default_db')
-    def test_persist_node__success(self, mock_db, mock_mutex):
+    def test_persist_node__success(self, mock_mutex):
         node = Mock(node_id="Node")
         nodemanager_helper_methods.persist_node(node)
         mock_mutex.assert_called_with("persist-Node", persisted=True)
-        mock_db.return_value.set.assert_called_with(node.node_id, node, -1, log_values=False)
+        node._persist.assert_called_once_with()
 
     @patch("enmutils_int.lib.services.nodemanager_helper_methods.config.get_redis_db_index")
     @patch("enmutils_int.lib.services.nodemanager_helper_methods.node_pool_mgr.get_pool")
@@ -203,6 +202,99 @@ class NodeManagerHelperMethodsUnitTests(unittest2.TestCase):
         nodemanager_helper_methods.update_cached_nodes_list()
         self.assertEqual(node_pool_mgr.cached_nodes_list, mock_select_all_nodes_from_redis.return_value)
 
+    @patch("enmutils_int.lib.services.nodemanager_helper_methods.node_pool_mgr.mutex")
+    @patch("enmutils_int.lib.services.nodemanager_helper_methods.refresh_cached_nodes")
+    @patch("enmutils_int.lib.services.nodemanager_helper_methods.select_all_nodes_from_redis")
+    def test_update_cached_nodes_list__only_refreshes_supplied_nodes(self, mock_select_all, mock_refresh, _):
+        generation = nodemanager_helper_methods.get_cached_nodes_generation()
+        nodemanager_helper_methods.update_cached_nodes_list(node_ids=["node1"])
+        mock_refresh.assert_called_with(["node1"])
+        self.assertFalse(mock_select_all.called)
+        self.assertEqual(generation + 1, nodemanager_helper_methods.get_cached_nodes_generation())
+
+    @patch("enmutils_int.lib.services.nodemanager_helper_methods.persistence.default_db")
+    def test_refresh_cached_nodes__updates_adds_and_removes_nodes(self, mock_default_db):
+        node1, node2, node3 = Mock(node_id="node1"), Mock(node_id="node2"), Mock(node_id="node3")
+        updated_node2, node4 = Mock(node_id="node2"), Mock(node_id="node4")
+        node_pool_mgr.cached_nodes_list = [node1, node2, node3]
+        mock_default_db.return_value.get_keys.return_value = [updated_node2, node4]
+        nodemanager_helper_methods.refresh_cached_nodes(["node2", "node3", "node4"])
+        self.assertEqual([node1, updated_node2, node4], node_pool_mgr.cached_nodes_list)
+
+    @patch("enmutils_int.lib.services.nodemanager_helper_methods.persistence.default_db")
+    def test_refresh_cached_nodes__populates_empty_cache(self, mock_default_db):
+        node1 = Mock(node_id="node1")
+        node_pool_mgr.cached_nodes_list = []
+        mock_default_db.return_value.get_keys.return_value = [node1]
+        nodemanager_helper_methods.refresh_cached_nodes(["node1"])
+        self.assertEqual([node1], node_pool_mgr.cached_nodes_list)
+
+    @patch("enmutils_int.lib.services.nodemanager_helper_methods.mutexer.mutex")
+    @patch("enmutils_int.lib.services.nodemanager_helper_methods.poid_refresh")
+    @patch("enmutils_int.lib.services.nodemanager_helper_methods.update_poid_attribute_on_nodes")
+    def test_update_poid_attributes_on_pool_nodes__only_updates_supplied_nodes(
+            self, mock_update_poid_attribute_on_nodes, mock_poid_refresh, _):
+        node1, node2 = Mock(node_id="node1"), Mock(node_id="node2")
+        node_pool_mgr.cached_nodes_list = [node1, node2]
+        nodemanager_helper_methods.update_poid_attributes_on_pool_nodes(node_ids=["node2"])
+        mock_update_poid_attribute_on_nodes.assert_called_with(mock_poid_refresh.return_value, nodes=[node2])
+
+    @patch("enmutils_int.lib.services.nodemanager_helper_methods.plan_batch_allocation", side_effect=lambda jobs: jobs)
+    @patch("enmutils_int.lib.services.nodemanager_helper_methods.mutexer.mutex")
+    @patch("enmutils_int.lib.services.nodemanager_helper_methods.perform_allocation_tasks",
+           side_effect=[None, NoNodesAvailable("no nodes"), Exception("error")])
+    def test_perform_batch_allocation_tasks__completes_each_job(self, mock_perform_allocation_tasks, mock_mutex, _):
+        jobs = [Mock(profile_name="TEST_0{0}".format(i), nodes=None, profile_values=None, network_config=None)
+                for i in range(3)]
+        nodemanager_helper_methods.perform_batch_allocation_tasks(jobs)
+        self.assertEqual(1, mock_mutex.call_count)
+        self.assertEqual(3, mock_perform_allocation_tasks.call_count)
+        jobs[0].complete.assert_called_with(True)
+        jobs[1].complete.assert_called_with(False, "no nodes")
+        jobs[2].complete.assert_called_with(False, "Could not allocate nodes - error encountered :: error")
+
+    @patch("enmutils_int.lib.services.nodemanager_helper_methods.deallocate_profiles_from_nodes")
+    @patch("enmutils_int.lib.services.nodemanager_helper_methods.allocation_planner.AllocationPlanner")
+    @patch("enmutils_int.lib.services.nodemanager_helper_methods.get_profile_object_from_profile_manager")
+    def test_plan_batch_allocation__plans_all_plannable_jobs_in_one_pass(self, mock_get_profile, mock_planner,
+                                                                         mock_deallocate):
+        profiles = [Mock(NAME="TEST_01"), Mock(NAME="TEST_02"), Mock(NAME="TEST_03")]
+        mock_get_profile.side_effect = profiles
+        mock_planner.can_be_planned.side_effect = lambda profile: profile.NAME != "TEST_03"
+        mock_planner.return_value.shortfalls = {"TEST_02": {"ERBS": 1}}
+        jobs = [Mock(profile_name=profile.NAME, nodes=None, profile_values=None, network_config="soem")
+                for profile in profiles] + [Mock(profile_name="TEST_04", nodes="node1")]
+
+        self.assertEqual(jobs[1:], nodemanager_helper_methods.plan_batch_allocation(jobs))
+        mock_planner.assert_called_once_with(profiles[:2])
+        self.assertEqual(1, mock_planner.return_value.plan.call_count)
+        mock_planner.return_value.commit.assert_called_once_with(record=False)
+        self.assertEqual(["TEST_01", "TEST_02"], sorted(mock_deallocate.call_args[0][1]))
+        jobs[0].complete.assert_called_once_with(True)
+        self.assertFalse(jobs[1].complete.called)
+        mock_get_profile.assert_any_call("TEST_01", profile_values=None, network_config="soem")
+
+    @patch("enmutils_int.lib.services.nodemanager_helper_methods.allocation_planner.AllocationPlanner")
+    @patch("enmutils_int.lib.services.nodemanager_helper_methods.get_profile_object_from_profile_manager",
+           side_effect=Exception("error"))
+    def test_plan_batch_allocation__returns_all_jobs_if_none_can_be_planned(self, _, mock_planner):
+        jobs = [Mock(profile_name="TEST_01", nodes=None, profile_values=None, network_config=None)]
+        self.assertEqual(jobs, nodemanager_helper_methods.plan_batch_allocation(jobs))
+        self.assertFalse(mock_planner.called)
+
+    @patch("enmutils_int.lib.services.nodemanager_helper_methods.node_pool_stats.record_nodes")
+    @patch("enmutils_int.lib.services.nodemanager_helper_methods.node_pool_mgr.update_cached_list_of_nodes")
+    @patch("enmutils_int.lib.services.nodemanager_helper_methods.mutexer.mutex")
+    def test_deallocate_profiles_from_nodes__removes_profiles_in_one_pass(self, _, mock_update_cached_list,
+                                                                          mock_record_nodes):
+        node1, node2 = Mock(node_id="node1", profiles=["TEST_01", "TEST_03"]), Mock(node_id="node2", profiles=[])
+        nodemanager_helper_methods.deallocate_profiles_from_nodes([node1, node2], ["TEST_01", "TEST_02"])
+        self.assertEqual(["TEST_03"], node1.profiles)
+        self.assertFalse(node1._persist.call_args[1]["record_stats"])
+        self.assertFalse(node2._persist.called)
+        mock_record_nodes.assert_called_once_with([node1])
+        mock_update_cached_list.assert_called_once_with({"node1": node1})
+
     @patch("enmutils_int.lib.services.nodemanager_helper_methods.profile_manager.ProfileManager")
     @patch("enmutils_int.lib.services.nodemanager_helper_methods.profile_properties_manager.ProfilePropertiesManager")
     def test_get_profile_object_from_profile_manager__is_successful(
@@ -210,7 +302,7 @@ class NodeManagerHelperMethodsUnitTests(unittest2.TestCase):
         profile_object = Mock()
         mock_profilepropertiesmanager.return_value.get_profile_objects.return_value = [profile_object]
         nodemanager_helper_methods.get_profile_object_from_profile_manager("some_profile")
-        mock_profilepropertiesmanager.assert_called_with(["some_profile"])
+        mock_profilepropertiesmanager.assert_called_with(["some_profile"], network_config=None)
         mock_profilemanager.assert_called_with(profile_object)
 
     @patch("enmutils_int.lib.services.nodemanager_helper_methods.persistence.get")
@@ -224,7 +316,7 @@ class NodeManagerHelperMethodsUnitTests(unittest2.TestCase):
         mock_profilepropertiesmanager.return_value.get_profile_objects.return_value = [profile_object]
         mock_get.return_value = profile_object
         nodemanager_helper_methods.get_profile_object_from_profile_manager("some_profile")
-        mock_profilepropertiesmanager.assert_called_with(["some_profile"])
+        mock_profilepropertiesmanager.assert_called_with(["some_profile"], network_config=None)
         mock_get.assert_called_with("some_profile")
         mock_profilemanager.assert_called_with(profile_object)
 
@@ -240,7 +332,7 @@ class NodeManagerHelperMethodsUnitTests(unittest2.TestCase):
         mock_get.return_value = profile_object
         nodemanager_helper_methods.get_profile_object_from_profile_manager(
             "some_profile", profile_values={'NUM_NODES': {"ERBS": -1}})
-        mock_profilepropertiesmanager.assert_called_with(["some_profile"])
+        mock_profilepropertiesmanager.assert_called_with(["some_profile"], network_config=None)
         self.assertEqual(0, mock_get.call_count)
         mock_profilemanager.assert_called_with(profile_object)
 
@@ -257,7 +349,7 @@ class NodeManagerHelperMethodsUnitTests(unittest2.TestCase):
         mock_get.return_value = profile_object
         nodemanager_helper_methods.get_profile_object_from_profile_manager(
             "some_profile", profile_values={'DEFAULT_NODES': {"ERBS": {"some_node"}}})
-        mock_profilepropertiesmanager.assert_called_with(["some_profile"])
+        mock_profilepropertiesmanager.assert_called_with(["some_profile"], network_config=None)
         self.assertEqual(0, mock_get.call_count)
         mock_profilemanager.assert_called_with(profile_object)
 
@@ -303,7 +395,7 @@ class NodeManagerHelperMethodsUnitTests(unittest2.TestCase):
     @patch("enmutils_int.lib.services.nodemanager_helper_methods.deallocate_profile_from_nodes")
     @patch("enmutils_int.lib.services.nodemanager_helper_methods.get_profile_object_from_profile_manager")
     @patch("enmutils_int.lib.services.nodemanager_helper_methods.node_pool_mgr.allocate_nodes")
-    def test_allocate_nodes__is_successful_if_nodes_not_specified(
+    def test_allocate_nodes__is_successful_if_nodes_not_specified_and_network_config_not_set_globally(
             self, mock_allocate_nodes, mock_get_profile_object_from_profile_manager,
             mock_deallocate_profile_from_nodes, mock_set_prop):
         node1 = Mock()
@@ -312,9 +404,10 @@ class NodeManagerHelperMethodsUnitTests(unittest2.TestCase):
         mock_get_profile_object_from_profile_manager.return_value = profile
         nodemanager_helper_methods.perform_allocation_tasks("PROFILE_01", "", network_config="40k")
         mock_allocate_nodes.assert_called_with(profile, nodes="")
-        mock_get_profile_object_from_profile_manager.assert_called_with("PROFILE_01", profile_values=None)
+        mock_get_profile_object_from_profile_manager.assert_called_with("PROFILE_01", profile_values=None,
+                                                                        network_config="40k")
         mock_deallocate_profile_from_nodes.assert_called_with([node1], "PROFILE_01")
-        self.assertEqual(1, mock_set_prop.call_count)
+        self.assertFalse(mock_set_prop.called)
 
     @patch("enmutils_int.lib.services.nodemanager_helper_methods.deallocate_profile_from_nodes")
     @patch("enmutils_int.lib.services.nodemanager_helper_methods.get_profile_object_from_profile_manager")
@@ -328,7 +421,8 @@ class NodeManagerHelperMethodsUnitTests(unittest2.TestCase):
         mock_get_profile_object_from_profile_manager.return_value = profile
         nodemanager_helper_methods.perform_allocation_tasks("PROFILE_01", "node1,node2")
         mock_allocate_nodes.assert_called_with(profile, nodes=[node1, node2])
-        mock_get_profile_object_from_profile_manager.assert_called_with("PROFILE_01", profile_values=None)
+        mock_get_profile_object_from_profile_manager.assert_called_with("PROFILE_01", profile_values=None,
+                                                                        network_config=None)
         mock_deallocate_profile_from_nodes.assert_called_with([node1, node2, node3], "PROFILE_01")
 
     @patch("enmutils_int.lib.services.nodemanager_helper_methods.get_profile_object_from_profile_manager")
@@ -463,6 +557,27 @@ class NodeManagerHelperMethodsUnitTests(unittest2.TestCase):
         self.assertEqual(3, mock_persist_dict.call_count)
         self.assertEqual(2, mock_get.call_count)
 
+    @patch('enmutils_int.lib.services.nodemanager_helper_methods.sync_state_cache.get_max_age', return_value=600)
+    @patch('enmutils_int.lib.services.nodemanager_helper_methods.sync_state_cache.get_sync_states')
+    def test_refresh_network_sync_states__refreshes_states_older_than_half_max_age(self, mock_get_sync_states, _):
+        nodemanager_helper_methods.refresh_network_sync_states()
+        mock_get_sync_states.assert_called_with(max_age=300)
+
+    @patch('enmutils_int.lib.services.nodemanager_helper_methods.log.logger.debug')
+    @patch('enmutils_int.lib.services.nodemanager_helper_methods.sync_state_cache.get_sync_states',
+           side_effect=Exception("Error"))
+    def test_refresh_network_sync_states__logs_exception(self, _, mock_debug):
+        nodemanager_helper_methods.refresh_network_sync_states()
+        self.assertTrue(mock_debug.called)
+
+    @patch('enmutils_int.lib.services.nodemanager_helper_methods.sync_state_cache.get_sync_states',
+           return_value={"Node1": "SYNCHRONIZED", "Node2": "UNSYNCHRONIZED"})
+    def test_get_sync_states__returns_states_of_requested_nodes(self, mock_get_sync_states):
+        self.assertEqual({"Node2": "UNSYNCHRONIZED"},
+                         nodemanager_helper_methods.get_sync_states(node_ids=["Node2", "Node3"], max_age=60))
+        mock_get_sync_states.assert_called_with(max_age=60)
+        self.assertEqual(2, len(nodemanager_helper_methods.get_sync_states()))
+
 
 if __name__ == '__main__':
     unittest2.main(verbosity=2)
@@ -63,25 +63,22 @@ class ParameterManagementUnitTests(unittest2.TestCase):
         delete_parameter_set(self.mock_user, parameter_set_ids=['1'])
         self.assertTrue(self.mock_user.delete_request.return_value.raise_for_status.called)
 
-    @patch("enmutils_int.lib.parameter_management.chunks")
-    @patch("enmutils_int.lib.parameter_management.get_pos_by_poids")
-    def test_get_fdns_from_poids_success(self, mock_get_pos, mock_chunks):
+    @patch("enmutils_int.lib.parameter_management.get_po_attribute_fetcher")
+    def test_get_fdns_from_poids_success(self, mock_get_fetcher):
         search = {"objects": [{"id": 7584573434}]}
         mock_user = Mock()
-        mock_chunks.return_value = [1, 2, 3]
-        get_fdns_from_poids(mock_user, search, Mock(), Mock())
-
-        self.assertTrue(mock_chunks.called)
-        self.assertTrue(mock_get_pos.called)
+        mock_get_fetcher.return_value.fetch.return_value = [{"fdn": "NetworkElement=1", "poId": 7584573434}]
+        self.assertEqual(["NetworkElement=1"], get_fdns_from_poids(mock_user, search, "NetworkElement", "neType"))
+        mock_get_fetcher.assert_called_with(mock_user)
+        mock_get_fetcher.return_value.fetch.assert_called_with(
+            [7584573434], [{"moType": "NetworkElement", "attributeNames": ["neType"]}])
 
     @patch("time.sleep")
-    @patch("enmutils_int.lib.parameter_management.chunks")
-    @patch("enmutils_int.lib.parameter_management.get_pos_by_poids")
-    def test_get_fdns_from_poids_retries_and_throws_http_error(self, mock_get_pos, mock_chunks, *_):
+    @patch("enmutils_int.lib.parameter_management.get_po_attribute_fetcher")
+    def test_get_fdns_from_poids_retries_and_throws_http_error(self, mock_get_fetcher, *_):
         search = {"objects": [{"id": 7584573434}]}
         mock_user = Mock()
-        mock_get_pos.side_effect = [HTTPError(), HTTPError(), HTTPError()]
-        mock_chunks.return_value = [1, 2, 3]
+        mock_get_fetcher.return_value.fetch.side_effect = [HTTPError(), HTTPError(), HTTPError()]
 
         self.assertRaises(HTTPError, get_fdns_from_poids, mock_user, search, Mock(), Mock())
 
@@ -771,12 +771,13 @@ class SubscriptionUnitTests(PmSubscriptionsUnitTests):
         self.stats_sub.NODE_COUNT_THRESHOLD_FOR_SCANNER_POLL_FEATURE = 10
         self.assertFalse(self.stats_sub.check_number_of_scanners_tied_to_subscription_on_enm_exceeds_threshold())
 
+    @patch("enmutils_int.lib.pm_rest_nbi_subscriptions.pm_scanner_poller.deregister_subscription")
     @patch('enmutils_int.lib.pm_rest_nbi_subscriptions.log.logger.debug')
     @patch("enmutils_int.lib.pm_rest_nbi_subscriptions.Subscription."
            "get_number_of_nodes_attached_to_subscription_on_enm", return_value=10000)
     @patch("enmutils_int.lib.pm_rest_nbi_subscriptions.Subscription.check_if_scanner_polling_complete",
            side_effect=[False, False, True])
-    @patch("enmutils_int.lib.pm_rest_nbi_subscriptions.Subscription._get_number_of_active_scanners",
+    @patch("enmutils_int.lib.pm_rest_nbi_subscriptions.Subscription._get_polled_number_of_active_scanners",
            side_effect=[7000, 8000, 9100])
     @patch("enmutils_int.lib.pm_rest_nbi_subscriptions.time.sleep", return_value=0)
     @patch("enmutils_int.lib.pm_rest_nbi_subscriptions.datetime.timedelta")
@@ -802,10 +803,11 @@ class SubscriptionUnitTests(PmSubscriptionsUnitTests):
         self.assertTrue(call("activation", 8000, 0) in mock_check_if_scanner_polling_complete.mock_calls)
         self.assertTrue(call("activation", 9100, 0) in mock_check_if_scanner_polling_complete.mock_calls)
 
+    @patch("enmutils_int.lib.pm_rest_nbi_subscriptions.pm_scanner_poller.deregister_subscription")
     @patch('enmutils_int.lib.pm_rest_nbi_subscriptions.log.logger.debug')
     @patch("enmutils_int.lib.pm_rest_nbi_subscriptions.Subscription.check_if_scanner_polling_complete",
            return_value=False)
-    @patch("enmutils_int.lib.pm_rest_nbi_subscriptions.Subscription._get_number_of_active_scanners",
+    @patch("enmutils_int.lib.pm_rest_nbi_subscriptions.Subscription._get_polled_number_of_active_scanners",
            return_value=7000)
     @patch("enmutils_int.lib.pm_rest_nbi_subscriptions.time.sleep", return_value=0)
     @patch("enmutils_int.lib.pm_rest_nbi_subscriptions.datetime.timedelta")
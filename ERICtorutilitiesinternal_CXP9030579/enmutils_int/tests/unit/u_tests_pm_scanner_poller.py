@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+import unittest2
+from mock import patch, Mock
+
+from enmutils.lib import persistence
+from enmutils_int.lib import pm_scanner_poller
+from testslib import unit_test_utils
+
+SCANNER_COUNTS = {"123": 2, "456": 1, "789": 1}
+
+
+def enm_execute(command):
+    response = Mock()
+    subscription_id = command.split("subscriptionId==")[1].split(",")[0]
+    response.get_output.return_value = ["", "PMICScannerInfo {0} instance(s)".format(
+        SCANNER_COUNTS.get(subscription_id, 0))]
+    return response
+
+
+class PmScannerPollerUnitTests(unittest2.TestCase):
+
+    def setUp(self):
+        unit_test_utils.setup()
+        self.user = Mock()
+        self.user.enm_execute.side_effect = enm_execute
+
+    def tearDown(self):
+        unit_test_utils.tear_down()
+
+    def test_register_subscription__adds_subscription_until_deregistered(self):
+        pm_scanner_poller.register_subscription(123)
+        pm_scanner_poller.register_subscription("456")
+        self.assertEqual(["123", "456"], pm_scanner_poller.get_registered_subscriptions())
+        pm_scanner_poller.deregister_subscription(123)
+        pm_scanner_poller.deregister_subscription(789)
+        self.assertEqual(["456"], pm_scanner_poller.get_registered_subscriptions())
+
+    @patch("enmutils_int.lib.pm_scanner_poller.time.time")
+    def test_get_registered_subscriptions__excludes_expired_registrations(self, mock_time):
+        mock_time.return_value = 1000
+        pm_scanner_poller.register_subscription("123")
+        mock_time.return_value = 1000 + pm_scanner_poller.REGISTRATION_EXPIRY_SECS + 1
+        self.assertEqual([], pm_scanner_poller.get_registered_subscriptions())
+
+    def test_query_active_scanner_counts__counts_scanners_of_each_subscription_with_filtered_count(self):
+        self.assertEqual({"123": 2, "456": 1, "999": 0},
+                         pm_scanner_poller._query_active_scanner_counts(self.user, ["123", "456", "999"]))
+        self.assertEqual([pm_scanner_poller.COUNT_SUBSCRIPTION_SCANNERS_CMD.format(subscription_id)
+                          for subscription_id in ["123", "456", "999"]],
+                         [call[0][0] for call in self.user.enm_execute.call_args_list])
+
+    def test_query_active_scanner_counts__counts_zero_if_no_count_in_output(self):
+        self.user.enm_execute.side_effect = None
+        self.user.enm_execute.return_value.get_output.return_value = ["Error 1234"]
+        self.assertEqual({"123": 0}, pm_scanner_poller._query_active_scanner_counts(self.user, ["123"]))
+
+    def test_query_active_scanner_counts__excludes_subscriptions_which_fail_to_be_counted(self):
+        self.user.enm_execute.side_effect = [Exception("Error"), enm_execute(
+            pm_scanner_poller.COUNT_SUBSCRIPTION_SCANNERS_CMD.format("456"))]
+        self.assertEqual({"456": 1}, pm_scanner_poller._query_active_scanner_counts(self.user, ["123", "456"]))
+
+    def test_poll_active_scanner_counts__stores_counts_of_registered_subscriptions(self):
+        self.assertEqual({}, pm_scanner_poller.poll_active_scanner_counts(self.user))
+        self.assertFalse(self.user.enm_execute.called)
+        pm_scanner_poller.register_subscription("123")
+        pm_scanner_poller.register_subscription("789")
+        self.assertEqual({"123": 2, "789": 1}, pm_scanner_poller.poll_active_scanner_counts(self.user))
+        self.assertEqual({"123": 2, "789": 1}, {subscription_id: polled_count["count"] for subscription_id, polled_count
+                                                in persistence.get(pm_scanner_poller.ACTIVE_SCANNER_COUNTS_KEY).items()})
+
+    @patch("enmutils_int.lib.pm_scanner_poller.time.time")
+    def test_poll_active_scanner_counts__only_queries_subscriptions_with_out_of_date_counts(self, mock_time):
+        mock_time.return_value = 1000
+        pm_scanner_poller.register_subscription("123")
+        pm_scanner_poller.poll_active_scanner_counts(self.user)
+        mock_time.return_value = 1030
+        pm_scanner_poller.register_subscription("456")
+        pm_scanner_poller.register_subscription("789")
+        self.user.enm_execute.reset_mock()
+
+        self.assertEqual({"123": 2, "456": 1, "789": 1},
+                         pm_scanner_poller.poll_active_scanner_counts(self.user, max_age=60))
+        self.assertEqual([pm_scanner_poller.COUNT_SUBSCRIPTION_SCANNERS_CMD.format(subscription_id)
+                          for subscription_id in ["456", "789"]],
+                         [call[0][0] for call in self.user.enm_execute.call_args_list])
+        self.assertEqual(1000, persistence.get(pm_scanner_poller.ACTIVE_SCANNER_COUNTS_KEY)["123"]["timestamp"])
+
+    def test_get_active_scanner_count__polls_once_per_interval_for_all_waiting_subscriptions(self):
+        pm_scanner_poller.register_subscription("456")
+        self.assertEqual(2, pm_scanner_poller.get_active_scanner_count("123", self.user))
+        self.assertEqual(1, pm_scanner_poller.get_active_scanner_count("456", Mock()))
+        self.assertEqual(2, self.user.enm_execute.call_count)
+
+    @patch("enmutils_int.lib.pm_scanner_poller.time.time")
+    def test_get_active_scanner_count__polls_again_when_counts_are_older_than_max_age(self, mock_time):
+        mock_time.return_value = 1000
+        pm_scanner_poller.register_subscription("456")
+        pm_scanner_poller.get_active_scanner_count("123", self.user, max_age=60)
+        mock_time.return_value = 1061
+        pm_scanner_poller.get_active_scanner_count("123", self.user, max_age=60)
+        self.assertEqual(4, self.user.enm_execute.call_count)
+
+    @patch("enmutils_int.lib.pm_scanner_poller.time.time")
+    def test_get_active_scanner_count__only_polls_missing_subscription_when_others_are_up_to_date(self, mock_time):
+        mock_time.return_value = 1000
+        pm_scanner_poller.register_subscription("456")
+        pm_scanner_poller.get_active_scanner_count("123", self.user, max_age=60)
+        mock_time.return_value = 1010
+        self.user.enm_execute.reset_mock()
+
+        self.assertEqual(1, pm_scanner_poller.get_active_scanner_count("789", self.user, max_age=60))
+        self.assertEqual([pm_scanner_poller.COUNT_SUBSCRIPTION_SCANNERS_CMD.format("789")],
+                         [call[0][0] for call in self.user.enm_execute.call_args_list])
+
+    def test_get_active_scanner_count__returns_zero_if_poll_fails(self):
+        self.user.enm_execute.side_effect = Exception("Error")
+        self.assertEqual(0, pm_scanner_poller.get_active_scanner_count("123", self.user))
+
+
+if __name__ == "__main__":
+    unittest2.main(verbosity=2)
@@ -768,12 +768,13 @@ class SubscriptionUnitTests(PmSubscriptionsUnitTests):
         self.stats_sub.NODE_COUNT_THRESHOLD_FOR_SCANNER_POLL_FEATURE = 10
         self.assertFalse(self.stats_sub.check_number_of_scanners_tied_to_subscription_on_enm_exceeds_threshold())
 
+    @patch("enmutils_int.lib.pm_subscriptions.pm_scanner_poller.deregister_subscription")
     @patch('enmutils_int.lib.pm_subscriptions.log.logger.debug')
     @patch("enmutils_int.lib.pm_subscriptions.Subscription.get_number_of_nodes_attached_to_subscription_on_enm",
            return_value=10000)
     @patch("enmutils_int.lib.pm_subscriptions.Subscription.check_if_scanner_polling_complete",
            side_effect=[False, False, True])
-    @patch("enmutils_int.lib.pm_subscriptions.Subscription._get_number_of_active_scanners",
+    @patch("enmutils_int.lib.pm_subscriptions.Subscription._get_polled_number_of_active_scanners",
            side_effect=[7000, 8000, 9100])
     @patch("enmutils_int.lib.pm_subscriptions.time.sleep", return_value=0)
     @patch("enmutils_int.lib.pm_subscriptions.datetime.timedelta")
@@ -799,9 +800,10 @@ class SubscriptionUnitTests(PmSubscriptionsUnitTests):
         self.assertTrue(call("activation", 8000, 0) in mock_check_if_scanner_polling_complete.mock_calls)
         self.assertTrue(call("activation", 9100, 0) in mock_check_if_scanner_polling_complete.mock_calls)
 
+    @patch("enmutils_int.lib.pm_subscriptions.pm_scanner_poller.deregister_subscription")
     @patch('enmutils_int.lib.pm_subscriptions.log.logger.debug')
     @patch("enmutils_int.lib.pm_subscriptions.Subscription.check_if_scanner_polling_complete", return_value=False)
-    @patch("enmutils_int.lib.pm_subscriptions.Subscription._get_number_of_active_scanners", return_value=7000)
+    @patch("enmutils_int.lib.pm_subscriptions.Subscription._get_polled_number_of_active_scanners", return_value=7000)
     @patch("enmutils_int.lib.pm_subscriptions.time.sleep", return_value=0)
     @patch("enmutils_int.lib.pm_subscriptions.datetime.timedelta")
     @patch("enmutils_int.lib.pm_subscriptions.datetime.datetime")
@@ -923,6 +925,21 @@ class SubscriptionUnitTests(PmSubscriptionsUnitTests):
         self.assertEqual(1, mock_get_active_scanners_based_on_node_type.call_count)
         self.assertEqual(mock_debug_log.call_count, 1)
 
+    # _get_polled_number_of_active_scanners test cases
+    @patch("enmutils_int.lib.pm_subscriptions.pm_scanner_poller.get_active_scanner_count", return_value=5)
+    def test_get_polled_number_of_active_scanners__uses_central_poller(self, mock_get_active_scanner_count):
+        self.stats_sub.node_types = ["ERBS"]
+        self.stats_sub.id = "123"
+        self.assertEqual(5, self.stats_sub._get_polled_number_of_active_scanners())
+        mock_get_active_scanner_count.assert_called_with(
+            "123", self.stats_sub.user, max_age=self.stats_sub.SLEEP_SECONDS_BETWEEN_CHECKING_SCANNERS)
+
+    @patch("enmutils_int.lib.pm_subscriptions.pm_scanner_poller.get_active_scanner_count")
+    def test_get_polled_number_of_active_scanners__returns_zero_if_no_node_types(self, mock_get_active_scanner_count):
+        self.stats_sub.node_types = []
+        self.assertEqual(0, self.stats_sub._get_polled_number_of_active_scanners())
+        self.assertFalse(mock_get_active_scanner_count.called)
+
     @patch("enmutils_int.lib.pm_subscriptions.Subscription.__init__", return_value=None)
     @patch("enmutils_int.lib.pm_subscriptions.Subscription._is_scanner_poll_required", return_value=True)
     @patch("enmutils_int.lib.pm_subscriptions.Subscription._activate")
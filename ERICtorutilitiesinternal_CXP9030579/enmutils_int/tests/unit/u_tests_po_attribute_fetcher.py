@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+import unittest2
+from mock import patch, Mock
+from requests.exceptions import HTTPError
+
+from enmutils.lib.exceptions import EnmApplicationError
+from enmutils_int.lib import po_attribute_fetcher
+from enmutils_int.lib.po_attribute_fetcher import PoAttributeFetcher, get_po_attribute_fetcher
+from testslib import unit_test_utils
+
+ATTRIBUTE_MAPPINGS = [{"moType": "NetworkElement", "attributeNames": ["neType"]}]
+
+
+def get_response(poids, ok=True, status_code=200):
+    response = Mock(ok=ok, status_code=status_code)
+    response.json.return_value = [{"poId": str(poid), "attributeMap": {"neType": "RadioNode"}} for poid in poids]
+    if not ok:
+        response.raise_for_status.side_effect = HTTPError("Error", response=response)
+    return response
+
+
+def post_side_effect(*_, **kwargs):
+    return get_response(kwargs["json"]["poList"])
+
+
+class PoAttributeFetcherUnitTests(unittest2.TestCase):
+
+    def setUp(self):
+        unit_test_utils.setup()
+        self.user = Mock(username="user_1")
+        self.user.post.side_effect = post_side_effect
+        self.fetcher = PoAttributeFetcher(self.user)
+
+    def tearDown(self):
+        po_attribute_fetcher.FETCHERS.clear()
+        unit_test_utils.tear_down()
+
+    def test_fetch__requests_poids_in_batches_and_returns_all_objects(self):
+        pos = self.fetcher.fetch(range(600), ATTRIBUTE_MAPPINGS, default_mappings=["syncStatus"])
+        self.assertEqual([str(poid) for poid in range(600)], [po["poId"] for po in pos])
+        self.assertEqual(3, self.user.post.call_count)
+        payload = self.user.post.call_args[1]["json"]
+        self.assertEqual(["syncStatus"], payload["defaultMappings"])
+        self.assertEqual(ATTRIBUTE_MAPPINGS, payload["attributeMappings"])
+
+    def test_fetch__uses_cached_objects_for_same_attribute_set(self):
+        self.fetcher.fetch([1, 2], ATTRIBUTE_MAPPINGS)
+        pos = self.fetcher.fetch([2, 3], ATTRIBUTE_MAPPINGS)
+        self.assertEqual(["2", "3"], sorted(po["poId"] for po in pos))
+        self.assertEqual([3], self.user.post.call_args[1]["json"]["poList"])
+        self.fetcher.fetch([1, 2, 3], [{"moType": "NetworkElement", "attributeNames": ["platformType"]}])
+        self.assertEqual(3, self.user.post.call_count)
+        self.assertEqual({"requests_made": 3, "cache_hits": 1, "cached_objects": 6, "batch_size": 250},
+                         self.fetcher.get_stats())
+
+    @patch("enmutils_int.lib.po_attribute_fetcher.time.time")
+    def test_fetch__requests_objects_again_once_cache_has_expired(self, mock_time):
+        mock_time.return_value = 1000
+        self.fetcher.fetch([1], ATTRIBUTE_MAPPINGS)
+        mock_time.return_value = 1000 + po_attribute_fetcher.CACHE_TTL_SECS + 1
+        self.fetcher.fetch([1], ATTRIBUTE_MAPPINGS)
+        self.assertEqual(2, self.user.post.call_count)
+
+    def test_fetch__evicts_least_recently_used_objects_once_cache_is_full(self):
+        fetcher = PoAttributeFetcher(self.user, max_cached_pos=2)
+        fetcher.fetch([1, 2], ATTRIBUTE_MAPPINGS)
+        fetcher.fetch([1], ATTRIBUTE_MAPPINGS)
+        fetcher.fetch([3], ATTRIBUTE_MAPPINGS)
+        self.assertEqual(["1", "3"], [key[0] for key in fetcher.cache])
+        fetcher.fetch([1, 2], ATTRIBUTE_MAPPINGS)
+        self.assertEqual([2], self.user.post.call_args[1]["json"]["poList"])
+
+    @patch("enmutils_int.lib.po_attribute_fetcher.time.time")
+    def test_fetch__evicts_expired_objects_when_caching_new_objects(self, mock_time):
+        mock_time.return_value = 1000
+        self.fetcher.fetch([1], ATTRIBUTE_MAPPINGS)
+        mock_time.return_value = 1000 + po_attribute_fetcher.CACHE_TTL_SECS + 1
+        self.fetcher.fetch([2], ATTRIBUTE_MAPPINGS)
+        self.assertEqual(1, self.fetcher.get_stats()["cached_objects"])
+
+    def test_fetch__returns_copies_of_cached_objects(self):
+        self.fetcher.fetch([1], ATTRIBUTE_MAPPINGS)[0]["attributeMap"]["neType"] = "ERBS"
+        self.assertEqual("RadioNode", self.fetcher.fetch([1], ATTRIBUTE_MAPPINGS)[0]["attributeMap"]["neType"])
+
+    def test_fetch__splits_failed_batch_and_reduces_batch_size(self):
+        def fail_large_batches(*_, **kwargs):
+            poids = kwargs["json"]["poList"]
+            return get_response(poids, ok=len(poids) <= 125, status_code=504)
+        self.user.post.side_effect = fail_large_batches
+        pos = self.fetcher.fetch(range(250), ATTRIBUTE_MAPPINGS)
+        self.assertEqual(250, len(pos))
+        self.assertEqual(3, self.user.post.call_count)
+        self.assertEqual(250, self.fetcher.batch_size)
+        self.user.post.side_effect = lambda *_, **kwargs: get_response(kwargs["json"]["poList"], ok=False,
+                                                                       status_code=504)
+        self.assertRaises(HTTPError, self.fetcher.fetch, range(300, 400), ATTRIBUTE_MAPPINGS)
+        self.assertEqual(po_attribute_fetcher.MIN_BATCH_SIZE, self.fetcher.batch_size)
+
+    def test_fetch__does_not_retry_client_errors(self):
+        self.user.post.side_effect = lambda *_, **kwargs: get_response(kwargs["json"]["poList"], ok=False,
+                                                                       status_code=404)
+        self.assertRaises(HTTPError, self.fetcher.fetch, range(250), ATTRIBUTE_MAPPINGS)
+        self.assertEqual(1, self.user.post.call_count)
+
+    def test_fetch__raises_exception_if_any_concurrent_batch_fails(self):
+        self.user.post.side_effect = lambda *_, **kwargs: get_response(kwargs["json"]["poList"], ok=False,
+                                                                       status_code=404)
+        self.assertRaises(HTTPError, self.fetcher.fetch, range(600), ATTRIBUTE_MAPPINGS)
+
+    @patch("enmutils_int.lib.po_attribute_fetcher.ThreadQueue")
+    def test_fetch__raises_enm_application_error_if_exception_not_recorded(self, mock_thread_queue):
+        mock_thread_queue.return_value.work_entries = [Mock(exception_raised=True, exception=None)]
+        self.assertRaises(EnmApplicationError, self.fetcher.fetch, range(600), ATTRIBUTE_MAPPINGS)
+
+    def test_adapt_batch_size__reduces_size_after_slow_batch_and_grows_after_fast_batches(self):
+        self.fetcher._adapt_batch_size([(250, 1), (250, po_attribute_fetcher.SLOW_BATCH_RESPONSE_SECS + 1)])
+        self.assertEqual(125, self.fetcher.batch_size)
+        self.fetcher._adapt_batch_size([(125, 1)])
+        self.assertEqual(250, self.fetcher.batch_size)
+
+    def test_clear_cache__removes_cached_objects(self):
+        self.fetcher.fetch([1], ATTRIBUTE_MAPPINGS)
+        self.fetcher.clear_cache()
+        self.fetcher.fetch([1], ATTRIBUTE_MAPPINGS)
+        self.assertEqual(2, self.user.post.call_count)
+
+    def test_get_po_attribute_fetcher__returns_shared_fetcher_of_user_and_headers(self):
+        fetcher = get_po_attribute_fetcher(self.user)
+        self.assertIs(fetcher, get_po_attribute_fetcher(self.user))
+        self.assertIsNot(fetcher, get_po_attribute_fetcher(self.user, headers={"X-Custom": "1"}))
+        self.assertIsNot(fetcher, get_po_attribute_fetcher(Mock(username="user_1")))
+
+    @patch("enmutils_int.lib.po_attribute_fetcher.MAX_FETCHERS", 2)
+    def test_get_po_attribute_fetcher__drops_least_recently_used_fetcher(self):
+        users = [Mock(username="user_{0}".format(index)) for index in range(3)]
+        fetcher = get_po_attribute_fetcher(users[0])
+        get_po_attribute_fetcher(users[1])
+        get_po_attribute_fetcher(users[0])
+        get_po_attribute_fetcher(users[2])
+        self.assertEqual(["user_0", "user_2"], [key[0] for key in po_attribute_fetcher.FETCHERS])
+        self.assertIs(fetcher, get_po_attribute_fetcher(users[0]))
+
+
+if __name__ == "__main__":
+    unittest2.main(verbosity=2)
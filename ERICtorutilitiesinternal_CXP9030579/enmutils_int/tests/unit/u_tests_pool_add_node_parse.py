@@ -1,4 +1,5 @@
 #!/usr/bin/env python
+import tempfile
 
 import unittest2
 from mock import patch, mock_open
@@ -6,7 +7,8 @@ from mock import patch, mock_open
 from enmutils_int.lib.node_parse import (set_nodes_ranges, verify_nodes_on_enm, EnmApplicationError,
                                          parse_command_result_for_ne_values, update_row_with_enm_values,
                                          get_node_data_from_xml, get_node_data, update_row_values,
-                                         get_node_names_from_xml)
+                                         get_node_names_from_xml, get_node_data_in_chunks, get_enm_values,
+                                         get_node_data_from_xml_in_chunks)
 from testslib import unit_test_utils
 
 CMD_RESPONSE = ['FDN : NetworkElement=netsim_LTE08ERBS00011',
@@ -159,6 +161,47 @@ class NodeParseUnitTests(unittest2.TestCase):
     def test_get_node_name_from_xml__raises_runtime_error_if_file_does_not_exist(self, _):
         self.assertRaises(RuntimeError, get_node_names_from_xml, "some_file")
 
+    @patch('enmutils_int.lib.node_parse.filesystem.does_file_exist', return_value=True)
+    def test_get_node_data_from_xml_in_chunks__reads_range_in_chunks_skipping_processed_rows(self, _):
+        header = "node_name,node_ip,mim_version,oss_model_identity,subnetwork,normal_user,normal_password," \
+                 "secure_user,secure_password\n"
+        rows = ["Node{0},ip,17A,-,NetW,dXNlcg==,cGFzcw==,dXNlcg==,cGFzcw==\n".format(_) for _ in range(10)]
+        with tempfile.NamedTemporaryFile() as node_file:
+            node_file.write(header + "".join(rows))
+            node_file.flush()
+            chunks = [chunk for chunk in get_node_data_from_xml_in_chunks(node_file.name, 2, 9, chunk_size=3, skip=1)]
+        self.assertEqual([["Node2", "Node3", "Node4"], ["Node5", "Node6", "Node7"], ["Node8"]],
+                         [[row["node_id"] for row in chunk] for chunk in chunks])
+        self.assertEqual("user", chunks[0][0]["normal_user"])
+
+    @patch('enmutils_int.lib.node_parse.filesystem.does_file_exist', return_value=False)
+    def test_get_node_data_from_xml_in_chunks__raises_runtime_error_if_file_does_not_exist(self, _):
+        self.assertRaises(RuntimeError, next, get_node_data_from_xml_in_chunks("some_file"))
+
+    @patch('enmutils_int.lib.node_parse.update_row_with_enm_values', side_effect=lambda node_ids: {
+        node_id: {} for node_id in node_ids})
+    def test_get_enm_values__queries_chunks_concurrently(self, mock_enm_values):
+        node_ids = ["Node{0}".format(_) for _ in range(400)]
+        self.assertEqual(set(node_ids), set(get_enm_values(node_ids).keys()))
+        self.assertEqual(3, mock_enm_values.call_count)
+
+    @patch('enmutils_int.lib.node_parse.update_row_with_enm_values', return_value=None)
+    def test_get_enm_values__returns_empty_dict_if_enm_query_fails(self, _):
+        self.assertEqual({}, get_enm_values(["Node1"]))
+        self.assertEqual({}, get_enm_values([]))
+
+    @patch('enmutils_int.lib.node_parse.get_enm_values', side_effect=lambda node_ids: {
+        node_id: {"primary_type": "ERBS"} for node_id in node_ids})
+    @patch('enmutils_int.lib.node_parse.get_node_data_from_xml_in_chunks')
+    @patch('enmutils_int.lib.node_parse.get_nodes_on_enm', return_value={"Node1", "Node3"})
+    def test_get_node_data_in_chunks__validates_each_chunk_against_enm(self, mock_nodes_on_enm, mock_chunks, _):
+        mock_chunks.return_value = iter([[{"node_id": "Node1"}, {"node_id": "Node2"}], [{"node_id": "Node3"}]])
+        chunks = [chunk for chunk in get_node_data_in_chunks("some_file", skip=5)]
+        self.assertEqual([([{"node_id": "Node1", "primary_type": "ERBS"}], ["Node2"], 2),
+                          ([{"node_id": "Node3", "primary_type": "ERBS"}], [], 1)], chunks)
+        self.assertEqual(1, mock_nodes_on_enm.call_count)
+        mock_chunks.assert_called_once_with("some_file", None, None, 1000, 5)
+
 
 if __name__ == "__main__":
     unittest2.main(verbosity=2)
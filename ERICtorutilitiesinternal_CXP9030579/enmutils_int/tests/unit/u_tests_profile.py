@@ -165,6 +165,14 @@ class ProfileUnitTests(ParameterizedTestCase):
         self.base_profile.sleep()
         self.assertTrue("Every {}".format(time_string))
 
+    @patch('enmutils_int.lib.profile.Profile._log_when_sleeping_for_gt_four_hours')
+    @patch('enmutils_int.lib.profile.Profile._reserve_iteration', return_value=6)
+    def test_sleep__sleeps_for_stagger_of_iteration(self, mock_reserve, mock_sleep):
+        self.base_profile.SCHEDULE_SLEEP = 1800
+        self.base_profile.sleep()
+        self.assertAlmostEqual(1806, mock_sleep.call_args[0][0], delta=2)
+        self.assertEqual(1, mock_reserve.call_count)
+
     @patch("enmutils_int.lib.profile.Profile.check_if_error_limit_reached", return_value=False)
     @patch('enmutils_int.lib.profile.Profile._persist_error_or_warning_as_string')
     def test_add_errors_adds_correct_error_information_to_errors_property(self, mock_persist_error, _):
@@ -927,6 +935,28 @@ class ProfileUnitTests(ParameterizedTestCase):
         profile.calculate_time_to_wait_until_next_iteration(current_time_in_secs_since_epoch, delay_secs=30 * 60)
         self.assertEqual(profile._sleep_time, 35 * 60)
 
+    @patch("enmutils_int.lib.profile.Profile.update_recent_scheduled_times_for_dst")
+    @patch('enmutils_int.lib.profile.Profile.calculate_dst_adjusted_diff_between_timestamps')
+    @patch('enmutils_int.lib.profile.iteration_scheduler.reserve')
+    def test_calculate_time_to_wait_until_next_iteration__does_not_stagger_scheduled_iteration(
+            self, mock_reserve, mock_calculate_diff, _):
+        profile = self.base_profile
+        profile.SCHEDULED_TIMES = [datetime(2019, 10, 27, 2, 0)]
+        mock_calculate_diff.return_value = (5 * 60, 0, profile.SCHEDULED_TIMES[0])
+        profile.calculate_time_to_wait_until_next_iteration(1000)
+        self.assertEqual(5 * 60, profile._sleep_time)
+        self.assertFalse(mock_reserve.called)
+
+    @patch('enmutils_int.lib.profile.iteration_scheduler.reserve', return_value=4)
+    def test_reserve_iteration__reserves_iteration_with_jitter_of_profile(self, mock_reserve):
+        self.base_profile.ITERATION_JITTER_SECS = 10
+        self.assertEqual(4, self.base_profile._reserve_iteration(1000))
+        mock_reserve.assert_called_once_with(self.base_profile.NAME, 1000, max_jitter_secs=10)
+
+    @patch('enmutils_int.lib.profile.iteration_scheduler.reserve', side_effect=Exception("Error"))
+    def test_reserve_iteration__returns_no_stagger_if_calendar_unavailable(self, _):
+        self.assertEqual(0, self.base_profile._reserve_iteration(1000))
+
     @patch("enmutils_int.lib.profile.Profile.update_recent_scheduled_times_for_dst")
     @patch('enmutils_int.lib.profile.Profile.calculate_dst_adjusted_diff_between_timestamps')
     def test_calculate_time_to_wait_until_next_iteration__is_ok_if_dst_deactivation_has_happened(
@@ -1013,10 +1043,21 @@ class ProfileUnitTests(ParameterizedTestCase):
     @patch('enmutils_int.lib.profile.persistence.has_key', return_value=True)
     @patch('enmutils_int.lib.profile.sys.getsizeof')
     @patch('enmutils_int.lib.profile.pickle.dumps')
-    @patch('enmutils_int.lib.profile.persistence.set', side_effect=ConnectionError("Error"))
+    @patch('enmutils_int.lib.profile.persistence.Batch.flush', side_effect=ConnectionError("Error"))
     def test_persist__raises_generator_exit(self, *_):
         self.assertRaises(GeneratorExit, self.base_profile.persist)
 
+    @patch('enmutils_int.lib.profile.Profile.check_profile_memory_usage')
+    @patch('enmutils_int.lib.profile.persistence.Batch.flush', autospec=True)
+    def test_persist__queues_profile_status_and_diff_objects_in_single_batch(self, mock_flush, _):
+        persistence.set(self.base_profile.NAME, "profile", 10)
+        self.base_profile.persist()
+
+        self.assertEqual(1, mock_flush.call_count)
+        batch = mock_flush.call_args[0][0]
+        self.assertEqual([self.base_profile.NAME, "{0}-status".format(self.base_profile.NAME),
+                          "{0}-diff".format(self.base_profile.NAME)], [args[0] for _, _, args, _ in batch.commands])
+
     @patch('enmutils_int.lib.profile.Profile.set_diff_object')
     @patch('enmutils_int.lib.profile.Profile.set_status_object')
     @patch("enmutils_int.lib.profile.sys.getsizeof")
@@ -1050,6 +1091,15 @@ class ProfileUnitTests(ParameterizedTestCase):
         mock_log_current_memory_usage.return_value = (self.base_profile.DEFAULT_MAX_RSS_MEMORY_MB + 1) * 1024
         self.assertRaises(GeneratorExit, self.base_profile.check_profile_memory_usage)
 
+    @patch("enmutils_int.lib.profile.process.get_profile_daemon_pid", return_value=["9999"])
+    @patch("enmutils_int.lib.profile.process.get_current_rss_memory_for_current_process")
+    def test_check_profile_memory_usage__does_not_check_memory_of_profile_host_shared_by_hosted_profile(
+            self, mock_log_current_memory_usage, mock_get_profile_daemon_pid):
+        self.base_profile.hosted_by = "PROFILE_HOST_1"
+        mock_log_current_memory_usage.return_value = (self.base_profile.DEFAULT_MAX_RSS_MEMORY_MB + 1) * 1024
+        self.base_profile.check_profile_memory_usage()
+        self.assertFalse(mock_get_profile_daemon_pid.called)
+
     @patch("enmutils_int.lib.profile.process.get_profile_daemon_pid", return_value=["9999"])
     @patch("enmutils_int.lib.profile.process.get_current_rss_memory_for_current_process")
     def test_check_profile_memory_usage__does_not_raise_generatorexit_if_memory_exceeds_limit_but_autostop_disabled(
@@ -1760,6 +1810,15 @@ class ProfileUnitTests(ParameterizedTestCase):
         self.base_profile.kill_completed_pid()
         self.assertEqual(1, mock_os_remove.call_count)
 
+    @patch('enmutils_int.lib.profile.os.path.exists', return_value=True)
+    @patch('enmutils_int.lib.profile.os.remove')
+    @patch('enmutils_int.lib.profile.process.kill_process_id')
+    def test_kill_completed_pid__does_not_kill_shared_profile_host(self, mock_kill, mock_os_remove, _):
+        self.base_profile.hosted_by = "PROFILE_HOST_1"
+        self.base_profile.kill_completed_pid()
+        self.assertEqual(1, mock_os_remove.call_count)
+        self.assertFalse(mock_kill.called)
+
     @patch("enmutils_int.lib.profile.Profile.state", new_callable=PropertyMock)
     @patch("enmutils_int.lib.profile.nodemanager_adaptor.can_service_be_used", return_value=True)
     def test_service_to_be_used__return_true_if_service_can_be_used(self, mock_can_service_be_used, *_):
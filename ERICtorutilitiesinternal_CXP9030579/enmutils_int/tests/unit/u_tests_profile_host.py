@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import unittest2
+from mock import patch, Mock
+
+from enmutils.lib import persistence
+from enmutils_int.lib import profile_host
+from enmutils_int.lib import profile as profile_module
+from testslib import unit_test_utils
+
+EVENTS = []
+
+
+class SleepingProfile(object):
+
+    def __init__(self, name, iterations, interval):
+        self.NAME = name
+        self.iterations = iterations
+        self.interval = interval
+
+    def __call__(self):
+        try:
+            for iteration in xrange(self.iterations):
+                profile_module._iteration_number = (self.NAME, iteration)
+                profile_module._sleep(self.interval)
+                EVENTS.append((self.NAME, iteration, profile_module._iteration_number == (self.NAME, iteration)))
+        except KeyboardInterrupt:
+            EVENTS.append((self.NAME, "STOPPING"))
+
+
+class FailingProfile(SleepingProfile):
+
+    def __call__(self):
+        profile_module._sleep(self.interval)
+        raise SystemExit(5)
+
+
+class TimerWheelUnitTests(unittest2.TestCase):
+
+    def test_advance__returns_items_due_in_order_of_wake_time(self):
+        wheel = profile_host.TimerWheel(resolution=1, num_slots=10)
+        now = time.time()
+        wheel.schedule(now + 3, "b")
+        wheel.schedule(now + 1, "a")
+        wheel.schedule(now + 25, "c")
+
+        self.assertEqual([], wheel.advance(now))
+        self.assertEqual(["a", "b"], wheel.advance(now + 5))
+        self.assertEqual(1, len(wheel))
+        self.assertEqual([], wheel.advance(now + 15))
+        self.assertEqual(["c"], wheel.advance(now + 26))
+
+    def test_advance__returns_all_items_due_after_more_than_a_turn_of_the_wheel(self):
+        wheel = profile_host.TimerWheel(resolution=1, num_slots=10)
+        now = time.time()
+        for index in xrange(5):
+            wheel.schedule(now + index * 7, index)
+
+        self.assertEqual([0, 1, 2, 3, 4], wheel.advance(now + 100))
+        self.assertEqual(0, len(wheel))
+
+    def test_schedule__reschedules_item_already_scheduled(self):
+        wheel = profile_host.TimerWheel(resolution=1, num_slots=10)
+        now = time.time()
+        wheel.schedule(now + 2, "a")
+        wheel.schedule(now + 8, "a")
+
+        self.assertEqual([], wheel.advance(now + 5))
+        self.assertEqual(["a"], wheel.advance(now + 9))
+
+    def test_cancel__removes_item(self):
+        wheel = profile_host.TimerWheel(resolution=1, num_slots=10)
+        now = time.time()
+        wheel.schedule(now + 2, "a")
+        wheel.cancel("a")
+        wheel.cancel("b")
+
+        self.assertEqual([], wheel.advance(now + 5))
+
+
+class ProfileHostUnitTests(unittest2.TestCase):
+
+    def setUp(self):
+        unit_test_utils.setup()
+        self.temp_dir = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.temp_dir, "daemon"))
+        del EVENTS[:]
+
+    def tearDown(self):
+        unit_test_utils.tear_down()
+        shutil.rmtree(self.temp_dir)
+
+    def _run_host(self, profiles, stop_after=None, stop_names=None):
+        for profile in profiles:
+            persistence.set(profile_host.HOSTED_PROFILE_KEY.format(profile.NAME), profile, 60)
+        persistence.set(profile_host.REQUESTS_KEY.format("HOST_1"), [profile.NAME for profile in profiles], 60)
+        if stop_names:
+            timer = threading.Timer(stop_after, persistence.set,
+                                    [profile_host.STOP_REQUESTS_KEY.format("HOST_1"), stop_names, 60])
+            timer.start()
+        with patch.object(profile_host, "PID_PATH", self.temp_dir + "/{0}.pid"), \
+                patch("enmutils_int.lib.profile_host.config.get_log_dir", return_value=self.temp_dir), \
+                patch("enmutils_int.lib.profile_host.zygote.set_process_title", return_value=True) as mock_title:
+            profile_host.ProfileHost("HOST_1", resolution=0.01, idle_exit_secs=0.1).run()
+        return mock_title
+
+    def test_run__interleaves_sleeping_profiles_with_their_own_profile_state(self):
+        mock_title = self._run_host([SleepingProfile("TEST_01", 3, 0.05),
+                                     SleepingProfile("TEST_02", 2, 0.12)])
+
+        self.assertEqual([("TEST_01", 0, True), ("TEST_01", 1, True), ("TEST_02", 0, True), ("TEST_01", 2, True),
+                          ("TEST_02", 1, True)], EVENTS)
+        self.assertIn(["TEST_01", "test_01", "TEST_02", "test_02"],
+                      [title_call[0][0][-4:] for title_call in mock_title.call_args_list])
+        self.assertEqual({}, persistence.get(profile_host.HOSTS_KEY))
+        self.assertFalse(hasattr(threading.current_thread(), "hosted_owner"))
+
+    def test_run__interrupts_sleeping_profile_on_stop_request(self):
+        start_time = time.time()
+        self._run_host([SleepingProfile("TEST_01", 1, 30)], stop_after=0.1, stop_names=["TEST_01"])
+
+        self.assertEqual([("TEST_01", "STOPPING")], EVENTS)
+        self.assertLess(time.time() - start_time, 10)
+
+    def test_run__isolates_failure_of_hosted_profile(self):
+        self._run_host([FailingProfile("TEST_01", 1, 0.01),
+                        SleepingProfile("TEST_02", 2, 0.03)])
+
+        self.assertEqual([("TEST_02", 0, True), ("TEST_02", 1, True)], EVENTS)
+
+    def test_sleep__sleeps_as_usual_outside_hosted_profile(self):
+        host = profile_host.ProfileHost("HOST_1", resolution=0.01)
+        with patch("enmutils_int.lib.profile_host.time.sleep") as mock_sleep:
+            host.sleep(5)
+        mock_sleep.assert_called_once_with(5)
+
+    def test_get_owner__returns_task_running_for_threads_not_belonging_to_a_task(self):
+        task = Mock()
+        self.assertIsNone(profile_host.get_owner())
+        with patch.object(profile_host, "_running_task", task):
+            self.assertIs(task, profile_host.get_owner())
+            threading.current_thread().hosted_owner = None
+            try:
+                self.assertIsNone(profile_host.get_owner())
+            finally:
+                del threading.current_thread().hosted_owner
+
+    @patch("enmutils_int.lib.profile_host.process.get_current_rss_memory_for_current_process", return_value=204800)
+    def test_check_memory_usage__measures_memory_of_host_once_per_interval(self, mock_get_rss):
+        host = profile_host.ProfileHost("HOST_1", resolution=0.01)
+        host.registered_profiles = []
+        host.check_memory_usage()
+        host.check_memory_usage()
+
+        self.assertEqual(1, mock_get_rss.call_count)
+        self.assertEqual(204800, host.rss)
+        self.assertIsNone(host.registered_profiles)
+
+    @patch("enmutils_int.lib.profile_host.zygote.can_set_process_title", return_value=True)
+    @patch("enmutils_int.lib.profile_host.config.has_prop", return_value=True)
+    @patch("enmutils_int.lib.profile_host.config.get_prop")
+    def test_is_hostable__checks_profile_flag_and_categories(self, mock_get_prop, *_):
+        mock_get_prop.side_effect = lambda key: {profile_host.HOST_PROPERTY: "true",
+                                                 profile_host.HOST_CATEGORIES_PROPERTY: ["FM", "shm"]}[key]
+
+        self.assertTrue(profile_host.is_hostable(Mock(HOSTABLE=False, application="SHM")))
+        self.assertTrue(profile_host.is_hostable(Mock(HOSTABLE=True, application="CMSYNC")))
+        self.assertFalse(profile_host.is_hostable(Mock(HOSTABLE=False, application="CMSYNC")))
+
+    @patch("enmutils_int.lib.profile_host.config.has_prop", return_value=True)
+    @patch("enmutils_int.lib.profile_host.config.get_prop", return_value="false")
+    def test_is_hostable__returns_false_if_profile_host_mode_disabled(self, *_):
+        self.assertFalse(profile_host.is_hostable(Mock(HOSTABLE=True, application="FM")))
+
+    @patch("enmutils_int.lib.profile_host.zygote.can_set_process_title", return_value=False)
+    @patch("enmutils_int.lib.profile_host.config.has_prop", return_value=True)
+    @patch("enmutils_int.lib.profile_host.config.get_prop", return_value="true")
+    def test_is_hostable__returns_false_if_setproctitle_not_installed(self, *_):
+        self.assertFalse(profile_host.is_hostable(Mock(HOSTABLE=True, application="FM")))
+
+    def test_get_host__returns_none_if_profile_not_hosted(self):
+        self.assertEqual("HOST_1", profile_host.get_host(Mock(hosted_by="HOST_1")))
+        self.assertIsNone(profile_host.get_host(Mock(hosted_by=None)))
+
+    @patch("enmutils_int.lib.profile_host.ProfileHostDaemon")
+    def test_add_profile__starts_new_host_if_none_running(self, mock_daemon):
+        self.assertEqual("PROFILE_HOST_1", profile_host.add_profile(SleepingProfile("TEST_01", 1, 1)))
+
+        mock_daemon.assert_called_once_with("PROFILE_HOST_1")
+        self.assertTrue(mock_daemon.return_value.start.called)
+        self.assertEqual(["TEST_01"], persistence.get(profile_host.REQUESTS_KEY.format("PROFILE_HOST_1")))
+        self.assertEqual("TEST_01", persistence.get(profile_host.HOSTED_PROFILE_KEY.format("TEST_01")).NAME)
+
+    @patch("enmutils_int.lib.profile_host.os.path.exists", return_value=True)
+    @patch("enmutils_int.lib.profile_host.ProfileHostDaemon")
+    def test_add_profile__uses_running_host_with_spare_capacity(self, mock_daemon, _):
+        persistence.set(profile_host.HOSTS_KEY, {
+            "PROFILE_HOST_1": {"pid": 1, "profiles": ["P{0}".format(index) for index in
+                                                      xrange(profile_host.MAX_PROFILES_PER_HOST)], "time": 0},
+            "PROFILE_HOST_2": {"pid": 2, "profiles": ["P"], "time": 0}}, -1)
+
+        self.assertEqual("PROFILE_HOST_2", profile_host.add_profile(SleepingProfile("TEST_01", 1, 1)))
+        self.assertFalse(mock_daemon.called)
+        self.assertEqual(["P", "TEST_01"], persistence.get(profile_host.HOSTS_KEY)["PROFILE_HOST_2"]["profiles"])
+
+    @patch("enmutils_int.lib.profile_host.os.path.exists", return_value=False)
+    @patch("enmutils_int.lib.profile_host.ProfileHostDaemon")
+    def test_add_profile__replaces_host_no_longer_running(self, mock_daemon, _):
+        persistence.set(profile_host.HOSTS_KEY, {"PROFILE_HOST_1": {"pid": 1, "profiles": ["P"], "time": 0}}, -1)
+
+        self.assertEqual("PROFILE_HOST_1", profile_host.add_profile(SleepingProfile("TEST_01", 1, 1)))
+        self.assertTrue(mock_daemon.called)
+        self.assertEqual(["TEST_01"], persistence.get(profile_host.HOSTS_KEY)["PROFILE_HOST_1"]["profiles"])
+
+    @patch("enmutils_int.lib.profile_host.os.path.exists", return_value=True)
+    def test_stop_hosted_profile__requests_stop_from_host_of_profile(self, _):
+        persistence.set(profile_host.HOSTS_KEY, {"PROFILE_HOST_1": {"pid": 1234, "profiles": ["TEST_01"], "time": 0,
+                                                                    "rss": 204800}}, -1)
+
+        self.assertEqual("PROFILE_HOST_1", profile_host.stop_hosted_profile("TEST_01"))
+        self.assertIsNone(profile_host.stop_hosted_profile("TEST_02"))
+        self.assertEqual(["TEST_01"], persistence.get(profile_host.STOP_REQUESTS_KEY.format("PROFILE_HOST_1")))
+        self.assertEqual({"PROFILE_HOST_1": (204800, ["TEST_01"])}, profile_host.get_memory_usage())
+
+    def test_request_stop__adds_profile_to_stop_requests_of_host(self):
+        profile_host.request_stop(Mock(NAME="TEST_01", hosted_by="HOST_1"))
+        profile_host.request_stop(Mock(NAME="TEST_02", hosted_by="HOST_1"))
+
+        self.assertEqual(["TEST_01", "TEST_02"], persistence.get(profile_host.STOP_REQUESTS_KEY.format("HOST_1")))
+
+
+if __name__ == "__main__":
+    unittest2.main(verbosity=2)
@@ -323,6 +323,33 @@ class ProfileManagerUnitTests(unittest2.TestCase):
         self.profile_manager._allocate_nodes_to_profile()
         self.assertTrue(mock_retain_or_release_nodes.called)
 
+    @patch('enmutils_int.lib.profile_manager.ProfileManager._profile_requires_nodes', return_value=True)
+    @patch('enmutils_int.lib.profile_manager.ProfileManager._planned_nodes_allocated', return_value=True)
+    @patch('enmutils_int.lib.profile_manager.ProfileManager._retain_or_release_nodes')
+    @patch('enmutils_int.lib.profile_manager.node_pool_mgr.allocate_nodes')
+    def test_allocate_nodes_to_profile__does_not_allocate_if_planned_nodes_allocated(
+            self, mock_allocate, mock_retain_or_release_nodes, *_):
+        self.profile_manager.profile.EXCLUSIVE = False
+        self.profile_manager._allocate_nodes_to_profile()
+        self.assertFalse(mock_allocate.called)
+        self.assertFalse(mock_retain_or_release_nodes.called)
+
+    @patch('enmutils_int.lib.profile_manager.allocation_planner.pop_planned_allocation', return_value=2)
+    def test_planned_nodes_allocated__returns_true_if_planned_nodes_still_allocated(self, _):
+        self.profile_manager.profile.get_nodes_list_by_attribute.return_value = [Mock(), Mock()]
+        self.assertTrue(self.profile_manager._planned_nodes_allocated())
+        self.assertEqual(2, self.profile_manager.profile.num_nodes)
+
+    @patch('enmutils_int.lib.profile_manager.allocation_planner.pop_planned_allocation', return_value=2)
+    def test_planned_nodes_allocated__returns_false_if_planned_nodes_no_longer_allocated(self, _):
+        self.profile_manager.profile.get_nodes_list_by_attribute.return_value = [Mock()]
+        self.assertFalse(self.profile_manager._planned_nodes_allocated())
+
+    @patch('enmutils_int.lib.profile_manager.allocation_planner.pop_planned_allocation', return_value=0)
+    def test_planned_nodes_allocated__returns_false_if_no_nodes_planned(self, _):
+        self.assertFalse(self.profile_manager._planned_nodes_allocated())
+        self.assertFalse(self.profile_manager.profile.get_nodes_list_by_attribute.called)
+
     @patch('enmutils_int.lib.profile_manager.ProfileManager._profile_requires_nodes', return_value=False)
     @patch('enmutils_int.lib.profile_manager.ProfileManager._retain_or_release_nodes')
     @patch('enmutils_int.lib.profile_manager.node_pool_mgr.allocate_nodes')
@@ -454,6 +481,41 @@ class ProfileManagerUnitTests(unittest2.TestCase):
         self.profile_mgr.initial_install_teardown()
         mock_debug.assert_called_with("Failed to kill pid, may have already been killed, continuing teardown: Error")
 
+    @patch('enmutils_int.lib.profile_manager.profile_host.request_stop')
+    @patch('enmutils_int.lib.profile_manager.process.kill_process_id')
+    def test_initial_install_teardown__requests_profile_host_to_stop_hosted_profile(self, mock_os_kill,
+                                                                                    mock_request_stop):
+        self.profile_mgr.profile.hosted_by = "PROFILE_HOST_1"
+        self.profile_mgr.initial_install_teardown()
+        self.assertFalse(mock_os_kill.called)
+        mock_request_stop.assert_called_once_with(self.profile_mgr.profile)
+
+    @patch('enmutils_int.lib.profile_manager.ProfileDaemon')
+    @patch('enmutils_int.lib.profile_manager.profile_host.add_profile', return_value="PROFILE_HOST_1")
+    @patch('enmutils_int.lib.profile_manager.profile_host.is_hostable', return_value=True)
+    def test_start__hands_hostable_profile_to_profile_host(self, _, mock_add_profile, mock_daemon):
+        self.profile_mgr._start()
+        mock_add_profile.assert_called_once_with(self.profile_mgr.profile)
+        mock_daemon.check_for_existing_process.assert_called_once_with("CMSYNC_01")
+        self.assertFalse(mock_daemon.called)
+
+    @patch('enmutils_int.lib.profile_manager.process.kill_spawned_process')
+    @patch('enmutils_int.lib.profile_manager.profile_host.request_stop')
+    def test_stop__requests_profile_host_to_stop_hosted_profile(self, mock_request_stop, mock_kill_spawned):
+        profile = Mock(NAME="TEST_01", EXCLUSIVE=False, running=True, hosted_by="PROFILE_HOST_1")
+        profile_manager.ProfileManager(profile)._stop()
+        mock_request_stop.assert_called_once_with(profile)
+        self.assertFalse(mock_kill_spawned.called)
+
+    @patch('enmutils_int.lib.profile_manager.persistence.get')
+    @patch("enmutils_int.lib.profile_manager.process.kill_pid")
+    @patch("enmutils_int.lib.profile_manager.time.sleep", return_value=0)
+    def test_checks_profile_is_stopping__does_not_kill_profile_host(self, _, mock_kill_pid, mock_get):
+        profile = Mock(state="RUNNING", hosted_by="PROFILE_HOST_1")
+        mock_get.return_value = profile
+        profile_manager.ProfileManager(profile).checks_profile_is_stopping()
+        self.assertFalse(mock_kill_pid.called)
+
     @patch('enmutils_int.lib.profile_manager.ProfileDaemon.__init__', return_value=None)
     @patch('enmutils_int.lib.profile_manager.shell.run_local_cmd')
     def test_profile_daemon_catches_existing_process(self, mock_run_local, *_):
@@ -83,9 +83,10 @@ class ProfilePropertiesManagerUnitTest(unittest2.TestCase):
         mock_get_profile_objects.return_value = [profile_1, profile_2]
         config_data = mock_input_data.return_value
         config_data.pool = {}
-        prop_mgr = ProfilePropertiesManager(['profile_1', 'profile_2'])
+        prop_mgr = ProfilePropertiesManager(['profile_1', 'profile_2'], network_config='soem')
         self.assertFalse(mock_input_data.get_profiles_values.called)
         self.assertEqual(prop_mgr.get_profile_objects(), [profile_1, profile_2])
+        mock_input_data.assert_called_with(network_config='soem')
 
     @patch('enmutils_int.lib.profile_properties_manager.config')
     @patch('enmutils_int.lib.profile_properties_manager.InputData')
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+import json
+import os
+import tempfile
+
+import unittest2
+from mock import patch
+
+from enmutils_int.lib import profile_registry
+from testslib import unit_test_utils
+
+NETWORKS = {
+    "basic": {"ap": {"AP_01": {"SUPPORTED": True, "EXCLUSIVE": True, "PRIORITY": 2, "NOTE": "-"},
+                     "AP_SETUP": {"SUPPORTED": "INTRUSIVE", "PRIORITY": 1}},
+              "cli_mon": {"CLI_MON_01": {"SUPPORTED": True, "PRIORITY": 1}}},
+    "forty_k_network": {"ap": {"AP_01": {"NUM_NODES": {"RadioNode": 10}, "SCHEDULE_SLEEP": 60},
+                               "AP_SETUP": {}},
+                        "cli_mon": {"CLI_MON_01": {"TOTAL_NODES": 5, "SUPPORTED_NODE_TYPES": ["ERBS"]}}}}
+
+
+class ProfileRegistryUnitTests(unittest2.TestCase):
+
+    def setUp(self):
+        unit_test_utils.setup()
+        profile_registry.clear_registry()
+
+    def tearDown(self):
+        profile_registry.clear_registry()
+        unit_test_utils.tear_down()
+
+    def test_get_category__returns_category_of_profile(self):
+        self.assertEqual("cli_mon", profile_registry.get_category("CLI_MON_01"))
+        self.assertEqual("ap", profile_registry.get_category("ap_setup"))
+        self.assertEqual("asr_l", profile_registry.get_category("asr_l_01"))
+
+    @patch("enmutils_int.lib.profile_registry.get_source_checksum", return_value="1234")
+    def test_build_registry__builds_entry_for_each_profile_in_basic_network(self, _):
+        registry = profile_registry.build_registry(NETWORKS)
+        self.assertEqual("1234", registry["source_checksum"])
+        self.assertEqual(["AP_01", "AP_SETUP", "CLI_MON_01"], sorted(registry["profiles"]))
+        entry = registry["profiles"]["AP_01"]
+        self.assertEqual("enmutils_int.lib.workload.ap_01", entry["module"])
+        self.assertEqual(("ap", "ap", 2), (entry["app"], entry["category"], entry["priority"]))
+        self.assertEqual({"SUPPORTED": True, "EXCLUSIVE": True}, entry["supported"])
+        self.assertEqual({"forty_k_network": {"NUM_NODES": {"RadioNode": 10}}}, entry["node_requirements"])
+        self.assertEqual(NETWORKS["basic"]["ap"]["AP_01"], entry["basic_values"])
+        self.assertEqual({}, registry["profiles"]["AP_SETUP"]["node_requirements"])
+        self.assertEqual({"forty_k_network": {"TOTAL_NODES": 5, "SUPPORTED_NODE_TYPES": ["ERBS"]}},
+                         registry["profiles"]["CLI_MON_01"]["node_requirements"])
+
+    @patch("enmutils_int.lib.profile_registry.os.path.isfile", return_value=False)
+    def test_build_registry__sets_no_module_if_profile_module_does_not_exist(self, _):
+        self.assertIsNone(profile_registry.build_registry(NETWORKS)["profiles"]["AP_01"]["module"])
+
+    def test_build_registry__defaults_to_profile_values(self):
+        self.assertIn("CMIMPORT_02", profile_registry.build_registry()["profiles"])
+
+    @patch("enmutils_int.lib.profile_registry.build_registry")
+    @patch("enmutils_int.lib.profile_registry.get_source_checksum", return_value="1234")
+    @patch("enmutils_int.lib.profile_registry._read_registry_file")
+    def test_load_registry__uses_generated_file_if_up_to_date(self, mock_read, _, mock_build):
+        mock_read.return_value = {"source_checksum": "1234", "profiles": {"AP_01": {"category": "ap"}}}
+        self.assertEqual({"AP_01": {"category": "ap"}}, profile_registry.load_registry())
+        profile_registry.load_registry()
+        self.assertEqual(1, mock_read.call_count)
+        self.assertFalse(mock_build.called)
+
+    @patch("enmutils_int.lib.profile_registry.build_registry")
+    @patch("enmutils_int.lib.profile_registry.get_source_checksum", return_value="5678")
+    @patch("enmutils_int.lib.profile_registry._read_registry_file")
+    def test_load_registry__builds_registry_if_file_out_of_date_or_missing(self, mock_read, _, mock_build):
+        mock_build.return_value = {"source_checksum": "5678", "profiles": {"AP_02": {"category": "ap"}}}
+        mock_read.return_value = {"source_checksum": "1234", "profiles": {"AP_01": {"category": "ap"}}}
+        self.assertEqual(["AP_02"], profile_registry.load_registry().keys())
+        profile_registry.clear_registry()
+        mock_read.return_value = None
+        self.assertEqual(["AP_02"], profile_registry.load_registry().keys())
+        self.assertEqual(2, mock_build.call_count)
+
+    @patch("enmutils_int.lib.profile_registry.REGISTRY_FILE", "/tmp/non_existent/profile_registry.json")
+    def test_read_registry_file__returns_none_if_file_cannot_be_read(self):
+        self.assertIsNone(profile_registry._read_registry_file())
+
+    @patch("enmutils_int.lib.profile_registry.get_source_checksum", return_value="1234")
+    def test_generate_registry_file__writes_registry_which_is_then_loaded(self, _):
+        registry = profile_registry.build_registry(NETWORKS)
+        registry_file = tempfile.NamedTemporaryFile(delete=False)
+        registry_file.close()
+        try:
+            with patch("enmutils_int.lib.profile_registry.build_registry", return_value=registry) as mock_build:
+                self.assertEqual(3, profile_registry.generate_registry_file(registry_file.name))
+                with patch("enmutils_int.lib.profile_registry.REGISTRY_FILE", registry_file.name):
+                    self.assertEqual(["ap_01", "ap_setup", "cli_mon_01"], profile_registry.get_all_profile_names())
+                    self.assertEqual(["ap", "cli_mon"], profile_registry.get_categories())
+                    self.assertEqual(2, profile_registry.get_profile_entry("ap_01")["priority"])
+                self.assertEqual(1, mock_build.call_count)
+        finally:
+            os.remove(registry_file.name)
+
+    @patch("enmutils_int.lib.profile_registry.log.logger.info")
+    @patch("enmutils_int.lib.profile_registry.log.cyan_text")
+    def test_print_profile_description__success(self, mock_cyan, mock_info):
+        profile_registry.print_profile_description("test_00")
+        mock_cyan.assert_called_with("\n Description of the profile: TEST_00: \n")
+        mock_info.assert_called_with('\n Please refer to the latest ENM TERE at: \n '
+                                     'https://eteamspace.internal.ericsson.com'
+                                     '/pages/viewpage.action?pageId=1982554551 \n ')
+
+    @patch("enmutils_int.lib.profile_registry.log.logger.info")
+    @patch("enmutils_int.lib.profile_registry.log.cyan_text")
+    @patch("enmutils_int.lib.profile_registry._read_registry_file")
+    def test_print_basic_network_values__prints_values_read_from_registry_file(self, mock_read, mock_cyan,
+                                                                               mock_info):
+        mock_read.return_value = json.loads(json.dumps(profile_registry.build_registry(NETWORKS)))
+        profile_registry.print_basic_network_values("ap_setup")
+        mock_cyan.assert_called_with("\n Basic network values for AP_SETUP: \n")
+        mock_info.assert_called_with("{0}\n".format(NETWORKS["basic"]["ap"]["AP_SETUP"]))
+
+    def test_get_source_checksum__is_consistent(self):
+        self.assertEqual(profile_registry.get_source_checksum(), profile_registry.get_source_checksum())
+
+    @patch("enmutils_int.lib.profile_registry.os.stat")
+    @patch("enmutils_int.lib.profile_registry.glob.glob", return_value=["/path/b.py", "/path/a.py"])
+    def test_get_source_checksum__uses_size_and_modification_time_of_sources(self, _, mock_stat):
+        mock_stat.return_value.st_size, mock_stat.return_value.st_mtime = 100, 1600000000.5
+        self.assertEqual("a.py:100:1600000000,b.py:100:1600000000", profile_registry.get_source_checksum())
+
+    @patch("enmutils_int.lib.profile_registry.time.time", side_effect=[0, 2, 3, 4, 10, 11])
+    @patch("enmutils_int.lib.profile_registry.subprocess.check_call")
+    def test_benchmark_imports__records_fastest_import_of_each_module(self, mock_check_call, _):
+        self.assertEqual({"os": 1}, profile_registry.benchmark_imports(["os"], repeat=3))
+        self.assertEqual(3, mock_check_call.call_count)
+
+    @patch("enmutils_int.lib.profile_registry.generate_registry_file", return_value=3)
+    def test_cli__generates_registry_file(self, mock_generate):
+        with patch("enmutils_int.lib.profile_registry.sys.argv", ["profile_registry.py", "--generate",
+                                                                  "--path-to-save=/tmp/registry.json"]):
+            profile_registry.cli()
+        mock_generate.assert_called_with("/tmp/registry.json")
+
+    @patch("enmutils_int.lib.profile_registry.benchmark_imports", return_value={"os": 0.1})
+    def test_cli__records_benchmark_against_version(self, _):
+        benchmark_file = tempfile.NamedTemporaryFile(delete=False)
+        benchmark_file.close()
+        try:
+            argv = ["profile_registry.py", "--benchmark", "--version=1.2.3",
+                    "--path-to-save={0}".format(benchmark_file.name)]
+            with patch("enmutils_int.lib.profile_registry.sys.argv", argv):
+                profile_registry.cli()
+            with open(benchmark_file.name) as f:
+                self.assertEqual({"version": "1.2.3", "import_times": {"os": 0.1}}, json.load(f))
+        finally:
+            os.remove(benchmark_file.name)
+
+
+if __name__ == "__main__":
+    unittest2.main(verbosity=2)
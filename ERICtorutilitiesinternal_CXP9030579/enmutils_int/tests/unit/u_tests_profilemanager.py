@@ -10,8 +10,7 @@ from enmutils_int.lib.services.profilemanager import (get_status, get_profiles_b
                                                       get_multiple_status, set_status, set_error_or_warning,
                                                       StatusProfile, clear_errors, delete_pid_files, clear_pids,
                                                       profiles_list, categories_list, describe,
-                                                      build_describe_message_for_profiles, print_basic_network_values,
-                                                      print_profile_description, export_all, print_export_path,
+                                                      build_describe_message_for_profiles, export_all, print_export_path,
                                                       get_profiles_and_file_names, write_to_file, generate_export_file,
                                                       export, diff, at_startup, verify_profiles,
                                                       check_for_consistently_dead_or_inactive_profiles)
@@ -167,6 +166,25 @@ class ProfileManagerServiceUnitTests(unittest2.TestCase):
             mock_abort.assert_called_with("Failed to retrieve categories list.", mock_logger, 'profilemanager',
                                           "/home/enmutils/services", error)
 
+    @patch('enmutils_int.lib.services.profilemanager.get_json_response')
+    @patch('enmutils_int.lib.services.profilemanager.iteration_scheduler.get_calendar')
+    def test_iteration_calendar__success(self, mock_get_calendar, mock_get_json):
+        mock_get_calendar.return_value = [{"profile": "TEST_01", "planned": 1000, "wake": 1002}]
+        with app.test_request_context('iterations/calendar'):
+            profilemanager.iteration_calendar()
+            mock_get_json.assert_called_with(message=mock_get_calendar.return_value)
+
+    @patch('enmutils.lib.log.logger')
+    @patch('enmutils_int.lib.services.profilemanager.abort_with_message')
+    @patch('enmutils_int.lib.services.profilemanager.iteration_scheduler.get_calendar')
+    def test_iteration_calendar__calls_abort_with_message(self, mock_get_calendar, mock_abort, mock_logger):
+        error = Exception("Error")
+        mock_get_calendar.side_effect = error
+        with app.test_request_context('iterations/calendar'):
+            profilemanager.iteration_calendar()
+            mock_abort.assert_called_with("Failed to retrieve iteration calendar.", mock_logger, 'profilemanager',
+                                          "/home/enmutils/services", error)
+
     @patch('enmutils_int.lib.services.profilemanager.get_json_response')
     @patch('enmutils_int.lib.services.profilemanager.clear_profile_errors')
     def test_clear_errors__success(self, mock_clear_profile_errors, mock_get_json):
@@ -349,24 +367,6 @@ class ProfileManagerServiceUnitTests(unittest2.TestCase):
         self.assertListEqual(["DESC1 Values1", "DESC2 Values2"], build_describe_message_for_profiles(
             ["TEST_00", "TEST_01"]))
 
-    @patch('enmutils_int.lib.services.profilemanager.log.logger.info')
-    @patch('enmutils_int.lib.services.profilemanager.log.cyan_text')
-    def test_print_profile_description__success(self, mock_cyan, mock_info):
-        print_profile_description("test_00")
-        mock_cyan.assert_called_with("\n Description of the profile: TEST_00: \n")
-        mock_info.assert_called_with('\n Please refer to the latest ENM TERE at: \n '
-                                     'https://eteamspace.internal.ericsson.com'
-                                     '/pages/viewpage.action?pageId=1982554551 \n ')
-
-    @patch('enmutils_int.lib.services.profilemanager.log.logger.info')
-    @patch('enmutils_int.lib.services.profilemanager.log.cyan_text')
-    @patch('enmutils_int.lib.services.profilemanager.get_all_networks')
-    def test_print_basic_network_values__success(self, mock_all_networks, mock_cyan, mock_info):
-        mock_all_networks.return_value = {"basic": {"test": {"TEST_SETUP": {"NUM_NODES": {"ERBS": -1}}}}}
-        print_basic_network_values("test_setup")
-        mock_cyan.assert_called_with("\n Basic network values for TEST_SETUP: \n")
-        mock_info.assert_called_with("{\'NUM_NODES\': {\'ERBS\': -1}}\n")
-
     @patch('enmutils_int.lib.services.profilemanager.export_all')
     def test_generate_export_file__all_categories(self, mock_export_all):
         profiles = {"TEST_00": Mock()}
@@ -490,13 +490,57 @@ class ProfileManagerServiceUnitTests(unittest2.TestCase):
                                                   profile_names=["TEST_01", "TEST_02"], priority=1)
             self.assertEqual(1, mock_abort_with_message.call_count)
 
+    @patch('enmutils_int.lib.services.profilemanager.schedule_persistence_snapshots')
     @patch('enmutils_int.lib.services.profilemanager.create_and_start_once_off_background_scheduled_job')
     @patch('enmutils_int.lib.services.profilemanager.create_and_start_background_scheduled_job')
-    def test_at_startup__starts_background_jobs(self, mock_start_background_job, mock_start_once_off_job):
+    def test_at_startup__starts_background_jobs(self, mock_start_background_job, mock_start_once_off_job,
+                                                mock_schedule_persistence_snapshots):
         at_startup()
-        self.assertEqual(1, mock_start_background_job.call_count)
+        self.assertEqual(1, mock_schedule_persistence_snapshots.call_count)
+        self.assertEqual(3, mock_start_background_job.call_count)
         self.assertEqual(1, mock_start_once_off_job.call_count)
 
+    @patch('enmutils_int.lib.services.profilemanager.log.logger.debug')
+    @patch('enmutils_int.lib.services.profilemanager.node_pool_mgr.recount_pool_stats',
+           side_effect=[None, Exception("Error")])
+    def test_recount_node_pool_stats__logs_failure(self, mock_recount_pool_stats, mock_debug):
+        profilemanager.recount_node_pool_stats()
+        profilemanager.recount_node_pool_stats()
+        self.assertEqual(2, mock_recount_pool_stats.call_count)
+        mock_debug.assert_called_once_with("Failed to recount node pool stats: Error")
+
+    @patch('enmutils_int.lib.services.profilemanager.log.logger.debug')
+    @patch('enmutils_int.lib.services.profilemanager.persistence_monitor.record_sample', side_effect=[{}, Exception("Error")])
+    def test_record_persistence_health_sample__logs_failure(self, mock_record_sample, mock_debug):
+        profilemanager.record_persistence_health_sample()
+        profilemanager.record_persistence_health_sample()
+        self.assertEqual(2, mock_record_sample.call_count)
+        mock_debug.assert_called_once_with("Failed to record persistence health sample: Error")
+
+    @patch('enmutils_int.lib.services.profilemanager.create_and_start_background_scheduled_job')
+    @patch('enmutils_int.lib.services.profilemanager.persistence_snapshot.get_interval_mins', side_effect=[60, 0])
+    @patch('enmutils_int.lib.services.profilemanager.persistence_snapshot.configure')
+    def test_schedule_persistence_snapshots__schedules_snapshots_if_enabled(self, mock_configure, _, mock_start_job):
+        profilemanager.schedule_persistence_snapshots()
+        profilemanager.schedule_persistence_snapshots()
+        self.assertEqual(2, mock_configure.call_count)
+        mock_start_job.assert_called_once_with(profilemanager.take_persistence_snapshot, 60,
+                                               "profilemanager_PERSISTENCE_SNAPSHOT", profilemanager.log.logger)
+
+    @patch('enmutils_int.lib.services.profilemanager.create_and_start_background_scheduled_job')
+    @patch('enmutils_int.lib.services.profilemanager.persistence_snapshot.configure', side_effect=Exception("Error"))
+    def test_schedule_persistence_snapshots__does_not_schedule_snapshots_if_settings_not_applied(
+            self, _, mock_start_job):
+        profilemanager.schedule_persistence_snapshots()
+        self.assertFalse(mock_start_job.called)
+
+    @patch('enmutils_int.lib.services.profilemanager.log.logger.debug')
+    @patch('enmutils_int.lib.services.profilemanager.persistence_snapshot.run_scheduled_snapshot',
+           side_effect=Exception("Error"))
+    def test_take_persistence_snapshot__logs_failure(self, _, mock_debug):
+        profilemanager.take_persistence_snapshot()
+        mock_debug.assert_called_once_with("Failed to take persistence snapshot: Error")
+
     @patch('enmutils_int.lib.services.profilemanager.threading')
     @patch('enmutils_int.lib.services.profilemanager.persisted_verify_key', return_value=None)
     @patch('enmutils_int.lib.services.profilemanager.get_persisted_profiles_by_name', return_value={})
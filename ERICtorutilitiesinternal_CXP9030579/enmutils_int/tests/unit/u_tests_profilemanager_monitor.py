@@ -168,6 +168,15 @@ class ProfileManagerMonitorUnitTests(ParameterizedTestCase):
         profilemanager_monitor.profile_clean_up(self.profile)
         mock_kill.assert_called_with(self.profile.NAME, self.profile.pid)
 
+    @patch('enmutils_int.lib.services.profilemanager_monitor.profile_host.request_stop')
+    @patch('enmutils_int.lib.services.profilemanager_monitor.process.kill_spawned_process')
+    def test_profile_clean_up__requests_host_to_stop_hosted_profile(self, mock_kill, mock_request_stop):
+        self.profile.hosted_by = "PROFILE_HOST_1"
+        profilemanager_monitor.profile_clean_up(self.profile)
+        self.assertFalse(mock_kill.called)
+        mock_request_stop.assert_called_once_with(self.profile)
+        self.assertEqual(1, self.profile.teardown.call_count)
+
     @patch('enmutils_int.lib.services.profilemanager_monitor.process.kill_spawned_process',
            side_effect=Exception("Error"))
     def test_profile_clean_up__teardown_called_on_failure(self, mock_kill):
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+import unittest2
+from mock import patch
+
+from enmutils_int.lib import script_engine_output
+from testslib import unit_test_utils
+
+TABULAR_OUTPUT = [u"Node Name\tTrust State\tSubject", u"NetworkElement=LTE01\tIDLE\tCN=ENM_PKI_Root_CA",
+                  u"\t\tCN=ENM_OAM_CA", u"NetworkElement=LTE02\tIDLE", u"", u"Command Executed Successfully"]
+
+
+class ScriptEngineOutputUnitTests(unittest2.TestCase):
+
+    def setUp(self):
+        unit_test_utils.setup()
+
+    def tearDown(self):
+        unit_test_utils.tear_down()
+
+    def test_split_tabular_rows__splits_non_empty_rows_with_required_number_of_values(self):
+        self.assertEqual([[u"NetworkElement=LTE01", u"IDLE", u"CN=ENM_PKI_Root_CA"], [u"", u"", u"CN=ENM_OAM_CA"]],
+                         script_engine_output.split_tabular_rows(TABULAR_OUTPUT[1:], num_columns=3))
+        self.assertEqual(4, len(script_engine_output.split_tabular_rows(TABULAR_OUTPUT[1:])))
+        self.assertEqual(3, len(script_engine_output.split_tabular_rows(TABULAR_OUTPUT[1:],
+                                                                        skip="Command Executed Successfully")))
+
+    def test_split_tabular_rows__strips_padded_values(self):
+        self.assertEqual([["LTE01", "IDLE", ""], ["LTE02", "", "CN=CA 1"]],
+                         script_engine_output.split_tabular_rows(["LTE01 \tIDLE\t", " LTE02\t\tCN=CA 1\r"]))
+        self.assertEqual([["LTE01", "IDLE"]],
+                         script_engine_output.split_tabular_rows(["| LTE01 | IDLE |"], separator="|", borders=True))
+
+    def test_parse_tabular_output__returns_dictionary_per_row(self):
+        self.assertEqual([{"Node Name": "NetworkElement=LTE01", "Trust State": "IDLE",
+                           "Subject": "CN=ENM_PKI_Root_CA"},
+                          {"Node Name": "", "Trust State": "", "Subject": "CN=ENM_OAM_CA"}],
+                         list(script_engine_output.parse_tabular_output(TABULAR_OUTPUT)))
+
+    def test_parse_tabular_output__reuses_item_of_previous_row_if_multiline(self):
+        output = [u"Entity"] + TABULAR_OUTPUT
+        self.assertEqual(["NetworkElement=LTE01", "NetworkElement=LTE01"],
+                         [row["Node Name"] for row in script_engine_output.parse_tabular_output(output, header_line=1,
+                                                                                                multiline=True)])
+
+    def test_parse_tabular_columns__returns_values_of_each_column(self):
+        self.assertEqual({"Node Name": ["NetworkElement=LTE01", ""], "Trust State": ["IDLE", ""],
+                          "Subject": ["CN=ENM_PKI_Root_CA", "CN=ENM_OAM_CA"]},
+                         script_engine_output.parse_tabular_columns(TABULAR_OUTPUT))
+        self.assertEqual({"Node Name": [], "Trust State": [], "Subject": []},
+                         script_engine_output.parse_tabular_columns(TABULAR_OUTPUT[:1]))
+
+    def test_parse_fdns__returns_fdns_of_fdn_lines_only(self):
+        output = [u"FDN : NetworkElement=LTE01,CmFunction=1", u"syncStatus : SYNCHRONIZED", u"",
+                  u"FDN:NetworkElement=LTE02,CmFunction=1", u"MyFDN : 1", u"2 instance(s)"]
+        self.assertEqual([u"NetworkElement=LTE01,CmFunction=1", u"NetworkElement=LTE02,CmFunction=1"],
+                         script_engine_output.parse_fdns(output))
+
+    def test_iter_fdns__parses_only_the_lines_consumed(self):
+        output = iter([u"FDN : NetworkElement=LTE01", u"", u"FDN : NetworkElement=LTE02"])
+        fdns = script_engine_output.iter_fdns(output)
+        self.assertEqual(u"NetworkElement=LTE01", next(fdns))
+        self.assertEqual([u"", u"FDN : NetworkElement=LTE02"], list(output))
+
+    @patch("enmutils_int.lib.script_engine_output.time.time", side_effect=[0, 2, 0, 1] * 2)
+    def test_benchmark__records_fastest_parse_of_each_parser(self, _):
+        self.assertEqual({"parse_tabular_output": 1, "parse_tabular_columns": 1},
+                         script_engine_output.benchmark(num_rows=10, repeat=2))
+
+
+if __name__ == "__main__":
+    unittest2.main(verbosity=2)
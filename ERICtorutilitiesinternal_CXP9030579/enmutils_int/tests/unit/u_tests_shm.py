@@ -347,47 +347,72 @@ class ShmJobUnitTests(ParameterizedTestCase):
     def test_convert_schedule_time_in_secs_add_error_as_exception(self):
         self.assertRaises(Exception, self.job.convert_schedule_time_in_secs(scheduled_time=["1234"]))
 
-    @patch('enmutils_int.lib.shm_job.ShmJob._get_job_response')
-    def test_wait_job_to_complete_upgrade_success(self, mock_get_job_response, *_):
-        mock_get_job_response.return_value = {"status": "COMPLETED"}
+    @patch('enmutils_int.lib.shm_job.shm_job_monitor.get_job_state')
+    def test_wait_job_to_complete_upgrade_success(self, mock_get_job_state, *_):
+        mock_get_job_state.return_value = {"status": "COMPLETED"}
         self.job.job_type = "UPGRADE"
         self.job._wait_job_to_complete()
-        self.assertTrue(mock_get_job_response.called)
+        self.assertTrue(mock_get_job_state.called)
 
-    @patch('enmutils_int.lib.shm_job.ShmJob._get_job_response')
-    def test_wait_job_to_complete_mltn_success(self, mock_get_job_response, *_):
-        mock_get_job_response.return_value = {"status": "COMPLETED"}
+    @patch('enmutils_int.lib.shm_job.shm_job_monitor.get_job_state')
+    def test_wait_job_to_complete_mltn_success(self, mock_get_job_state, *_):
+        mock_get_job_state.return_value = {"status": "COMPLETED"}
         self.job.nodes[0].primary_type = "MLTN"
         self.job._wait_job_to_complete()
-        self.assertTrue(mock_get_job_response.called)
+        self.assertTrue(mock_get_job_state.called)
 
-    @patch('enmutils_int.lib.shm_job.ShmJob._get_job_response')
-    def test_wait_job_to_complete_ml669x_success(self, mock_get_job_response, *_):
-        mock_get_job_response.return_value = {"status": "COMPLETED"}
+    @patch('enmutils_int.lib.shm_job.shm_job_monitor.get_job_state')
+    def test_wait_job_to_complete_ml669x_success(self, mock_get_job_state, *_):
+        mock_get_job_state.return_value = {"status": "COMPLETED"}
         self.job.nodes[0].primary_type = "MINI-LINK-669x"
         self.job._wait_job_to_complete()
-        self.assertTrue(mock_get_job_response.called)
+        self.assertTrue(mock_get_job_state.called)
 
-    @patch('enmutils_int.lib.shm_job.ShmJob._get_job_response')
-    def test_wait_job_to_complete_cleanup_success(self, mock_get_job_response, *_):
-        mock_get_job_response.return_value = {"status": "COMPLETED"}
+    @patch('enmutils_int.lib.shm_job.shm_job_monitor.get_job_state')
+    def test_wait_job_to_complete_cleanup_success(self, mock_get_job_state, *_):
+        mock_get_job_state.return_value = {"status": "COMPLETED"}
         self.job.name = "SHM_35"
         self.job.job_type = "Cleanup_job"
         self.job._wait_job_to_complete()
-        self.assertTrue(mock_get_job_response.called)
+        self.assertTrue(mock_get_job_state.called)
 
-    @patch('enmutils_int.lib.shm_job.ShmJob._get_job_response')
-    def test_wait_job_to_complete_upgrade_raises_enm_error(self, mock_get_job_response, *_):
-        mock_get_job_response.return_value = {"status": "STARTING"}
+    @patch('enmutils_int.lib.shm_job.shm_job_monitor.get_job_state')
+    def test_wait_job_to_complete_upgrade_raises_enm_error(self, mock_get_job_state, *_):
+        mock_get_job_state.return_value = {"status": "STARTING"}
         self.assertRaises(EnmApplicationError, self.job._wait_job_to_complete)
 
+    @patch('enmutils_int.lib.shm_job.shm_job_monitor.deregister_job')
+    @patch('enmutils_int.lib.shm_job.sleep', return_value=0)
+    @patch('enmutils_int.lib.shm_job.ShmJob._get_job_response')
+    @patch('enmutils_int.lib.shm_job.shm_job_monitor.get_job_state')
+    def test_wait_job_to_complete_uses_job_monitor_at_interval_of_expected_job_time(
+            self, mock_get_job_state, mock_get_job_response, mock_sleep, mock_deregister_job):
+        mock_get_job_state.side_effect = [{"status": "RUNNING"}, {"status": "COMPLETED"}]
+        self.job.job_type = "UPGRADE"
+        self.assertEqual("COMPLETED", self.job._wait_job_to_complete())
+        self.assertFalse(mock_get_job_response.called)
+        mock_get_job_state.assert_called_with(self.job.name, self.job.user, max_age=90)
+        mock_sleep.assert_called_once_with(90)
+        mock_deregister_job.assert_called_once_with(self.job.name)
+
+    @patch('enmutils_int.lib.shm_job.shm_job_monitor.deregister_job')
+    @patch('enmutils_int.lib.shm_job.sleep', return_value=0)
+    @patch('enmutils_int.lib.shm_job.ShmJob._get_job_response')
+    @patch('enmutils_int.lib.shm_job.shm_job_monitor.get_job_state')
+    def test_wait_job_to_complete_waits_for_job_not_found_by_monitor_without_searching_job_list(
+            self, mock_get_job_state, mock_get_job_response, mock_sleep, _):
+        mock_get_job_state.side_effect = [None, {"status": "COMPLETED"}]
+        self.assertEqual("COMPLETED", self.job._wait_job_to_complete())
+        self.assertFalse(mock_get_job_response.called)
+        self.assertEqual(1, mock_sleep.call_count)
+
     @patch('enmutils_int.lib.shm_job.sleep', return_value=0)
     @patch('datetime.timedelta')
     @patch('datetime.datetime')
-    @patch('enmutils_int.lib.shm_job.ShmJob._get_job_response')
-    def test_wait_job_to_complete_upgrade_raises_timeout_error(self, mock_get_job_response,
+    @patch('enmutils_int.lib.shm_job.shm_job_monitor.get_job_state')
+    def test_wait_job_to_complete_upgrade_raises_timeout_error(self, mock_get_job_state,
                                                                mock_datetime, mock_timedelta, *_):
-        mock_get_job_response.return_value = {"status": "RUNNING"}
+        mock_get_job_state.return_value = {"status": "RUNNING"}
         time_now = datetime.now()
         expiry_time = time_now + timedelta(minutes=60)
         mock_datetime.now.side_effect = [time_now, time_now, expiry_time]
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+import json
+from operator import itemgetter
+
+import unittest2
+from mock import patch, Mock
+
+from enmutils.lib import persistence
+from enmutils_int.lib import shm_job_monitor
+from testslib import unit_test_utils
+
+
+def get_response(job_names, ok=True):
+    response = Mock(ok=ok, status_code=200 if ok else 500)
+    response.json.return_value = {"result": [{"jobName": job_name, "jobId": index, "status": "RUNNING"}
+                                             for index, job_name in enumerate(job_names)]}
+    return response
+
+
+class ShmJobMonitorUnitTests(unittest2.TestCase):
+
+    def setUp(self):
+        unit_test_utils.setup()
+        self.user = Mock()
+        self.user.post.return_value = get_response(["SHM_01_job", "SHM_03_job", "Other_job"])
+
+    def tearDown(self):
+        unit_test_utils.tear_down()
+
+    def test_get_poll_interval__adapts_to_expected_job_time(self):
+        self.assertEqual(30, shm_job_monitor.get_poll_interval(1))
+        self.assertEqual(30, shm_job_monitor.get_poll_interval(45))
+        self.assertEqual(90, shm_job_monitor.get_poll_interval(135))
+        self.assertEqual(120, shm_job_monitor.get_poll_interval(180))
+        self.assertEqual(180, shm_job_monitor.get_poll_interval(600))
+
+    def test_register_job__adds_job_until_deregistered(self):
+        shm_job_monitor.register_job("SHM_01_job")
+        shm_job_monitor.register_job("SHM_03_job")
+        shm_job_monitor.deregister_job("SHM_01_job")
+        shm_job_monitor.deregister_job("SHM_99_job")
+        self.assertEqual({"SHM_03_job"}, shm_job_monitor.get_monitored_jobs())
+
+    @patch("enmutils_int.lib.shm_job_monitor.time.time")
+    def test_get_monitored_jobs__excludes_expired_registrations(self, mock_time):
+        mock_time.return_value = 1000
+        shm_job_monitor.register_job("SHM_01_job")
+        mock_time.return_value = 1000 + shm_job_monitor.REGISTRATION_EXPIRY_SECS + 1
+        self.assertEqual(set(), shm_job_monitor.get_monitored_jobs())
+
+    @patch("enmutils_int.lib.shm_job_monitor.PAGE_SIZE", 2)
+    def test_query_job_states__pages_job_list_until_all_jobs_found(self):
+        self.user.post.side_effect = [get_response(["Other_job", "SHM_01_job"]),
+                                      get_response(["Other_job_2", "SHM_03_job"]),
+                                      get_response(["SHM_04_job"])]
+        job_states = shm_job_monitor._query_job_states(self.user, {"SHM_01_job", "SHM_03_job"})
+        self.assertEqual(["SHM_01_job", "SHM_03_job"], sorted(job_states))
+        self.assertEqual(2, self.user.post.call_count)
+        self.assertEqual((3, 4), itemgetter("offset", "limit")(json.loads(self.user.post.call_args[1]["data"])))
+
+    def test_get_page_bounds__returns_positions_of_first_and_last_jobs_of_page(self):
+        self.assertEqual((1, 50), shm_job_monitor.get_page_bounds(0))
+        self.assertEqual((51, 100), shm_job_monitor.get_page_bounds(1))
+
+    @patch("enmutils_int.lib.shm_job_monitor.PAGE_SIZE", 2)
+    def test_query_job_states__stops_paging_at_end_of_job_list(self):
+        self.user.post.side_effect = [get_response(["Other_job", "SHM_01_job"]), get_response(["Other_job_2"])]
+        self.assertEqual(["SHM_01_job"], shm_job_monitor._query_job_states(self.user, {"SHM_01_job", "SHM_03_job"})
+                         .keys())
+
+    def test_query_job_states__raises_error_if_job_list_not_retrieved(self):
+        self.user.post.return_value = get_response([], ok=False)
+        self.assertRaises(shm_job_monitor.EnmApplicationError, shm_job_monitor._query_job_states, self.user,
+                          {"SHM_01_job"})
+
+    def test_poll_job_states__stores_states_of_monitored_jobs(self):
+        self.assertEqual({}, shm_job_monitor.poll_job_states(self.user))
+        self.assertFalse(self.user.post.called)
+        shm_job_monitor.register_job("SHM_01_job")
+        self.assertEqual(["SHM_01_job"], shm_job_monitor.poll_job_states(self.user).keys())
+        self.assertEqual("RUNNING",
+                         persistence.get(shm_job_monitor.SHM_JOB_STATES_KEY)["SHM_01_job"]["result"]["status"])
+
+    @patch("enmutils_int.lib.shm_job_monitor._query_job_states")
+    @patch("enmutils_int.lib.shm_job_monitor.time.time")
+    def test_poll_job_states__only_queries_jobs_with_out_of_date_states(self, mock_time, mock_query_job_states):
+        mock_time.return_value = 1000
+        mock_query_job_states.return_value = {"SHM_01_job": {"status": "RUNNING"}}
+        shm_job_monitor.register_job("SHM_01_job")
+        shm_job_monitor.poll_job_states(self.user)
+        mock_time.return_value = 1010
+        shm_job_monitor.register_job("SHM_03_job")
+        mock_query_job_states.return_value = {"SHM_03_job": {"status": "COMPLETED"}}
+
+        self.assertEqual({"SHM_01_job": {"status": "RUNNING"}, "SHM_03_job": {"status": "COMPLETED"}},
+                         shm_job_monitor.poll_job_states(self.user, max_age=30))
+        mock_query_job_states.assert_called_with(self.user, {"SHM_03_job"})
+        self.assertEqual(1000, persistence.get(shm_job_monitor.SHM_JOB_STATES_KEY)["SHM_01_job"]["timestamp"])
+
+    def test_get_job_state__polls_once_per_interval_for_all_monitored_jobs(self):
+        shm_job_monitor.register_job("SHM_03_job")
+        self.assertEqual("RUNNING", shm_job_monitor.get_job_state("SHM_01_job", self.user)["status"])
+        self.assertEqual(1, shm_job_monitor.get_job_state("SHM_03_job", Mock())["jobId"])
+        self.assertEqual(1, self.user.post.call_count)
+
+    @patch("enmutils_int.lib.shm_job_monitor.time.time")
+    def test_get_job_state__polls_again_when_states_are_older_than_max_age(self, mock_time):
+        mock_time.return_value = 1000
+        shm_job_monitor.get_job_state("SHM_01_job", self.user, max_age=30)
+        mock_time.return_value = 1031
+        shm_job_monitor.get_job_state("SHM_01_job", self.user, max_age=30)
+        self.assertEqual(2, self.user.post.call_count)
+
+    def test_get_job_state__returns_none_if_job_not_found_or_poll_fails(self):
+        self.assertIsNone(shm_job_monitor.get_job_state("SHM_99_job", self.user))
+        self.user.post.side_effect = Exception("Error")
+        self.assertIsNone(shm_job_monitor.get_job_state("SHM_98_job", self.user))
+
+
+if __name__ == "__main__":
+    unittest2.main(verbosity=2)
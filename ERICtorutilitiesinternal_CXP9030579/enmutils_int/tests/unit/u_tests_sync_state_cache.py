@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+import unittest2
+from mock import patch, Mock
+
+from enmutils.lib import persistence
+from enmutils_int.lib import sync_state_cache
+from testslib import unit_test_utils
+
+SYNC_STATES = {"Node1": "SYNCHRONIZED", "Node2": "UNSYNCHRONIZED", "Node3": "SYNCHRONIZED"}
+
+
+class SyncStateCacheUnitTests(unittest2.TestCase):
+
+    def setUp(self):
+        unit_test_utils.setup()
+        self.user = Mock()
+
+    def tearDown(self):
+        unit_test_utils.tear_down()
+
+    @patch("enmutils_int.lib.sync_state_cache.config.get_prop", return_value="120")
+    @patch("enmutils_int.lib.sync_state_cache.config.has_prop", side_effect=[False, True])
+    def test_get_max_age__returns_default_or_configured_value(self, *_):
+        self.assertEqual(sync_state_cache.DEFAULT_MAX_AGE, sync_state_cache.get_max_age())
+        self.assertEqual(120, sync_state_cache.get_max_age())
+
+    @patch("enmutils_int.lib.sync_state_cache.get_enm_network_element_sync_states", return_value=SYNC_STATES)
+    def test_refresh_sync_states__persists_states_grouped_by_state(self, mock_get_states):
+        self.assertEqual(SYNC_STATES, sync_state_cache.refresh_sync_states(self.user))
+        mock_get_states.assert_called_with(self.user)
+        cached = persistence.get(sync_state_cache.SYNC_STATES_KEY)
+        self.assertEqual(["Node1", "Node3"], sorted(cached["states"]["SYNCHRONIZED"]))
+        self.assertEqual(["Node2"], cached["states"]["UNSYNCHRONIZED"])
+        self.assertEqual(SYNC_STATES, sync_state_cache._read_cached_sync_states()[1])
+
+    @patch("enmutils_int.lib.sync_state_cache.get_workload_admin_user")
+    @patch("enmutils_int.lib.sync_state_cache.get_enm_network_element_sync_states", return_value=SYNC_STATES)
+    def test_get_sync_states__queries_enm_once_while_cache_is_fresh(self, mock_get_states, mock_admin_user):
+        self.assertEqual(SYNC_STATES, sync_state_cache.get_sync_states())
+        self.assertEqual(SYNC_STATES, sync_state_cache.get_sync_states(user=self.user))
+        self.assertEqual(1, mock_get_states.call_count)
+        mock_get_states.assert_called_with(mock_admin_user.return_value)
+
+    @patch("enmutils_int.lib.sync_state_cache.time.time")
+    @patch("enmutils_int.lib.sync_state_cache.get_enm_network_element_sync_states", return_value=SYNC_STATES)
+    def test_get_sync_states__refreshes_states_older_than_max_age(self, mock_get_states, mock_time):
+        mock_time.return_value = 1000
+        sync_state_cache.get_sync_states(user=self.user)
+        mock_time.return_value = 1100
+        sync_state_cache.get_sync_states(user=self.user, max_age=200)
+        self.assertEqual(1, mock_get_states.call_count)
+        sync_state_cache.get_sync_states(user=self.user, max_age=50)
+        self.assertEqual(2, mock_get_states.call_count)
+
+    @patch("enmutils_int.lib.sync_state_cache.get_enm_network_element_sync_states", return_value=SYNC_STATES)
+    def test_get_cache_age__returns_none_if_nothing_cached(self, _):
+        self.assertIsNone(sync_state_cache.get_cache_age())
+        sync_state_cache.refresh_sync_states(self.user)
+        self.assertLess(sync_state_cache.get_cache_age(), 5)
+
+    @patch("enmutils_int.lib.sync_state_cache.get_sync_states", return_value=SYNC_STATES)
+    def test_split_nodes_by_sync_state__returns_synced_and_unsynced_nodes(self, _):
+        nodes = [Mock(node_id="Node1"), Mock(node_id="Node2"), Mock(node_id="Node4")]
+        synced, unsynced = sync_state_cache.split_nodes_by_sync_state(nodes, user=self.user)
+        self.assertEqual([nodes[0]], synced)
+        self.assertEqual([nodes[1], nodes[2]], unsynced)
+
+
+if __name__ == "__main__":
+    unittest2.main(verbosity=2)
@@ -1,8 +1,9 @@
 #!/usr/bin/env python
 # -*- coding: utf8 -*-
+import json
 from datetime import datetime
 import unittest2
-from mock import Mock, patch
+from mock import Mock, patch, call
 from requests.exceptions import HTTPError, ConnectionError
 from enmutils.lib.exceptions import ScriptEngineResponseValidationError, EnvironError
 from enmutils_int.lib.fm import (_fetch_alarms, acknowledge_alarms, alarmsearch_help, alarmviewer_help,
@@ -15,7 +16,7 @@ from enmutils_int.lib.fm import (_fetch_alarms, acknowledge_alarms, alarmsearch_
                                  add_nodes_to_given_workspace_for_a_user, delete_nodes_from_a_given_workspace_for_a_user,
                                  alarm_search_for_open_alarms, alarm_search_for_historical_alarms,
                                  fetch_response_for_given_search_type, collect_eNodeB_network_logs,
-                                 create_empty_workspace_for_a_user)
+                                 create_empty_workspace_for_a_user, execute_node_action_in_batches)
 from testslib import unit_test_utils
 
 URL = 'http://test.com'
@@ -24,6 +25,11 @@ to_datetime = datetime.now()
 from_datetime = datetime.now().replace(year=2018, day=01, hour=0, minute=0)
 
 
+def raise_for_500(response, message_prefix=""):
+    if response.status_code == 500:
+        raise HTTPError(message_prefix + "Error", response=response)
+
+
 class FMUiRestUnitTests(unittest2.TestCase):
 
     def setUp(self):
@@ -43,11 +49,14 @@ class FMUiRestUnitTests(unittest2.TestCase):
         enable_alarm_supervision(self.user, self.nodes)
         self.assertTrue(self.user.post.called)
 
+    @patch("enmutils_int.lib.fm.time.sleep")
     @patch("enmutils_int.lib.fm.raise_for_status")
-    def test_enable_alarm_supervision_raises_HTTP_error(self, mock_raise_for_status):
+    def test_enable_alarm_supervision_raises_HTTP_error(self, mock_raise_for_status, mock_sleep):
         self.user.post.return_value = Mock()
         mock_raise_for_status.side_effect = HTTPError
         self.assertRaises(HTTPError, enable_alarm_supervision, self.user, self.nodes)
+        self.assertEqual(1, self.user.post.call_count)
+        self.assertFalse(mock_sleep.called)
 
     def test_initiate_alarm_sync_is_success(self):
         response = Mock()
@@ -56,11 +65,14 @@ class FMUiRestUnitTests(unittest2.TestCase):
         initiate_alarm_sync(self.user, self.nodes)
         self.assertTrue(self.user.post.called)
 
+    @patch("enmutils_int.lib.fm.time.sleep")
     @patch("enmutils_int.lib.fm.raise_for_status")
-    def test_initiate_alarm_sync_raises_HTTP_error(self, mock_raise_for_status):
+    def test_initiate_alarm_sync_raises_HTTP_error(self, mock_raise_for_status, mock_sleep):
         self.user.post.return_value = Mock()
         mock_raise_for_status.side_effect = HTTPError
         self.assertRaises(HTTPError, initiate_alarm_sync, self.user, self.nodes)
+        self.assertEqual(1, self.user.post.call_count)
+        self.assertFalse(mock_sleep.called)
 
     @patch('enmutils_int.lib.fm.log.logger.debug')
     def test_acknowledge_alarms_is_success(self, *_):
@@ -86,7 +98,7 @@ class FMUiRestUnitTests(unittest2.TestCase):
     @patch('enmutils_int.lib.fm.log.logger.debug')
     @patch('enmutils_int.lib.fm.raise_for_status')
     def test_acknowledge_alarms__retries_if_http_error(self, mock_raise_for_status, mock_logger_debug,
-                                                       mock_logger_info, mock_fetch_alarms, _):
+                                                       mock_logger_info, mock_fetch_alarms, mock_sleep):
         response = Mock()
         response.json.return_value = [{"header": [{"content_type": "application/json"}]},
                                       {"eventPoIds": ["281486172947712", "281486172587586"]}]
@@ -96,8 +108,11 @@ class FMUiRestUnitTests(unittest2.TestCase):
         mock_raise_for_status.side_effect = [HTTPError, response]
         self.assertRaises(HTTPError, acknowledge_alarms, self.user, self.nodes)
         self.assertEqual(mock_raise_for_status.call_count, 1)
-        self.assertEqual(mock_logger_debug.call_count, 1)
-        self.assertEqual(mock_logger_info.call_count, 2)
+        self.assertEqual(self.user.post.call_count, 2)
+        self.assertEqual(mock_fetch_alarms.call_count, 1)
+        self.assertEqual(mock_logger_info.call_count, 1)
+        self.assertTrue(mock_logger_debug.called)
+        mock_sleep.assert_called_with(120)
 
     @patch('enmutils_int.lib.fm.time.sleep')
     @patch('enmutils_int.lib.fm._fetch_alarms')
@@ -105,7 +120,7 @@ class FMUiRestUnitTests(unittest2.TestCase):
     @patch('enmutils_int.lib.fm.log.logger.debug')
     @patch('enmutils_int.lib.fm.raise_for_status')
     def test_acknowledge_alarms__retries_if_connection_error(self, mock_raise_for_status, mock_logger_debug,
-                                                             mock_logger_info, mock_fetch_alarms, _):
+                                                             mock_logger_info, mock_fetch_alarms, mock_sleep):
         response = Mock()
         response.json.return_value = [{"header": [{"content_type": "application/json"}]},
                                       {"eventPoIds": ["281486172947712", "281486172587586"]}]
@@ -115,8 +130,53 @@ class FMUiRestUnitTests(unittest2.TestCase):
         mock_raise_for_status.side_effect = [ConnectionError, response]
         self.assertRaises(ConnectionError, acknowledge_alarms, self.user, self.nodes)
         self.assertEqual(mock_raise_for_status.call_count, 1)
-        self.assertEqual(mock_logger_debug.call_count, 1)
-        self.assertEqual(mock_logger_info.call_count, 2)
+        self.assertEqual(self.user.post.call_count, 2)
+        self.assertEqual(mock_fetch_alarms.call_count, 1)
+        self.assertEqual(mock_logger_info.call_count, 1)
+        self.assertTrue(mock_logger_debug.called)
+        mock_sleep.assert_called_with(120)
+
+    def test_enable_alarm_supervision__shares_batches_of_nodes_between_users(self):
+        users = [Mock(), Mock()]
+        for user in users:
+            user.post.return_value = Mock(status_code=200)
+        nodes = [Mock(node_id="LTE{0:02}".format(i)) for i in xrange(5)]
+        enable_alarm_supervision(users, nodes, batch_size=2)
+        self.assertEqual(2, users[0].post.call_count)
+        self.assertEqual(1, users[1].post.call_count)
+        payloads = [json.loads(post_call[1]["data"]) for user in users for post_call in user.post.call_args_list]
+        self.assertEqual(sorted(["LTE00;LTE01", "LTE02;LTE03", "LTE04"]),
+                         sorted(payload["nodes"] for payload in payloads))
+        self.assertTrue(all(payload["action"] == "supervision" for payload in payloads))
+
+    @patch("enmutils_int.lib.fm.time.sleep")
+    def test_execute_node_action_in_batches__retries_only_items_of_failed_batches(self, mock_sleep):
+        def post(_, data, **__):
+            return Mock(status_code=500 if "LTE03" in json.loads(data)["nodes"] else 200)
+
+        self.user.post.side_effect = post
+        with patch("enmutils_int.lib.fm.raise_for_status", side_effect=raise_for_500):
+            failures = execute_node_action_in_batches(self.user, ["LTE0{0}".format(i) for i in xrange(6)],
+                                                      {"action": "sync"}, "Failed: ", batch_size=2, max_workers=1,
+                                                      retries=2)
+        self.assertEqual(["LTE02", "LTE03"], sorted(failures))
+        self.assertIsInstance(failures["LTE03"], HTTPError)
+        retried_nodes = [json.loads(post_call[1]["data"])["nodes"]
+                         for post_call in self.user.post.call_args_list[3:]]
+        self.assertEqual(["LTE02;LTE03", "LTE02;LTE03"], retried_nodes)
+        self.assertEqual(2, mock_sleep.call_args_list.count(call(10)))
+
+    def test_execute_node_action_in_batches__no_requests_if_no_items(self):
+        self.assertEqual({}, execute_node_action_in_batches(self.user, [], {"action": "sync"}, "Failed: "))
+        self.assertFalse(self.user.post.called)
+
+    @patch("enmutils_int.lib.fm.raise_for_status", side_effect=raise_for_500)
+    @patch("enmutils_int.lib.fm.time.sleep")
+    def test_initiate_alarm_sync__raises_error_without_retrying_failed_nodes(self, mock_sleep, _):
+        self.user.post.return_value = Mock(status_code=500)
+        self.assertRaises(HTTPError, initiate_alarm_sync, self.user, self.nodes)
+        self.assertEqual(1, self.user.post.call_count)
+        self.assertFalse(mock_sleep.called)
 
     def test_network_explorer_search_for_nodes_is_success(self):
         response = Mock()
@@ -137,11 +197,23 @@ class FMUiRestUnitTests(unittest2.TestCase):
         _fetch_alarms(self.user, self.nodes)
         self.assertTrue(self.user.post.called)
 
+    @patch("enmutils_int.lib.fm.time.sleep")
     @patch("enmutils_int.lib.fm.raise_for_status")
-    def test_fetch_alarms_raises_HTTP_error(self, mock_raise_for_status):
+    def test_fetch_alarms_raises_HTTP_error(self, mock_raise_for_status, mock_sleep):
         self.user.post.return_value = Mock()
         mock_raise_for_status.side_effect = HTTPError
         self.assertRaises(HTTPError, _fetch_alarms, self.user, self.nodes)
+        self.assertEqual(2, self.user.post.call_count)
+        mock_sleep.assert_called_once_with(120)
+
+    @patch("enmutils_int.lib.fm.time.sleep")
+    @patch("enmutils_int.lib.fm.raise_for_status")
+    def test_fetch_alarms__retries_if_connection_error(self, mock_raise_for_status, _):
+        response = Mock()
+        self.user.post.side_effect = [ConnectionError, response]
+        mock_raise_for_status.side_effect = lambda *args, **kwargs: None
+        self.assertEqual(response, _fetch_alarms(self.user, self.nodes))
+        self.assertEqual(2, self.user.post.call_count)
 
     def tests_alarm_viewer_help_success(self):
         response = Mock()
@@ -41,7 +41,7 @@ class UserManagerServiceUnitTests(ParameterizedTestCase):
     @patch("enmutils_int.lib.services.usermanager.execute_create_flow",
            return_value=([{"username": 'test', "password": 'test', "keep_password": 'test',
                            "persist": 'test', "_session_key": 'test'}], []))
-    @patch('enmutils_int.lib.services.usermanager.CustomContainsQueue.block_until_item_removed')
+    @patch('enmutils_int.lib.services.usermanager.KeyedWorkRegistry.block_until_item_removed')
     @patch("enmutils_int.lib.services.usermanager.user_count_threshold_abort_check")
     @patch("enmutils_int.lib.services.usermanager.helper.create_user_role_objects")
     @patch("enmutils_int.lib.services.usermanager.helper.generate_user_info_list", return_value=[{'test_user': 'test'}])
@@ -57,7 +57,7 @@ class UserManagerServiceUnitTests(ParameterizedTestCase):
     @patch("enmutils_int.lib.services.usermanager.user_count_threshold_abort_check")
     @patch("enmutils_int.lib.services.usermanager.helper.create_user_role_objects")
     @patch("enmutils_int.lib.services.usermanager.execute_create_flow", side_effect=Exception("Some Error"))
-    @patch('enmutils_int.lib.services.usermanager.CustomContainsQueue.block_until_item_removed')
+    @patch('enmutils_int.lib.services.usermanager.KeyedWorkRegistry.block_until_item_removed')
     @patch('enmutils_int.lib.services.usermanager.log.logger')
     @patch('enmutils_int.lib.services.usermanager.abort_with_message')
     def test_create__is_failed_if_enm_error(self, mock_abort, mock_logger, *_):
@@ -68,7 +68,7 @@ class UserManagerServiceUnitTests(ParameterizedTestCase):
         mock_abort.assert_called_with(MESSAGE, mock_logger, usermanager.SERVICE_NAME, LOG_DIR, http_status_code=500)
 
     @patch("enmutils_int.lib.services.usermanager.user_count_threshold_abort_check")
-    @patch('enmutils_int.lib.services.usermanager.CustomContainsQueue.block_until_item_removed')
+    @patch('enmutils_int.lib.services.usermanager.KeyedWorkRegistry.block_until_item_removed')
     @patch('enmutils_int.lib.services.usermanager.log.logger')
     @patch('enmutils_int.lib.services.usermanager.abort_with_message')
     def test_create__is_failed_if_missing_manditory_data_in_request(self, mock_abort, mock_logger, mock_block, *_):
@@ -279,7 +279,7 @@ class UserManagerServiceUnitTests(ParameterizedTestCase):
         mock_debug.assert_any_call("User not deleted from ENM, error encountered :: Error")
         self.assertEqual(0, mock_delete.call_count)
 
-    @patch('enmutils_int.lib.services.usermanager.CustomContainsQueue.get_item')
+    @patch('enmutils_int.lib.services.usermanager.KeyedWorkRegistry.get_item')
     @patch('enmutils_int.lib.services.usermanager.delete_profile_users')
     def test_delete_profile_users_from_enm__calls_delete_profile_users(self, mock_delete, mock_get_item):
         profile = "Test"
@@ -307,7 +307,7 @@ class UserManagerServiceUnitTests(ParameterizedTestCase):
     @patch('enmutils_int.lib.services.usermanager.extract_delete_user_values', return_value=[None, "AP_11", ["ADMIN"]])
     @patch('enmutils_int.lib.services.usermanager.get_json_response',
            return_value=('{"message": "", "success": true}', 200, {'ContentType': 'application/json'}))
-    @patch('enmutils_int.lib.services.usermanager.CustomContainsQueue.put_unique')
+    @patch('enmutils_int.lib.services.usermanager.KeyedWorkRegistry.put_unique')
     @patch('enmutils_int.lib.services.usermanager.helper.get_enm_users_with_matching_user_roles',
            return_value=["user1", "user2"])
     @patch('enmutils_int.lib.services.usermanager.log.logger')
@@ -325,7 +325,7 @@ class UserManagerServiceUnitTests(ParameterizedTestCase):
     @patch('enmutils_int.lib.services.usermanager.extract_delete_user_values', return_value=[None, "AP_11", None])
     @patch('enmutils_int.lib.services.usermanager.get_json_response',
            return_value=('{"message": "", "success": true}', 200, {'ContentType': 'application/json'}))
-    @patch('enmutils_int.lib.services.usermanager.CustomContainsQueue.put_unique')
+    @patch('enmutils_int.lib.services.usermanager.KeyedWorkRegistry.put_unique')
     @patch('enmutils_int.lib.services.usermanager.create_and_start_once_off_background_scheduled_job')
     @patch('enmutils_int.lib.services.usermanager.log.logger')
     def test_delete_users__delete_all_profile_success(self, mock_logger, mock_create, mock_put, *_):
@@ -154,6 +154,14 @@ class WorkloadNetworkManagerUnitTests(ParameterizedTestCase):
         self.assertTrue(config.has_prop('network_config'))
         self.assertEqual(self.input_data.network_key, 'soem_five_k_network')
 
+    @patch('enmutils_int.lib.workload_network_manager.InputData.network_size')
+    def test_network_key__uses_supplied_network_config_over_configured_value(self, mock_network_size):
+        config.set_prop('network_config', 'SOEM')
+        self.input_data.network_config = 'extra-small'
+        self.assertEqual(self.input_data.network_key, map_synonym_to_network_size('extra-small'))
+        self.assertNotEqual(map_synonym_to_network_size('SOEM'), self.input_data.network_key)
+        self.assertFalse(mock_network_size.called)
+
     @patch('enmutils_int.lib.workload_network_manager.InputData.network_size', return_value=1000)
     def test_network_key__extra_small_key_returned(self, *_):
         config.set_prop('network_config', 'extra-small')
@@ -1154,6 +1154,24 @@ class StatusOperationUnitTests(ParameterizedTestCase):
         mock_logger.debug.assert_called_with("Number of workload admins found on ENM: 1\nAll usernames found: "
                                              "[u'workload_admin_host']")
 
+    @patch('enmutils_int.lib.workload_ops.persistence_monitor.check_health', return_value=["High memory"])
+    @patch('enmutils_int.lib.workload_ops.persistence_monitor.get_history', return_value=[{"time": 1}, {"time": 2}])
+    @patch('enmutils_int.lib.workload_ops.log.logger')
+    def test_check_persistence_health__warns_of_latest_sample_health(self, mock_logger, _, mock_check_health):
+        op = workload_ops.StatusOperation(argument_dict=self.default_arg_dict)
+        op.check_persistence_health()
+        mock_check_health.assert_called_once_with({"time": 2}, [{"time": 1}])
+        mock_logger.warn.assert_called_once_with("PERSISTENCE WARNING : High memory")
+
+    @patch('enmutils_int.lib.workload_ops.persistence_monitor.check_health')
+    @patch('enmutils_int.lib.workload_ops.persistence_monitor.get_history', return_value=[])
+    @patch('enmutils_int.lib.workload_ops.log.logger')
+    def test_check_persistence_health__does_nothing_if_no_samples(self, mock_logger, _, mock_check_health):
+        op = workload_ops.StatusOperation(argument_dict=self.default_arg_dict)
+        op.check_persistence_health()
+        self.assertFalse(mock_check_health.called)
+        self.assertFalse(mock_logger.warn.called)
+
     @patch('enmutils_int.lib.workload_ops.check_enm_access', return_value=(False, 'no access'))
     @patch('enmutils_int.lib.workload_ops.log.logger')
     def test_check_if_enm_accessible__adds_warning(self, mock_logger, _):
@@ -1872,6 +1890,61 @@ class StartOperationUnitTests(ParameterizedTestCase):
         self.assertTrue(mock_schedule.return_value.start.called)
         self.assertFalse(mock_allocate_nodes_to_exclusive_profiles.called)
 
+    @patch('enmutils_int.lib.workload_ops.deployment_info_helper_methods.output_network_basic')
+    @patch('enmutils_int.lib.workload_ops.StartOperation._plan_node_allocation')
+    @patch('enmutils_int.lib.workload_ops.StartOperation._allocate_nodes_to_exclusive_profiles')
+    @patch('enmutils_int.lib.workload_ops.workload_schedule.WorkloadSchedule')
+    def test_execute_operation__in_startoperation_plans_allocation_before_starting_profiles(
+            self, mock_schedule, mock_allocate_nodes_to_exclusive_profiles, mock_plan_node_allocation, *_):
+        args_dict = {'--schedule': None, '--conf': None, '--force': False, '--include': None, '--updated': False,
+                     '--release-exclusive-nodes': False, '--network-check': False, '--no-exclusive': False,
+                     '--once-before-stability': False, '--priority': None, '--new-only': False,
+                     '--no-network-size-check': False, '--plan-allocation': True, '--dry-run': False}
+        op = workload_ops.StartOperation(args_dict, profile_names=["TEST_PROFILE_01"])
+        op._execute_operation()
+        self.assertTrue(mock_allocate_nodes_to_exclusive_profiles.called)
+        self.assertTrue(mock_plan_node_allocation.called)
+        self.assertTrue(mock_schedule.return_value.start.called)
+
+    @patch('enmutils_int.lib.workload_ops.deployment_info_helper_methods.output_network_basic')
+    @patch('enmutils_int.lib.workload_ops.StartOperation._plan_node_allocation')
+    @patch('enmutils_int.lib.workload_ops.StartOperation._allocate_nodes_to_exclusive_profiles')
+    @patch('enmutils_int.lib.workload_ops.workload_schedule.WorkloadSchedule')
+    def test_execute_operation__in_startoperation_only_plans_allocation_if_dry_run(
+            self, mock_schedule, mock_allocate_nodes_to_exclusive_profiles, mock_plan_node_allocation, *_):
+        args_dict = {'--schedule': None, '--conf': None, '--force': False, '--include': None, '--updated': False,
+                     '--release-exclusive-nodes': False, '--network-check': False, '--no-exclusive': False,
+                     '--once-before-stability': False, '--priority': None, '--new-only': False,
+                     '--no-network-size-check': False, '--plan-allocation': False, '--dry-run': True}
+        op = workload_ops.StartOperation(args_dict, profile_names=["TEST_PROFILE_01"])
+        op._execute_operation()
+        self.assertTrue(mock_plan_node_allocation.called)
+        self.assertFalse(mock_allocate_nodes_to_exclusive_profiles.called)
+        self.assertFalse(mock_schedule.called)
+
+    @patch('enmutils_int.lib.workload_ops.nodemanager_adaptor.update_nodes_cache_on_request')
+    @patch('enmutils_int.lib.workload_ops.allocation_planner.AllocationPlanner')
+    def test_plan_node_allocation__commits_plan_and_refreshes_service_cache(
+            self, mock_planner, mock_update_nodes_cache_on_request):
+        op = workload_ops.StartOperation.__new__(workload_ops.StartOperation)
+        op.valid_profiles, op.dry_run, op.nodemanager_service_to_be_used = {"TEST_01": Mock()}, False, True
+        op._plan_node_allocation()
+        self.assertTrue(mock_planner.return_value.plan.called)
+        self.assertTrue(mock_planner.return_value.log_plan.called)
+        self.assertTrue(mock_planner.return_value.commit.called)
+        self.assertTrue(mock_update_nodes_cache_on_request.called)
+
+    @patch('enmutils_int.lib.workload_ops.nodemanager_adaptor.update_nodes_cache_on_request')
+    @patch('enmutils_int.lib.workload_ops.allocation_planner.AllocationPlanner')
+    def test_plan_node_allocation__does_not_commit_plan_if_dry_run(
+            self, mock_planner, mock_update_nodes_cache_on_request):
+        op = workload_ops.StartOperation.__new__(workload_ops.StartOperation)
+        op.valid_profiles, op.dry_run, op.nodemanager_service_to_be_used = {"TEST_01": Mock()}, True, True
+        op._plan_node_allocation()
+        self.assertTrue(mock_planner.return_value.log_plan.called)
+        self.assertFalse(mock_planner.return_value.commit.called)
+        self.assertFalse(mock_update_nodes_cache_on_request.called)
+
     @patch('enmutils_int.lib.workload_ops.node_pool_mgr.mutex')
     @patch('enmutils_int.lib.workload_ops.node_pool_mgr.get_pool')
     @patch('enmutils_int.lib.workload_ops.StartOperation._allocate_exclusive_nodes')
@@ -2429,6 +2502,25 @@ class WorkloadPoolSummaryOperationUnitTests(ParameterizedTestCase):
         self.assertFalse(mock_print_node_pool_summary.called)
         self.assertTrue(mock_info.called)
 
+    @patch("enmutils_int.lib.workload_ops.tabulate")
+    @patch("enmutils_int.lib.workload_ops.log.logger.info")
+    @patch("enmutils_int.lib.workload_ops.node_pool_mgr.get_pool_stats")
+    def test_print_node_pool_summary__prints_counts_per_ne_type(self, mock_get_pool_stats, _, mock_tabulate):
+        mock_get_pool_stats.return_value = {
+            "RadioNode": {"total": 5, "allocated": 1, "exclusive": 0, "profiles": {"FM_01": 1}},
+            "ERBS": {"total": 4, "allocated": 3, "exclusive": 2, "profiles": {"SHM_01": 3}}}
+        op = workload_ops.WorkloadPoolSummaryOperation()
+        op.total_nodes = 9
+        op._print_node_pool_summary()
+        mock_tabulate.assert_called_with([["ERBS", 4, 3, 1, 2], ["RadioNode", 5, 1, 4, 0]],
+                                         headers=["NE Type", "Total", "Allocated", "Unallocated", "Exclusive"])
+
+    @patch("enmutils_int.lib.workload_ops.node_pool_mgr.get_pool_stats")
+    def test_print_node_pool_summary__does_not_read_counters_if_no_nodes(self, mock_get_pool_stats):
+        op = workload_ops.WorkloadPoolSummaryOperation()
+        op._print_node_pool_summary()
+        self.assertFalse(mock_get_pool_stats.called)
+
     def test__execute_operation__raises_notimplementederror(self):
         op = workload_ops.WorkloadPoolSummaryOperation()
         with self.assertRaises(NotImplementedError):
@@ -2670,13 +2762,17 @@ class ListNodesOperationUnitTests(ParameterizedTestCase):
 
     @patch("enmutils_int.lib.workload_ops.WorkloadInfoOperation.__init__", return_value=None)
     @patch("enmutils_int.lib.workload_ops.WorkloadInfoOperation._setup")
+    @patch("enmutils_int.lib.workload_ops.node_pool_mgr.get_pool_stats")
     @patch("enmutils_int.lib.workload_ops.node_pool_mgr.get_pool")
-    def test_setup__is_successful_if_service_not_used(self, mock_get_pool, *_):
+    def test_setup__is_successful_if_service_not_used(self, mock_get_pool, mock_get_pool_stats, *_):
+        mock_get_pool.return_value.nodes = [Mock(), Mock(), Mock()]
         args_dict = {"IDENTIFIER": "all", "--json": True, "--errored-nodes": False, "--profiles": None}
         op = workload_ops.ListNodesOperation(argument_dict=args_dict)
         op.nodemanager_service_to_be_used = False
         op._setup()
         self.assertTrue(mock_get_pool.called)
+        self.assertEqual(3, op.total_nodes)
+        self.assertFalse(mock_get_pool_stats.called)
 
 
 class KillOperationUnitTests(ParameterizedTestCase):
@@ -2697,6 +2793,7 @@ class KillOperationUnitTests(ParameterizedTestCase):
         with self.assertRaises(NotImplementedError):
             op._validate()
 
+    @patch("enmutils_int.lib.workload_ops.profile_host.stop_hosted_profile", return_value=None)
     @patch("enmutils_int.lib.workload_ops.persistence.get_all_keys",
            return_value={'HA_01': 0, 'SHM_01': 1, 'active_workload_profiles': ['py', 'msg', 'SHM_01']})
     @patch('enmutils_int.lib.node_pool_mgr.persistence.get', return_value=['py', 'msg', 'SHM_01'])
@@ -2708,6 +2805,7 @@ class KillOperationUnitTests(ParameterizedTestCase):
         op = workload_ops.KillOperation(profile_names=['SHM_01'])
         op._execute_operation()
 
+    @patch("enmutils_int.lib.workload_ops.profile_host.stop_hosted_profile", return_value=None)
     @patch("enmutils_int.lib.workload_ops.persistence.get_all_keys", return_value=[])
     @patch('enmutils_int.lib.node_pool_mgr.persistence.get', return_value=[])
     @patch("enmutils_int.lib.workload_ops.process.get_profile_daemon_pid", return_value=[])
@@ -2720,6 +2818,7 @@ class KillOperationUnitTests(ParameterizedTestCase):
         op._execute_operation()
         self.assertTrue(mock_log.logger.info.called)
 
+    @patch("enmutils_int.lib.workload_ops.profile_host.stop_hosted_profile", return_value=None)
     @patch("enmutils_int.lib.workload_ops.persistence.get_all_keys",
            return_value={'HA_01': 0, 'SHM_01': 1, 'active_workload_profiles': ['py', 'msg', 'SHM_01']})
     @patch('enmutils_int.lib.node_pool_mgr.persistence.get', return_value=['py', 'msg', 'SHM_01'])
@@ -2734,6 +2833,7 @@ class KillOperationUnitTests(ParameterizedTestCase):
         self.assertFalse(op._execute_operation())
         self.assertTrue(mock_profile_pid)
 
+    @patch("enmutils_int.lib.workload_ops.profile_host.stop_hosted_profile", return_value=None)
     @patch("enmutils_int.lib.workload_ops.persistence.get_all_keys",
            return_value={'HA_01': 0, 'SHM_01': 1, 'active_workload_profiles': ['py', 'msg', 'SHM_01']})
     @patch('enmutils_int.lib.node_pool_mgr.persistence.get', return_value=['py', 'msg', 'SHM_01'])
@@ -2748,6 +2848,7 @@ class KillOperationUnitTests(ParameterizedTestCase):
         self.assertFalse(op._execute_operation())
         self.assertTrue(mock_profile_pid)
 
+    @patch("enmutils_int.lib.workload_ops.profile_host.stop_hosted_profile", return_value=None)
     @patch("enmutils_int.lib.workload_ops.persistence.get_all_keys",
            return_value={'HA_01': 0, 'SHM_01': 1, 'active_workload_profiles': ['py', 'msg', 'SHM_01']})
     @patch('enmutils_int.lib.node_pool_mgr.persistence.get', return_value=['py', 'msg', 'SHM_01'])
@@ -2760,6 +2861,20 @@ class KillOperationUnitTests(ParameterizedTestCase):
         op = workload_ops.KillOperation(profile_names=['HA_01'])
         op._execute_operation()
 
+    @patch("enmutils_int.lib.workload_ops.persistence.get_all_keys", return_value={'SHM_01': 1})
+    @patch('enmutils_int.lib.node_pool_mgr.persistence.get', return_value=['SHM_01'])
+    @patch("enmutils_int.lib.workload_ops.profile_host.stop_hosted_profile", return_value="PROFILE_HOST_1")
+    @patch("enmutils_int.lib.workload_ops.process.get_profile_daemon_pid", return_value=["123"])
+    @patch("enmutils_int.lib.workload_ops.process.kill_process_id")
+    @patch("enmutils_int.lib.workload_ops.profilemanager.delete_pid_files")
+    @patch("enmutils_int.lib.workload_ops.profilemanager_adaptor.can_service_be_used", return_value=False)
+    def test_execute_operation__requests_host_to_stop_hosted_profile_instead_of_killing_host(
+            self, _, __, mock_kill_process_id, mock_get_pid, mock_stop_hosted_profile, *___):
+        workload_ops.KillOperation(profile_names=['SHM_01'])._execute_operation()
+        mock_stop_hosted_profile.assert_called_once_with('SHM_01')
+        self.assertFalse(mock_get_pid.called)
+        self.assertFalse(mock_kill_process_id.called)
+
 
 if __name__ == '__main__':
     unittest2.main(verbosity=2)
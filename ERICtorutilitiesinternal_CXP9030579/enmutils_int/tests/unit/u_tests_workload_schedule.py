@@ -202,6 +202,16 @@ class WorkloadScheduleUnitTests(unittest2.TestCase):
         self.assertEqual(mock_finished.call_count, 1)
         self.assertEqual(mock_execute.call_count, 0)
 
+    @patch('enmutils_int.lib.workload_schedule.WorkloadSchedule.check_for_existing_process',
+           side_effect=[False, True, False])
+    @patch('enmutils_int.lib.workload_schedule.WorkloadSchedule._execute')
+    def test_start_profile__executes_profiles_not_running_in_order_started(self, mock_execute, _):
+        profiles = OrderedDict([("TEST_01", (0, 0)), ("TEST_02", (0, 0)), ("TEST_03", (0, 0))])
+        for profile, sleeps in profiles.iteritems():
+            self.schedule._start_profile(profile, sleeps, profiles)
+        self.assertEqual([(0, "TEST_01"), (1, "TEST_03")],
+                         [execute_call[0][:2] for execute_call in mock_execute.call_args_list])
+
     @patch('enmutils_int.lib.workload_schedule.WorkloadSchedule.parse_schedule_file')
     @patch('enmutils_int.lib.workload_schedule.WorkloadSchedule._finished')
     @patch('enmutils_int.lib.workload_schedule.log.logger.error')
@@ -246,5 +256,109 @@ class WorkloadScheduleUnitTests(unittest2.TestCase):
         self.assertEqual(4, mock_debug.call_count)
 
 
+class StartSchedulerUnitTests(unittest2.TestCase):
+
+    def setUp(self):
+        unit_test_utils.setup()
+
+    def tearDown(self):
+        unit_test_utils.tear_down()
+
+    @staticmethod
+    def _get_scheduler(profiles, dependencies, **kwargs):
+        scheduler = workload_schedule.StartScheduler(profiles, dependencies, Mock(), **kwargs)
+        scheduler._run = Mock()  # Starts remain in progress until finished by the test
+        return scheduler
+
+    @staticmethod
+    def _finish(scheduler, name):
+        with scheduler.condition:
+            scheduler._finish(name)
+
+    def test_get_start_dependencies__returns_setup_and_configured_profiles_being_started(self):
+        dependencies = workload_schedule.get_start_dependencies(
+            ["SHM_SETUP", "SHM_01", "ASU_01", "NHM_REST_NBI_03", "NHM_SETUP", "FM_0506", "FM_01", "CMSYNC_02"])
+        self.assertEqual([], dependencies["SHM_SETUP"])
+        self.assertEqual(["SHM_SETUP"], dependencies["SHM_01"])
+        self.assertEqual(["SHM_SETUP"], dependencies["ASU_01"])
+        self.assertEqual(["NHM_SETUP"], dependencies["NHM_REST_NBI_03"])
+        self.assertEqual(["FM_0506"], dependencies["FM_01"])
+        self.assertEqual([], dependencies["CMSYNC_02"])
+
+    @patch("enmutils_int.lib.workload_schedule.profile_values.networks",
+           {"basic": {"app": {"APP_SETUP": {workload_schedule.basic_network.DEPENDENT: ["APP_02"]},
+                              "APP_02": {workload_schedule.basic_network.START_AFTER: ["OTHER_01"]}}}})
+    def test_get_configured_start_dependencies__reads_start_after_and_dependent_profiles(self):
+        self.assertEqual({"APP_SETUP": [], "APP_02": ["OTHER_01", "APP_SETUP"]},
+                         {name: sorted(dependencies, reverse=True) for name, dependencies in
+                          workload_schedule.get_configured_start_dependencies().iteritems()})
+
+    def test_start_ready_profiles__starts_dependent_profiles_after_the_profiles_they_depend_on(self):
+        profiles = OrderedDict([("SHM_01", (1, 0)), ("CMSYNC_01", (1, 0)), ("SHM_SETUP", (5, 0)), ("SHM_02", (1, 0))])
+        scheduler = self._get_scheduler(profiles, workload_schedule.get_start_dependencies(profiles), parallelism=4)
+
+        self.assertEqual(["CMSYNC_01", "SHM_SETUP"], scheduler._start_ready_profiles())
+        self._finish(scheduler, "CMSYNC_01")
+        self.assertEqual([], scheduler._start_ready_profiles())
+        self._finish(scheduler, "SHM_SETUP")
+        self.assertEqual(["SHM_01", "SHM_02"], scheduler._start_ready_profiles())
+
+    def test_start_ready_profiles__limits_starts_in_progress_to_parallelism_and_load_budget(self):
+        profiles = OrderedDict(("TEST_0{0}".format(index), (2, 0)) for index in xrange(6))
+        scheduler = self._get_scheduler(profiles, {}, parallelism=4)
+        self.assertEqual(["TEST_00", "TEST_01", "TEST_02", "TEST_03"], scheduler._start_ready_profiles())
+        self._finish(scheduler, "TEST_01")
+        self.assertEqual(["TEST_04"], scheduler._start_ready_profiles())
+
+        scheduler = self._get_scheduler(profiles, {}, parallelism=4, load_budget=5)
+        self.assertEqual(["TEST_00", "TEST_01"], scheduler._start_ready_profiles())
+
+    def test_start_ready_profiles__starts_profile_exceeding_load_budget_on_its_own(self):
+        profiles = OrderedDict([("TEST_01", (1, 0)), ("TEST_02", (9, 0)), ("TEST_03", (1, 0))])
+        scheduler = self._get_scheduler(profiles, {}, parallelism=4, load_budget=5)
+
+        self.assertEqual(["TEST_01"], scheduler._start_ready_profiles())
+        self._finish(scheduler, "TEST_01")
+        self.assertEqual(["TEST_02"], scheduler._start_ready_profiles())
+        self._finish(scheduler, "TEST_02")
+        self.assertEqual(["TEST_03"], scheduler._start_ready_profiles())
+
+    def test_start_ready_profiles__starts_profiles_one_at_a_time_in_schedule_order_without_parallelism(self):
+        profiles = OrderedDict([("TEST_01", (0, 0)), ("TEST_02", (0, 0))])
+        scheduler = self._get_scheduler(profiles, {})
+
+        self.assertEqual(["TEST_01"], scheduler._start_ready_profiles())
+        self._finish(scheduler, "TEST_01")
+        self.assertEqual(["TEST_02"], scheduler._start_ready_profiles())
+
+    def test_start_ready_profiles__starts_profile_whose_dependencies_cannot_be_met(self):
+        profiles = OrderedDict([("TEST_01", (0, 0)), ("TEST_02", (0, 0))])
+        scheduler = self._get_scheduler(profiles, {"TEST_01": ["TEST_02"], "TEST_02": ["TEST_01"]}, parallelism=4)
+
+        self.assertEqual(["TEST_01"], scheduler._start_ready_profiles())
+        self._finish(scheduler, "TEST_01")
+        self.assertEqual(["TEST_02"], scheduler._start_ready_profiles())
+
+    def test_run__starts_all_profiles_continuing_if_start_of_profile_fails(self):
+        profiles = OrderedDict([("TEST_SETUP", (0, 0)), ("TEST_01", (0, 0))])
+        start_func = Mock(side_effect=[Exception("Error"), None])
+        scheduler = workload_schedule.StartScheduler(profiles, {"TEST_01": ["TEST_SETUP"]}, start_func, parallelism=4)
+        scheduler.run()
+
+        self.assertEqual(["TEST_SETUP", "TEST_01"], [start_call[0][0] for start_call in start_func.call_args_list])
+        self.assertEqual({"TEST_SETUP", "TEST_01"}, scheduler.started)
+        self.assertEqual({}, scheduler.in_progress)
+
+    def test_get_timeline__charts_each_profile_start(self):
+        scheduler = workload_schedule.StartScheduler(OrderedDict(), {}, Mock())
+        scheduler.start_time = 100
+        scheduler.timeline = OrderedDict([("TEST_SETUP", [100, 130]), ("TEST_01", [130, 160])])
+        lines = scheduler.get_timeline().split("\n")
+
+        self.assertEqual(3, len(lines))
+        self.assertEqual("TEST_SETUP |" + "#" * 30 + " " * 30 + "|    0.0s - 30.0s", lines[1])
+        self.assertEqual("TEST_01    |" + " " * 30 + "#" * 30 + "|   30.0s - 60.0s", lines[2])
+
+
 if __name__ == "__main__":
     unittest2.main(verbosity=2)
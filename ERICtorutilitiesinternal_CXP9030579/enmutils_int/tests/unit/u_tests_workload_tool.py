@@ -5,7 +5,8 @@ from mock import patch, Mock
 from enmutils_int.bin.workload import (log_workload_message, perform_cli_pre_checks, cli, SessionNotEstablishedException,
                                        _validate_profiles, _update_config, _get_existing_profiles_in_categories,
                                        _do_profiles_validation_against_existing_profiles, _validate_categories,
-                                       _ignoring_profiles, _remove_duplicates, display_workload_operation_info_message)
+                                       _ignoring_profiles, _remove_duplicates, display_workload_operation_info_message,
+                                       is_registry_operation, display_registry_operation)
 from testslib import unit_test_utils
 
 
@@ -163,7 +164,7 @@ class WorkloadToolUnitTests(unittest2.TestCase):
     @patch('enmutils_int.bin.workload.docopt')
     @patch('enmutils_int.bin.workload._validate_profiles')
     @patch('enmutils_int.bin.workload._update_config')
-    @patch('enmutils_int.bin.workload.workload_ops_node_operations.get_workload_operations')
+    @patch('enmutils_int.lib.workload_ops_node_operations.get_workload_operations')
     @patch('enmutils_int.bin.workload.init.exit')
     @patch('enmutils_int.bin.workload.perform_cli_pre_checks')
     def test_cli__workload_node_op_called(self, mock_perform_cli_pre_checks, mock_init, mock_get_op, *_):
@@ -172,6 +173,54 @@ class WorkloadToolUnitTests(unittest2.TestCase):
         self.assertEqual(1, mock_get_op.return_value.execute.call_count)
         mock_init.assert_called_with(0)
 
+    @patch('enmutils_int.bin.workload.display_workload_operation_info_message')
+    @patch('enmutils_int.bin.workload.signal.signal')
+    @patch('enmutils_int.bin.workload.init.global_init')
+    @patch('enmutils_int.bin.workload.docopt')
+    @patch('enmutils_int.bin.workload._validate_profiles', return_value=["PM_26"])
+    @patch('enmutils_int.bin.workload._update_config')
+    @patch('enmutils_int.bin.workload.display_registry_operation')
+    @patch('enmutils_int.lib.workload_ops.get_workload_operations')
+    @patch('enmutils_int.bin.workload.init.exit')
+    @patch('enmutils_int.bin.workload.perform_cli_pre_checks')
+    def test_cli__describe_is_answered_from_registry(self, mock_perform_cli_pre_checks, mock_init, mock_get_op,
+                                                     mock_display, _, __, mock_docopt, ___, ____, mock_info_message):
+        self.argument_dict.update({"status": False, "describe": True, "--exclusive": False})
+        mock_docopt.return_value = self.argument_dict
+        mock_perform_cli_pre_checks.return_value = None, "describe"
+        cli()
+        mock_display.assert_called_with("describe", ["PM_26"])
+        self.assertFalse(mock_get_op.called)
+        self.assertFalse(mock_info_message.called)
+        mock_init.assert_called_with(0)
+
+    def test_is_registry_operation__only_for_operations_reading_profile_information(self):
+        self.argument_dict["--exclusive"] = False
+        self.assertTrue(all(is_registry_operation(operation_type, self.argument_dict)
+                            for operation_type in ["profiles", "category", "describe"]))
+        self.assertFalse(is_registry_operation("status", self.argument_dict))
+        self.argument_dict["--exclusive"] = True
+        self.assertFalse(is_registry_operation("profiles", self.argument_dict))
+
+    @patch('enmutils_int.bin.workload.get_all_profile_names', return_value=["ap_01", "cli_mon_01"])
+    @patch('enmutils_int.bin.workload.log.logger.info')
+    def test_display_registry_operation__lists_profiles(self, mock_info, _):
+        display_registry_operation("profiles", [])
+        self.assertIn("AP_01, CLI_MON_01", mock_info.call_args[0][0])
+
+    @patch('enmutils_int.bin.workload.get_categories', return_value=["ap", "cli_mon"])
+    @patch('enmutils_int.bin.workload.log.logger.info')
+    def test_display_registry_operation__lists_categories(self, mock_info, _):
+        display_registry_operation("category", [])
+        self.assertIn("ap, cli_mon", mock_info.call_args[0][0])
+
+    @patch('enmutils_int.bin.workload.profile_registry.print_basic_network_values')
+    @patch('enmutils_int.bin.workload.profile_registry.print_profile_description')
+    def test_display_registry_operation__describes_each_profile(self, mock_description, mock_values):
+        display_registry_operation("describe", ["AP_01", "CLI_MON_01"])
+        self.assertEqual(2, mock_description.call_count)
+        mock_values.assert_called_with("CLI_MON_01")
+
     @patch('enmutils_int.bin.workload.signal.signal')
     @patch('enmutils_int.bin.workload.init.global_init')
     @patch('enmutils_int.bin.workload.exception.handle_invalid_argument')
@@ -179,7 +228,7 @@ class WorkloadToolUnitTests(unittest2.TestCase):
     @patch('enmutils_int.bin.workload._validate_profiles')
     @patch('enmutils_int.bin.workload._update_config')
     @patch('enmutils_int.bin.workload.exception.process_exception')
-    @patch('enmutils_int.bin.workload.workload_ops.get_workload_operations')
+    @patch('enmutils_int.lib.workload_ops.get_workload_operations')
     @patch('enmutils_int.bin.workload.init.exit')
     @patch('enmutils_int.bin.workload.perform_cli_pre_checks')
     def test_cli__fails_if_session_not_established_error(self, mock_perform_cli_pre_checks, mock_init, mock_get_op, *_):
@@ -196,7 +245,7 @@ class WorkloadToolUnitTests(unittest2.TestCase):
     @patch('enmutils_int.bin.workload.exception.process_exception')
     @patch('enmutils_int.bin.workload.display_workload_operation_info_message')
     @patch('enmutils_int.bin.workload.docopt')
-    @patch('enmutils_int.bin.workload.workload_ops.get_workload_operations')
+    @patch('enmutils_int.lib.workload_ops.get_workload_operations')
     @patch('enmutils_int.bin.workload.init.exit')
     @patch('enmutils_int.bin.workload.perform_cli_pre_checks')
     def test_cli__when_getting_profile_status_in_json_format(self, mock_perform_cli_pre_checks, mock_init,
@@ -217,7 +266,7 @@ class WorkloadToolUnitTests(unittest2.TestCase):
     @patch('enmutils_int.bin.workload.exception.process_exception')
     @patch('enmutils_int.bin.workload.display_workload_operation_info_message')
     @patch('enmutils_int.bin.workload.docopt')
-    @patch('enmutils_int.bin.workload.workload_ops.get_workload_operations')
+    @patch('enmutils_int.lib.workload_ops.get_workload_operations')
     @patch('enmutils_int.bin.workload.init.exit')
     @patch('enmutils_int.bin.workload.perform_cli_pre_checks')
     def test_cli__when_getting_all_profiles_status_in_json_format(self, mock_perform_cli_pre_checks, mock_init,
@@ -239,7 +288,7 @@ class WorkloadToolUnitTests(unittest2.TestCase):
     @patch('enmutils_int.bin.workload.exception.process_exception')
     @patch('enmutils_int.bin.workload.display_workload_operation_info_message')
     @patch('enmutils_int.bin.workload.docopt')
-    @patch('enmutils_int.bin.workload.workload_ops.get_workload_operations')
+    @patch('enmutils_int.lib.workload_ops.get_workload_operations')
     @patch('enmutils_int.bin.workload.init.exit')
     @patch('enmutils_int.bin.workload.perform_cli_pre_checks')
     def test_cli__when_getting_all_profiles_status_based_on_priority_in_json_format(self, mock_perform_cli_pre_checks,
@@ -264,7 +313,7 @@ class WorkloadToolUnitTests(unittest2.TestCase):
     @patch('enmutils_int.bin.workload.exception.process_exception')
     @patch('enmutils_int.bin.workload.display_workload_operation_info_message')
     @patch('enmutils_int.bin.workload.docopt')
-    @patch('enmutils_int.bin.workload.workload_ops.get_workload_operations')
+    @patch('enmutils_int.lib.workload_ops.get_workload_operations')
     @patch('enmutils_int.bin.workload.init.exit')
     @patch('enmutils_int.bin.workload.perform_cli_pre_checks')
     def test_cli__when_getting_all_profiles_status(self, mock_perform_cli_pre_checks, mock_init,
@@ -286,7 +335,7 @@ class WorkloadToolUnitTests(unittest2.TestCase):
     @patch('enmutils_int.bin.workload._update_config')
     @patch('enmutils_int.bin.workload.exception.process_exception')
     @patch('enmutils_int.bin.workload.log.logger.error')
-    @patch('enmutils_int.bin.workload.workload_ops.get_workload_operations')
+    @patch('enmutils_int.lib.workload_ops.get_workload_operations')
     @patch('enmutils_int.bin.workload.init.exit')
     @patch('enmutils_int.bin.workload.perform_cli_pre_checks')
     def test_cli__fails_if_any_exception_with_clean_output(
@@ -23,11 +23,13 @@ persistence - Tool for management of and interaction with the ENM Utilities pers
 Usage:
   persistence backup
   persistence clear [force] [--index=<index>] [--auto-confirm]
-  persistence list [TOKEN]  [--index=<index>]
+  persistence list [TOKEN]  [--index=<index>] [--details] [--page-size=<size>]
   persistence get KEY [--index=<index>] [--detailed] [--json]
+  persistence health [--history]
   persistence set KEY VALUE EXPIRY [--index=<index>]
   persistence remove KEY [--index=<index>] [--force]
   persistence restore
+  persistence stats [TOKEN] [--index=<index>]
 
 Arguments:
   TOKEN           Token to search for in DB; all keys containing the TOKEN will be listed (optional)
@@ -41,6 +43,9 @@ Arguments:
   --auto-confirm  Automatic confirmation, when force clearing the production persistence
   --detailed      Returns the detailed contents of the persisted object
   --json          Returns content in json format
+  --history       Lists the rolling history of persistence health samples instead of taking a new sample
+  --details       Lists the ttl, type and size of each of the keys
+  --page-size=<size>  Number of keys listed before prompting to continue
 
 Examples:
     ./persistence clear
@@ -56,6 +61,13 @@ Examples:
     ./persistence list enm
         Lists all the keys containing the TOKEN enm in the database.
 
+    ./persistence list enm --details --page-size=50
+        Lists the ttl, type and size of all the keys containing the TOKEN enm in the database, 50 keys at a time.
+
+    ./persistence stats
+        Lists the number of keys, the number of keys with an expiry and the memory used by each key prefix,
+        e.g. FM_ for the key FM_01-status, largest first.
+
     ./persistence get enm_utilities
         Gets the value of the key enm_utilities from the database.
 
@@ -68,17 +80,30 @@ Examples:
     ./persistence remove enm_utilities
         Removes the key enm_utilities from the database.
 
+    ./persistence health
+        Samples the memory usage, keyspace and slow log of the persistence store, lists the memory used by the nodes,
+        profiles, MOs, sessions, counters and mutexes, and any health warnings.
+
+    ./persistence health --history
+        Lists the rolling history of the persistence health samples, recorded every 15 minutes by the profilemanager
+        service.
+
     ./persistence backup
-        Backup the in memory Redis DB to disk. This overwrites any old backup stored in this directory.
+        Backup the in memory Redis DB to disk, streaming the keys to the backup file without stopping or blocking the
+        DB. This overwrites any old backup stored in this directory.
         Only one backup is kept at a time in /var/db/enmutils/backup
 
     ./persistence restore
-        Restore from disk the Redis DB saved by a backup
+        Restore from disk the Redis DB saved by the latest backup, emptying the DB and streaming the keys back into
+        the running DB. Backups taken as a copy of the Redis snapshot file (*.db) are restored by restarting the DB
+        with the snapshot file
 
 Options:
   -h        Print this help text
 
 Note:
+  Keys are listed incrementally (SCAN) rather than all at once, so the listing does not block the persistence store.
+
   Using special characters in the value of arguments KEY, VALUE and TOKEN is generally allowed, but to be safe and avoid
   unwanted shell globbing, it is recommended to surround the value with single quotes.
 
@@ -88,42 +113,109 @@ Note:
 import json
 import os
 import pprint
+import re
 import sys
 import time
+from itertools import islice
 
 from docopt import docopt
 
-from enmutils.lib import exception, filesystem, init, log, persistence
+from enmutils.lib import exception, filesystem, init, log, persistence, persistence_monitor, persistence_snapshot
 from enmutils.lib.custom_json_encoder import CustomEncoder
 from enmutils.lib.enm_node import Node
 
 
-def list(token, db):  # pylint: disable=redefined-builtin
+def _get_match_pattern(token):
     """
-    List all keys in the persistence store that contain the specified token in the key name
+    Get the pattern matching all key names that contain the token, escaping the glob characters in the token
 
-    :param: token: Token to search for in all key names
-    :type: token: str
-    :param: db: Persistence to use to perform query
-    :type: db: enmutils.lib.Persistence object
+    :param token: Token to search for in all key names
+    :type token: str
 
-    :returns: true
+    :returns: Glob-style pattern
+    :rtype: str
+    """
+    return "*{0}*".format(re.sub(r"([\\*?\[\]])", r"\\\1", token))
+
+
+def _continue_paging(num_keys):
+    """
+    Prompts the user to continue listing the keys
+
+    :param num_keys: Number of keys listed so far
+    :type num_keys: int
+
+    :returns: True if the user wishes to continue
     :rtype: bool
+    """
+    log.logger.info("-- {0} keys listed, press Enter for more or q to quit --".format(num_keys))
+    return not raw_input().lower().startswith("q")
+
 
+def list(token, db, details=False, page_size=None):  # pylint: disable=redefined-builtin
     """
+    List all keys in the persistence store that contain the specified token in the key name, scanning the store
+    incrementally with the token matched by the store
 
-    all_keys = db.get_all_keys()
+    :param token: Token to search for in all key names
+    :type token: str
+    :param db: Persistence to use to perform query
+    :type db: enmutils.lib.Persistence object
+    :param details: Boolean indicating if the ttl, type and size of each key should be listed
+    :type details: bool
+    :param page_size: Number of keys listed before prompting to continue, None to list all keys
+    :type page_size: int
 
-    if len(all_keys) > 0:
-        for key in all_keys:
-            if token in key:
-                log.logger.info(key)
-    else:
+    :returns: true
+    :rtype: bool
+
+    """
+    keys = db.scan_keys(match=_get_match_pattern(token))
+    num_keys = 0
+    if details:
+        log.logger.info("{0:<60} {1:>10} {2:>8} {3:>12}".format("KEY", "TTL", "TYPE", "SIZE"))
+    for page in iter(lambda: [key for key in islice(keys, page_size or persistence.SCAN_COUNT)], []):
+        lines = (["{0:<60} {1:>10} {2:>8} {3:>12}".format(*key_details) for key_details in db.get_key_details(page)]
+                 if details else page)
+        for line in lines:
+            log.logger.info(line)
+        num_keys += len(page)
+        if page_size and len(page) == page_size and not _continue_paging(num_keys):
+            break
+
+    if not num_keys:
         log.logger.warn("No keys in the persistence store")
 
     return True
 
 
+def stats(token, db):
+    """
+    Logs the number of keys, the number of keys with an expiry and the memory used by each key prefix, for all keys
+    that contain the specified token in the key name
+
+    :param token: Token to search for in all key names
+    :type token: str
+    :param db: Persistence to use to perform query
+    :type db: enmutils.lib.Persistence object
+
+    :returns: true
+    :rtype: bool
+    """
+    usage = persistence_monitor.get_prefix_usage(db, match=_get_match_pattern(token))
+    if not usage:
+        log.logger.warn("No keys in the persistence store")
+        return True
+    log.logger.info("{0:<40} {1:>10} {2:>10} {3:>14}".format("PREFIX", "KEYS", "EXPIRING", "BYTES"))
+    for prefix, prefix_usage in sorted(usage.iteritems(), key=lambda item: item[1]["bytes"], reverse=True):
+        log.logger.info("{0:<40} {1:>10} {2:>10} {3:>14}".format(
+            prefix, prefix_usage["keys"], prefix_usage["expiring"], prefix_usage["bytes"]))
+    log.logger.info(log.green_text("{0:<40} {1:>10} {2:>10} {3:>14}".format(
+        "TOTAL", *[sum(prefix_usage[name] for prefix_usage in usage.values())
+                   for name in ["keys", "expiring", "bytes"]])))
+    return True
+
+
 def log_in_json_format(value):
     """
     Logs the persistence value in json format
@@ -221,6 +313,34 @@ def remove(key, db, force=False):
     return not db.has_key(key)
 
 
+def health(history=False):
+    """
+    Logs the health of the persistence store, from a new sample or from the rolling history of samples
+
+    :param history: Boolean indicating if the rolling history of samples should be logged
+    :type history: bool
+
+    :returns: True if no health warnings were found
+    :rtype: bool
+    """
+    samples = persistence_monitor.get_history()
+    if history:
+        if not samples:
+            log.logger.warn("No persistence health samples have been recorded")
+        for sample in samples:
+            log.logger.info("{0}  {1:>8.1f}MB  {2:>8} keys  {3:>3} slow commands".format(
+                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sample["time"])),
+                sample["used_memory"] / 1024.0 ** 2, sum(sample["keyspace"].values()), len(sample["slowlog"])))
+        return True
+    sample = persistence_monitor.take_sample()
+    for line in persistence_monitor.get_report(sample):
+        log.logger.info(line)
+    warnings = persistence_monitor.check_health(sample, samples)
+    for warning in warnings:
+        log.logger.warn(log.yellow_text(warning))
+    return not warnings
+
+
 def _log_result(result, arguments):
     """
     Logs operation on database persistence, can either be set or remove
@@ -245,6 +365,7 @@ class RedisVariablesMixin(object):
     RedisVariablesMixin: Object which holds common variables for backup and restore Objects
     """
     default_db_backup_name = "enmutils.db"
+    stream_backup_suffix = "_backup.dump.gz"
     default_db_filesystem_path = "/var/db/enmutils/"
     custom_db_backup_path = "{0}backup/".format(default_db_filesystem_path)
 
@@ -261,11 +382,10 @@ class BackupDb(RedisVariablesMixin):
         filesystem.create_dir(self.custom_db_backup_path)  # Create directory for backup
 
     def execute(self):
-        persistence.save()
-        filesystem.copy("{0}{1}".format(self.default_db_filesystem_path, self.default_db_backup_name),
-                        "{0}{1}_backup.db".format(self.custom_db_backup_path, time.strftime("%Y%m%d-%H%M%S")))
-        log.logger.info(log.green_text("Backup of persistence taken. Stored in: {0}".format(
-            log.blue_text(self.custom_db_backup_path))))
+        num_keys = persistence_snapshot.backup("{0}{1}{2}".format(
+            self.custom_db_backup_path, time.strftime("%Y%m%d-%H%M%S"), self.stream_backup_suffix))
+        log.logger.info(log.green_text("Backup of persistence taken ({0} keys). Stored in: {1}".format(
+            num_keys, log.blue_text(self.custom_db_backup_path))))
 
 
 class RestoreDb(RedisVariablesMixin):
@@ -278,7 +398,16 @@ class RestoreDb(RedisVariablesMixin):
 
     def execute(self):
         if os.path.isdir(self.custom_db_backup_path) and os.listdir(self.custom_db_backup_path):
-            backup_file_name = os.listdir(self.custom_db_backup_path)[0]
+            backup_file_names = sorted(os.listdir(self.custom_db_backup_path))
+            stream_backup_file_names = [file_name for file_name in backup_file_names
+                                        if file_name.endswith(self.stream_backup_suffix)]
+            # Stream backups are named by the time taken, so the latest sorts last
+            backup_file_name = stream_backup_file_names[-1] if stream_backup_file_names else backup_file_names[0]
+            if backup_file_name.endswith(self.stream_backup_suffix):
+                num_keys = persistence_snapshot.restore(self.custom_db_backup_path + backup_file_name)
+                log.logger.info(log.green_text("Restored {0} keys from backup: {1}".format(
+                    num_keys, log.blue_text(self.custom_db_backup_path + backup_file_name))))
+                return
             persistence.shutdown()
             log.logger.info(log.green_text("Redis has been shut down."))
             filesystem.copy("{0}{1}".format(self.custom_db_backup_path, backup_file_name),
@@ -337,10 +466,18 @@ def cli():
             func = db.clear
     elif arguments["list"]:
         func = list
-        if arguments["TOKEN"] is not None:
-            parameters = [arguments["TOKEN"], db]
-        else:
-            parameters = ["", db]
+        page_size = None
+        if arguments["--page-size"]:
+            try:
+                page_size = int(arguments["--page-size"])
+                if page_size < 1:
+                    raise ValueError()
+            except ValueError:
+                exception.handle_invalid_argument('The page size you specified is not valid')
+        parameters = [arguments["TOKEN"] or "", db, arguments["--details"], page_size]
+    elif arguments["stats"]:
+        func = stats
+        parameters = [arguments["TOKEN"] or "", db]
     elif arguments["get"]:
         func = get
         parameters = [arguments["KEY"], db, arguments['--detailed'], arguments['--json']]
@@ -361,6 +498,9 @@ def cli():
             exception.handle_invalid_argument('Key "%s" does not exist in the database' % key)
         func = remove
         parameters = [key, db, force]
+    elif arguments["health"]:
+        func = health
+        parameters = [arguments["--history"]]
     elif arguments["backup"]:
         func = BackupDb().execute
     elif arguments["restore"]:
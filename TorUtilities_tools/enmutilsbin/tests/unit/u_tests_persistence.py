@@ -87,16 +87,33 @@ class PersistenceParameterizedTests(ParameterizedTestCase):
         self.assertEqual(mock_handle_invalid_argument.called, assert_value)
 
     @patch("enmutils.lib.init.exit")
-    @patch("enmutils.lib.persistence.Persistence.save")
+    @patch("enmutilsbin.persistence.persistence_snapshot.backup", return_value=10)
     @patch("enmutils.lib.init.global_init")
-    @patch("enmutils.lib.filesystem.copy")
     @patch("enmutils.lib.filesystem.create_dir")
     @patch("enmutils.lib.filesystem.remove_dir")
     @patch("enmutils.lib.log.logger.info")
-    def test_persistence_backup(self, mock_log_info, *_):
+    def test_persistence_backup(self, mock_log_info, mock_remove_dir, mock_create_dir, _, mock_backup, *__):
         sys.argv = ["persistence", "backup"]
         persistence.cli()
         self.assertTrue(mock_log_info.call_count == 1)
+        self.assertRegexpMatches(mock_backup.call_args[0][0], r"^/var/db/enmutils/backup/.*_backup.dump.gz$")
+        self.assertTrue(mock_remove_dir.called)
+        self.assertTrue(mock_create_dir.called)
+
+    @patch("enmutils.lib.init.exit")
+    @patch("enmutilsbin.persistence.persistence_snapshot.restore", return_value=10)
+    @patch("enmutils.lib.persistence.Persistence.shutdown")
+    @patch("enmutils.lib.init.global_init")
+    @patch("os.listdir", return_value=["20240102-000000_backup.dump.gz", "enmutils.db", "20240101-000000_backup.dump.gz"])
+    @patch("os.path.isdir", return_value=True)
+    @patch("enmutils.lib.log.logger.info")
+    def test_persistence_restore__streams_keys_from_backup(self, mock_log_info, _, __, ___, mock_shutdown,
+                                                           mock_restore, *____):
+        sys.argv = ["persistence", "restore"]
+        persistence.cli()
+        mock_restore.assert_called_once_with("/var/db/enmutils/backup/20240102-000000_backup.dump.gz")
+        self.assertFalse(mock_shutdown.called)
+        self.assertEqual(1, mock_log_info.call_count)
 
     @patch("enmutils.lib.init.exit")
     @patch("enmutils.lib.persistence.default_db")
@@ -189,6 +206,78 @@ class PersistenceParameterizedTests(ParameterizedTestCase):
         persistence.log_in_json_format({"FM_01", "CMSYNC_01", "PM_01"})
         self.assertRegexpMatches(mock_info.call_args[0][0], r'["FM_01", "CMSYNC_01", "PM_01"]')
 
+    @patch('enmutilsbin.persistence.log.logger')
+    @patch('enmutilsbin.persistence.persistence_monitor.check_health', return_value=["High memory"])
+    @patch('enmutilsbin.persistence.persistence_monitor.get_report', return_value=["line1", "line2"])
+    @patch('enmutilsbin.persistence.persistence_monitor.take_sample')
+    @patch('enmutilsbin.persistence.persistence_monitor.get_history', return_value=[{"time": 1}])
+    def test_health__logs_report_and_warnings_of_new_sample(self, _, mock_take_sample, mock_get_report,
+                                                            mock_check_health, mock_logger):
+        self.assertFalse(persistence.health())
+        mock_get_report.assert_called_once_with(mock_take_sample.return_value)
+        mock_check_health.assert_called_once_with(mock_take_sample.return_value, [{"time": 1}])
+        self.assertEqual(2, mock_logger.info.call_count)
+        self.assertEqual(1, mock_logger.warn.call_count)
+
+    @patch('enmutilsbin.persistence.log.logger')
+    @patch('enmutilsbin.persistence.persistence_monitor.take_sample')
+    @patch('enmutilsbin.persistence.persistence_monitor.get_history')
+    def test_health__logs_history_of_samples(self, mock_get_history, mock_take_sample, mock_logger):
+        mock_get_history.return_value = [{"time": 1, "used_memory": 1024 ** 2, "keyspace": {0: 5, 32: 1},
+                                          "slowlog": [{}]}]
+        self.assertTrue(persistence.health(history=True))
+        self.assertFalse(mock_take_sample.called)
+        self.assertIn("1.0MB         6 keys    1 slow commands", mock_logger.info.call_args[0][0])
+
+    @patch('enmutilsbin.persistence.log.logger')
+    def test_list__lists_keys_containing_token_with_details(self, mock_logger):
+        db = persistence_lib.default_db()
+        db.set("list-test-key", "value", -1)
+        db.set("other-key", "value", -1)
+
+        with patch.object(db.connection, "type", return_value="string"):
+            self.assertTrue(persistence.list("test", db, details=True))
+
+        lines = [call[0][0] for call in mock_logger.info.call_args_list]
+        self.assertEqual(2, len(lines))
+        self.assertTrue(lines[1].startswith("list-test-key"))
+        self.assertTrue(lines[1].endswith(" {0}".format(len(db.connection.get("list-test-key")))))
+
+    def test_get_match_pattern__escapes_glob_characters_in_token(self):
+        self.assertEqual(r"*FM_01\*\[1\]\?*", persistence._get_match_pattern("FM_01*[1]?"))
+
+    @patch('enmutilsbin.persistence.raw_input', create=True, return_value="q")
+    @patch('enmutilsbin.persistence.log.logger')
+    def test_list__stops_paging_if_user_quits(self, mock_logger, mock_raw_input):
+        db = Mock()
+        db.scan_keys.return_value = iter(["key1", "key2", "key3"])
+
+        self.assertTrue(persistence.list("", db, page_size=2))
+
+        self.assertEqual(1, mock_raw_input.call_count)
+        self.assertEqual(["key1", "key2", "-- 2 keys listed, press Enter for more or q to quit --"],
+                         [call[0][0] for call in mock_logger.info.call_args_list])
+        db.scan_keys.assert_called_once_with(match="**")
+
+    @patch('enmutilsbin.persistence.log.logger')
+    @patch('enmutilsbin.persistence.persistence_monitor.get_prefix_usage')
+    def test_stats__logs_usage_by_prefix_largest_first(self, mock_get_prefix_usage, mock_logger):
+        mock_get_prefix_usage.return_value = {"FM_": {"keys": 2, "expiring": 1, "bytes": 10},
+                                              "LTE": {"keys": 3, "expiring": 0, "bytes": 300}}
+
+        self.assertTrue(persistence.stats("", Mock()))
+
+        lines = [call[0][0] for call in mock_logger.info.call_args_list]
+        self.assertEqual(4, len(lines))
+        self.assertTrue(lines[1].startswith("LTE"))
+        self.assertIn("{0:>10} {1:>10} {2:>14}".format(5, 1, 310), lines[3])
+
+    @patch('enmutilsbin.persistence.log.logger')
+    @patch('enmutilsbin.persistence.persistence_monitor.get_prefix_usage', return_value={})
+    def test_stats__warns_if_no_keys_found(self, _, mock_logger):
+        self.assertTrue(persistence.stats("missing", Mock()))
+        self.assertEqual(1, mock_logger.warn.call_count)
+
 
 if __name__ == "__main__":
     unittest2.main(verbosity=2)
@@ -102,13 +102,13 @@ def setup_test_node_objects(range_end=100, primary_type="ERBS", node_version="16
 
 def add_nodes_to_pool(pool, num_nodes, primary_type="ERBS", node_version="16A"):
     with patch('enmutils_int.lib.node_pool_mgr.Pool.validate_nodes_against_enm') as mock_validate:
-        with patch('enmutils_int.lib.node_pool_mgr.Pool._load_nodes_from_file') as mock_add_file:
+        with patch('enmutils_int.lib.node_pool_mgr.Pool._load_nodes_from_file_in_chunks') as mock_add_file:
             with patch('enmutils.lib.enm_node_management.CmManagement.get_status') as mock_sync_state:
                 with patch('enmutils_int.lib.node_pool_mgr.Pool.nodes_to_be_allocated') as mock_lte:
                     with patch('testslib.unit_test_utils.BaseLoadNode.compare_and_update_persisted_node') as _:
                         nodes = setup_test_node_objects(num_nodes, primary_type=primary_type,
                                                         node_version=node_version)
-                        mock_add_file.return_value = (nodes, [])
+                        mock_add_file.return_value = iter([(nodes, [], len(nodes))])
                         mock_validate.return_value = []
                         mock_lte.side_effect = [node for node in nodes]
                         mock_sync_state.return_value = {node.node_id: "SYNCHRONIZED" for node in nodes}